@@ -0,0 +1,897 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+统一对齐引擎
+一次动态规划对齐同时产出S/D/I统计、操作块、高亮文本和差异序列，
+保证指标、高亮和差异三者基于同一条对齐路径，不会互相矛盾
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import Levenshtein
+except ImportError:
+    Levenshtein = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# 逐列操作编码（每个对齐列占1字节）
+OP_EQUAL = 0
+OP_REPLACE = 1
+OP_DELETE = 2
+OP_INSERT = 3
+
+# 操作编码对应的difflib风格标签
+OP_TAGS = ('equal', 'replace', 'delete', 'insert')
+
+# 可用的对齐后端
+BACKENDS = ('auto', 'levenshtein', 'numpy', 'python', 'hirschberg')
+
+# python-Levenshtein不可用时的回退后端
+FALLBACK_BACKEND = 'numpy' if np is not None else 'python'
+
+# 回退实现的完整DP矩阵超过该单元数时自动切换到线性内存的Hirschberg对齐
+# （2500万单元约对应两侧各5000字，uint16矩阵约50MB）
+DEFAULT_LINEAR_MEMORY_THRESHOLD = 25_000_000
+
+# Hirschberg子问题降到该单元数以下时直接使用完整矩阵回溯
+HIRSCHBERG_BASE_CELLS = 250_000
+
+# 分段对齐默认的锚点k-mer长度（字符数）
+DEFAULT_ANCHOR_LENGTH = 12
+
+
+class Alignment:
+    """
+    对齐结果
+    以紧凑的字节数组保存逐列操作，S/D/I统计、操作块和渲染结果都由它派生
+    """
+
+    __slots__ = ('ref', 'hyp', 'ops', 'backend', 'exact')
+
+    def __init__(self, ref: str, hyp: str, ops: array, backend: str = 'unknown',
+                 exact: bool = True):
+        """
+        初始化对齐结果
+
+        Args:
+            ref (str): 参考字符串
+            hyp (str): 假设字符串
+            ops (array): 逐列操作数组（array('B')，取值为OP_*）
+            backend (str): 产生该对齐的后端名称
+            exact (bool): 编辑距离是否保证最优；分段对齐无法证明最优时为False，
+                此时统计结果是真实错误数的上界
+        """
+        self.ref = ref
+        self.hyp = hyp
+        self.ops = ops
+        self.backend = backend
+        self.exact = exact
+
+    @property
+    def substitutions(self) -> int:
+        """替换错误数"""
+        return self.ops.count(OP_REPLACE)
+
+    @property
+    def deletions(self) -> int:
+        """删除错误数"""
+        return self.ops.count(OP_DELETE)
+
+    @property
+    def insertions(self) -> int:
+        """插入错误数"""
+        return self.ops.count(OP_INSERT)
+
+    @property
+    def hits(self) -> int:
+        """命中数"""
+        return self.ops.count(OP_EQUAL)
+
+    @property
+    def distance(self) -> int:
+        """编辑距离"""
+        return len(self.ops) - self.hits
+
+    def counts(self) -> Tuple[int, int, int]:
+        """
+        获取编辑操作统计
+
+        Returns:
+            Tuple[int, int, int]: (替换数, 删除数, 插入数)
+        """
+        return self.substitutions, self.deletions, self.insertions
+
+    def get_editops(self) -> List[Tuple[str, int, int]]:
+        """
+        获取与Levenshtein.editops格式一致的编辑操作序列
+
+        Returns:
+            List[Tuple[str, int, int]]: (操作类型, 参考位置, 假设位置)的列表
+        """
+        editops = []
+        i = j = 0
+        for op in self.ops:
+            if op == OP_EQUAL:
+                i += 1
+                j += 1
+            elif op == OP_REPLACE:
+                editops.append(('replace', i, j))
+                i += 1
+                j += 1
+            elif op == OP_DELETE:
+                editops.append(('delete', i, j))
+                i += 1
+            else:
+                editops.append(('insert', i, j))
+                j += 1
+        return editops
+
+    def get_opcodes(self) -> List[Tuple[str, int, int, int, int]]:
+        """
+        获取difflib风格的操作块，连续的同类操作合并为一个块
+
+        Returns:
+            List[Tuple[str, int, int, int, int]]: (标签, i1, i2, j1, j2)的列表
+        """
+        opcodes = []
+        i = j = 0
+        ops = self.ops
+        k = 0
+        total = len(ops)
+        while k < total:
+            op = ops[k]
+            start = k
+            while k < total and ops[k] == op:
+                k += 1
+            run = k - start
+            di = 0 if op == OP_INSERT else run
+            dj = 0 if op == OP_DELETE else run
+            opcodes.append((OP_TAGS[op], i, i + di, j, j + dj))
+            i += di
+            j += dj
+        return opcodes
+
+    def highlights(self) -> Tuple[str, str]:
+        """
+        构建高亮标记的字符串，错误部分用方括号标出
+
+        Returns:
+            tuple: (参考文本高亮版, 假设文本高亮版)
+        """
+        ref, hyp = self.ref, self.hyp
+        ref_highlighted = []
+        hyp_highlighted = []
+
+        for tag, i1, i2, j1, j2 in self.get_opcodes():
+            if tag == 'equal':
+                ref_highlighted.append(ref[i1:i2])
+                hyp_highlighted.append(hyp[j1:j2])
+            elif tag == 'replace':
+                ref_highlighted.append(f"[{ref[i1:i2]}]")
+                hyp_highlighted.append(f"[{hyp[j1:j2]}]")
+            elif tag == 'delete':
+                ref_highlighted.append(f"[{ref[i1:i2]}]")
+            elif tag == 'insert':
+                hyp_highlighted.append(f"[{hyp[j1:j2]}]")
+
+        return ''.join(ref_highlighted), ''.join(hyp_highlighted)
+
+    def diff_sequence(self) -> str:
+        """
+        生成与difflib.Differ格式一致的逐字差异序列
+
+        Returns:
+            str: 差异序列（'  '表示相同，'- '表示参考独有，'+ '表示假设独有）
+        """
+        ref, hyp = self.ref, self.hyp
+        diff = []
+        for tag, i1, i2, j1, j2 in self.get_opcodes():
+            if tag == 'equal':
+                diff.extend('  ' + char for char in ref[i1:i2])
+                continue
+            diff.extend('- ' + char for char in ref[i1:i2])
+            diff.extend('+ ' + char for char in hyp[j1:j2])
+        return ''.join(diff)
+
+    def __repr__(self) -> str:
+        s, d, i = self.counts()
+        bound = '' if self.exact else ', upper_bound'
+        return f"Alignment(S={s}, D={d}, I={i}, backend='{self.backend}'{bound})"
+
+
+def editops_to_ops(editops, len1: int, len2: int) -> array:
+    """
+    将编辑操作序列展开为逐列操作数组
+
+    Args:
+        editops: (操作类型, 参考位置, 假设位置)的序列，按位置升序
+        len1 (int): 参考字符串长度
+        len2 (int): 假设字符串长度
+
+    Returns:
+        array: 逐列操作数组
+    """
+    codes = {'replace': OP_REPLACE, 'delete': OP_DELETE, 'insert': OP_INSERT}
+    ops = array('B')
+    i = j = 0
+    for tag, si, sj in editops:
+        # 操作之前未被触及的部分为相同字符（编码为0，可以批量填充）
+        if si > i:
+            ops.frombytes(bytes(si - i))
+            j += si - i
+            i = si
+        op = codes[tag]
+        ops.append(op)
+        if op != OP_INSERT:
+            i += 1
+        if op != OP_DELETE:
+            j += 1
+    if i < len1:
+        ops.frombytes(bytes(len1 - i))
+    return ops
+
+
+def _python_editops(s1: str, s2: str) -> List[Tuple[str, int, int]]:
+    """
+    纯Python动态规划+路径回溯计算编辑操作序列
+    在numpy和python-Levenshtein都不可用时使用
+
+    Args:
+        s1 (str): 参考字符串
+        s2 (str): 假设字符串
+
+    Returns:
+        List[Tuple[str, int, int]]: (操作类型, 参考位置, 假设位置)的列表，按位置升序
+    """
+    m, n = len(s1), len(s2)
+
+    # 创建DP矩阵
+    dp = [[0] * (n + 1) for _ in range(m + 1)]
+
+    # 初始化第一行和第一列
+    for i in range(m + 1):
+        dp[i][0] = i  # 从s1[:i]到空字符串需要i次删除
+    for j in range(n + 1):
+        dp[0][j] = j  # 从空字符串到s2[:j]需要j次插入
+
+    # 填充DP矩阵
+    for i in range(1, m + 1):
+        for j in range(1, n + 1):
+            if s1[i-1] == s2[j-1]:
+                # 字符相同，无需编辑
+                dp[i][j] = dp[i-1][j-1]
+            else:
+                # 字符不同，选择代价最小的操作
+                dp[i][j] = min(
+                    dp[i-1][j-1] + 1,  # 替换
+                    dp[i-1][j] + 1,     # 删除
+                    dp[i][j-1] + 1      # 插入
+                )
+
+    return _backtrack(s1, s2, dp)
+
+
+def _backtrack(s1: str, s2: str, dp) -> List[Tuple[str, int, int]]:
+    """
+    在完整DP矩阵上回溯出一条最优路径
+    平局时依次优先匹配、替换、删除、插入
+
+    Args:
+        s1 (str): 参考字符串
+        s2 (str): 假设字符串
+        dp: 可按dp[i][j]访问的DP矩阵（嵌套列表或numpy二维数组）
+
+    Returns:
+        List[Tuple[str, int, int]]: (操作类型, 参考位置, 假设位置)的列表，按位置升序
+    """
+    i, j = len(s1), len(s2)
+    ops = []
+
+    while i > 0 or j > 0:
+        if i == 0:
+            # 只能插入
+            j -= 1
+            ops.append(('insert', 0, j))
+            continue
+        if j == 0:
+            # 只能删除
+            i -= 1
+            ops.append(('delete', i, 0))
+            continue
+
+        if s1[i-1] == s2[j-1]:
+            # 字符匹配，向左上移动
+            i -= 1
+            j -= 1
+        else:
+            current = dp[i][j]
+            if current == dp[i-1][j-1] + 1:
+                # 替换操作
+                i -= 1
+                j -= 1
+                ops.append(('replace', i, j))
+            elif current == dp[i-1][j] + 1:
+                # 删除操作
+                i -= 1
+                ops.append(('delete', i, j))
+            else:
+                # 插入操作
+                j -= 1
+                ops.append(('insert', i, j))
+
+    ops.reverse()
+    return ops
+
+
+def build_pattern_masks(pattern: str) -> Dict[str, int]:
+    """
+    预计算字母表到位掩码的映射（Myers/Hyyrö位并行算法中的Peq表）
+    掩码第i位为1表示pattern[i]等于该字符，同一参考文本可重复使用
+
+    Args:
+        pattern (str): 模式串（通常为参考文本）
+
+    Returns:
+        Dict[str, int]: 字符到位掩码的映射
+    """
+    masks: Dict[str, int] = {}
+    for i, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks
+
+
+def bitparallel_distance(pattern: str, text: str,
+                         masks: Optional[Dict[str, int]] = None) -> int:
+    """
+    使用Myers/Hyyrö位并行算法计算编辑距离
+    DP矩阵的一整列被打包成位向量，每处理text中的一个字符只需常数次位运算，
+    时间复杂度O(n·⌈m/w⌉)，内存O(m)。位向量使用Python任意精度整数，
+    运算在C层面按机器字批量完成，无需手动处理跨字的进位
+
+    Args:
+        pattern (str): 模式串（参考文本）
+        text (str): 待比较文本（假设文本）
+        masks (Dict[str, int]): 预计算的字符位掩码，None时自动计算
+
+    Returns:
+        int: 编辑距离
+    """
+    m = len(pattern)
+    if m == 0:
+        return len(text)
+    if not text:
+        return m
+
+    if masks is None:
+        masks = build_pattern_masks(pattern)
+
+    full = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv = full  # 垂直正增量：初始列D[i][0]=i，每行+1
+    mv = 0     # 垂直负增量
+    score = m
+
+    for char in text:
+        eq = masks.get(char, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & full) ^ pv) | eq
+        ph = mv | ((xh | pv) ^ full)
+        mh = pv & xh
+
+        # 跟踪最后一行的分数变化
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+
+        # 第0行D[0][j]=j，水平增量恒为+1，因此移位时补1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | ((xv | ph) ^ full)
+        mv = ph & xv
+
+    return score
+
+
+def distance(ref: str, hyp: str, backend: str = 'auto',
+             score_cutoff: Optional[int] = None,
+             masks: Optional[Dict[str, int]] = None) -> int:
+    """
+    计算编辑距离（只需要距离、不需要对齐路径时使用）
+
+    给定score_cutoff时只关心距离是否超过该值：一旦能确定超过就提前结束并返回
+    score_cutoff + 1（与python-Levenshtein的score_cutoff语义一致）。回退实现先用
+    长度差和字符多重集差异两个下界快速排除，无法排除时再计算精确距离
+
+    Args:
+        ref (str): 参考字符串
+        hyp (str): 假设字符串
+        backend (str): auto时优先使用python-Levenshtein，否则使用位并行算法
+        score_cutoff (int): 距离上限，None表示计算精确距离
+        masks (Dict[str, int]): 参考文本预计算的位掩码（位并行算法使用）
+
+    Returns:
+        int: 编辑距离；超过score_cutoff时为score_cutoff + 1
+    """
+    backend = resolve_backend(backend)
+    if score_cutoff is None:
+        if backend == 'levenshtein':
+            return Levenshtein.distance(ref, hyp)
+        return bitparallel_distance(ref, hyp, masks)
+
+    score_cutoff = max(score_cutoff, 0)
+    if abs(len(ref) - len(hyp)) > score_cutoff:
+        return score_cutoff + 1
+    if backend == 'levenshtein':
+        return Levenshtein.distance(ref, hyp, score_cutoff=score_cutoff)
+    if bag_distance(ref, hyp) > score_cutoff:
+        return score_cutoff + 1
+    return min(bitparallel_distance(ref, hyp, masks), score_cutoff + 1)
+
+
+def encode_text(text: str):
+    """
+    将字符串编码为码点数组，便于向量化比较
+
+    Args:
+        text (str): 输入字符串
+
+    Returns:
+        numpy.ndarray: uint32码点数组
+    """
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+
+
+def _numpy_rows(a, b):
+    """
+    使用numpy逐行向量化计算编辑距离矩阵，依次产出每一行
+    行内的插入依赖通过"减去列号后求前缀最小值"的技巧一次完成
+
+    Args:
+        a: 参考序列的码点数组（行方向）
+        b: 假设序列的码点数组（列方向）
+
+    Yields:
+        numpy.ndarray: 第1行到第m行（生成器内部复用缓冲区，调用方需要时自行拷贝）
+    """
+    n = len(b)
+    cols = np.arange(n + 1, dtype=np.int64)
+    prev = cols.copy()
+    row = np.empty(n + 1, dtype=np.int64)
+
+    for i in range(1, len(a) + 1):
+        # 替换（或匹配）与删除两种来源
+        cost = (b != a[i - 1])
+        row[0] = i
+        np.minimum(prev[:-1] + cost, prev[1:] + 1, out=row[1:])
+        # 插入来源：row[j] = min_k(row[k] + (j - k))
+        row -= cols
+        np.minimum.accumulate(row, out=row)
+        row += cols
+        yield row
+        prev, row = row, prev
+
+
+def _numpy_dp_matrix(a, b):
+    """
+    使用numpy计算完整的(m+1)×(n+1)编辑距离矩阵
+
+    Args:
+        a: 参考序列的码点数组
+        b: 假设序列的码点数组
+
+    Returns:
+        numpy.ndarray: DP矩阵
+    """
+    m, n = len(a), len(b)
+    # 编辑距离不会超过max(m, n)，选用能容纳的最小整数类型以节省内存
+    dtype = np.uint16 if max(m, n) < np.iinfo(np.uint16).max else np.uint32
+    dp = np.empty((m + 1, n + 1), dtype=dtype)
+    dp[0] = np.arange(n + 1)
+    for i, row in enumerate(_numpy_rows(a, b), start=1):
+        dp[i] = row
+    return dp
+
+
+def _numpy_last_row(a, b):
+    """
+    只保留最后一行的numpy动态规划，内存O(n)
+
+    Args:
+        a: 参考序列的码点数组
+        b: 假设序列的码点数组
+
+    Returns:
+        numpy.ndarray: 最后一行（长度n+1）
+    """
+    last = np.arange(len(b) + 1, dtype=np.int64)
+    for row in _numpy_rows(a, b):
+        last = row
+    return last.copy()
+
+
+def _numpy_block_editops(a, b) -> List[Tuple[str, int, int]]:
+    """
+    numpy向量化动态规划+路径回溯计算码点数组之间的编辑操作序列
+
+    Args:
+        a: 参考序列的码点数组
+        b: 假设序列的码点数组
+
+    Returns:
+        List[Tuple[str, int, int]]: (操作类型, 参考位置, 假设位置)的列表，按位置升序
+    """
+    dp = _numpy_dp_matrix(a, b)
+    # 转为Python列表后回溯，避免逐个访问numpy标量的开销
+    if dp.size <= 4_000_000:
+        return _backtrack(a.tolist(), b.tolist(), dp.tolist())
+    return _backtrack(a.tolist(), b.tolist(), dp)
+
+
+def _numpy_editops(s1: str, s2: str, codes1=None) -> List[Tuple[str, int, int]]:
+    """
+    numpy向量化动态规划+路径回溯计算编辑操作序列
+
+    Args:
+        s1 (str): 参考字符串
+        s2 (str): 假设字符串
+        codes1: 参考字符串预先编码的码点数组（可选）
+
+    Returns:
+        List[Tuple[str, int, int]]: (操作类型, 参考位置, 假设位置)的列表，按位置升序
+    """
+    return _numpy_block_editops(encode_text(s1) if codes1 is None else codes1, encode_text(s2))
+
+
+def _python_last_row(a, b) -> List[int]:
+    """
+    只保留最后一行的纯Python动态规划，内存O(n)
+
+    Args:
+        a: 参考序列
+        b: 假设序列
+
+    Returns:
+        List[int]: 最后一行（长度n+1）
+    """
+    prev = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        row = [i]
+        for j, char_b in enumerate(b, start=1):
+            if char_a == char_b:
+                row.append(prev[j - 1])
+            else:
+                row.append(min(prev[j - 1], prev[j], row[j - 1]) + 1)
+        prev = row
+    return prev
+
+
+def hirschberg_ops(ref: str, hyp: str, base_cells: int = HIRSCHBERG_BASE_CELLS,
+                   ref_codes=None) -> array:
+    """
+    Hirschberg分治对齐，内存O(m+n)
+    每次把参考序列对半切分，分别计算上半部分的正向末行和下半部分的反向末行，
+    两者之和最小的列就是最优路径穿过中间行的位置，据此递归求解两个子问题；
+    子问题规模降到base_cells以下时改用完整DP矩阵回溯
+
+    得到的编辑距离与完整DP完全相同，S/D/I统计对应其中一条最优路径
+
+    Args:
+        ref (str): 参考字符串
+        hyp (str): 假设字符串
+        base_cells (int): 子问题的矩阵单元数不超过该值时直接回溯
+        ref_codes: 参考字符串预先编码的码点数组（可选，仅numpy实现使用）
+
+    Returns:
+        array: 逐列操作数组
+    """
+    if np is not None:
+        a = encode_text(ref) if ref_codes is None else ref_codes
+        b = encode_text(hyp)
+        last_row, block_editops = _numpy_last_row, _numpy_block_editops
+    else:
+        a, b = ref, hyp
+        last_row, block_editops = _python_last_row, _python_editops
+
+    ops = array('B')
+
+    def solve(a_lo: int, a_hi: int, b_lo: int, b_hi: int):
+        m, n = a_hi - a_lo, b_hi - b_lo
+        if m == 0:
+            ops.extend(array('B', [OP_INSERT]) * n)
+            return
+        if n == 0:
+            ops.extend(array('B', [OP_DELETE]) * m)
+            return
+        if m == 1 or m * n <= base_cells:
+            editops = block_editops(a[a_lo:a_hi], b[b_lo:b_hi])
+            ops.extend(editops_to_ops(editops, m, n))
+            return
+
+        mid = a_lo + m // 2
+        sub_b = b[b_lo:b_hi]
+        forward = last_row(a[a_lo:mid], sub_b)
+        backward = last_row(a[mid:a_hi][::-1], sub_b[::-1])
+        # 正向与反向代价之和最小的列即最优路径穿过中间行的位置
+        if np is not None:
+            split = int(np.argmin(forward + backward[::-1]))
+        else:
+            costs = [f + r for f, r in zip(forward, reversed(backward))]
+            split = costs.index(min(costs))
+
+        solve(a_lo, mid, b_lo, b_lo + split)
+        solve(mid, a_hi, b_lo + split, b_hi)
+
+    solve(0, len(a), 0, len(b))
+    return ops
+
+
+def resolve_backend(backend: str = 'auto') -> str:
+    """
+    解析实际使用的对齐后端
+
+    Args:
+        backend (str): 请求的后端名称
+
+    Returns:
+        str: 实际可用的后端名称
+
+    Raises:
+        ValueError: 后端名称不支持或对应依赖未安装
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"不支持的对齐后端: {backend}，可用的后端: {list(BACKENDS)}")
+
+    if backend == 'auto':
+        if Levenshtein is not None:
+            return 'levenshtein'
+        if np is not None:
+            return 'numpy'
+        return 'python'
+
+    if backend == 'levenshtein' and Levenshtein is None:
+        raise ValueError("python-Levenshtein库未安装，请运行: pip install python-Levenshtein")
+    if backend == 'numpy' and np is None:
+        raise ValueError("numpy库未安装，请运行: pip install numpy")
+
+    return backend
+
+
+def align(ref: str, hyp: str, backend: str = 'auto',
+          linear_memory_threshold: Optional[int] = DEFAULT_LINEAR_MEMORY_THRESHOLD,
+          ref_codes=None) -> Alignment:
+    """
+    对齐参考字符串和假设字符串
+    优先使用python-Levenshtein的原生实现，不可用时回退到numpy向量化实现，
+    最后回退到纯Python实现。回退实现的矩阵规模超过阈值时自动改用
+    线性内存的Hirschberg分治对齐
+
+    Args:
+        ref (str): 参考字符串
+        hyp (str): 假设字符串
+        backend (str): 对齐后端（auto/levenshtein/numpy/python/hirschberg）
+        linear_memory_threshold (int): 回退实现切换到Hirschberg的矩阵单元数阈值，None表示不切换
+        ref_codes: 参考字符串预先编码的码点数组（encode_text的结果），
+            同一参考文本对齐多个假设文本时可避免重复编码
+
+    Returns:
+        Alignment: 对齐结果
+    """
+    backend = resolve_backend(backend)
+
+    # 边界情况无需动态规划
+    if not ref or not hyp:
+        ops = array('B', [OP_INSERT]) * len(hyp) if not ref else array('B', [OP_DELETE]) * len(ref)
+        return Alignment(ref, hyp, ops, backend)
+
+    # 完整DP矩阵过大时改用线性内存的分治对齐
+    if backend in ('numpy', 'python') and linear_memory_threshold is not None \
+            and len(ref) * len(hyp) > linear_memory_threshold:
+        backend = 'hirschberg'
+
+    if backend == 'hirschberg':
+        return Alignment(ref, hyp, hirschberg_ops(ref, hyp, ref_codes=ref_codes), backend)
+
+    if backend == 'levenshtein':
+        editops = Levenshtein.editops(ref, hyp)
+    elif backend == 'numpy':
+        editops = _numpy_editops(ref, hyp, ref_codes)
+    else:
+        editops = _python_editops(ref, hyp)
+
+    return Alignment(ref, hyp, editops_to_ops(editops, len(ref), len(hyp)), backend)
+
+
+def _unique_kmers(text: str, k: int) -> Dict[str, int]:
+    """
+    统计文本中只出现一次的k-mer及其位置
+
+    Args:
+        text (str): 文本
+        k (int): k-mer长度
+
+    Returns:
+        Dict[str, int]: 唯一k-mer到起始位置的映射
+    """
+    positions = {}
+    repeated = set()
+    for pos in range(len(text) - k + 1):
+        kmer = text[pos:pos + k]
+        if kmer in positions:
+            repeated.add(kmer)
+        else:
+            positions[kmer] = pos
+    for kmer in repeated:
+        del positions[kmer]
+    return positions
+
+
+def _longest_increasing_chain(pairs: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    在按参考位置排序的(参考位置, 假设位置)列表中选出假设位置严格递增的最长子序列
+    （耐心排序，O(n log n)）
+
+    Args:
+        pairs (List[Tuple[int, int]]): 按参考位置升序排列的候选锚点
+
+    Returns:
+        List[Tuple[int, int]]: 两侧位置都单调递增的锚点链
+    """
+    tails = []          # tails[k]: 长度为k+1的链的最小末尾假设位置
+    tail_index = []     # tails[k]对应的pairs下标
+    previous = [-1] * len(pairs)
+
+    for idx, (_, hyp_pos) in enumerate(pairs):
+        k = bisect_left(tails, hyp_pos)
+        if k == len(tails):
+            tails.append(hyp_pos)
+            tail_index.append(idx)
+        else:
+            tails[k] = hyp_pos
+            tail_index[k] = idx
+        previous[idx] = tail_index[k - 1] if k > 0 else -1
+
+    chain = []
+    idx = tail_index[-1] if tail_index else -1
+    while idx >= 0:
+        chain.append(pairs[idx])
+        idx = previous[idx]
+    chain.reverse()
+    return chain
+
+
+def anchors_are_monotonic(anchors: List[Tuple[int, int, int]]) -> bool:
+    """
+    检查锚点在两侧都按顺序排列且互不重叠
+
+    Args:
+        anchors (List[Tuple[int, int, int]]): (参考起点, 假设起点, 长度)列表
+
+    Returns:
+        bool: 是否单调
+    """
+    ref_end = hyp_end = 0
+    for ref_pos, hyp_pos, length in anchors:
+        if length <= 0 or ref_pos < ref_end or hyp_pos < hyp_end:
+            return False
+        ref_end, hyp_end = ref_pos + length, hyp_pos + length
+    return True
+
+
+def find_anchors(ref: str, hyp: str, k: int = DEFAULT_ANCHOR_LENGTH) -> List[Tuple[int, int, int]]:
+    """
+    查找参考文本和假设文本之间的锚点：在两侧都只出现一次的公共k-mer，
+    取两侧位置同时递增的最长链，合并同一对角线上相邻的k-mer并向右延伸
+
+    Args:
+        ref (str): 参考字符串
+        hyp (str): 假设字符串
+        k (int): k-mer长度，越长锚点越可靠但越少
+
+    Returns:
+        List[Tuple[int, int, int]]: 单调且互不重叠的(参考起点, 假设起点, 长度)列表
+    """
+    if k <= 0:
+        raise ValueError(f"锚点长度必须为正整数: {k}")
+    if len(ref) < k or len(hyp) < k:
+        return []
+
+    ref_kmers = _unique_kmers(ref, k)
+    hyp_kmers = _unique_kmers(hyp, k)
+    candidates = sorted((pos, hyp_kmers[kmer]) for kmer, pos in ref_kmers.items() if kmer in hyp_kmers)
+
+    anchors = []
+    ref_end = hyp_end = 0
+    for ref_pos, hyp_pos in _longest_increasing_chain(candidates):
+        # 同一对角线上重叠或相邻的k-mer合并为一个锚点
+        if anchors and ref_pos - hyp_pos == anchors[-1][0] - anchors[-1][1] and ref_pos <= ref_end:
+            continue
+        # 与上一个锚点交叉的k-mer丢弃，保证锚点互不重叠
+        if ref_pos < ref_end or hyp_pos < hyp_end:
+            continue
+        length = k
+        while ref_pos + length < len(ref) and hyp_pos + length < len(hyp) \
+                and ref[ref_pos + length] == hyp[hyp_pos + length]:
+            length += 1
+        anchors.append((ref_pos, hyp_pos, length))
+        ref_end, hyp_end = ref_pos + length, hyp_pos + length
+
+    return anchors
+
+
+def bag_distance(ref: str, hyp: str) -> int:
+    """
+    字符多重集差异，是编辑距离的下界，用于判断分段对齐结果是否最优
+
+    Args:
+        ref (str): 参考字符串
+        hyp (str): 假设字符串
+
+    Returns:
+        int: 下界
+    """
+    ref_counts, hyp_counts = Counter(ref), Counter(hyp)
+    return max(sum((ref_counts - hyp_counts).values()), sum((hyp_counts - ref_counts).values()))
+
+
+def segmented_align(ref: str, hyp: str, backend: str = 'auto',
+                    anchor_length: int = DEFAULT_ANCHOR_LENGTH,
+                    linear_memory_threshold: Optional[int] = DEFAULT_LINEAR_MEMORY_THRESHOLD,
+                    verify: bool = False) -> Alignment:
+    """
+    基于锚点的分段对齐，适用于数万字以上的长文档快速分诊
+    先查找两侧唯一的公共子串作为锚点并检查其单调性，只对锚点之间的间隙做动态规划，
+    再把各间隙的操作拼接为完整对齐
+
+    锚点不一定位于最优路径上，因此结果是编辑距离的上界；当结果等于字符多重集下界，
+    或verify=True且与精确编辑距离一致时，标记为精确（exact=True）
+
+    Args:
+        ref (str): 参考字符串
+        hyp (str): 假设字符串
+        backend (str): 间隙对齐使用的后端
+        anchor_length (int): 锚点k-mer长度
+        linear_memory_threshold (int): 间隙对齐切换到Hirschberg的矩阵单元数阈值
+        verify (bool): 是否额外计算一次精确编辑距离来确认结果是否最优
+
+    Returns:
+        Alignment: 拼接后的对齐结果，backend为"segmented:<间隙后端>"
+    """
+    backend = resolve_backend(backend)
+    anchors = find_anchors(ref, hyp, anchor_length)
+    if not anchors_are_monotonic(anchors):
+        raise ValueError("锚点不满足单调性，无法分段对齐")
+
+    ops = array('B')
+    gap_backend = backend
+    ref_pos = hyp_pos = 0
+    for anchor_ref, anchor_hyp, length in anchors + [(len(ref), len(hyp), 0)]:
+        gap = align(ref[ref_pos:anchor_ref], hyp[hyp_pos:anchor_hyp], backend=backend,
+                    linear_memory_threshold=linear_memory_threshold)
+        ops.extend(gap.ops)
+        if gap.ops:
+            gap_backend = gap.backend
+        ops.extend(array('B', [OP_EQUAL]) * length)
+        ref_pos, hyp_pos = anchor_ref + length, anchor_hyp + length
+
+    result = Alignment(ref, hyp, ops, f"segmented:{gap_backend}")
+    if not anchors:
+        # 没有锚点时就是一次完整对齐
+        return result
+
+    found = result.distance
+    if found == bag_distance(ref, hyp):
+        result.exact = True
+    elif verify:
+        result.exact = found == distance(ref, hyp, backend=backend)
+    else:
+        result.exact = False
+    return result
@@ -3,14 +3,81 @@
 支持多种分词器的字准确率计算引擎
 """
 
-import jiwer
-import difflib
-import re
-import unicodedata
-from typing import List, Tuple, Dict, Any, Optional
+import math
+import random
+from typing import List, Tuple, Dict, Any, Optional, Iterable, Sequence
 
 # 导入分词器模块
-from text_tokenizers import get_tokenizer, get_available_tokenizers, TokenizerError
+from text_tokenizers import (get_tokenizer, get_available_tokenizers, TokenizerError,
+                             TokenSpans)
+
+# 导入统一对齐引擎
+from text_normalizer import get_normalizer
+from preprocess_cache import PreprocessCache, make_cache_key
+from result_store import ResultStore, make_result_key
+from alignment import (Alignment, align, segmented_align, bitparallel_distance, resolve_backend,
+                       build_pattern_masks, encode_text, np,
+                       FALLBACK_BACKEND, DEFAULT_LINEAR_MEMORY_THRESHOLD, DEFAULT_ANCHOR_LENGTH,
+                       distance as edit_distance)
+
+
+# 支持的评估模式
+# token: 经过分词器分词/精确定位后再按字符比较（原有行为）
+# char: 纯字符级快速路径，仅在需要过滤语气词（词性标注）时才调用分词器
+EVALUATION_MODES = ('token', 'char')
+
+# 支持的对齐模式
+# full: 整篇文档一次完整对齐（原有行为，结果精确）
+# segmented: 基于锚点的分段对齐，用于超长文档快速分诊，结果可能是错误数的上界
+ALIGNMENT_MODES = ('full', 'segmented')
+
+# calculate_cer指定max_cer且确定超过阈值时的返回值（不再计算精确数值）
+ABOVE_THRESHOLD = float('inf')
+
+# 常见的语气词列表
+FILLER_WORDS = ["嗯", "啊", "呢", "吧", "哦", "呀", "啦", "喔",
+                "诶", "唉", "噢", "喂", "呐", "呵", "咯", "咦", "嘿"]
+
+
+class PreparedReference:
+    """
+    预处理完毕、可重复使用的参考文本
+    由ASRMetrics.prepare_reference创建，保存参考侧全部只需计算一次的结果，
+    同一参考文本与多个假设文本（N-best列表、多家ASR结果）对比时不再重复分词和编码
+    """
+    
+    __slots__ = ('text', 'filter_fillers', 'evaluation_mode', 'tokenizer_name',
+                 'processed', 'characters', 'codes', 'masks')
+    
+    def __init__(self, text: str, filter_fillers: bool, evaluation_mode: str, tokenizer_name: str,
+                 processed: str, characters: str):
+        """
+        初始化预处理后的参考文本
+        
+        Args:
+            text (str): 原始参考文本
+            filter_fillers (bool): 是否过滤了语气词
+            evaluation_mode (str): 评估模式
+            tokenizer_name (str): 分词器名称
+            processed (str): 预处理后的文本
+            characters (str): 用于比较的字符序列
+        """
+        self.text = text
+        self.filter_fillers = filter_fillers
+        self.evaluation_mode = evaluation_mode
+        self.tokenizer_name = tokenizer_name
+        self.processed = processed
+        self.characters = characters
+        # 码点数组供numpy回退对齐使用，位掩码供位并行距离使用
+        self.codes = encode_text(characters) if np is not None else None
+        self.masks = build_pattern_masks(characters)
+    
+    def __len__(self) -> int:
+        return len(self.characters)
+    
+    def __repr__(self) -> str:
+        return (f"PreparedReference(length={len(self.characters)}, mode='{self.evaluation_mode}', "
+                f"tokenizer='{self.tokenizer_name}', filter_fillers={self.filter_fillers})")
 
 
 class ASRMetrics:
@@ -19,16 +86,61 @@ class ASRMetrics:
     支持多种分词器：jieba、THULAC、HanLP
     """
     
-    def __init__(self, tokenizer_name: str = "jieba"):
+    def __init__(self, tokenizer_name: str = "jieba", evaluation_mode: str = "token",
+                 alignment_backend: str = "auto",
+                 linear_memory_threshold: Optional[int] = DEFAULT_LINEAR_MEMORY_THRESHOLD,
+                 alignment_mode: str = "full", anchor_length: int = DEFAULT_ANCHOR_LENGTH,
+                 preprocess_cache: Optional[PreprocessCache] = None,
+                 result_store: Optional[ResultStore] = None):
         """
         初始化ASRMetrics实例
         
         Args:
             tokenizer_name (str): 分词器名称，默认为"jieba"
+            evaluation_mode (str): 评估模式，"token"（默认）或"char"；
+                char模式下分词器延迟到首次需要词性标注时才加载
+            alignment_backend (str): 对齐后端，"auto"（默认）/"levenshtein"/"numpy"/"python"/"hirschberg"
+            linear_memory_threshold (int): 回退对齐实现的DP矩阵单元数超过该值时改用
+                线性内存的Hirschberg对齐，None表示始终使用完整矩阵
+            alignment_mode (str): 对齐模式，"full"（默认）或"segmented"；
+                segmented模式的详细指标中会附带alignment_exact字段
+            anchor_length (int): segmented模式的锚点长度（字符数）
+            preprocess_cache (PreprocessCache): 预处理结果缓存，可在多个实例间共享；
+                None表示不缓存
+            result_store (ResultStore): 持久化评估结果库，evaluate_pair先查询再计算；
+                None表示不使用
         """
+        if evaluation_mode not in EVALUATION_MODES:
+            raise ValueError(f"不支持的评估模式: {evaluation_mode}，可用的模式: {list(EVALUATION_MODES)}")
+        if alignment_mode not in ALIGNMENT_MODES:
+            raise ValueError(f"不支持的对齐模式: {alignment_mode}，可用的模式: {list(ALIGNMENT_MODES)}")
+        
         self.tokenizer_name = tokenizer_name
-        self.tokenizer = None
-        self._initialize_tokenizer()
+        self.evaluation_mode = evaluation_mode
+        self.alignment_backend = resolve_backend(alignment_backend)
+        self.linear_memory_threshold = linear_memory_threshold
+        self.alignment_mode = alignment_mode
+        self.anchor_length = anchor_length
+        self.preprocess_cache = preprocess_cache
+        self.result_store = result_store
+        self._tokenizer = None
+        
+        # token模式需要分词器，立即初始化；char模式按需加载
+        if evaluation_mode == 'token':
+            self._initialize_tokenizer()
+    
+    @property
+    def tokenizer(self):
+        """
+        分词器实例，首次访问时才初始化
+        """
+        if self._tokenizer is None:
+            self._initialize_tokenizer()
+        return self._tokenizer
+    
+    @tokenizer.setter
+    def tokenizer(self, value):
+        self._tokenizer = value
     
     def _initialize_tokenizer(self):
         """
@@ -89,36 +201,106 @@ class ASRMetrics:
             if not text.strip():
                 return ""
             
-            # 定义常见的语气词列表
-            filler_words = ["嗯", "啊", "呢", "吧", "哦", "呀", "啦", "喔", 
-                           "诶", "唉", "噢", "喂", "呐", "呵", "咯", "咦", "嘿"]
-            
             # 使用当前分词器进行词性标注
             words_pos = self.tokenizer.posseg(text)
-            
-            # 过滤语气词
-            filtered_words = []
-            for word, flag in words_pos:
-                # 检查是否为语气词
-                if word in filler_words:
-                    continue
-                # 检查词性是否为语气词（y）
-                if flag == 'y':
-                    continue
-                filtered_words.append(word)
-            
-            # 重新组合文本
-            return "".join(filtered_words)
+            return self._drop_fillers(words_pos)
             
         except Exception as e:
             print(f"警告: 语气词过滤失败: {str(e)}")
             # 如果词性标注失败，仅使用词表过滤
-            filler_words = ["嗯", "啊", "呢", "吧", "哦", "呀", "啦", "喔", 
-                           "诶", "唉", "噢", "喂", "呐", "呵", "咯", "咦", "嘿"]
-            result = text
-            for filler in filler_words:
-                result = result.replace(filler, "")
-            return result
+            return self._drop_fillers_by_list(text)
+    
+    @staticmethod
+    def _drop_fillers(words_pos: List[Tuple[str, str]]) -> str:
+        """
+        从词性标注结果中过滤语气词并重新组合文本
+        
+        Args:
+            words_pos (list): (词语, 词性)的元组列表
+            
+        Returns:
+            str: 过滤掉语气词后的文本
+        """
+        filtered_words = []
+        for word, flag in words_pos:
+            # 检查是否为语气词
+            if word in FILLER_WORDS:
+                continue
+            # 检查词性是否为语气词（y）
+            if flag == 'y':
+                continue
+            filtered_words.append(word)
+        
+        # 重新组合文本
+        return "".join(filtered_words)
+    
+    @staticmethod
+    def _drop_fillers_by_list(text: str) -> str:
+        """词性标注不可用时仅按语气词表过滤"""
+        result = text
+        for filler in FILLER_WORDS:
+            result = result.replace(filler, "")
+        return result
+    
+    def filter_filler_words_batch(self, texts: List[str]) -> List[str]:
+        """
+        批量过滤语气词，使用分词器的批量词性标注
+        
+        Args:
+            texts (list): 输入中文文本列表
+            
+        Returns:
+            list: 过滤掉语气词后的文本列表，与filter_filler_words逐条处理结果一致
+        """
+        results = [""] * len(texts)
+        indices = [i for i, text in enumerate(texts) if text.strip()]
+        if not indices:
+            return results
+        
+        try:
+            words_pos_list = self.tokenizer.posseg_batch([texts[i] for i in indices])
+        except Exception as e:
+            print(f"警告: 批量词性标注失败，改为逐条处理: {str(e)}")
+            for i in indices:
+                results[i] = self.filter_filler_words(texts[i])
+            return results
+        
+        for i, words_pos in zip(indices, words_pos_list):
+            results[i] = self._drop_fillers(words_pos)
+        return results
+    
+    def preprocess_chinese_text_batch(self, texts: List[str]) -> List[str]:
+        """
+        批量分词预处理，使用分词器的批量分词
+        
+        Args:
+            texts (list): 输入中文文本列表
+            
+        Returns:
+            list: 分词后重新组合的文本列表，与preprocess_chinese_text逐条处理结果一致
+        """
+        results = []
+        indices = []
+        for i, text in enumerate(texts):
+            stripped = text.strip() if text else ""
+            # 与preprocess_chinese_text一致：很短的文本跳过分词
+            results.append(stripped if len(stripped) <= 2 else text)
+            if len(stripped) > 2:
+                indices.append(i)
+        if not indices:
+            return results
+        
+        try:
+            words_list = self.tokenizer.cut_batch([texts[i] for i in indices])
+        except Exception as e:
+            print(f"警告: 批量分词预处理失败，改为逐条处理: {str(e)}")
+            for i in indices:
+                results[i] = self.preprocess_chinese_text(texts[i])
+            return results
+        
+        for i, words in zip(indices, words_list):
+            results[i] = "".join(words)
+        return results
     
     def normalize_chinese_text(self, text: str, 
                               normalize_width: bool = True,
@@ -136,52 +318,111 @@ class ASRMetrics:
         Returns:
             str: 标准化后的文本
         """
-        # 可选：移除标点符号
-        if remove_punctuation:
-            text = re.sub(r'[^\w\s]', '', text)
-        
-        # 统一全角/半角字符 - 使用Unicode标准化方法（NFKC）
-        # NFKC = Normalization Form Compatibility Composition
-        # 这是更标准和可靠的全/半角统一方法
-        if normalize_width:
-            text = unicodedata.normalize('NFKC', text)
-        
-        # 可选：统一数字格式
-        if normalize_numbers:
-            text = re.sub(r'[0-9０-９]+', '0', text)
-        
-        # 统一空格处理
-        text = re.sub(r'\s+', '', text)
-        
-        return text
+        # 使用按配置编译一次的融合标准化器，单次translate完成全部步骤
+        return get_normalizer(normalize_width, normalize_numbers, remove_punctuation).normalize(text)
     
-    def get_character_positions(self, text: str) -> List[Tuple[str, int]]:
+    def get_character_positions(self, text: str) -> Sequence[Tuple[str, int]]:
         """
         利用当前分词器的tokenize功能进行精确字符定位
+        返回分词结果（TokenSpans）上的只读视图，(字符, 位置)元组在访问时才生成
         
         Args:
             text (str): 输入文本
             
         Returns:
-            list: 包含(字符, 位置)元组的列表
+            CharacterPositions: (字符, 位置)序列，与逐个展开词语得到的元组列表一致
         """
         try:
             if not text.strip():
                 return []
             
-            positions = []
-            tokens = self.tokenizer.tokenize(text)
-            
-            for word, start, end in tokens:
-                for i, char in enumerate(word):
-                    positions.append((char, start + i))
-            
-            return positions
+            return self.tokenizer.tokenize_spans(text).character_positions()
             
         except Exception as e:
             print(f"警告: 字符位置获取失败: {str(e)}")
             # 回退到简单的字符位置
-            return [(char, i) for i, char in enumerate(text)]
+            return TokenSpans.single_characters(text).character_positions()
+    
+    def _character_sequence(self, processed_text: str, mode: Optional[str] = None) -> str:
+        """
+        获取用于比较的字符序列
+        token模式经过分词器的tokenize精确定位后展开为字符；char模式直接使用预处理结果
+        
+        Args:
+            processed_text (str): 预处理后的文本
+            mode (str): 评估模式，默认为当前实例的模式
+            
+        Returns:
+            str: 字符序列
+        """
+        if (mode or self.evaluation_mode) == 'char':
+            return processed_text
+        
+        # token模式的字符定位同样要调用分词器，与预处理结果一起缓存
+        key = None
+        if self.preprocess_cache is not None:
+            key = self._preprocess_cache_key(processed_text, False, 'token', stage='characters')
+            cached = self.preprocess_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        positions = self.get_character_positions(processed_text)
+        sequence = positions.characters() if positions else processed_text
+        if key is not None:
+            self.preprocess_cache.put(key, sequence)
+        return sequence
+    
+    def _character_sequences(self, processed_texts: List[str]) -> List[str]:
+        """
+        批量获取用于比较的字符序列，token模式使用分词器的批量精确分词
+        
+        Args:
+            processed_texts (list): 预处理后的文本列表
+            
+        Returns:
+            list: 字符序列列表，与_character_sequence逐条处理结果一致
+        """
+        if self.evaluation_mode == 'char':
+            return list(processed_texts)
+        
+        results = list(processed_texts)
+        keys = {}
+        pending = {}
+        for i, text in enumerate(processed_texts):
+            if not text.strip():
+                continue
+            if text in pending:
+                pending[text].append(i)
+                continue
+            if self.preprocess_cache is not None:
+                key = self._preprocess_cache_key(text, False, 'token', stage='characters')
+                cached = self.preprocess_cache.get(key)
+                if cached is not None:
+                    results[i] = cached
+                    continue
+                keys[text] = key
+            pending[text] = [i]
+        if not pending:
+            return results
+        
+        texts = list(pending)
+        try:
+            tokens_list = self.tokenizer.tokenize_batch(texts)
+        except Exception as e:
+            print(f"警告: 批量字符定位失败，改为逐条处理: {str(e)}")
+            tokens_list = None
+        
+        for k, text in enumerate(texts):
+            if tokens_list is None:
+                positions = self.get_character_positions(text)
+                sequence = positions.characters() if positions else text
+            else:
+                sequence = "".join(word for word, _, _ in tokens_list[k]) or text
+            for i in pending[text]:
+                results[i] = sequence
+            if text in keys:
+                self.preprocess_cache.put(keys[text], sequence)
+        return results
     
     def preprocess_text(self, text: str, filter_fillers: bool = False) -> str:
         """
@@ -191,6 +432,174 @@ class ASRMetrics:
             text (str): 输入文本
             filter_fillers (bool): 是否过滤语气词
             
+        Returns:
+            str: 预处理后的文本
+        """
+        if self.preprocess_cache is None:
+            return self._preprocess(text, filter_fillers, self.evaluation_mode)
+        
+        key = self._preprocess_cache_key(text, filter_fillers, self.evaluation_mode)
+        processed_text = self.preprocess_cache.get(key)
+        if processed_text is None:
+            processed_text = self._preprocess(text, filter_fillers, self.evaluation_mode)
+            self.preprocess_cache.put(key, processed_text)
+        return processed_text
+    
+    def preprocess_batch(self, texts: Iterable[str], filter_fillers: bool = False) -> List[str]:
+        """
+        批量预处理文本：相同文本只处理一次，未命中缓存的文本统一送入分词器的批量接口
+        
+        Args:
+            texts (Iterable[str]): 输入文本
+            filter_fillers (bool): 是否过滤语气词
+            
+        Returns:
+            list: 预处理后的文本列表，与preprocess_text逐条处理结果一致
+        """
+        texts = list(texts)
+        results = [""] * len(texts)
+        keys = {}
+        pending = {}
+        for i, text in enumerate(texts):
+            if text in pending:
+                pending[text].append(i)
+                continue
+            if self.preprocess_cache is not None:
+                key = self._preprocess_cache_key(text, filter_fillers, self.evaluation_mode)
+                cached = self.preprocess_cache.get(key)
+                if cached is not None:
+                    results[i] = cached
+                    continue
+                keys[text] = key
+            pending[text] = [i]
+        
+        unique_texts = list(pending)
+        processed = self._preprocess_batch(unique_texts, filter_fillers, self.evaluation_mode)
+        for text, processed_text in zip(unique_texts, processed):
+            for i in pending[text]:
+                results[i] = processed_text
+            if text in keys:
+                self.preprocess_cache.put(keys[text], processed_text)
+        return results
+    
+    def _preprocess_batch(self, texts: List[str], filter_fillers: bool, mode: str) -> List[str]:
+        """
+        按指定评估模式批量预处理文本，步骤与_preprocess相同，
+        词性标注和分词两步分别对整批文本调用一次分词器
+        
+        Args:
+            texts (list): 输入文本列表
+            filter_fillers (bool): 是否过滤语气词
+            mode (str): 评估模式（"token"或"char"）
+            
+        Returns:
+            list: 预处理后的文本列表
+        """
+        normalizer = get_normalizer()
+        
+        # char模式且不过滤语气词时中间没有分词步骤，逐条一次完成全部预处理
+        if mode == 'char' and not filter_fillers:
+            return [normalizer(text) if text and text.strip() else "" for text in texts]
+        
+        processed = [normalizer.clean(text) if text and text.strip() else "" for text in texts]
+        
+        if filter_fillers:
+            processed = self.filter_filler_words_batch(processed)
+        
+        if mode == 'token':
+            processed = self.preprocess_chinese_text_batch(processed)
+        
+        return [self.normalize_chinese_text(text) if text else "" for text in processed]
+    
+    def _preprocess_cache_key(self, text: str, filter_fillers: bool, mode: str,
+                              stage: str = 'preprocess') -> str:
+        """
+        计算预处理缓存键
+        只有处理过程会经过分词器时（token模式或过滤语气词）才把分词器名称和配置
+        （cache_config()，含版本和自定义词典等）计入键，
+        char快速路径的结果与分词器无关，不同分词器之间可以共享
+        
+        Args:
+            text (str): 输入文本
+            filter_fillers (bool): 是否过滤语气词
+            mode (str): 评估模式
+            stage (str): 缓存的处理阶段
+            
+        Returns:
+            str: 缓存键
+        """
+        tokenizer_name = tokenizer_config = None
+        if mode == 'token' or filter_fillers:
+            tokenizer = self.tokenizer
+            tokenizer_name = getattr(tokenizer, 'name', type(tokenizer).__name__)
+            tokenizer_config = self._tokenizer_cache_config()
+        return make_cache_key(text, filter_fillers, mode, tokenizer_name, tokenizer_config,
+                              get_normalizer().config, stage)
+    
+    def _tokenizer_cache_config(self) -> tuple:
+        """
+        当前分词器中影响分词结果的配置（名称、版本、自定义词典等），用于缓存键
+        
+        Returns:
+            tuple: 分词器的cache_config()；未实现该方法的分词器为(名称, 版本)
+        """
+        tokenizer = self.tokenizer
+        if hasattr(tokenizer, 'cache_config'):
+            return tokenizer.cache_config()
+        return (getattr(tokenizer, 'name', type(tokenizer).__name__), getattr(tokenizer, 'version', None))
+    
+    def _result_store_key(self, reference: str, hypothesis: str, filter_fillers: bool) -> str:
+        """
+        计算结果库的键
+        与预处理缓存键相同，只有处理过程经过分词器时才计入分词器配置（cache_config()，
+        含版本和自定义词典等；无需为char模式加载分词器）；
+        对齐后端和线性内存阈值会影响等价最优对齐中S/D/I的分配，一并计入。
+        结果库总是保存带高亮文本和差异序列的完整结果，是否需要差异不影响键
+        
+        Args:
+            reference (str): 参考文本
+            hypothesis (str): 假设文本
+            filter_fillers (bool): 是否过滤语气词
+            
+        Returns:
+            str: 结果键
+        """
+        tokenizer_config = None
+        if self.evaluation_mode == 'token' or filter_fillers:
+            tokenizer_config = self._tokenizer_cache_config()
+        config = {
+            'tokenizer': self.tokenizer_name,
+            'tokenizer_config': tokenizer_config,
+            'filter_fillers': filter_fillers,
+            'evaluation_mode': self.evaluation_mode,
+            'alignment_mode': self.alignment_mode,
+            'anchor_length': self.anchor_length,
+            'alignment_backend': self.alignment_backend,
+            'linear_memory_threshold': self.linear_memory_threshold,
+            'normalization': sorted(get_normalizer().config.items()),
+        }
+        return make_result_key(reference, hypothesis, config)
+    
+    def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        获取预处理缓存的统计信息
+        
+        Returns:
+            Optional[dict]: 命中/未命中次数等统计，未启用缓存时为None
+        """
+        if self.preprocess_cache is None:
+            return None
+        return self.preprocess_cache.get_stats()
+    
+    def _preprocess(self, text: str, filter_fillers: bool, mode: str) -> str:
+        """
+        按指定评估模式预处理文本
+        
+        Args:
+            text (str): 输入文本
+            filter_fillers (bool): 是否过滤语气词
+            mode (str): 评估模式（"token"或"char"）
+            
         Returns:
             str: 预处理后的文本
         """
@@ -198,16 +607,14 @@ class ASRMetrics:
         if not text or not text.strip():
             return ""
         
-        # 创建基本预处理转换
-        transformation = jiwer.Compose([
-            jiwer.RemoveMultipleSpaces(),
-            jiwer.Strip(),
-            jiwer.RemovePunctuation(),
-            jiwer.ToLowerCase(),
-        ])
+        normalizer = get_normalizer()
         
-        # 应用预处理
-        processed_text = transformation(text)
+        # char模式且不过滤语气词时中间没有分词步骤，一次完成全部预处理
+        if mode == 'char' and not filter_fillers:
+            return normalizer(text)
+        
+        # 基本预处理：合并多余空格、去首尾空白、移除标点、转小写
+        processed_text = normalizer.clean(text)
         
         # 优化：如果处理后为空，直接返回
         if not processed_text:
@@ -219,15 +626,17 @@ class ASRMetrics:
             if not processed_text:
                 return ""
         
-        # 对于中文，先进行分词预处理
-        processed_text = self.preprocess_chinese_text(processed_text)
+        # 对于中文，先进行分词预处理（char模式下分词结果会被重新拼接，直接跳过）
+        if mode == 'token':
+            processed_text = self.preprocess_chinese_text(processed_text)
         
         # 应用中文标准化处理
         processed_text = self.normalize_chinese_text(processed_text)
         
         return processed_text
     
-    def calculate_cer(self, reference: str, hypothesis: str, filter_fillers: bool = False) -> float:
+    def calculate_cer(self, reference: str, hypothesis: str, filter_fillers: bool = False,
+                      max_cer: Optional[float] = None) -> float:
         """
         计算字符错误率 (Character Error Rate)
         
@@ -235,48 +644,59 @@ class ASRMetrics:
             reference (str): 参考文本（标准文本）
             hypothesis (str): 假设文本（ASR生成文本）
             filter_fillers (bool): 是否过滤语气词
+            max_cer (float): CER阈值，指定后只要确定超过阈值就提前结束，
+                用于只关心哪些文件超标的分诊场景
             
         Returns:
-            float: 字符错误率
+            float: 字符错误率；指定max_cer且超过阈值时返回ABOVE_THRESHOLD
         """
         # 预处理文本
         ref_processed = self.preprocess_text(reference, filter_fillers)
         hyp_processed = self.preprocess_text(hypothesis, filter_fillers)
         
-        # 获取字符位置信息
-        ref_positions = self.get_character_positions(ref_processed)
-        hyp_positions = self.get_character_positions(hyp_processed)
+        if len(ref_processed) == 0:
+            cer = 1.0 if len(hyp_processed) > 0 else 0.0
+            return ABOVE_THRESHOLD if max_cer is not None and cer > max_cer else cer
         
-        # 提取字符列表
-        ref_chars = [pos[0] for pos in ref_positions] if ref_positions else list(ref_processed)
-        hyp_chars = [pos[0] for pos in hyp_positions] if hyp_positions else list(hyp_processed)
+        # 计算编辑距离（优先使用python-Levenshtein，否则使用位并行算法）
+        score_cutoff = None
+        if max_cer is not None:
+            score_cutoff = self._max_distance(max_cer, len(ref_processed))
+        distance = edit_distance(ref_processed, hyp_processed, backend=self.alignment_backend,
+                                 score_cutoff=score_cutoff)
         
-        # 确保两个字符串都不为空
-        if len(ref_chars) == 0:
-            ref_chars = [""]
-        if len(hyp_chars) == 0:
-            hyp_chars = [""]
-        
-        # 计算编辑距离
-        try:
-            import Levenshtein
-            distance = Levenshtein.distance(ref_processed, hyp_processed)
-        except ImportError:
-            # 如果没有Levenshtein库，使用基本的编辑距离算法
-            distance = self._calculate_edit_distance(ref_processed, hyp_processed)
+        if score_cutoff is not None and distance > score_cutoff:
+            return ABOVE_THRESHOLD
         
         # 计算CER
-        if len(ref_processed) > 0:
-            cer = distance / len(ref_processed)
-        else:
-            cer = 1.0 if len(hyp_processed) > 0 else 0.0
+        return distance / len(ref_processed)
+    
+    @staticmethod
+    def _max_distance(max_cer: float, ref_length: int) -> int:
+        """
+        将CER阈值换算为允许的最大编辑距离
+        与 distance / ref_length > max_cer 的浮点比较保持一致
         
-        return cer
+        Args:
+            max_cer (float): CER阈值
+            ref_length (int): 参考文本长度（大于0）
+            
+        Returns:
+            int: 不超过阈值的最大编辑距离（小于0时表示任何距离都超标）
+        """
+        if max_cer < 0:
+            return -1
+        limit = math.floor(max_cer * ref_length)
+        while limit >= 0 and limit / ref_length > max_cer:
+            limit -= 1
+        while (limit + 1) / ref_length <= max_cer:
+            limit += 1
+        return limit
     
     def _calculate_edit_distance(self, s1: str, s2: str) -> int:
         """
         计算两个字符串的编辑距离（Levenshtein距离）
-        使用动态规划算法，当python-Levenshtein库不可用时的备用实现
+        使用位并行算法，当python-Levenshtein库不可用时的备用实现
         
         Args:
             s1 (str): 第一个字符串
@@ -285,42 +705,12 @@ class ASRMetrics:
         Returns:
             int: 编辑距离（最少需要多少次编辑操作使两个字符串相同）
         """
-        # 边界条件处理
-        if len(s1) == 0:
-            return len(s2)  # 插入s2的所有字符
-        if len(s2) == 0:
-            return len(s1)  # 删除s1的所有字符
-        
-        # 创建编辑距离矩阵，使用动态规划
-        matrix = [[0] * (len(s2) + 1) for _ in range(len(s1) + 1)]
-        
-        # 初始化第一行和第一列（基础情况）
-        for i in range(len(s1) + 1):
-            matrix[i][0] = i  # 从空字符串到s1[:i]需要i次插入
-        for j in range(len(s2) + 1):
-            matrix[0][j] = j  # 从空字符串到s2[:j]需要j次插入
-        
-        # 填充矩阵，计算最小编辑距离
-        for i in range(1, len(s1) + 1):
-            for j in range(1, len(s2) + 1):
-                if s1[i-1] == s2[j-1]:
-                    cost = 0  # 字符相同，无需编辑
-                else:
-                    cost = 1  # 字符不同，需要替换
-                
-                # 选择三种操作中代价最小的
-                matrix[i][j] = min(
-                    matrix[i-1][j] + 1,      # 删除操作
-                    matrix[i][j-1] + 1,      # 插入操作
-                    matrix[i-1][j-1] + cost  # 替换操作（或匹配）
-                )
-        
-        return matrix[len(s1)][len(s2)]
+        return bitparallel_distance(s1, s2)
     
     def _calculate_edit_ops_with_backtrack(self, s1: str, s2: str) -> Tuple[int, int, int]:
         """
         使用动态规划+路径回溯精确计算编辑操作（替换、删除、插入）
-        当python-Levenshtein库不可用时的精确回退实现
+        当python-Levenshtein库不可用时的精确回退实现（优先使用numpy向量化版本）
         
         Args:
             s1 (str): 参考字符串
@@ -329,68 +719,8 @@ class ASRMetrics:
         Returns:
             Tuple[int, int, int]: (替换数, 删除数, 插入数)
         """
-        m, n = len(s1), len(s2)
-        
-        # 创建DP矩阵
-        dp = [[0] * (n + 1) for _ in range(m + 1)]
-        
-        # 初始化第一行和第一列
-        for i in range(m + 1):
-            dp[i][0] = i  # 从s1[:i]到空字符串需要i次删除
-        for j in range(n + 1):
-            dp[0][j] = j  # 从空字符串到s2[:j]需要j次插入
-        
-        # 填充DP矩阵
-        for i in range(1, m + 1):
-            for j in range(1, n + 1):
-                if s1[i-1] == s2[j-1]:
-                    # 字符相同，无需编辑
-                    dp[i][j] = dp[i-1][j-1]
-                else:
-                    # 字符不同，选择代价最小的操作
-                    dp[i][j] = min(
-                        dp[i-1][j-1] + 1,  # 替换
-                        dp[i-1][j] + 1,     # 删除
-                        dp[i][j-1] + 1      # 插入
-                    )
-        
-        # 路径回溯统计各类操作
-        i, j = m, n
-        substitutions = 0
-        deletions = 0
-        insertions = 0
-        
-        while i > 0 or j > 0:
-            if i == 0:
-                # 只能插入
-                insertions += j
-                break
-            if j == 0:
-                # 只能删除
-                deletions += i
-                break
-                
-            if s1[i-1] == s2[j-1]:
-                # 字符匹配，向左上移动
-                i -= 1
-                j -= 1
-            else:
-                # 找到当前位置的最优来源
-                if dp[i][j] == dp[i-1][j-1] + 1:
-                    # 替换操作
-                    substitutions += 1
-                    i -= 1
-                    j -= 1
-                elif dp[i][j] == dp[i-1][j] + 1:
-                    # 删除操作
-                    deletions += 1
-                    i -= 1
-                else:
-                    # 插入操作
-                    insertions += 1
-                    j -= 1
-        
-        return substitutions, deletions, insertions
+        return align(s1, s2, backend=FALLBACK_BACKEND,
+                     linear_memory_threshold=self.linear_memory_threshold).counts()
     
     def calculate_wer(self, reference: str, hypothesis: str, filter_fillers: bool = False) -> float:
         """
@@ -438,28 +768,27 @@ class ASRMetrics:
         Returns:
             Tuple[int, int, int]: (替换数, 删除数, 插入数)
         """
-        try:
-            import Levenshtein
-            
-            # 将列表转为字符串，然后计算编辑距离
-            ref_str = "".join(reference)
-            hyp_str = "".join(hypothesis)
-            
-            # 计算编辑操作
-            ops = Levenshtein.editops(ref_str, hyp_str)
-            
-            # 统计各类操作数量
-            s = len([op for op in ops if op[0] == 'replace'])  # 替换
-            d = len([op for op in ops if op[0] == 'delete'])   # 删除
-            i = len([op for op in ops if op[0] == 'insert'])   # 插入
-            
-            return s, d, i
+        # 将列表转为字符串，然后对齐
+        return self._align("".join(reference), "".join(hypothesis)).counts()
+    
+    def _align(self, ref_str: str, hyp_str: str, ref_codes=None) -> Alignment:
+        """
+        使用配置的对齐后端对齐两个字符串
+        
+        Args:
+            ref_str (str): 参考字符串
+            hyp_str (str): 假设字符串
+            ref_codes: 参考字符串预先编码的码点数组（可选）
             
-        except ImportError:
-            # 如果没有Levenshtein库，使用精确的DP路径回溯算法
-            ref_str = "".join(reference)
-            hyp_str = "".join(hypothesis)
-            return self._calculate_edit_ops_with_backtrack(ref_str, hyp_str)
+        Returns:
+            Alignment: 对齐结果
+        """
+        if self.alignment_mode == 'segmented':
+            return segmented_align(ref_str, hyp_str, backend=self.alignment_backend,
+                                   anchor_length=self.anchor_length,
+                                   linear_memory_threshold=self.linear_memory_threshold)
+        return align(ref_str, hyp_str, backend=self.alignment_backend,
+                     linear_memory_threshold=self.linear_memory_threshold, ref_codes=ref_codes)
     
     def calculate_accuracy(self, reference: str, hypothesis: str, filter_fillers: bool = False) -> float:
         """
@@ -492,13 +821,9 @@ class ASRMetrics:
         ref_processed = self.preprocess_text(reference, filter_fillers)
         hyp_processed = self.preprocess_text(hypothesis, filter_fillers)
         
-        # 获取字符位置信息
-        ref_positions = self.get_character_positions(ref_processed)
-        hyp_positions = self.get_character_positions(hyp_processed)
-        
-        # 提取字符列表
-        ref_chars = [pos[0] for pos in ref_positions] if ref_positions else list(ref_processed)
-        hyp_chars = [pos[0] for pos in hyp_positions] if hyp_positions else list(hyp_processed)
+        # 获取字符序列并提取字符列表
+        ref_chars = list(self._character_sequence(ref_processed))
+        hyp_chars = list(self._character_sequence(hyp_processed))
         
         # 确保列表不为空
         if not ref_chars:
@@ -507,12 +832,29 @@ class ASRMetrics:
             hyp_chars = [""]
         
         # 使用自定义方式计算详细指标
-        s, d, i = self._calculate_edit_ops(ref_chars, hyp_chars)
+        alignment = self._align("".join(ref_chars), "".join(hyp_chars))
+        s, d, i = alignment.counts()
+        
+        return self._build_metrics(len(ref_chars), len(hyp_chars), s, d, i, alignment.exact)
+    
+    def _build_metrics(self, ref_length: int, hyp_length: int, s: int, d: int, i: int,
+                       exact: bool = True) -> Dict[str, Any]:
+        """
+        根据编辑操作统计构建详细指标字典
         
+        Args:
+            ref_length (int): 参考文本长度
+            hyp_length (int): 假设文本长度
+            s (int): 替换错误数
+            d (int): 删除错误数
+            i (int): 插入错误数
+            exact (bool): 对齐结果是否保证最优（仅segmented模式输出）
+            
+        Returns:
+            dict: 包含各种错误指标的字典
+        """
         # 计算总错误数和字符错误率
         total_errors = s + d + i
-        ref_length = len(ref_chars)
-        hyp_length = len(hyp_chars)
         
         if ref_length > 0:
             cer = total_errors / ref_length
@@ -520,7 +862,7 @@ class ASRMetrics:
             cer = 1.0 if hyp_length > 0 else 0.0
         
         # 返回详细指标
-        return {
+        metrics = {
             'cer': cer,
             'wer': cer,  # 对于中文，CER和WER相同
             'mer': cer,  # 匹配错误率
@@ -533,8 +875,228 @@ class ASRMetrics:
             'ref_length': ref_length,  # 参考文本长度
             'hyp_length': hyp_length,  # 假设文本长度
             'accuracy': 1.0 - cer,  # 准确率
-            'tokenizer': self.tokenizer_name  # 使用的分词器
+            'tokenizer': self.tokenizer_name,  # 使用的分词器
+            'evaluation_mode': self.evaluation_mode  # 评估模式
+        }
+        
+        # 分段对齐时标明结果是精确值还是上界
+        if self.alignment_mode == 'segmented':
+            metrics['alignment_exact'] = exact
+        
+        return metrics
+    
+    def evaluate_pair(self, reference: str, hypothesis: str, filter_fillers: bool = False,
+                      include_diff: bool = True) -> Dict[str, Any]:
+        """
+        单次评估一个文本对：两侧文本各预处理一次，只计算一次对齐，
+        并由同一对齐结果生成详细指标、高亮文本和差异序列
+        
+        等价于依次调用calculate_detailed_metrics、highlight_errors和show_differences，
+        但避免了三次重复的分词和词性标注
+        
+        Args:
+            reference (str): 参考文本（标准文本）
+            hypothesis (str): 假设文本（ASR生成文本）
+            filter_fillers (bool): 是否过滤语气词
+            include_diff (bool): 是否生成高亮文本和差异序列（只需要指标时可关闭）
+            
+        Returns:
+            dict: {'metrics': 详细指标字典, 'diff_reference': 参考文本高亮版,
+                   'diff_hypothesis': 假设文本高亮版, 'diff_sequence': 差异序列}
+        """
+        # 内容和配置都相同的文本对直接复用结果库中的结果；
+        # 结果库中保存完整结果，命令行和图形界面的运行可以互相复用
+        if self.result_store is not None:
+            key = self._result_store_key(reference, hypothesis, filter_fillers)
+            stored = self.result_store.get(key)
+            if stored is None:
+                stored = self._evaluate_pair(reference, hypothesis, filter_fillers, True)
+                self.result_store.put(key, stored)
+            if not include_diff:
+                stored.update(diff_reference='', diff_hypothesis='', diff_sequence='')
+            return stored
+        
+        return self._evaluate_pair(reference, hypothesis, filter_fillers, include_diff)
+    
+    def _evaluate_pair(self, reference: str, hypothesis: str, filter_fillers: bool,
+                       include_diff: bool) -> Dict[str, Any]:
+        """计算单个文本对（不查询结果库），参数和返回值同evaluate_pair"""
+        # 预处理文本（每侧只执行一次）
+        ref_processed = self.preprocess_text(reference, filter_fillers)
+        hyp_processed = self.preprocess_text(hypothesis, filter_fillers)
+        
+        # 获取字符序列
+        ref_str = self._character_sequence(ref_processed)
+        hyp_str = self._character_sequence(hyp_processed)
+        
+        return self._evaluate_sequences(ref_str, hyp_str, include_diff)
+    
+    def evaluate_batch(self, pairs: Iterable[Tuple[str, str]], filter_fillers: bool = False,
+                       include_diff: bool = True) -> List[Dict[str, Any]]:
+        """
+        批量评估多个文本对：两侧全部文本一起批量预处理（分词器按批推理），再逐对计算对齐
+        
+        Args:
+            pairs (Iterable[Tuple[str, str]]): (参考文本, 假设文本)对
+            filter_fillers (bool): 是否过滤语气词
+            include_diff (bool): 是否生成高亮文本和差异序列
+            
+        Returns:
+            list: 每个文本对的评估结果，与evaluate_pair逐对调用结果一致
+        """
+        pairs = list(pairs)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(pairs)
+        
+        # 与evaluate_pair相同：先查询结果库，只对未命中的文本对批量预处理，结果库中保存完整结果
+        keys: List[Optional[str]] = [None] * len(pairs)
+        if self.result_store is not None:
+            for k, (reference, hypothesis) in enumerate(pairs):
+                keys[k] = self._result_store_key(reference, hypothesis, filter_fillers)
+                results[k] = self.result_store.get(keys[k])
+        missing = [k for k in range(len(pairs)) if results[k] is None]
+        
+        if missing:
+            count = len(missing)
+            processed = self.preprocess_batch([pairs[k][0] for k in missing] + [pairs[k][1] for k in missing],
+                                              filter_fillers)
+            sequences = self._character_sequences(processed)
+            compute_diff = include_diff or self.result_store is not None
+            for j, k in enumerate(missing):
+                results[k] = self._evaluate_sequences(sequences[j], sequences[count + j], compute_diff)
+                if keys[k] is not None:
+                    self.result_store.put(keys[k], results[k])
+        
+        if self.result_store is not None and not include_diff:
+            for result in results:
+                result.update(diff_reference='', diff_hypothesis='', diff_sequence='')
+        return results
+    
+    def _evaluate_sequences(self, ref_str: str, hyp_str: str, include_diff: bool,
+                            ref_codes=None) -> Dict[str, Any]:
+        """
+        对两个字符序列只计算一次对齐，生成详细指标以及可选的高亮文本和差异序列
+        
+        Args:
+            ref_str (str): 参考字符序列
+            hyp_str (str): 假设字符序列
+            include_diff (bool): 是否生成高亮文本和差异序列
+            ref_codes: 参考字符序列预先编码的码点数组（可选）
+            
+        Returns:
+            dict: 与evaluate_pair相同结构的结果
+        """
+        alignment = self._align(ref_str, hyp_str, ref_codes)
+        s, d, i = alignment.counts()
+        
+        # 与calculate_detailed_metrics保持一致：空文本按长度1计
+        metrics = self._build_metrics(len(ref_str) or 1, len(hyp_str) or 1, s, d, i, alignment.exact)
+        
+        result = {
+            'metrics': metrics,
+            'diff_reference': '',
+            'diff_hypothesis': '',
+            'diff_sequence': ''
         }
+        
+        if include_diff:
+            result['diff_reference'], result['diff_hypothesis'] = alignment.highlights()
+            result['diff_sequence'] = alignment.diff_sequence()
+        
+        return result
+    
+    def prepare_reference(self, text: str, filter_fillers: bool = False) -> PreparedReference:
+        """
+        预处理参考文本，得到可与任意多个假设文本重复对比的PreparedReference
+        
+        Args:
+            text (str): 参考文本（标准文本）
+            filter_fillers (bool): 是否过滤语气词
+            
+        Returns:
+            PreparedReference: 预处理后的参考文本
+        """
+        processed = self.preprocess_text(text, filter_fillers)
+        characters = self._character_sequence(processed)
+        return PreparedReference(text, filter_fillers, self.evaluation_mode, self.tokenizer_name,
+                                 processed, characters)
+    
+    def _check_prepared(self, prepared_ref: PreparedReference):
+        """
+        检查参考文本是否由相同评估模式预处理
+        
+        Raises:
+            ValueError: 评估模式不一致
+        """
+        if prepared_ref.evaluation_mode != self.evaluation_mode:
+            raise ValueError(f"参考文本按{prepared_ref.evaluation_mode}模式预处理，"
+                             f"与当前的{self.evaluation_mode}模式不一致")
+    
+    def evaluate(self, prepared_ref: PreparedReference, hypothesis: str,
+                 include_diff: bool = True) -> Dict[str, Any]:
+        """
+        将假设文本与预处理好的参考文本对比，只处理假设侧
+        结果与evaluate_pair(prepared_ref.text, hypothesis, prepared_ref.filter_fillers)完全一致
+        
+        Args:
+            prepared_ref (PreparedReference): prepare_reference返回的参考文本
+            hypothesis (str): 假设文本（ASR生成文本）
+            include_diff (bool): 是否生成高亮文本和差异序列
+            
+        Returns:
+            dict: {'metrics': 详细指标字典, 'diff_reference': 参考文本高亮版,
+                   'diff_hypothesis': 假设文本高亮版, 'diff_sequence': 差异序列}
+        """
+        self._check_prepared(prepared_ref)
+        # 与evaluate_pair共用结果库中的键和完整结果
+        if self.result_store is not None:
+            key = self._result_store_key(prepared_ref.text, hypothesis, prepared_ref.filter_fillers)
+            stored = self.result_store.get(key)
+            if stored is None:
+                stored = self._evaluate_prepared(prepared_ref, hypothesis, True)
+                self.result_store.put(key, stored)
+            if not include_diff:
+                stored.update(diff_reference='', diff_hypothesis='', diff_sequence='')
+            return stored
+        
+        return self._evaluate_prepared(prepared_ref, hypothesis, include_diff)
+    
+    def _evaluate_prepared(self, prepared_ref: PreparedReference, hypothesis: str,
+                           include_diff: bool) -> Dict[str, Any]:
+        """计算假设文本与预处理好的参考文本的结果（不查询结果库），参数和返回值同evaluate"""
+        hyp_processed = self.preprocess_text(hypothesis, prepared_ref.filter_fillers)
+        hyp_str = self._character_sequence(hyp_processed)
+        return self._evaluate_sequences(prepared_ref.characters, hyp_str, include_diff,
+                                        prepared_ref.codes)
+    
+    def evaluate_cer(self, prepared_ref: PreparedReference, hypothesis: str,
+                     max_cer: Optional[float] = None) -> float:
+        """
+        只计算假设文本相对预处理好的参考文本的CER（不计算对齐路径），
+        回退实现直接复用参考文本的位掩码；结果与evaluate()['metrics']['cer']一致
+        
+        Args:
+            prepared_ref (PreparedReference): prepare_reference返回的参考文本
+            hypothesis (str): 假设文本（ASR生成文本）
+            max_cer (float): CER阈值，超过时提前结束并返回ABOVE_THRESHOLD
+            
+        Returns:
+            float: 字符错误率
+        """
+        self._check_prepared(prepared_ref)
+        hyp_processed = self.preprocess_text(hypothesis, prepared_ref.filter_fillers)
+        hyp_str = self._character_sequence(hyp_processed)
+        
+        # 与详细指标一致：空参考文本按长度1计
+        ref_length = len(prepared_ref.characters) or 1
+        score_cutoff = None
+        if max_cer is not None:
+            score_cutoff = self._max_distance(max_cer, ref_length)
+        distance = edit_distance(prepared_ref.characters, hyp_str, backend=self.alignment_backend,
+                                 score_cutoff=score_cutoff, masks=prepared_ref.masks)
+        
+        if score_cutoff is not None and distance > score_cutoff:
+            return ABOVE_THRESHOLD
+        return distance / ref_length
     
     def show_differences(self, reference: str, hypothesis: str, filter_fillers: bool = False) -> str:
         """
@@ -552,11 +1114,8 @@ class ASRMetrics:
         ref_processed = self.preprocess_text(reference, filter_fillers)
         hyp_processed = self.preprocess_text(hypothesis, filter_fillers)
         
-        # 使用difflib计算差异
-        d = difflib.Differ()
-        diff = list(d.compare(list(ref_processed), list(hyp_processed)))
-        
-        return ''.join(diff)
+        # 基于统一对齐结果生成逐字差异
+        return self._align(ref_processed, hyp_processed).diff_sequence()
     
     def highlight_errors(self, reference: str, hypothesis: str, filter_fillers: bool = False) -> Tuple[str, str]:
         """
@@ -574,26 +1133,47 @@ class ASRMetrics:
         ref_processed = self.preprocess_text(reference, filter_fillers)
         hyp_processed = self.preprocess_text(hypothesis, filter_fillers)
         
-        # 使用difflib的SequenceMatcher找出匹配和不匹配的部分
-        matcher = difflib.SequenceMatcher(None, ref_processed, hyp_processed)
+        # 基于统一对齐结果构建高亮标记的字符串
+        return self._align(ref_processed, hyp_processed).highlights()
+    
+    def verify_char_mode(self, texts: Iterable[str], filter_fillers: bool = False,
+                         sample_size: Optional[int] = None, seed: int = 0) -> Dict[str, Any]:
+        """
+        校验char快速路径与token分词路径的结果是否一致
+        对样本文本分别执行两条路径，报告所有产生不同字符序列的文本，
+        例如分词器丢弃或改写了空白、替换了字符等情况
         
-        # 构建高亮标记的字符串
-        ref_highlighted = []
-        hyp_highlighted = []
+        Args:
+            texts: 待校验的文本集合
+            filter_fillers (bool): 是否过滤语气词
+            sample_size (int): 随机抽样数量，None表示全部校验
+            seed (int): 抽样随机种子，保证结果可复现
+            
+        Returns:
+            dict: {'checked': 校验数量, 'divergences': [{'text', 'token', 'char', 'index'}, ...]}
+        """
+        texts = list(texts)
+        if sample_size is not None and sample_size < len(texts):
+            texts = random.Random(seed).sample(texts, sample_size)
         
-        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-            if tag == 'equal':
-                ref_highlighted.append(ref_processed[i1:i2])
-                hyp_highlighted.append(hyp_processed[j1:j2])
-            elif tag == 'replace':
-                ref_highlighted.append(f"[{ref_processed[i1:i2]}]")
-                hyp_highlighted.append(f"[{hyp_processed[j1:j2]}]")
-            elif tag == 'delete':
-                ref_highlighted.append(f"[{ref_processed[i1:i2]}]")
-            elif tag == 'insert':
-                hyp_highlighted.append(f"[{hyp_processed[j1:j2]}]")
+        divergences = []
+        for text in texts:
+            token_chars = self._character_sequence(self._preprocess(text, filter_fillers, 'token'), 'token')
+            char_chars = self._character_sequence(self._preprocess(text, filter_fillers, 'char'), 'char')
+            if token_chars == char_chars:
+                continue
+            
+            # 定位第一个不同字符的位置
+            index = next((k for k, (a, b) in enumerate(zip(token_chars, char_chars)) if a != b),
+                         min(len(token_chars), len(char_chars)))
+            divergences.append({
+                'text': text,
+                'token': token_chars,
+                'char': char_chars,
+                'index': index
+            })
         
-        return ''.join(ref_highlighted), ''.join(hyp_highlighted)
+        return {'checked': len(texts), 'divergences': divergences}
     
     def get_tokenizer_info(self) -> Dict[str, Any]:
         """
@@ -602,7 +1182,10 @@ class ASRMetrics:
         Returns:
             Dict[str, Any]: 分词器信息
         """
-        if self.tokenizer:
-            return self.tokenizer.get_info()
+        if self._tokenizer:
+            return self._tokenizer.get_info()
+        elif self.evaluation_mode == 'char':
+            # char模式下尚未需要分词器，不为了查询信息而加载模型
+            return {'name': self.tokenizer_name, 'initialized': False, 'evaluation_mode': 'char'}
         else:
             return {'name': self.tokenizer_name, 'available': False}
\ No newline at end of file
@@ -9,11 +9,26 @@ import argparse
 import sys
 import os
 import csv
+import signal
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Tuple, Optional, Sequence, Iterable, Iterator
 
-from asr_metrics_refactored import ASRMetrics
-from text_tokenizers import get_available_tokenizers, get_tokenizer_info
+from asr_metrics_refactored import ASRMetrics, ABOVE_THRESHOLD
+from preprocess_cache import PreprocessCache
+from result_store import ResultStore
+from manifest import ManifestError, PairRecord, iter_manifest
+from utterance_table import UtteranceTableError, join_tables
+from result_writer import CheckpointError, ResultWriter, result_row
+from text_tokenizers import TokenizerFactory, probe_tokenizer
+
+
+# 并行批处理时每个工作进程持有的ASRMetrics实例（由_init_worker创建）
+_worker_metrics: Optional[ASRMetrics] = None
+_worker_options: dict = {}
 
 
 def read_file_with_encodings(file_path: str) -> str:
@@ -43,9 +58,35 @@ def read_file_with_encodings(file_path: str) -> str:
         raise Exception(f"无法读取文件 {file_path}: {str(e)}")
 
 
+def configure_tokenizers(tokenizer: str, user_dicts: Optional[Sequence[str]] = None,
+                         dict_cache_dir: Optional[str] = None,
+                         tokenizer_service: Optional[str] = None):
+    """
+    按命令行选项配置分词器工厂（主进程和并行批处理的工作进程都会调用）
+    
+    Args:
+        tokenizer: 分词器名称
+        user_dicts: jieba自定义词典路径列表
+        dict_cache_dir: jieba前缀词典持久化缓存目录
+        tokenizer_service: 共享分词服务地址
+    """
+    if user_dicts or dict_cache_dir:
+        TokenizerFactory.configure_tokenizer('jieba', cache_dir=dict_cache_dir,
+                                             user_dicts=user_dicts)
+    
+    if tokenizer_service:
+        from text_tokenizers.tokenizers.service import parse_address, use_tokenizer_service
+        use_tokenizer_service(parse_address(tokenizer_service), names=[tokenizer])
+
+
 def process_single_pair(asr_file: str, ref_file: str, 
                        tokenizer: str, filter_fillers: bool,
-                       verbose: bool = False) -> dict:
+                       verbose: bool = False,
+                       evaluation_mode: str = 'token',
+                       alignment_mode: str = 'full',
+                       preprocess_cache: PreprocessCache = None,
+                       metrics: Optional[ASRMetrics] = None,
+                       result_store: Optional[ResultStore] = None) -> dict:
     """
     处理单个文件对
     
@@ -55,6 +96,11 @@ def process_single_pair(asr_file: str, ref_file: str,
         tokenizer: 分词器名称
         filter_fillers: 是否过滤语气词
         verbose: 是否显示详细信息
+        evaluation_mode: 评估模式（token或char）
+        alignment_mode: 对齐模式（full或segmented）
+        preprocess_cache: 共享的预处理缓存（可选）
+        metrics: 复用的ASRMetrics实例（可选，批处理时所有文件对共用一个实例）
+        result_store: 持久化结果库（可选，未传入metrics时使用）
         
     Returns:
         dict: 计算结果
@@ -65,50 +111,109 @@ def process_single_pair(asr_file: str, ref_file: str,
         ref_text = read_file_with_encodings(ref_file)
         
         # 创建ASRMetrics实例
-        metrics = ASRMetrics(tokenizer_name=tokenizer)
+        if metrics is None:
+            metrics = ASRMetrics(tokenizer_name=tokenizer, evaluation_mode=evaluation_mode,
+                                 alignment_mode=alignment_mode, preprocess_cache=preprocess_cache,
+                                 result_store=result_store)
         
-        # 计算详细指标
-        result = metrics.calculate_detailed_metrics(ref_text, asr_text, filter_fillers)
-        
-        # 添加文件信息
-        result['asr_file'] = os.path.basename(asr_file)
-        result['ref_file'] = os.path.basename(ref_file)
-        result['filter_fillers'] = filter_fillers
-        
-        if verbose:
-            print(f"\n处理: {result['asr_file']} <-> {result['ref_file']}")
-            print(f"  CER: {result['cer']:.4f}")
-            print(f"  准确率: {result['accuracy']:.4f}")
-            print(f"  替换: {result['substitutions']}, 删除: {result['deletions']}, 插入: {result['insertions']}")
-        
-        return result
+        # 计算详细指标（单次预处理和对齐，CLI不需要高亮和差异序列）
+        result = metrics.evaluate_pair(ref_text, asr_text, filter_fillers, include_diff=False)['metrics']
+        return _pair_result(result, asr_file, ref_file, filter_fillers, verbose)
         
     except Exception as e:
         if verbose:
-            print(f"\n错误: 处理文件对时出错")
-            print(f"  ASR文件: {asr_file}")
-            print(f"  标注文件: {ref_file}")
-            print(f"  错误信息: {str(e)}")
+            _print_pair_error(asr_file, ref_file, str(e))
         return None
 
 
+def _pair_result(result: dict, asr_file: str, ref_file: str, filter_fillers: bool,
+                 verbose: bool = False) -> dict:
+    """在指标字典中添加文件信息，verbose时打印结果"""
+    result['asr_file'] = os.path.basename(asr_file)
+    result['ref_file'] = os.path.basename(ref_file)
+    result['filter_fillers'] = filter_fillers
+    
+    if verbose:
+        print(f"\n处理: {result['asr_file']} <-> {result['ref_file']}")
+        bound = "（上界）" if result.get('alignment_exact') is False else ""
+        print(f"  CER: {result['cer']:.4f}{bound}")
+        print(f"  准确率: {result['accuracy']:.4f}")
+        print(f"  替换: {result['substitutions']}, 删除: {result['deletions']}, 插入: {result['insertions']}")
+    return result
+
+
+def _print_pair_error(asr_file: str, ref_file: str, error: str):
+    """打印文件对的处理错误"""
+    print(f"\n错误: 处理文件对时出错")
+    print(f"  ASR文件: {asr_file}")
+    print(f"  标注文件: {ref_file}")
+    print(f"  错误信息: {error}")
+
+
+def evaluate_text_batch(metrics: ASRMetrics, texts: List[Tuple[str, str]],
+                        filter_fillers: bool) -> List[Tuple[Optional[dict], Optional[str]]]:
+    """
+    用evaluate_batch批量评估一批文本对（分词器按批推理），整批失败时退回逐对评估，
+    单对出错不影响其他文本对
+    
+    Args:
+        metrics: ASRMetrics实例
+        texts: (参考文本, 识别文本)列表
+        filter_fillers: 是否过滤语气词
+        
+    Returns:
+        list: (指标字典, 错误信息)列表，与texts一一对应
+    """
+    try:
+        return [(result['metrics'], None)
+                for result in metrics.evaluate_batch(texts, filter_fillers, include_diff=False)]
+    except Exception:
+        outputs = []
+        for ref_text, asr_text in texts:
+            try:
+                outputs.append((metrics.evaluate_pair(ref_text, asr_text, filter_fillers,
+                                                      include_diff=False)['metrics'], None))
+            except Exception as e:
+                outputs.append((None, str(e)))
+        return outputs
+
+
 def batch_process_directory(asr_dir: str, ref_dir: str,
                            tokenizer: str, filter_fillers: bool,
                            output_file: str = None,
-                           verbose: bool = False) -> List[dict]:
+                           verbose: bool = False,
+                           evaluation_mode: str = 'token',
+                           alignment_mode: str = 'full',
+                           preprocess_cache: PreprocessCache = None,
+                           jobs: int = 1,
+                           ordered: bool = True,
+                           tokenizer_setup: Optional[dict] = None,
+                           resume: bool = False,
+                           keep_results: bool = True,
+                           result_store: Optional[ResultStore] = None) -> List[dict]:
     """
     批处理目录中的文件
+    指定输出文件时每个文件对完成后立即追加写入并定期提交检查点，resume时跳过已完成的文件对
     
     Args:
         asr_dir: ASR文件目录
         ref_dir: 标注文件目录
         tokenizer: 分词器名称
         filter_fillers: 是否过滤语气词
-        output_file: 输出文件路径
+        output_file: 输出文件路径（.csv或.jsonl）
         verbose: 是否显示详细信息
+        evaluation_mode: 评估模式（token或char）
+        alignment_mode: 对齐模式（full或segmented）
+        preprocess_cache: 共享的预处理缓存（可选）
+        jobs: 并行进程数，1表示在当前进程中依次处理
+        ordered: 并行时是否按文件对顺序返回结果（False时按完成顺序）
+        tokenizer_setup: 工作进程中传给configure_tokenizers的分词器配置
+        resume: 是否根据输出文件的检查点续跑
+        keep_results: 是否在内存中保留并返回本次计算的结果（False时内存占用与文件对数无关）
+        result_store: 持久化结果库（可选），内容和配置都未变的文件对直接复用之前的结果
         
     Returns:
-        List[dict]: 所有结果列表
+        List[dict]: 本次计算的结果列表（keep_results为False时为空列表）
     """
     asr_path = Path(asr_dir)
     ref_path = Path(ref_dir)
@@ -120,51 +225,787 @@ def batch_process_directory(asr_dir: str, ref_dir: str,
     if len(asr_files) != len(ref_files):
         print(f"警告: ASR文件数({len(asr_files)})和标注文件数({len(ref_files)})不匹配")
     
-    results = []
-    total = min(len(asr_files), len(ref_files))
+    pairs = [(str(a), str(r)) for a, r in zip(asr_files, ref_files)]
+    total = len(pairs)
+    started = time.time()
     
     print(f"\n开始批处理，共{total}个文件对...")
     print(f"分词器: {tokenizer}")
+    print(f"评估模式: {evaluation_mode}")
+    print(f"对齐模式: {alignment_mode}")
     print(f"语气词过滤: {'启用' if filter_fillers else '禁用'}")
+    if jobs > 1:
+        print(f"并行进程: {jobs}")
     print("-" * 60)
     
-    for i, (asr_file, ref_file) in enumerate(zip(asr_files, ref_files), 1):
-        if verbose:
-            print(f"\n[{i}/{total}] ", end='')
-        
-        result = process_single_pair(
-            str(asr_file), str(ref_file),
-            tokenizer, filter_fillers, verbose
-        )
+    summary = _new_summary()
+    writer = _open_writer(output_file, result_fieldnames(), resume, summary)
+    if writer is not None and writer.resumed:
+        pairs = [pair for pair in pairs if not writer.is_completed(_pair_key(*pair))]
+        summary['skipped'] = total - len(pairs)
+    
+    if jobs > 1:
+        outputs = iter_parallel_pairs(
+            pairs, jobs, tokenizer, filter_fillers, verbose,
+            evaluation_mode=evaluation_mode, alignment_mode=alignment_mode,
+            cache_bytes=preprocess_cache.max_bytes if preprocess_cache is not None else None,
+            cache_path=preprocess_cache.disk_path if preprocess_cache is not None else None,
+            ordered=ordered, tokenizer_setup=tokenizer_setup, window=jobs * 4,
+            store_path=result_store.path if result_store is not None else None)
+    else:
+        metrics = ASRMetrics(tokenizer_name=tokenizer, evaluation_mode=evaluation_mode,
+                             alignment_mode=alignment_mode, preprocess_cache=preprocess_cache,
+                             result_store=result_store)
         
-        if result:
-            results.append(result)
+        def sequential():
+            for i, (asr_file, ref_file) in enumerate(pairs):
+                if verbose:
+                    print(f"\n[{i + 1}/{len(pairs)}] ", end='')
+                yield i, process_single_pair(asr_file, ref_file, tokenizer, filter_fillers,
+                                             verbose, metrics=metrics)
+        outputs = sequential()
+    
+    results = []
+    try:
+        for index, result in outputs:
+            _add_to_summary(summary, result)
+            if result is None:
+                continue
+            if writer is not None:
+                writer.write(_pair_key(*pairs[index]), result)
+            if keep_results:
+                results.append(result)
+    finally:
+        if writer is not None:
+            writer.close()
     
     # 统计总体结果
-    if results:
+    _finish_summary(summary)
+    evaluated = summary['records'] - summary['failed']
+    if evaluated:
         print("\n" + "=" * 60)
         print("批处理完成！")
         print("=" * 60)
         
-        avg_cer = sum(r['cer'] for r in results) / len(results)
-        avg_accuracy = sum(r['accuracy'] for r in results) / len(results)
-        total_subs = sum(r['substitutions'] for r in results)
-        total_dels = sum(r['deletions'] for r in results)
-        total_ins = sum(r['insertions'] for r in results)
+        print(f"成功处理: {evaluated}/{total}个文件对")
+        if summary['skipped']:
+            print(f"续跑跳过: {summary['skipped']}个已完成的文件对")
+        print(f"平均CER: {summary['avg_cer']:.4f}")
+        print(f"平均准确率: {summary['avg_accuracy']:.4f}")
+        print(f"总错误: 替换={summary['substitutions']}, 删除={summary['deletions']}, "
+              f"插入={summary['insertions']}")
+        
+        if summary['inexact']:
+            print(f"分段对齐: {summary['inexact']}个文件对的错误数为上界（未证明最优）")
         
-        print(f"成功处理: {len(results)}/{total}个文件对")
-        print(f"平均CER: {avg_cer:.4f}")
-        print(f"平均准确率: {avg_accuracy:.4f}")
-        print(f"总错误: 替换={total_subs}, 删除={total_dels}, 插入={total_ins}")
+        # 并行时缓存统计分散在各工作进程中
+        if preprocess_cache is not None and jobs <= 1:
+            print_cache_stats(preprocess_cache)
+        if result_store is not None:
+            print_result_store_stats(result_store, started)
         
-        # 保存结果
         if output_file:
-            save_results_to_csv(results, output_file)
             print(f"\n结果已保存到: {output_file}")
     
     return results
 
 
+def _init_worker(tokenizer: str, evaluation_mode: str, alignment_mode: str,
+                 filter_fillers: bool, verbose: bool,
+                 cache_bytes: Optional[int], cache_path: Optional[str],
+                 tokenizer_setup: Optional[dict], store_path: Optional[str] = None):
+    """
+    并行批处理工作进程的初始化函数：配置分词器工厂，每个进程只创建一个ASRMetrics
+    Ctrl-C由主进程统一处理，工作进程忽略SIGINT
+    """
+    global _worker_metrics, _worker_options
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    configure_tokenizers(tokenizer, **(tokenizer_setup or {}))
+    
+    # 每个进程使用独立的内存缓存和SQLite连接，磁盘层仍然共享
+    preprocess_cache = None
+    if cache_bytes is not None:
+        preprocess_cache = PreprocessCache(max_bytes=cache_bytes, disk_path=cache_path)
+    result_store = ResultStore(store_path) if store_path is not None else None
+    _worker_metrics = ASRMetrics(tokenizer_name=tokenizer, evaluation_mode=evaluation_mode,
+                                 alignment_mode=alignment_mode, preprocess_cache=preprocess_cache,
+                                 result_store=result_store)
+    _worker_options = {'tokenizer': tokenizer, 'filter_fillers': filter_fillers, 'verbose': verbose}
+
+
+def _process_chunk(chunk: List[Tuple[int, str, str]]) -> List[Tuple[int, Optional[dict]]]:
+    """
+    在工作进程中处理一批文件对：读取全部文件后整块批量评估
+    
+    Args:
+        chunk: (序号, ASR文件路径, 标注文件路径)列表
+        
+    Returns:
+        list: (序号, 计算结果)列表，处理失败的结果为None
+    """
+    filter_fillers = _worker_options['filter_fillers']
+    verbose = _worker_options['verbose']
+    results = {}
+    readable, texts = [], []
+    for index, asr_file, ref_file in chunk:
+        try:
+            texts.append((read_file_with_encodings(ref_file), read_file_with_encodings(asr_file)))
+            readable.append((index, asr_file, ref_file))
+        except Exception as e:
+            results[index] = None
+            if verbose:
+                _print_pair_error(asr_file, ref_file, str(e))
+    
+    for (index, asr_file, ref_file), (result, error) in zip(
+            readable, evaluate_text_batch(_worker_metrics, texts, filter_fillers)):
+        if result is None:
+            results[index] = None
+            if verbose:
+                _print_pair_error(asr_file, ref_file, error)
+        else:
+            results[index] = _pair_result(result, asr_file, ref_file, filter_fillers, verbose)
+    return [(index, results[index]) for index, _, _ in chunk]
+
+
+def _map_chunks(func, chunks: Iterable[list], jobs: int, initargs: tuple,
+                ordered: bool = True, window: Optional[int] = None) -> Iterator[list]:
+    """
+    在进程池中逐块执行func并依次产出每块的结果
+    
+    Args:
+        func: 在工作进程中处理一块的函数
+        chunks: 块的可迭代对象，按需读取
+        jobs: 工作进程数
+        initargs: 传给_init_worker的参数
+        ordered: True时按提交顺序产出，False时按完成顺序产出
+        window: 同时在途的块数上限，None表示一次全部提交
+        
+    Yields:
+        list: 每块的处理结果
+        
+    Raises:
+        KeyboardInterrupt: 用户中断时取消未开始的任务后抛出
+    """
+    executor = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=initargs)
+    chunks = iter(chunks)
+    pending = deque()
+    finished = False
+    try:
+        while True:
+            for chunk in chunks:
+                pending.append(executor.submit(func, chunk))
+                if window is not None and len(pending) >= window:
+                    break
+            if not pending:
+                break
+            if ordered:
+                future = pending.popleft()
+            else:
+                future = next(iter(wait(pending, return_when=FIRST_COMPLETED).done))
+                pending.remove(future)
+            yield future.result()
+        finished = True
+    except KeyboardInterrupt:
+        print("\n已中断，取消未开始的任务...")
+        raise
+    finally:
+        executor.shutdown(wait=finished, cancel_futures=not finished)
+
+
+def parallel_process_pairs(pairs: List[Tuple[str, str]], jobs: int,
+                           tokenizer: str, filter_fillers: bool,
+                           verbose: bool = False,
+                           evaluation_mode: str = 'token',
+                           alignment_mode: str = 'full',
+                           cache_bytes: Optional[int] = None,
+                           cache_path: Optional[str] = None,
+                           chunksize: Optional[int] = None,
+                           ordered: bool = True,
+                           tokenizer_setup: Optional[dict] = None,
+                           store_path: Optional[str] = None) -> List[Optional[dict]]:
+    """
+    用进程池并行处理文件对，每个工作进程初始化时创建一个ASRMetrics（分词器只加载一次），
+    文件对按块提交以减少进程间通信
+    
+    Args:
+        pairs: (ASR文件路径, 标注文件路径)列表
+        jobs: 工作进程数
+        tokenizer: 分词器名称
+        filter_fillers: 是否过滤语气词
+        verbose: 是否显示详细信息
+        evaluation_mode: 评估模式（token或char）
+        alignment_mode: 对齐模式（full或segmented）
+        cache_bytes: 各工作进程预处理缓存的内存层容量，None表示不缓存
+        cache_path: 预处理缓存的SQLite文件路径（各工作进程共用）
+        chunksize: 每个任务包含的文件对数，None表示按文件对数和进程数自动选择
+        ordered: True时结果与pairs顺序一致，False时按完成顺序返回
+        tokenizer_setup: 传给configure_tokenizers的分词器配置
+        store_path: 持久化结果库的SQLite文件路径（各工作进程共用），None表示不使用
+        
+    Returns:
+        List[Optional[dict]]: 计算结果列表，处理失败的文件对为None
+        
+    Raises:
+        KeyboardInterrupt: 用户中断时取消未开始的任务后抛出
+    """
+    results: List[Optional[dict]] = [None] * len(pairs) if ordered else []
+    for index, result in iter_parallel_pairs(
+            pairs, jobs, tokenizer, filter_fillers, verbose,
+            evaluation_mode=evaluation_mode, alignment_mode=alignment_mode,
+            cache_bytes=cache_bytes, cache_path=cache_path, chunksize=chunksize,
+            ordered=ordered, tokenizer_setup=tokenizer_setup, store_path=store_path):
+        if ordered:
+            results[index] = result
+        else:
+            results.append(result)
+    return results
+
+
+def iter_parallel_pairs(pairs: Sequence[Tuple[str, str]], jobs: int,
+                        tokenizer: str, filter_fillers: bool,
+                        verbose: bool = False,
+                        evaluation_mode: str = 'token',
+                        alignment_mode: str = 'full',
+                        cache_bytes: Optional[int] = None,
+                        cache_path: Optional[str] = None,
+                        chunksize: Optional[int] = None,
+                        ordered: bool = True,
+                        tokenizer_setup: Optional[dict] = None,
+                        window: Optional[int] = None,
+                        store_path: Optional[str] = None) -> Iterator[Tuple[int, Optional[dict]]]:
+    """
+    用进程池并行处理文件对，逐个产出结果（参数同parallel_process_pairs）
+    
+    Args:
+        window: 同时在途的块数上限，None表示一次全部提交
+        
+    Yields:
+        Tuple[int, Optional[dict]]: (文件对序号, 计算结果)，处理失败的结果为None
+    """
+    if chunksize is None:
+        # 每个进程约分到4个任务，兼顾负载均衡和通信开销
+        chunksize = max(1, min(64, len(pairs) // (jobs * 4)))
+    chunks = ([(i, asr_file, ref_file) for i, (asr_file, ref_file) in
+               enumerate(pairs[start:start + chunksize], start)]
+              for start in range(0, len(pairs), chunksize))
+    
+    initargs = (tokenizer, evaluation_mode, alignment_mode, filter_fillers, verbose,
+                cache_bytes, cache_path, tokenizer_setup, store_path)
+    for chunk_results in _map_chunks(_process_chunk, chunks, jobs, initargs,
+                                     ordered=ordered, window=window):
+        yield from chunk_results
+
+
+def _new_summary() -> dict:
+    """流式汇总统计的初始值"""
+    return {'records': 0, 'failed': 0, 'skipped': 0, 'inexact': 0,
+            'cer_sum': 0.0, 'accuracy_sum': 0.0,
+            'substitutions': 0, 'deletions': 0, 'insertions': 0, 'ref_length': 0}
+
+
+def _add_to_summary(summary: dict, result: Optional[dict]):
+    """
+    把一条结果计入汇总（result为None表示处理失败）
+    续跑时从CSV读回的结果数值为字符串，这里统一转换
+    """
+    summary['records'] += 1
+    if result is None:
+        summary['failed'] += 1
+        return
+    summary['cer_sum'] += float(result['cer'])
+    summary['accuracy_sum'] += float(result['accuracy'])
+    for key in ('substitutions', 'deletions', 'insertions', 'ref_length'):
+        summary[key] += int(result[key])
+    if result.get('alignment_exact') in (False, 'False'):
+        summary['inexact'] += 1
+
+
+def _finish_summary(summary: dict) -> dict:
+    """计算平均CER、平均准确率和总体CER"""
+    evaluated = summary['records'] - summary['failed']
+    errors = summary['substitutions'] + summary['deletions'] + summary['insertions']
+    summary['avg_cer'] = summary.pop('cer_sum') / evaluated if evaluated else 0.0
+    summary['avg_accuracy'] = summary.pop('accuracy_sum') / evaluated if evaluated else 0.0
+    summary['corpus_cer'] = errors / max(summary['ref_length'], 1)
+    return summary
+
+
+def _open_writer(output_file: Optional[str], fieldnames: List[str], resume: bool,
+                 summary: dict) -> Optional[ResultWriter]:
+    """
+    打开增量结果写入器；续跑时把已提交的结果计入汇总
+    
+    Returns:
+        Optional[ResultWriter]: 写入器，未指定输出文件时为None
+    """
+    if not output_file:
+        return None
+    writer = ResultWriter(output_file, fieldnames, resume=resume)
+    for result in writer.iter_existing():
+        _add_to_summary(summary, result)
+    if writer.resumed:
+        print(f"续跑: 输出文件中已有{summary['records']}条结果，跳过已完成的部分")
+    return writer
+
+
+def _pair_key(asr_file: str, ref_file: str) -> str:
+    """文件对在检查点中的键"""
+    return f"{os.path.basename(asr_file)}\t{os.path.basename(ref_file)}"
+
+
+def evaluate_record(metrics: ASRMetrics, record: PairRecord, filter_fillers: bool) -> dict:
+    """
+    评估清单中的一条记录
+    
+    Args:
+        metrics: ASRMetrics实例
+        record: 清单记录
+        filter_fillers: 是否过滤语气词
+        
+    Returns:
+        dict: 计算结果（含utt_id和metadata字段）
+    """
+    ref_text, asr_text = _record_texts(record)
+    result = metrics.evaluate_pair(ref_text, asr_text, filter_fillers, include_diff=False)['metrics']
+    return _record_result(result, record, filter_fillers)
+
+
+def _record_texts(record: PairRecord) -> Tuple[str, str]:
+    """读取记录的(参考文本, 识别文本)，记录中给出路径时从文件读取"""
+    ref_text = record.ref if record.ref is not None else read_file_with_encodings(record.ref_path)
+    asr_text = record.hyp if record.hyp is not None else read_file_with_encodings(record.hyp_path)
+    return ref_text, asr_text
+
+
+def _record_result(result: dict, record: PairRecord, filter_fillers: bool) -> dict:
+    """在指标字典中添加记录的编号、文件和元数据"""
+    result['utt_id'] = record.utt_id
+    result['asr_file'] = os.path.basename(record.hyp_path) if record.hyp_path else ''
+    result['ref_file'] = os.path.basename(record.ref_path) if record.ref_path else ''
+    result['filter_fillers'] = filter_fillers
+    result['metadata'] = record.metadata
+    return result
+
+
+def _evaluate_records(metrics: ASRMetrics, records: List[PairRecord],
+                      filter_fillers: bool) -> List[Tuple[str, str, Optional[dict], Optional[str]]]:
+    """
+    批量评估一批清单记录（整块一次evaluate_batch），单条记录出错不影响其他记录
+    
+    Returns:
+        list: (记录的键, 记录名称, 计算结果, 错误信息)列表，与records顺序一致
+    """
+    outputs = {}
+    readable, texts = [], []
+    for position, record in enumerate(records):
+        try:
+            texts.append(_record_texts(record))
+            readable.append((position, record))
+        except Exception as e:
+            outputs[position] = (record.key, record.name, None, str(e))
+    
+    for (position, record), (result, error) in zip(readable, evaluate_text_batch(metrics, texts, filter_fillers)):
+        if result is not None:
+            result = _record_result(result, record, filter_fillers)
+        outputs[position] = (record.key, record.name, result, error)
+    return [outputs[position] for position in range(len(records))]
+
+
+def _skip_completed(records: Iterator[PairRecord], writer: ResultWriter,
+                    summary: dict) -> Iterator[PairRecord]:
+    """跳过已在之前的运行中完成的记录"""
+    for record in records:
+        if writer.is_completed(record.key):
+            summary['skipped'] += 1
+        else:
+            yield record
+
+
+def _process_records(records: List[PairRecord]) -> List[Tuple[str, str, Optional[dict], Optional[str]]]:
+    """在工作进程中评估一批清单记录"""
+    return _evaluate_records(_worker_metrics, records, _worker_options['filter_fillers'])
+
+
+def evaluate_record_stream(records: Iterable[PairRecord], source: str,
+                           tokenizer: str, filter_fillers: bool,
+                           output_file: str = None,
+                           verbose: bool = False,
+                           evaluation_mode: str = 'token',
+                           alignment_mode: str = 'full',
+                           preprocess_cache: PreprocessCache = None,
+                           jobs: int = 1,
+                           chunksize: int = 64,
+                           tokenizer_setup: Optional[dict] = None,
+                           resume: bool = False,
+                           result_store: Optional[ResultStore] = None) -> dict:
+    """
+    流式评估记录序列：逐块读取记录、评估并立即写出结果，只保留汇总统计，
+    内存占用与记录总数无关
+    
+    Args:
+        records: 记录的可迭代对象，按需读取
+        source: 记录来源（用于提示信息）
+        tokenizer: 分词器名称
+        filter_fillers: 是否过滤语气词
+        output_file: 输出文件路径（.csv或.jsonl，逐条写入并定期提交检查点）
+        verbose: 是否显示每条记录的结果
+        evaluation_mode: 评估模式（token或char）
+        alignment_mode: 对齐模式（full或segmented）
+        preprocess_cache: 共享的预处理缓存（可选）
+        jobs: 并行进程数，1表示在当前进程中依次处理
+        chunksize: 每次读取和提交的记录数
+        tokenizer_setup: 工作进程中传给configure_tokenizers的分词器配置
+        resume: 是否根据输出文件的检查点续跑（跳过已完成的记录）
+        result_store: 持久化结果库（可选），内容和配置都未变的记录直接复用之前的结果
+        
+    Returns:
+        dict: 汇总统计（记录数、失败数、跳过数、平均CER、总体CER和S/D/I总数）
+        
+    """
+    started = time.time()
+    summary = _new_summary()
+    writer = _open_writer(output_file, result_fieldnames(utterances=True), resume, summary)
+    records = iter(records)
+    if writer is not None and writer.resumed:
+        records = _skip_completed(records, writer, summary)
+    chunks = iter(lambda: list(islice(records, chunksize)), [])
+    
+    print(f"\n开始流式评估: {source}")
+    print(f"分词器: {tokenizer}")
+    print(f"评估模式: {evaluation_mode}")
+    print(f"对齐模式: {alignment_mode}")
+    print(f"语气词过滤: {'启用' if filter_fillers else '禁用'}")
+    if jobs > 1:
+        print(f"并行进程: {jobs}")
+    print("-" * 60)
+    
+    if jobs > 1:
+        cache_bytes = preprocess_cache.max_bytes if preprocess_cache is not None else None
+        cache_path = preprocess_cache.disk_path if preprocess_cache is not None else None
+        store_path = result_store.path if result_store is not None else None
+        initargs = (tokenizer, evaluation_mode, alignment_mode, filter_fillers, False,
+                    cache_bytes, cache_path, tokenizer_setup, store_path)
+        # 在途的块数有上限，清单读取速度不会超过评估速度太多
+        outputs = _map_chunks(_process_records, chunks, jobs, initargs, window=jobs * 4)
+    else:
+        metrics = ASRMetrics(tokenizer_name=tokenizer, evaluation_mode=evaluation_mode,
+                             alignment_mode=alignment_mode, preprocess_cache=preprocess_cache,
+                             result_store=result_store)
+        outputs = (_evaluate_records(metrics, chunk, filter_fillers) for chunk in chunks)
+    
+    try:
+        for chunk_outputs in outputs:
+            for key, name, result, error in chunk_outputs:
+                _add_to_summary(summary, result)
+                if result is None:
+                    print(f"错误: {name}: {error}")
+                    continue
+                if writer is not None:
+                    writer.write(key, result)
+                if verbose:
+                    print(f"{name}: CER {result['cer']:.4f}")
+    finally:
+        if writer is not None:
+            writer.close()
+    
+    _finish_summary(summary)
+    evaluated = summary['records'] - summary['failed']
+    
+    print("\n" + "=" * 60)
+    print("评估完成！")
+    print("=" * 60)
+    print(f"成功处理: {evaluated}/{summary['records']}条记录")
+    if summary['skipped']:
+        print(f"续跑跳过: {summary['skipped']}条已完成的记录")
+    if evaluated:
+        print(f"平均CER: {summary['avg_cer']:.4f}")
+        print(f"总体CER: {summary['corpus_cer']:.4f}")
+        print(f"平均准确率: {summary['avg_accuracy']:.4f}")
+        print(f"总错误: 替换={summary['substitutions']}, 删除={summary['deletions']}, "
+              f"插入={summary['insertions']}")
+    if preprocess_cache is not None and jobs <= 1:
+        print_cache_stats(preprocess_cache)
+    if result_store is not None:
+        summary['result_store'] = result_store.run_stats(started)
+        print_result_store_stats(result_store, started)
+    if output_file:
+        print(f"\n结果已保存到: {output_file}")
+    
+    return summary
+
+
+def evaluate_manifest(manifest_path: str, tokenizer: str, filter_fillers: bool,
+                      output_file: str = None,
+                      verbose: bool = False,
+                      manifest_format: Optional[str] = None,
+                      **options) -> dict:
+    """
+    按清单流式评估（TSV或JSONL，"-"表示标准输入）
+    
+    Args:
+        manifest_path: 清单路径
+        tokenizer: 分词器名称
+        filter_fillers: 是否过滤语气词
+        output_file: 输出CSV文件路径（逐条写入）
+        verbose: 是否显示每条记录的结果
+        manifest_format: 清单格式（tsv或jsonl），None时按扩展名判断
+        **options: 传给evaluate_record_stream的其他选项
+        
+    Returns:
+        dict: 汇总统计
+        
+    Raises:
+        ManifestError: 清单格式错误时抛出（已写出的结果保留）
+    """
+    return evaluate_record_stream(iter_manifest(manifest_path, manifest_format), manifest_path,
+                                  tokenizer, filter_fillers, output_file, verbose, **options)
+
+
+def evaluate_tables(ref_table: str, hyp_table: str, tokenizer: str, filter_fillers: bool,
+                    output_file: str = None,
+                    verbose: bool = False,
+                    assume_sorted: Optional[bool] = None,
+                    spill_dir: Optional[str] = None,
+                    **options) -> dict:
+    """
+    Kaldi/ESPnet风格语句表评估：按语句编号连接参考表和识别表，逐条评估并汇总
+    只有一侧存在的语句不参与评估，分别计入missing_hyp和missing_ref
+    
+    Args:
+        ref_table: 参考语句表路径（每行"utt_id 文本"）
+        hyp_table: 识别语句表路径
+        tokenizer: 分词器名称
+        filter_fillers: 是否过滤语气词
+        output_file: 输出CSV文件路径（逐条写入）
+        verbose: 是否显示每条语句的结果
+        assume_sorted: True表示两个表都已按编号排序（归并连接），False为哈希连接，None时自动检查
+        spill_dir: 哈希连接落盘的临时目录
+        **options: 传给evaluate_record_stream的其他选项
+        
+    Returns:
+        dict: 汇总统计（含missing_hyp和missing_ref）
+        
+    Raises:
+        UtteranceTableError: 语句表编号重复或（assume_sorted时）未排序时抛出
+    """
+    missing = {'missing_hyp': 0, 'missing_ref': 0}
+    
+    def records():
+        joined = join_tables(ref_table, hyp_table, assume_sorted=assume_sorted, spill_dir=spill_dir)
+        for line, (utt_id, ref, hyp) in enumerate(joined, 1):
+            if hyp is None:
+                missing['missing_hyp'] += 1
+            elif ref is None:
+                missing['missing_ref'] += 1
+            else:
+                yield PairRecord(line=line, utt_id=utt_id, ref=ref, hyp=hyp)
+    
+    summary = evaluate_record_stream(records(), f"{ref_table} <-> {hyp_table}",
+                                     tokenizer, filter_fillers, output_file, verbose, **options)
+    summary.update(missing)
+    if missing['missing_hyp']:
+        print(f"警告: {missing['missing_hyp']}条语句没有识别结果")
+    if missing['missing_ref']:
+        print(f"警告: {missing['missing_ref']}条识别结果没有对应的参考文本")
+    return summary
+
+
+def evaluate_systems(asr_dirs: List[str], ref_dir: str,
+                     tokenizer: str, filter_fillers: bool,
+                     output_file: str = None,
+                     verbose: bool = False,
+                     evaluation_mode: str = 'token',
+                     alignment_mode: str = 'full',
+                     preprocess_cache: PreprocessCache = None,
+                     resume: bool = False,
+                     keep_results: bool = True,
+                     result_store: Optional[ResultStore] = None) -> List[dict]:
+    """
+    多系统对比：一个标注目录对应多个ASR结果目录（多家ASR或多个模型版本）
+    每个标注文件只预处理一次，再与各系统中同名的ASR文件逐一对比；
+    各系统的汇总统计随结果流式更新，指定输出文件时逐条写入（键带系统名称），resume时跳过已完成的结果
+    
+    Args:
+        asr_dirs: ASR文件目录列表，每个目录代表一个系统
+        ref_dir: 标注文件目录
+        tokenizer: 分词器名称
+        filter_fillers: 是否过滤语气词
+        output_file: 输出文件路径（.csv或.jsonl）
+        verbose: 是否显示详细信息
+        evaluation_mode: 评估模式（token或char）
+        alignment_mode: 对齐模式（full或segmented）
+        preprocess_cache: 共享的预处理缓存（可选）
+        resume: 是否根据输出文件的检查点续跑
+        keep_results: 是否在内存中保留并返回本次计算的结果（False时内存占用与文件数无关）
+        result_store: 持久化结果库（可选），已计算过的文本对直接复用
+        
+    Returns:
+        List[dict]: 本次计算的结果列表（含system字段；keep_results为False时为空列表）
+    """
+    ref_files = sorted(Path(ref_dir).glob('*.txt'))
+    
+    # 系统名称默认取目录名，重名时使用完整路径
+    names = [Path(d).name for d in asr_dirs]
+    systems = [(name if names.count(name) == 1 else d, Path(d)) for name, d in zip(names, asr_dirs)]
+    
+    print(f"\n开始多系统对比，共{len(ref_files)}个标注文件，{len(systems)}个系统...")
+    print(f"分词器: {tokenizer}")
+    print(f"评估模式: {evaluation_mode}")
+    print(f"对齐模式: {alignment_mode}")
+    print(f"语气词过滤: {'启用' if filter_fillers else '禁用'}")
+    print("-" * 60)
+    
+    started = time.time()
+    summaries = {name: _new_summary() for name, _ in systems}
+    missing = {name: 0 for name, _ in systems}
+    
+    writer = None
+    if output_file:
+        writer = ResultWriter(output_file, result_fieldnames(system=True), resume=resume)
+        for row in writer.iter_existing():
+            if row.get('system') in summaries:
+                _add_to_summary(summaries[row['system']], row)
+        if writer.resumed:
+            print(f"续跑: 输出文件中已有{sum(s['records'] for s in summaries.values())}条结果，跳过已完成的部分")
+    
+    metrics = ASRMetrics(tokenizer_name=tokenizer, evaluation_mode=evaluation_mode,
+                         alignment_mode=alignment_mode, preprocess_cache=preprocess_cache,
+                         result_store=result_store)
+    results = []
+    
+    try:
+        for ref_file in ref_files:
+            # 本标注文件需要计算的系统（缺少同名ASR文件或续跑时已完成的不计算）
+            pending = []
+            for name, asr_path in systems:
+                asr_file = asr_path / ref_file.name
+                if not asr_file.exists():
+                    missing[name] += 1
+                    continue
+                key = f"{name}\t{_pair_key(str(asr_file), str(ref_file))}"
+                if writer is not None and writer.is_completed(key):
+                    summaries[name]['skipped'] += 1
+                    continue
+                pending.append((name, asr_file, key))
+            if not pending:
+                continue
+            
+            try:
+                prepared = metrics.prepare_reference(read_file_with_encodings(str(ref_file)), filter_fillers)
+            except Exception as e:
+                print(f"错误: 无法处理标注文件 {ref_file.name}: {str(e)}")
+                for name, _, _ in pending:
+                    _add_to_summary(summaries[name], None)
+                continue
+            
+            for name, asr_file, key in pending:
+                try:
+                    result = metrics.evaluate(prepared, read_file_with_encodings(str(asr_file)),
+                                              include_diff=False)['metrics']
+                except Exception as e:
+                    print(f"错误: {name}/{asr_file.name}: {str(e)}")
+                    _add_to_summary(summaries[name], None)
+                    continue
+                
+                result['system'] = name
+                result['asr_file'] = asr_file.name
+                result['ref_file'] = ref_file.name
+                result['filter_fillers'] = filter_fillers
+                _add_to_summary(summaries[name], result)
+                if writer is not None:
+                    writer.write(key, result)
+                if keep_results:
+                    results.append(result)
+                
+                if verbose:
+                    print(f"{name:>16s} | {ref_file.name}: CER {result['cer']:.4f}")
+    finally:
+        if writer is not None:
+            writer.close()
+    
+    # 按系统汇总
+    print("\n" + "=" * 60)
+    print("多系统对比完成！")
+    print("=" * 60)
+    print(f"{'系统':<16s} {'文件数':>6s} {'平均CER':>8s} {'总体CER':>8s} {'替换':>7s} {'删除':>7s} {'插入':>7s}")
+    for name, _ in systems:
+        summary = _finish_summary(summaries[name])
+        evaluated = summary['records'] - summary['failed']
+        if not evaluated:
+            print(f"{name:<16s} {0:>6d} {'-':>8s}")
+            continue
+        print(f"{name:<16s} {evaluated:>6d} {summary['avg_cer']:>8.4f} {summary['corpus_cer']:>8.4f} "
+              f"{summary['substitutions']:>7d} {summary['deletions']:>7d} {summary['insertions']:>7d}")
+    for name, count in missing.items():
+        if count:
+            print(f"警告: 系统{name}缺少{count}个与标注文件同名的ASR文件")
+    for name, summary in summaries.items():
+        if summary['failed']:
+            print(f"警告: 系统{name}有{summary['failed']}个文件对处理失败")
+    
+    if preprocess_cache is not None:
+        print_cache_stats(preprocess_cache)
+    if result_store is not None:
+        print_result_store_stats(result_store, started)
+    
+    if output_file:
+        print(f"\n结果已保存到: {output_file}")
+    
+    return results
+
+
+def print_cache_stats(preprocess_cache: PreprocessCache):
+    """
+    打印预处理缓存统计
+    
+    Args:
+        preprocess_cache: 预处理缓存
+    """
+    stats = preprocess_cache.get_stats()
+    print(f"预处理缓存: 命中={stats['hits']} (磁盘={stats['disk_hits']}), "
+          f"未命中={stats['misses']}, 命中率={stats['hit_rate']:.1%}, "
+          f"淘汰={stats['evictions']}, 占用={stats['bytes'] / 1024 / 1024:.1f}MB")
+
+
+def print_result_store_stats(result_store: ResultStore, since: float):
+    """
+    打印本次运行的结果库统计（并行时包含各工作进程）
+    
+    Args:
+        result_store: 持久化结果库
+        since: 本次运行开始的时间戳
+    """
+    stats = result_store.run_stats(since)
+    print(f"结果库: 复用={stats['reused']}, 新计算={stats['computed']}, "
+          f"总条数={stats['entries']} ({stats['path']})")
+
+
+def result_fieldnames(system: bool = False, utterances: bool = False) -> List[str]:
+    """
+    结果CSV的列
+    
+    Args:
+        system: 是否包含系统名称列（多系统对比）
+        utterances: 是否包含语句编号和元数据列（按清单评估）
+        
+    Returns:
+        List[str]: 列名列表
+    """
+    fieldnames = ['system'] if system else []
+    if utterances:
+        fieldnames.append('utt_id')
+    fieldnames += [
+        'asr_file', 'ref_file', 'tokenizer',
+        'cer', 'wer', 'accuracy',
+        'substitutions', 'deletions', 'insertions',
+        'ref_length', 'hyp_length',
+        'filter_fillers', 'alignment_exact'
+    ]
+    if utterances:
+        fieldnames.append('metadata')
+    return fieldnames
+
+
 def save_results_to_csv(results: List[dict], output_file: str):
     """
     保存结果到CSV文件
@@ -177,22 +1018,15 @@ def save_results_to_csv(results: List[dict], output_file: str):
         print("没有结果可以保存")
         return
     
-    # 定义CSV列
-    fieldnames = [
-        'asr_file', 'ref_file', 'tokenizer',
-        'cer', 'wer', 'accuracy',
-        'substitutions', 'deletions', 'insertions',
-        'ref_length', 'hyp_length',
-        'filter_fillers'
-    ]
+    fieldnames = result_fieldnames(system=any('system' in r for r in results),
+                                   utterances=any('utt_id' in r for r in results))
     
     with open(output_file, 'w', newline='', encoding='utf-8') as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
         
         for result in results:
-            row = {field: result.get(field, '') for field in fieldnames}
-            writer.writerow(row)
+            writer.writerow(result_row(result, fieldnames))
 
 
 def save_results_to_txt(results: List[dict], output_file: str):
@@ -224,22 +1058,106 @@ def save_results_to_txt(results: List[dict], output_file: str):
                    f"{'是' if result['filter_fillers'] else '否'}\n")
 
 
+def triage_pairs(pairs: List[Tuple[str, str]], tokenizer: str, filter_fillers: bool,
+                 max_cer: float, evaluation_mode: str = 'token',
+                 verbose: bool = False,
+                 preprocess_cache: PreprocessCache = None) -> List[dict]:
+    """
+    CER阈值分诊：只判断每个文件对是否超过CER阈值，超过时提前结束计算，
+    不生成S/D/I统计和差异，所有文件对共用一个ASRMetrics实例
+    
+    Args:
+        pairs: (ASR文件路径, 标注文件路径)列表
+        tokenizer: 分词器名称
+        filter_fillers: 是否过滤语气词
+        max_cer: CER阈值
+        evaluation_mode: 评估模式（token或char）
+        verbose: 是否显示未超标的文件对
+        preprocess_cache: 共享的预处理缓存（可选）
+        
+    Returns:
+        List[dict]: 超过阈值（或处理失败）的文件对列表
+    """
+    metrics = ASRMetrics(tokenizer_name=tokenizer, evaluation_mode=evaluation_mode,
+                         preprocess_cache=preprocess_cache)
+    offending = []
+    
+    print(f"\nCER阈值分诊，共{len(pairs)}个文件对，阈值: {max_cer:.4f}")
+    print("-" * 60)
+    
+    for asr_file, ref_file in pairs:
+        item = {'asr_file': os.path.basename(asr_file), 'ref_file': os.path.basename(ref_file)}
+        try:
+            cer = metrics.calculate_cer(read_file_with_encodings(ref_file),
+                                        read_file_with_encodings(asr_file),
+                                        filter_fillers, max_cer=max_cer)
+        except Exception as e:
+            item['error'] = str(e)
+            offending.append(item)
+            print(f"✗ {item['asr_file']} <-> {item['ref_file']}: 处理出错 ({str(e)})")
+            continue
+        
+        if cer == ABOVE_THRESHOLD:
+            offending.append(item)
+            print(f"✗ {item['asr_file']} <-> {item['ref_file']}: 超过阈值")
+        elif verbose:
+            print(f"✓ {item['asr_file']} <-> {item['ref_file']}: CER {cer:.4f}")
+    
+    print("-" * 60)
+    print(f"超过阈值: {len(offending)}/{len(pairs)}个文件对")
+    return offending
+
+
+def verify_char_mode(files: List[str], tokenizer: str, filter_fillers: bool,
+                     sample_size: int) -> int:
+    """
+    抽样校验char快速路径与token分词路径的一致性
+    
+    Args:
+        files: 待抽样的文本文件路径列表
+        tokenizer: 分词器名称
+        filter_fillers: 是否过滤语气词
+        sample_size: 抽样数量
+        
+    Returns:
+        int: 不一致的文本数量
+    """
+    metrics = ASRMetrics(tokenizer_name=tokenizer)
+    texts = [read_file_with_encodings(f) for f in files]
+    report = metrics.verify_char_mode(texts, filter_fillers, sample_size=sample_size)
+    
+    print(f"\n校验char模式: 分词器={metrics.tokenizer_name}, 抽样{report['checked']}个文本")
+    print("-" * 60)
+    for item in report['divergences']:
+        index = item['index']
+        print(f"不一致 (第{index}个字符): token={item['token'][index:index + 20]!r} "
+              f"char={item['char'][index:index + 20]!r}")
+    
+    if report['divergences']:
+        print(f"发现{len(report['divergences'])}处不一致，建议继续使用token模式")
+    else:
+        print("两条路径结果完全一致，可以安全使用 --mode char")
+    
+    return len(report['divergences'])
+
+
 def list_tokenizers():
-    """列出可用的分词器"""
+    """列出分词器及其安装/加载状态（只探测依赖包，不加载模型）"""
     print("\n可用的分词器:")
     print("=" * 60)
     
-    available = get_available_tokenizers()
-    
-    for name in available:
-        info = get_tokenizer_info(name)
-        status = "✓" if info.get('available') else "✗"
-        version = info.get('version', 'unknown')
-        desc = info.get('description', '')
-        print(f"{status} {name:10s} (v{version:10s}) - {desc}")
+    installed = 0
+    for name in TokenizerFactory.get_registered_tokenizers():
+        status = probe_tokenizer(name)
+        if status['installed']:
+            installed += 1
+            state = "已加载" if status['loaded'] else "首次使用时加载"
+            print(f"✓ {name:10s} (v{status['version']:10s}) - {status['description']} [{state}]")
+        else:
+            print(f"✗ {name:10s} {'':13s} - {status.get('error', '未安装')}")
     
     print("=" * 60)
-    print(f"共 {len(available)} 个可用分词器")
+    print(f"共 {installed} 个可用分词器")
 
 
 def main():
@@ -258,6 +1176,49 @@ def main():
   # 批量处理目录
   python cli.py --asr-dir ./asr_files --ref-dir ./ref_files --output results.csv
   
+  # 8个进程并行批处理（每个进程只加载一次分词器）
+  python cli.py --asr-dir ./asr_files --ref-dir ./ref_files --jobs 8 --output results.csv
+  
+  # 中断后续跑：结果逐条写入results.csv，检查点为results.csv.ckpt
+  python cli.py --asr-dir ./asr_files --ref-dir ./ref_files --jobs 8 --output results.csv --resume
+  
+  # 按清单流式评估（TSV表头: utt_id ref_path hyp_path [元数据列...]，或JSONL）
+  python cli.py --manifest pairs.tsv --jobs 8 --output results.csv
+  
+  # Kaldi/ESPnet风格语句表：按utt_id连接参考和识别结果，输出逐句结果和总体CER
+  python cli.py --ref-table data/test/text --hyp-table exp/decode/text --output per_utt.csv
+  
+  # 纯字符级快速模式（先抽样校验与分词路径一致）
+  python cli.py --asr-dir ./asr_files --ref-dir ./ref_files --tokenizer hanlp --verify-char-mode 50
+  python cli.py --asr-dir ./asr_files --ref-dir ./ref_files --mode char
+  
+  # 超长文档快速分诊（基于锚点的分段对齐，结果可能是错误数上界）
+  python cli.py --asr long_asr.txt --ref long_ref.txt --mode char --alignment segmented
+  
+  # CER阈值分诊：只列出CER超过0.1的文件对（存在超标时退出码为1）
+  python cli.py --asr-dir ./asr_files --ref-dir ./ref_files --mode char --max-cer 0.1
+  
+  # 多系统对比：一个标注目录，多个ASR结果目录（按文件名配对，标注文件只预处理一次）
+  python cli.py --ref-dir ./ref_files --asr-dir ./vendor_a ./vendor_b ./vendor_c --output bakeoff.csv
+  
+  # 预处理结果缓存到磁盘，多次运行（如对比多家ASR结果）复用参考文本的分词结果
+  python cli.py --asr-dir ./vendor_a --ref-dir ./ref_files --preprocess-cache ~/.cache/cer/preprocess.db
+  
+  # 持久化结果库：更换ASR模型后重新评估，只计算内容发生变化的文件对
+  python cli.py --asr-dir ./asr_v2 --ref-dir ./ref_files --cache-db ~/.cache/cer/results.db
+  
+  # 清理结果库和预处理缓存：删除30天未使用的条目，各自最多保留100万条
+  python cli.py --cache-db ~/.cache/cer/results.db --preprocess-cache ~/.cache/cer/preprocess.db \
+      --prune-cache-days 30 --prune-cache-entries 1000000
+  
+  # 加载领域词典，并把前缀词典持久化缓存，之后的运行不再重新构建
+  python cli.py --asr-dir ./asr_files --ref-dir ./ref_files --user-dict asr_terms.txt --dict-cache-dir ~/.cache/cer
+  
+  # 多个评估进程共用一个HanLP模型：先启动共享分词服务，再让各进程连接
+  export TEXT_TOKENIZERS_AUTHKEY=secret
+  python -m text_tokenizers.tokenizers.service --address /tmp/tokenizers.sock --preload hanlp &
+  python cli.py --asr-dir ./asr_files --ref-dir ./ref_files --tokenizer hanlp --tokenizer-service /tmp/tokenizers.sock
+  
   # 列出可用分词器
   python cli.py --list-tokenizers
         """
@@ -266,8 +1227,24 @@ def main():
     # 基本选项
     parser.add_argument('--asr', type=str, help='ASR转写结果文件路径')
     parser.add_argument('--ref', type=str, help='标注文件路径')
-    parser.add_argument('--asr-dir', type=str, help='ASR文件目录（批处理模式）')
+    parser.add_argument('--asr-dir', type=str, nargs='+', action='extend',
+                       help='ASR文件目录（批处理模式）；指定多个目录时进入多系统对比模式')
     parser.add_argument('--ref-dir', type=str, help='标注文件目录（批处理模式）')
+    parser.add_argument('--manifest', type=str, metavar='PATH',
+                       help='评估清单（TSV或JSONL，每条记录为ref/hyp文本或ref_path/hyp_path路径，'
+                            '可选utt_id和元数据列），流式读取；"-"表示标准输入')
+    parser.add_argument('--ref-table', type=str, metavar='PATH',
+                       help='Kaldi/ESPnet风格的参考语句表（每行"utt_id 文本"），与--hyp-table按编号连接')
+    parser.add_argument('--hyp-table', type=str, metavar='PATH',
+                       help='识别结果语句表（每行"utt_id 文本"）')
+    parser.add_argument('--tables-sorted', dest='tables_sorted', action='store_const', const=True,
+                       help='语句表已按编号排序，直接归并连接（默认自动检查）')
+    parser.add_argument('--tables-unsorted', dest='tables_sorted', action='store_const', const=False,
+                       help='语句表未排序，直接使用哈希连接（超过内存上限时分区落盘）')
+    parser.add_argument('--spill-dir', type=str, metavar='DIR',
+                       help='哈希连接分区落盘的临时目录（默认: 系统临时目录）')
+    parser.add_argument('--manifest-format', type=str, choices=['tsv', 'jsonl'],
+                       help='清单格式（默认按扩展名判断：.jsonl为JSONL，其余为TSV）')
     
     # 分词器选项
     parser.add_argument('--tokenizer', type=str, default='jieba',
@@ -275,16 +1252,57 @@ def main():
                        help='选择分词器 (默认: jieba)')
     parser.add_argument('--list-tokenizers', action='store_true',
                        help='列出所有可用的分词器')
+    parser.add_argument('--user-dict', type=str, action='append', metavar='PATH',
+                       help='jieba自定义词典（领域术语、产品名等），可多次指定')
+    parser.add_argument('--dict-cache-dir', type=str, metavar='DIR',
+                       help='jieba前缀词典持久化缓存目录，之后的进程直接加载序列化词典')
+    parser.add_argument('--tokenizer-service', type=str, metavar='ADDRESS',
+                       help='通过共享分词服务分词（Unix socket路径或"主机:端口"，'
+                            '认证密钥取自环境变量TEXT_TOKENIZERS_AUTHKEY）')
     
     # 处理选项
     parser.add_argument('--filter-fillers', action='store_true',
                        help='过滤语气词（如"嗯"、"啊"、"呢"等）')
+    parser.add_argument('--mode', type=str, default='token',
+                       choices=['token', 'char'],
+                       help='评估模式：token为分词路径，char为纯字符快速路径 (默认: token)')
+    parser.add_argument('--alignment', type=str, default='full',
+                       choices=['full', 'segmented'],
+                       help='对齐模式：full为整篇完整对齐，segmented为基于锚点的分段对齐 (默认: full)')
+    parser.add_argument('--verify-char-mode', type=int, metavar='N',
+                       help='抽样N个文本校验char模式与token模式结果是否一致')
+    
+    parser.add_argument('--max-cer', type=float, metavar='X',
+                       help='分诊模式：只列出CER超过X的文件对，超过即提前结束计算（存在超标时退出码为1）')
+    
+    parser.add_argument('--preprocess-cache', type=str, metavar='PATH',
+                       help='预处理缓存的SQLite文件路径，多次运行之间复用预处理结果')
+    parser.add_argument('--cache-mb', type=int, default=64,
+                       help='预处理缓存内存层容量（MB，默认: 64）')
+    parser.add_argument('--cache-db', type=str, metavar='PATH',
+                       help='持久化结果库的SQLite文件路径，文本内容和评估配置都未变的文本对直接复用之前的结果'
+                            '（保存含差异序列的完整结果，可与图形界面共用同一个结果库）')
+    parser.add_argument('--prune-cache-days', type=float, metavar='DAYS',
+                       help='清理结果库/预处理缓存中超过DAYS天未使用的条目后退出'
+                            '（清理--cache-db和--preprocess-cache指定的文件）')
+    parser.add_argument('--prune-cache-entries', type=int, metavar='N',
+                       help='清理结果库/预处理缓存，各自只保留最近使用的N条后退出'
+                            '（清理--cache-db和--preprocess-cache指定的文件）')
+    
+    parser.add_argument('--jobs', '-j', type=int, default=1, metavar='N',
+                       help='批处理并行进程数，0表示使用全部CPU核心 (默认: 1)')
+    parser.add_argument('--unordered', action='store_true',
+                       help='并行批处理时按完成顺序收集结果（默认按文件对顺序）')
     
     # 输出选项
     parser.add_argument('--output', '-o', type=str,
-                       help='输出文件路径（支持.csv或.txt格式）')
+                       help='输出文件路径。批处理/清单/语句表模式按扩展名逐条写入.csv或.jsonl，'
+                            '并在旁边维护检查点文件（输出路径加.ckpt，供--resume续跑）；'
+                            '单文件模式支持.csv或.txt')
     parser.add_argument('--verbose', '-v', action='store_true',
                        help='显示详细处理信息')
+    parser.add_argument('--resume', action='store_true',
+                       help='批处理/清单/语句表模式：根据输出文件旁的检查点（.ckpt）续跑，跳过已完成的部分')
     
     args = parser.parse_args()
     
@@ -293,6 +1311,121 @@ def main():
         list_tokenizers()
         return 0
     
+    # 结果库（多次运行之间复用评估结果）
+    result_store = ResultStore(args.cache_db) if args.cache_db else None
+    
+    # 清理结果库和预处理缓存的磁盘层
+    if args.prune_cache_days is not None or args.prune_cache_entries is not None:
+        if result_store is None and not args.preprocess_cache:
+            print("错误: 清理缓存需要指定--cache-db或--preprocess-cache")
+            return 1
+        if result_store is not None:
+            removed = result_store.prune(max_age_days=args.prune_cache_days,
+                                         max_entries=args.prune_cache_entries)
+            print(f"结果库已清理: 删除{removed}条，剩余{len(result_store)}条 ({args.cache_db})")
+        if args.preprocess_cache:
+            disk_cache = PreprocessCache(disk_path=args.preprocess_cache)
+            removed = disk_cache.prune(max_age_days=args.prune_cache_days,
+                                       max_entries=args.prune_cache_entries)
+            print(f"预处理缓存已清理: 删除{removed}条，剩余{disk_cache.disk_entries()}条 "
+                  f"({args.preprocess_cache})")
+            disk_cache.close()
+        return 0
+    
+    tokenizer_setup = {'user_dicts': args.user_dict, 'dict_cache_dir': args.dict_cache_dir,
+                       'tokenizer_service': args.tokenizer_service}
+    configure_tokenizers(args.tokenizer, **tokenizer_setup)
+    
+    # 校验char模式
+    if args.verify_char_mode:
+        if args.asr and args.ref:
+            files = [args.ref, args.asr]
+        elif args.asr_dir and args.ref_dir:
+            files = sorted(str(p) for p in Path(args.ref_dir).glob('*.txt'))
+            for asr_dir in args.asr_dir:
+                files += sorted(str(p) for p in Path(asr_dir).glob('*.txt'))
+        else:
+            parser.print_help()
+            return 1
+        divergent = verify_char_mode(files, args.tokenizer, args.filter_fillers,
+                                     args.verify_char_mode)
+        return 1 if divergent else 0
+    
+    # 预处理缓存（本次运行内共享，指定路径时同时落盘）
+    preprocess_cache = PreprocessCache(max_bytes=args.cache_mb * 1024 * 1024,
+                                       disk_path=args.preprocess_cache)
+    
+    # CER阈值分诊
+    if args.max_cer is not None:
+        if args.asr and args.ref:
+            pairs = [(args.asr, args.ref)]
+        elif args.asr_dir and args.ref_dir:
+            pairs = []
+            for asr_dir in args.asr_dir:
+                pairs += list(zip((str(p) for p in sorted(Path(asr_dir).glob('*.txt'))),
+                                  (str(p) for p in sorted(Path(args.ref_dir).glob('*.txt')))))
+        else:
+            parser.print_help()
+            return 1
+        offending = triage_pairs(pairs, args.tokenizer, args.filter_fillers, args.max_cer,
+                                 evaluation_mode=args.mode, verbose=args.verbose,
+                                 preprocess_cache=preprocess_cache)
+        return 1 if offending else 0
+    
+    # 清单模式
+    if args.manifest:
+        try:
+            evaluate_manifest(
+                args.manifest, args.tokenizer, args.filter_fillers,
+                args.output, args.verbose,
+                evaluation_mode=args.mode,
+                alignment_mode=args.alignment,
+                preprocess_cache=preprocess_cache,
+                jobs=args.jobs or os.cpu_count() or 1,
+                manifest_format=args.manifest_format,
+                tokenizer_setup=tokenizer_setup,
+                resume=args.resume,
+                result_store=result_store
+            )
+        except ManifestError as e:
+            print(f"错误: 清单格式错误: {str(e)}")
+            return 1
+        except CheckpointError as e:
+            print(f"错误: {str(e)}")
+            return 1
+        except KeyboardInterrupt:
+            return 130
+        return 0
+    
+    # 语句表模式
+    if args.ref_table or args.hyp_table:
+        if not (args.ref_table and args.hyp_table):
+            parser.print_help()
+            return 1
+        try:
+            evaluate_tables(
+                args.ref_table, args.hyp_table, args.tokenizer, args.filter_fillers,
+                args.output, args.verbose,
+                assume_sorted=args.tables_sorted,
+                spill_dir=args.spill_dir,
+                evaluation_mode=args.mode,
+                alignment_mode=args.alignment,
+                preprocess_cache=preprocess_cache,
+                jobs=args.jobs or os.cpu_count() or 1,
+                tokenizer_setup=tokenizer_setup,
+                resume=args.resume,
+                result_store=result_store
+            )
+        except UtteranceTableError as e:
+            print(f"错误: {str(e)}")
+            return 1
+        except CheckpointError as e:
+            print(f"错误: {str(e)}")
+            return 1
+        except KeyboardInterrupt:
+            return 130
+        return 0
+    
     # 单文件模式
     if args.asr and args.ref:
         print("\n单文件对比模式")
@@ -301,7 +1434,11 @@ def main():
         result = process_single_pair(
             args.asr, args.ref,
             args.tokenizer, args.filter_fillers,
-            verbose=True
+            verbose=True,
+            evaluation_mode=args.mode,
+            alignment_mode=args.alignment,
+            preprocess_cache=preprocess_cache,
+            result_store=result_store
         )
         
         if result and args.output:
@@ -313,13 +1450,56 @@ def main():
         
         return 0
     
+    # 多系统对比模式
+    elif args.asr_dir and args.ref_dir and len(args.asr_dir) > 1:
+        # 每个标注文件只预处理一次再与各系统对比，不拆分到多个进程
+        if args.jobs != 1 or args.unordered:
+            print("错误: 多系统对比模式不支持--jobs和--unordered")
+            return 1
+        if args.output and not args.output.lower().endswith(('.csv', '.jsonl')):
+            print("错误: 多系统对比模式的输出文件须为.csv或.jsonl")
+            return 1
+        try:
+            evaluate_systems(
+                args.asr_dir, args.ref_dir,
+                args.tokenizer, args.filter_fillers,
+                args.output, args.verbose,
+                evaluation_mode=args.mode,
+                alignment_mode=args.alignment,
+                preprocess_cache=preprocess_cache,
+                resume=args.resume,
+                keep_results=False,
+                result_store=result_store
+            )
+        except CheckpointError as e:
+            print(f"错误: {str(e)}")
+            return 1
+        except KeyboardInterrupt:
+            return 130
+        return 0
+    
     # 批处理模式
     elif args.asr_dir and args.ref_dir:
-        results = batch_process_directory(
-            args.asr_dir, args.ref_dir,
-            args.tokenizer, args.filter_fillers,
-            args.output, args.verbose
-        )
+        try:
+            batch_process_directory(
+                args.asr_dir[0], args.ref_dir,
+                args.tokenizer, args.filter_fillers,
+                args.output, args.verbose,
+                evaluation_mode=args.mode,
+                alignment_mode=args.alignment,
+                preprocess_cache=preprocess_cache,
+                jobs=args.jobs or os.cpu_count() or 1,
+                ordered=not args.unordered,
+                tokenizer_setup=tokenizer_setup,
+                resume=args.resume,
+                keep_results=False,
+                result_store=result_store
+            )
+        except CheckpointError as e:
+            print(f"错误: {str(e)}")
+            return 1
+        except KeyboardInterrupt:
+            return 130
         return 0
     
     # 没有提供足够的参数
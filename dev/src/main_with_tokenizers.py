@@ -23,10 +23,19 @@ import jiwer
 from functools import partial
 import threading
 import queue
+import time
 
 # 导入重构后的ASRMetrics类和分词器模块
 from asr_metrics_refactored import ASRMetrics
-from text_tokenizers import get_available_tokenizers, get_tokenizer_info, get_cached_tokenizer_info
+from preprocess_cache import PreprocessCache
+from result_store import ResultStore, DEFAULT_RESULT_STORE_PATH
+from text_tokenizers import (get_available_tokenizers, get_tokenizer_info, get_cached_tokenizer_info,
+                             probe_tokenizer)
+
+
+# 图形界面结果库的清理策略：每次打开时删除超过该天数未使用的结果，并限制总条数
+RESULT_STORE_MAX_AGE_DAYS = 30
+RESULT_STORE_MAX_ENTRIES = 50000
 
 
 class ASRComparisonTool:
@@ -65,6 +74,12 @@ class ASRComparisonTool:
         
         # 性能优化：缓存ASRMetrics实例，避免重复创建
         self.asr_metrics_cache = {}
+        # 预处理结果缓存，同一参考文本在多次计算之间只需分词一次
+        self.preprocess_cache = PreprocessCache()
+        # 持久化结果库（勾选"复用历史结果"后在首次计算时打开），以及本次计算使用的结果库和开始时间
+        self.result_store = None
+        self.active_result_store = None
+        self.calculation_started = None
 
         # 创建主框架分为上下两部分
         self.top_frame = ttk.Frame(root)
@@ -75,6 +90,7 @@ class ASRComparisonTool:
         
         # 控制变量设置
         self.filter_fillers = tk.BooleanVar(value=False)  # 语气词过滤开关
+        self.use_result_store = tk.BooleanVar(value=False)  # 复用历史结果开关
         self.selected_tokenizer = tk.StringVar(value="jieba")  # 默认选择jieba分词器
         self.available_tokenizers = []  # 可用分词器列表
 
@@ -250,6 +266,16 @@ class ASRComparisonTool:
         self.filter_frame = ttk.Frame(self.action_frame)
         self.filter_frame.pack(side=tk.RIGHT, pady=5)
 
+        # 复用历史结果：内容和设置都未变的文件对直接取结果库中的结果（默认关闭）
+        self.result_store_check = ttk.Checkbutton(
+            self.filter_frame,
+            text="复用历史结果",
+            variable=self.use_result_store,
+            onvalue=True,
+            offvalue=False
+        )
+        self.result_store_check.pack(side=tk.LEFT, padx=(0, 10))
+
         self.filter_check = ttk.Checkbutton(
             self.filter_frame,
             text="语气词过滤",
@@ -431,7 +457,12 @@ class ASRComparisonTool:
         """
         tokenizer_name = self.selected_tokenizer.get()
         try:
-            info = get_tokenizer_info(tokenizer_name)
+            # 未加载的分词器只探测依赖是否已安装，选择时不加载模型
+            status = probe_tokenizer(tokenizer_name)
+            if status['loaded']:
+                info = get_tokenizer_info(tokenizer_name)
+            else:
+                info = dict(status, available=status['installed'] and 'error' not in status)
             hint_text = ""
 
             if info.get('available', False):
@@ -439,6 +470,8 @@ class ASRComparisonTool:
                 status_text = f"✓ {tokenizer_name} (v{version})"
                 if tokenizer_name in self.asr_metrics_cache:
                     status_text += " [已缓存]"
+                elif not status['loaded']:
+                    status_text += " [首次使用时加载]"
                 self.tokenizer_status_label.config(
                     text=status_text,
                     foreground="green"
@@ -480,6 +513,7 @@ class ASRComparisonTool:
             tuple: (是否成功, 错误信息)
         """
         self.asr_metrics_cache.clear()
+        self.preprocess_cache.clear()
 
         try:
             from text_tokenizers.tokenizers.factory import TokenizerFactory
@@ -820,6 +854,7 @@ class ASRComparisonTool:
         # 获取用户设置
         filter_fillers = self.filter_fillers.get()
         tokenizer_name = self.selected_tokenizer.get()
+        use_result_store = self.use_result_store.get()
 
         # 配置进度条
         total_pairs = len(sorted_asr_files)
@@ -848,7 +883,7 @@ class ASRComparisonTool:
         # 启动后台计算线程
         self.calculation_thread = threading.Thread(
             target=self._calculate_worker,
-            args=(file_pairs, tokenizer_name, filter_fillers, total_pairs),
+            args=(file_pairs, tokenizer_name, filter_fillers, total_pairs, use_result_store),
             daemon=True
         )
         self.calculation_thread.start()
@@ -856,7 +891,25 @@ class ASRComparisonTool:
         # 启动UI更新定时器
         self.root.after(100, self._check_results)
     
-    def _calculate_worker(self, file_pairs, tokenizer_name, filter_fillers, total_pairs):
+    def _open_result_store(self):
+        """
+        打开（首次使用时）持久化结果库，并按RESULT_STORE_MAX_AGE_DAYS和RESULT_STORE_MAX_ENTRIES清理
+        
+        Returns:
+            ResultStore: 结果库，无法打开时为None
+        """
+        if self.result_store is None:
+            try:
+                self.result_store = ResultStore(DEFAULT_RESULT_STORE_PATH)
+                self.result_store.prune(max_age_days=RESULT_STORE_MAX_AGE_DAYS,
+                                        max_entries=RESULT_STORE_MAX_ENTRIES)
+            except Exception as e:
+                print(f"警告: 无法打开结果库 {DEFAULT_RESULT_STORE_PATH}: {str(e)}")
+                self.result_store = None
+        return self.result_store
+    
+    def _calculate_worker(self, file_pairs, tokenizer_name, filter_fillers, total_pairs,
+                          use_result_store=False):
         """
         后台计算工作线程
         在独立线程中执行耗时的计算任务
@@ -866,14 +919,19 @@ class ASRComparisonTool:
             tokenizer_name: 分词器名称
             filter_fillers: 是否过滤语气词
             total_pairs: 总文件对数
+            use_result_store: 是否复用持久化结果库中的历史结果
         """
         try:
             # 初始化分词器
             if tokenizer_name not in self.asr_metrics_cache:
                 self.result_queue.put(('status', f"正在加载{tokenizer_name}分词器..."))
-                self.asr_metrics_cache[tokenizer_name] = ASRMetrics(tokenizer_name=tokenizer_name)
+                self.asr_metrics_cache[tokenizer_name] = ASRMetrics(tokenizer_name=tokenizer_name,
+                                                                     preprocess_cache=self.preprocess_cache)
             
             asr_metrics = self.asr_metrics_cache[tokenizer_name]
+            self.calculation_started = time.time()
+            self.active_result_store = self._open_result_store() if use_result_store else None
+            asr_metrics.result_store = self.active_result_store
             
             # 逐对处理文件
             for index, (asr_file, ref_file) in enumerate(file_pairs, start=1):
@@ -887,10 +945,12 @@ class ASRComparisonTool:
                     asr_text = self.read_file_with_multiple_encodings(asr_file)
                     ref_text = self.read_file_with_multiple_encodings(ref_file)
                     
-                    # 计算指标
-                    metrics = asr_metrics.calculate_detailed_metrics(ref_text, asr_text, filter_fillers)
-                    diff_ref, diff_hyp = asr_metrics.highlight_errors(ref_text, asr_text, filter_fillers)
-                    diff_sequence = asr_metrics.show_differences(ref_text, asr_text, filter_fillers)
+                    # 计算指标：单次预处理和对齐，同时得到高亮文本和差异序列
+                    evaluation = asr_metrics.evaluate_pair(ref_text, asr_text, filter_fillers)
+                    metrics = evaluation['metrics']
+                    diff_ref = evaluation['diff_reference']
+                    diff_hyp = evaluation['diff_hypothesis']
+                    diff_sequence = evaluation['diff_sequence']
                     
                     # 构建结果
                     result = {
@@ -1041,6 +1101,10 @@ class ASRComparisonTool:
                 f"标注字数: {total_ref_chars}    ASR字数: {total_hyp_chars}",
                 f"替换: {total_subs}    删除: {total_dels}    插入: {total_ins}"
             ]
+            if self.active_result_store is not None:
+                stats = self.active_result_store.run_stats(self.calculation_started)
+                summary_lines.append(f"结果库: 复用 {stats['reused']}    新计算 {stats['computed']}    "
+                                     f"总条数 {stats['entries']}")
             self.summary_var.set("\n".join(summary_lines))
             
             # 选中第一项
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+评估清单（manifest）读取
+清单为TSV（首行为表头）或JSONL文件，每条记录是一个参考/识别文本对：
+文本可以直接写在清单中（ref/hyp），也可以给出文件路径（ref_path/hyp_path，相对路径相对于清单所在目录），
+可选的utt_id列为语句编号，其他列作为元数据原样保留。记录逐行读取，不把整个清单载入内存
+"""
+
+import csv
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+
+# 清单中有特殊含义的列名，其余列均视为元数据
+ID_FIELDS = ('utt_id', 'id')
+REF_TEXT_FIELD = 'ref'
+HYP_TEXT_FIELD = 'hyp'
+REF_PATH_FIELD = 'ref_path'
+HYP_PATH_FIELD = 'hyp_path'
+RESERVED_FIELDS = ID_FIELDS + (REF_TEXT_FIELD, HYP_TEXT_FIELD, REF_PATH_FIELD, HYP_PATH_FIELD)
+
+
+class ManifestError(ValueError):
+    """清单格式错误（行号从1开始，TSV表头为第1行）"""
+
+    def __init__(self, path: str, line: int, message: str):
+        super().__init__(f"{path}:{line}: {message}")
+        self.path = path
+        self.line = line
+
+
+@dataclass
+class PairRecord:
+    """清单中的一条参考/识别文本对，文本与路径二选一"""
+
+    line: int
+    utt_id: Optional[str] = None
+    ref: Optional[str] = None
+    hyp: Optional[str] = None
+    ref_path: Optional[str] = None
+    hyp_path: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def name(self) -> str:
+        """用于提示信息的记录名称：语句编号，没有时为行号"""
+        return self.utt_id if self.utt_id is not None else f"第{self.line}行"
+
+    @property
+    def key(self) -> str:
+        """续跑检查点中的键：语句编号，没有时为行号"""
+        return self.utt_id if self.utt_id is not None else f"line:{self.line}"
+
+
+def _make_record(values: Dict[str, Any], line: int, path: str, base_dir: str) -> PairRecord:
+    """
+    由一行的列值创建记录并检查参考/识别文本是否齐全
+
+    Args:
+        values (dict): 列名 -> 值
+        line (int): 行号
+        path (str): 清单路径（用于错误信息）
+        base_dir (str): 相对路径的基准目录
+
+    Returns:
+        PairRecord: 记录
+    """
+    def side(text_field, path_field):
+        text = values.get(text_field)
+        path_value = values.get(path_field) or None
+        # TSV中同时有文本列和路径列时，空的一列表示未指定
+        if text == '' and path_value is not None:
+            text = None
+        if text is None and path_value is None:
+            raise ManifestError(path, line, f"缺少{text_field}或{path_field}")
+        if text is not None and path_value is not None:
+            raise ManifestError(path, line, f"{text_field}和{path_field}只能指定一个")
+        if path_value is not None:
+            path_value = os.path.join(base_dir, os.path.expanduser(str(path_value)))
+        return (None if text is None else str(text)), path_value
+
+    ref, ref_path = side(REF_TEXT_FIELD, REF_PATH_FIELD)
+    hyp, hyp_path = side(HYP_TEXT_FIELD, HYP_PATH_FIELD)
+    utt_id = next((str(values[k]) for k in ID_FIELDS if values.get(k) not in (None, '')), None)
+    return PairRecord(
+        line=line,
+        utt_id=utt_id,
+        ref=ref,
+        hyp=hyp,
+        ref_path=ref_path,
+        hyp_path=hyp_path,
+        metadata={k: v for k, v in values.items() if k not in RESERVED_FIELDS},
+    )
+
+
+def _raise_field_size_limit():
+    """取消csv模块默认的单字段131072字符上限（清单中可以直接写入很长的文本）"""
+    limit = sys.maxsize
+    while True:
+        try:
+            csv.field_size_limit(limit)
+            return
+        except OverflowError:
+            # 部分平台上字段上限为C long
+            limit //= 2
+
+
+def _iter_tsv(path: str, f, base_dir: str) -> Iterator[PairRecord]:
+    """逐行读取TSV清单"""
+    _raise_field_size_limit()
+    reader = csv.reader(f, delimiter='\t', quoting=csv.QUOTE_NONE)
+    rows = iter(reader)
+    header = None
+    while True:
+        try:
+            row = next(rows)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            raise ManifestError(path, reader.line_num, f"TSV解析失败: {e}")
+        if header is None:
+            header = [name.strip() for name in row]
+            continue
+        line = reader.line_num
+        if not row or len(row) == 1 and not row[0].strip():
+            continue
+        if len(row) != len(header):
+            raise ManifestError(path, line, f"列数为{len(row)}，与表头的{len(header)}列不一致")
+        yield _make_record(dict(zip(header, row)), line, path, base_dir)
+
+
+def _iter_jsonl(path: str, f, base_dir: str) -> Iterator[PairRecord]:
+    """逐行读取JSONL清单"""
+    for line, text in enumerate(f, 1):
+        if not text.strip():
+            continue
+        try:
+            values = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ManifestError(path, line, f"JSON解析失败: {e.msg}")
+        if not isinstance(values, dict):
+            raise ManifestError(path, line, "每行必须是一个JSON对象")
+        yield _make_record(values, line, path, base_dir)
+
+
+def iter_manifest(path: str, manifest_format: Optional[str] = None) -> Iterator[PairRecord]:
+    """
+    逐条读取清单记录
+
+    Args:
+        path (str): 清单路径，"-"表示标准输入
+        manifest_format (str): "tsv"或"jsonl"，None时按扩展名判断（.jsonl/.json为JSONL，其余为TSV）
+
+    Yields:
+        PairRecord: 清单记录
+
+    Raises:
+        ManifestError: 清单格式错误时抛出
+    """
+    if manifest_format is None:
+        manifest_format = 'jsonl' if path.lower().endswith(('.jsonl', '.json')) else 'tsv'
+    if manifest_format not in ('tsv', 'jsonl'):
+        raise ValueError(f"不支持的清单格式: {manifest_format}")
+    parse = _iter_jsonl if manifest_format == 'jsonl' else _iter_tsv
+
+    if path == '-':
+        yield from parse('<stdin>', sys.stdin, os.getcwd())
+        return
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        yield from parse(path, f, base_dir)
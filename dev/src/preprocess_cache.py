@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预处理结果缓存
+以(文本, 是否过滤语气词, 评估模式, 分词器名称和配置, 标准化配置)的哈希为键缓存预处理结果，
+同一份参考文本与多家ASR结果对比时只需分词和词性标注一次。
+内存层按总字节数做LRU淘汰，可选的SQLite磁盘层让多次CLI运行之间也能复用，
+磁盘层按最近使用时间和条数用prune清理
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+# 内存层默认容量（字节）
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def make_cache_key(text: str, filter_fillers: bool, evaluation_mode: str,
+                   tokenizer_name: Optional[str], tokenizer_config: Any,
+                   normalization: Dict[str, Any], stage: str = 'preprocess') -> str:
+    """
+    计算预处理缓存键
+
+    Args:
+        text (str): 原始文本
+        filter_fillers (bool): 是否过滤语气词
+        evaluation_mode (str): 评估模式
+        tokenizer_name (str): 分词器名称，预处理不经过分词器时为None
+        tokenizer_config: 影响分词结果的配置（分词器的cache_config()，含版本和自定义词典等）
+        normalization (dict): 标准化配置
+        stage (str): 缓存的处理阶段（preprocess为预处理结果，characters为分词定位后的字符序列）
+
+    Returns:
+        str: SHA-256十六进制摘要
+    """
+    payload = json.dumps(
+        [stage, filter_fillers, evaluation_mode, tokenizer_name, tokenizer_config,
+         sorted(normalization.items())],
+        ensure_ascii=False, default=str
+    )
+    digest = hashlib.sha256(payload.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(text.encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+
+class PreprocessCache:
+    """
+    预处理结果缓存
+    内存层为按字节预算淘汰的LRU，可选挂载SQLite磁盘层（记录最近使用时间，可用prune清理）；
+    线程安全，可在多个ASRMetrics实例间共享
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, disk_path: Optional[str] = None):
+        """
+        初始化缓存
+
+        Args:
+            max_bytes (int): 内存层容量上限（按键和值对象占用的字节数计）
+            disk_path (str): 磁盘层SQLite文件路径，None表示只使用内存层
+        """
+        if max_bytes < 0:
+            raise ValueError(f"缓存容量不能为负数: {max_bytes}")
+
+        self.max_bytes = max_bytes
+        self.disk_path = disk_path
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+        self._db = None
+        if disk_path:
+            directory = os.path.dirname(os.path.abspath(disk_path))
+            os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False, isolation_level=None)
+            # 缓存内容丢失只会导致重新计算，不需要每次写入都同步落盘
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=OFF")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS preprocess_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "last_used REAL NOT NULL DEFAULT 0)"
+            )
+            # 旧版本创建的缓存文件没有last_used列，补上后旧条目按最久未使用处理
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(preprocess_cache)")}
+            if 'last_used' not in columns:
+                self._db.execute("ALTER TABLE preprocess_cache ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS preprocess_cache_last_used ON preprocess_cache (last_used)"
+            )
+
+    @staticmethod
+    def _entry_size(key: str, value: str) -> int:
+        """单个缓存项占用的字节数"""
+        return sys.getsizeof(key) + sys.getsizeof(value)
+
+    def _store(self, key: str, value: str):
+        """写入内存层并按字节预算淘汰最久未使用的项（调用方持有锁）"""
+        size = self._entry_size(key, value)
+        if size > self.max_bytes:
+            return
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= self._entry_size(key, old)
+
+        self._entries[key] = value
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            old_key, old_value = self._entries.popitem(last=False)
+            self._bytes -= self._entry_size(old_key, old_value)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        查询缓存
+
+        Args:
+            key (str): 缓存键
+
+        Returns:
+            Optional[str]: 缓存的预处理结果，未命中时为None
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value FROM preprocess_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE preprocess_cache SET last_used = ? WHERE key = ?", (time.time(), key)
+                    )
+                    self._store(key, row[0])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: str):
+        """
+        写入缓存（同时写入磁盘层）
+
+        Args:
+            key (str): 缓存键
+            value (str): 预处理结果
+        """
+        with self._lock:
+            self._store(key, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO preprocess_cache (key, value, last_used) VALUES (?, ?, ?)",
+                    (key, value, time.time())
+                )
+
+    def prune(self, max_age_days: Optional[float] = None, max_entries: Optional[int] = None) -> int:
+        """
+        清理磁盘层（内存层本身有字节预算，不受影响）
+
+        Args:
+            max_age_days (float): 删除超过该天数未使用的条目
+            max_entries (int): 只保留最近使用的max_entries条
+
+        Returns:
+            int: 删除的条数
+        """
+        removed = 0
+        with self._lock:
+            if self._db is None:
+                return 0
+            if max_age_days is not None:
+                cutoff = time.time() - max_age_days * 86400
+                removed += self._db.execute(
+                    "DELETE FROM preprocess_cache WHERE last_used < ?", (cutoff,)
+                ).rowcount
+            if max_entries is not None:
+                removed += self._db.execute(
+                    "DELETE FROM preprocess_cache WHERE key NOT IN "
+                    "(SELECT key FROM preprocess_cache ORDER BY last_used DESC LIMIT ?)",
+                    (max(max_entries, 0),)
+                ).rowcount
+            if removed:
+                self._db.execute("VACUUM")
+        return removed
+
+    def disk_entries(self) -> int:
+        """磁盘层的条目数（没有磁盘层时为0）"""
+        with self._lock:
+            if self._db is None:
+                return 0
+            return self._db.execute("SELECT COUNT(*) FROM preprocess_cache").fetchone()[0]
+
+    def clear(self, disk: bool = False):
+        """
+        清空缓存
+
+        Args:
+            disk (bool): 是否同时清空磁盘层
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if disk and self._db is not None:
+                self._db.execute("DELETE FROM preprocess_cache")
+
+    def close(self):
+        """关闭磁盘层连接"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计信息
+
+        Returns:
+            dict: 命中/未命中次数、淘汰次数、当前条目数和占用字节数等
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk_hits': self.disk_hits,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'disk_path': self.disk_path,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return (f"PreprocessCache(entries={len(self._entries)}, bytes={self._bytes}, "
+                f"max_bytes={self.max_bytes}, disk_path={self.disk_path!r})")
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+持久化评估结果库
+以(参考文本摘要, 识别文本摘要, 分词器名称和版本, 是否过滤语气词, 评估/对齐配置, 标准化配置)的哈希为键，
+把evaluate_pair的结果保存在SQLite中。更换ASR模型版本后重新评估时，内容未变的文本对直接复用结果，
+只计算发生变化的文本对。多个进程可以同时使用同一个结果库
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+# 图形界面默认使用的结果库路径
+DEFAULT_RESULT_STORE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'cer-matchingtools', 'results.db')
+
+
+def text_digest(text: str) -> str:
+    """文本内容的SHA-256十六进制摘要"""
+    return hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+def make_result_key(reference: str, hypothesis: str, config: Dict[str, Any]) -> str:
+    """
+    计算结果库的键
+
+    Args:
+        reference (str): 参考文本
+        hypothesis (str): 识别文本
+        config (dict): 影响结果的配置（分词器、语气词过滤、评估和对齐模式、标准化配置等）
+
+    Returns:
+        str: SHA-256十六进制摘要
+    """
+    payload = json.dumps([text_digest(reference), text_digest(hypothesis), sorted(config.items())],
+                         ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResultStore:
+    """
+    SQLite评估结果库
+    每条记录保存结果JSON、写入时间和最近使用时间；线程安全，可在多个ASRMetrics实例间共享
+    """
+
+    def __init__(self, path: str):
+        """
+        打开（必要时创建）结果库
+
+        Args:
+            path (str): SQLite文件路径
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        # 结果丢失只会导致重新计算，不需要每次写入都同步落盘
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        查询结果，命中时更新最近使用时间
+
+        Args:
+            key (str): 结果键
+
+        Returns:
+            Optional[dict]: 保存的结果，未命中时为None
+        """
+        with self._lock:
+            row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, value: Dict[str, Any]):
+        """
+        保存结果
+
+        Args:
+            key (str): 结果键
+            value (dict): 可JSON序列化的结果
+        """
+        now = time.time()
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now)
+            )
+            self.writes += 1
+
+    def prune(self, max_age_days: Optional[float] = None, max_entries: Optional[int] = None) -> int:
+        """
+        清理结果库
+
+        Args:
+            max_age_days (float): 删除超过该天数未使用的结果
+            max_entries (int): 只保留最近使用的max_entries条结果
+
+        Returns:
+            int: 删除的条数
+        """
+        removed = 0
+        with self._lock:
+            if max_age_days is not None:
+                cutoff = time.time() - max_age_days * 86400
+                removed += self._db.execute("DELETE FROM results WHERE last_used < ?", (cutoff,)).rowcount
+            if max_entries is not None:
+                removed += self._db.execute(
+                    "DELETE FROM results WHERE key NOT IN "
+                    "(SELECT key FROM results ORDER BY last_used DESC LIMIT ?)", (max(max_entries, 0),)
+                ).rowcount
+            if removed:
+                self._db.execute("VACUUM")
+        return removed
+
+    def clear(self):
+        """删除全部结果"""
+        with self._lock:
+            self._db.execute("DELETE FROM results")
+
+    def close(self):
+        """关闭连接"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def run_stats(self, since: float) -> Dict[str, Any]:
+        """
+        按时间统计一次运行的命中情况（包含其他进程的访问，并行评估时各工作进程各自打开结果库）
+
+        Args:
+            since (float): 运行开始的时间戳（time.time()）
+
+        Returns:
+            dict: 复用的结果数、新写入的结果数和结果库总条数
+        """
+        with self._lock:
+            reused, created, entries = self._db.execute(
+                "SELECT COALESCE(SUM(created < ? AND last_used >= ?), 0), "
+                "COALESCE(SUM(created >= ?), 0), COUNT(*) FROM results", (since, since, since)
+            ).fetchone()
+        return {'reused': reused, 'computed': created, 'entries': entries, 'path': self.path}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取本进程的访问统计
+
+        Returns:
+            dict: 命中/未命中/写入次数、命中率和结果库总条数
+        """
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'writes': self.writes,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': entries,
+                'path': self.path,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def __repr__(self) -> str:
+        return f"ResultStore(path={self.path!r}, hits={self.hits}, misses={self.misses})"
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量结果写入与断点续跑
+每条结果计算完成后立即追加到输出文件（CSV或JSONL），定期flush并fsync，
+同时在旁路检查点文件（输出路径加.ckpt）中记录已完成的键。检查点按批提交：
+先把输出文件落盘，再写入这一批的键和输出文件当时的字节长度。续跑时输出文件截断到
+最后一次提交的长度，已提交的键全部跳过，崩溃时未提交的结果会重新计算，不会重复或丢失
+"""
+
+import csv
+import io
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, Set
+
+
+# 默认每写入多少条结果提交一次检查点
+DEFAULT_FLUSH_EVERY = 100
+
+# 默认距上次提交超过多少秒时提交一次检查点
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+# 检查点文件的后缀
+CHECKPOINT_SUFFIX = '.ckpt'
+
+
+class CheckpointError(ValueError):
+    """续跑时找不到可用的检查点，继续写入会覆盖已有的输出文件"""
+    pass
+
+
+def checkpoint_path(output_file: str) -> str:
+    """输出文件对应的检查点文件路径"""
+    return output_file + CHECKPOINT_SUFFIX
+
+
+def _read_checkpoint(path: str):
+    """
+    读取检查点文件，只保留已提交的键
+
+    Returns:
+        tuple: (已提交的键集合, 最后一次提交时输出文件的字节长度)
+    """
+    completed: Set[str] = set()
+    pending: List[str] = []
+    offset = 0
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.endswith('\n'):
+                # 写入中断的最后一行
+                break
+            if line.startswith('#'):
+                completed.update(pending)
+                pending = []
+                offset = int(line[1:])
+            else:
+                pending.append(json.loads(line))
+    return completed, offset
+
+
+def result_row(result: Dict[str, Any], fieldnames: List[str]) -> Dict[str, Any]:
+    """
+    结果字典转换为CSV行（元数据序列化为JSON）
+
+    Args:
+        result (dict): 计算结果
+        fieldnames (List[str]): 列名列表
+
+    Returns:
+        dict: CSV行
+    """
+    row = {field: result.get(field, '') for field in fieldnames}
+    if 'metadata' in row:
+        row['metadata'] = json.dumps(result.get('metadata') or {}, ensure_ascii=False)
+    if 'utt_id' in row and row['utt_id'] is None:
+        row['utt_id'] = ''
+    return row
+
+
+class ResultWriter:
+    """
+    结果的增量写入器
+    输出格式按扩展名决定：.jsonl为每行一个JSON对象，其余为CSV（元数据列序列化为JSON）
+    """
+
+    def __init__(self, output_file: str, fieldnames: List[str], resume: bool = False,
+                 flush_every: int = DEFAULT_FLUSH_EVERY,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 fsync: bool = True):
+        """
+        打开输出文件
+
+        Args:
+            output_file (str): 输出文件路径
+            fieldnames (List[str]): 输出的字段
+            resume (bool): 是否从已有的检查点续跑（输出文件不存在或为空时从头开始）
+            flush_every (int): 每写入多少条结果提交一次检查点
+            flush_interval (float): 距上次提交超过多少秒时提交一次检查点
+            fsync (bool): 提交时是否调用fsync确保落盘
+            
+        Raises:
+            CheckpointError: resume时输出文件已有内容但检查点缺失或与输出文件不一致（不覆盖已有结果）
+        """
+        self.output_file = output_file
+        self.checkpoint_file = checkpoint_path(output_file)
+        self.fieldnames = list(fieldnames)
+        self.jsonl = output_file.lower().endswith('.jsonl')
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+
+        # 续跑前已提交的键（只读，本次运行新提交的键不再加入，内存占用与本次写入条数无关）
+        # 和本批待提交的键
+        self.completed: Set[str] = set()
+        self._pending: List[str] = []
+        self._last_commit = time.monotonic()
+        self.written = 0
+        self.committed = 0
+
+        offset = 0
+        if resume and os.path.exists(output_file) and os.path.getsize(output_file) > 0:
+            if not os.path.exists(self.checkpoint_file):
+                raise CheckpointError(f"找不到检查点文件{self.checkpoint_file}，"
+                                      f"续跑会覆盖已有的输出文件{output_file}；如需重新计算请先删除或移走该文件")
+            self.completed, offset = _read_checkpoint(self.checkpoint_file)
+            if offset > os.path.getsize(output_file):
+                raise CheckpointError(f"输出文件{output_file}比检查点记录的短，无法续跑；"
+                                      f"如需重新计算请先删除或移走该文件")
+        self.resumed = offset > 0
+
+        self._output = open(output_file, 'r+b' if self.resumed else 'wb')
+        self._output.truncate(offset)
+        self._output.seek(offset)
+        self._checkpoint = open(self.checkpoint_file, 'a' if self.resumed else 'w', encoding='utf-8')
+
+        self._buffer = io.StringIO()
+        self._csv = None
+        if not self.jsonl:
+            self._csv = csv.DictWriter(self._buffer, fieldnames=self.fieldnames, extrasaction='ignore')
+            if not self.resumed:
+                self._csv.writeheader()
+                self._output.write(self._buffer.getvalue().encode('utf-8'))
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+    def is_completed(self, key: str) -> bool:
+        """键对应的结果是否已在续跑前的运行中提交"""
+        return key in self.completed
+
+    def _format(self, result: Dict[str, Any]) -> str:
+        """把一条结果格式化为输出文件中的一行"""
+        if self.jsonl:
+            row = {field: result.get(field, '') for field in self.fieldnames}
+            return json.dumps(row, ensure_ascii=False) + '\n'
+        self._csv.writerow(result_row(result, self.fieldnames))
+        line = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return line
+
+    def write(self, key: str, result: Dict[str, Any]):
+        """
+        追加一条结果，达到条数或时间间隔时提交检查点
+
+        Args:
+            key (str): 结果的键（续跑时据此跳过）
+            result (dict): 计算结果
+        """
+        self._output.write(self._format(result).encode('utf-8'))
+        self._pending.append(key)
+        self.written += 1
+        if (len(self._pending) >= self.flush_every
+                or time.monotonic() - self._last_commit >= self.flush_interval):
+            self.commit()
+
+    def commit(self):
+        """把已写入的结果落盘，再在检查点中提交这一批的键"""
+        self._output.flush()
+        if self.fsync:
+            os.fsync(self._output.fileno())
+        offset = self._output.tell()
+        for key in self._pending:
+            self._checkpoint.write(json.dumps(key, ensure_ascii=False) + '\n')
+        self._checkpoint.write(f"#{offset}\n")
+        self._checkpoint.flush()
+        if self.fsync:
+            os.fsync(self._checkpoint.fileno())
+        self.committed += len(self._pending)
+        self._pending = []
+        self._last_commit = time.monotonic()
+
+    def iter_existing(self) -> Iterator[Dict[str, Any]]:
+        """
+        读取续跑前已提交的结果（用于重新计算汇总统计），逐条产出
+        须在写入新结果之前调用
+
+        Yields:
+            dict: 结果（CSV中的数值字段仍为字符串）
+        """
+        if not self.resumed:
+            return
+        self._output.flush()
+        with open(self.output_file, 'r', encoding='utf-8', newline='') as f:
+            if self.jsonl:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+            else:
+                yield from csv.DictReader(f)
+
+    def close(self):
+        """提交剩余结果并关闭文件"""
+        if self._output.closed:
+            return
+        self.commit()
+        self._output.close()
+        self._checkpoint.close()
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self) -> str:
+        return (f"ResultWriter(output={self.output_file!r}, written={self.written}, "
+                f"committed={self.committed}, resumed_from={len(self.completed)})")
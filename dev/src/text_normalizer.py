@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+融合式文本标准化器
+把ASRMetrics预处理中的多次整串遍历（合并空格、去首尾空白、移除标点、转小写、
+移除非单词字符、NFKC全半角统一、数字归一、移除空白）合并为一次str.translate：
+每种配置只编译一次BMP字符的转换表，逐字符结果与上下文无关时走单遍快速路径，
+包含组合字符、韩文字母、希腊大写Sigma或BMP以外字符的少数文本回退到逐步处理的慢速路径
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# 空白合并（与jiwer.RemoveMultipleSpaces一致）
+_MULTIPLE_SPACES = re.compile(r"\s\s+")
+# 非单词、非空白字符
+_NON_WORD = re.compile(r"[^\w\s]")
+# 数字串（不做全半角统一时全角数字保持原样，也一并匹配）
+_DIGIT_RUN = re.compile(r"[0-9０-９]+")
+_WHITESPACE = re.compile(r"\s+")
+
+# 韩文字母的元音和收音：会与前一个字符按算法合成音节，不在Unicode分解数据中
+_HANGUL_JAMO_V = range(0x1161, 0x1176)
+_HANGUL_JAMO_T = range(0x11A8, 0x11C3)
+
+# 大写Sigma转小写时取决于是否位于词尾（Final_Sigma规则）
+_CONTEXT_LOWER = {'Σ'}
+
+_BMP_SIZE = 0x10000
+
+
+def _is_punctuation(char: str) -> bool:
+    """Unicode类别以P开头的字符视为标点（与jiwer.RemovePunctuation一致）"""
+    return unicodedata.category(char).startswith('P')
+
+
+@lru_cache(maxsize=1)
+def _composing_characters() -> frozenset:
+    """
+    可能与前一个字符发生组合的字符集合：规范分解中位于第二位的字符、
+    组合标记以及韩文字母元音/收音。这些字符的标准化结果依赖上下文
+    """
+    # 组合的一方是BMP以外字符时文本本身就会走慢速路径，只需扫描BMP
+    chars = set()
+    for code in range(_BMP_SIZE):
+        char = chr(code)
+        if unicodedata.combining(char):
+            chars.add(char)
+        decomposition = unicodedata.decomposition(char)
+        if decomposition and not decomposition.startswith('<'):
+            parts = decomposition.split()
+            if len(parts) == 2:
+                chars.add(chr(int(parts[1], 16)))
+    chars.update(chr(code) for code in _HANGUL_JAMO_V)
+    chars.update(chr(code) for code in _HANGUL_JAMO_T)
+    return frozenset(chars)
+
+
+def _as_table(mapping: Dict[int, Optional[str]]) -> List[Optional[str]]:
+    """
+    把码点映射展开为覆盖整个BMP的列表，未映射的字符映射为自身
+    （str.translate按下标查表比查字典快约一倍）
+    """
+    table = [chr(code) for code in range(_BMP_SIZE)]
+    for code, value in mapping.items():
+        table[code] = value
+    return table
+
+
+def _char_class(chars) -> str:
+    """把字符集合压缩为正则字符类（按连续区间合并）"""
+    codes = sorted(ord(c) for c in chars)
+    parts = []
+    start = prev = None
+    for code in codes:
+        if start is None:
+            start = prev = code
+        elif code == prev + 1:
+            prev = code
+        else:
+            parts.append((start, prev))
+            start = prev = code
+    if start is not None:
+        parts.append((start, prev))
+    return ''.join(
+        re.escape(chr(a)) if a == b else f"{re.escape(chr(a))}-{re.escape(chr(b))}"
+        for a, b in parts
+    )
+
+
+class TextNormalizer:
+    """
+    编译后的文本标准化器
+    同一配置的实例应通过get_normalizer()获取并复用，转换表只在首次使用时构建一次
+
+    提供三个入口，结果分别与原有实现逐字符一致：
+    - clean(): jiwer.Compose([RemoveMultipleSpaces, Strip, RemovePunctuation, ToLowerCase])
+    - normalize(): ASRMetrics.normalize_chinese_text
+    - __call__(): 先clean再normalize（中间没有分词或语气词过滤时使用）
+    """
+
+    def __init__(self, normalize_width: bool = True,
+                 normalize_numbers: bool = False,
+                 remove_punctuation: bool = True):
+        """
+        初始化标准化器
+
+        Args:
+            normalize_width (bool): 是否统一全/半角字符（Unicode NFKC）
+            normalize_numbers (bool): 是否将数字串归一为'0'
+            remove_punctuation (bool): 是否移除非单词字符
+        """
+        self.normalize_width = normalize_width
+        self.normalize_numbers = normalize_numbers
+        self.remove_punctuation = remove_punctuation
+
+        # 各入口的(转换表, 慢速路径检测正则)，首次使用时编译
+        self._compiled: Dict[str, Tuple[List[Optional[str]], Any]] = {}
+
+    @property
+    def config(self) -> Dict[str, bool]:
+        """标准化配置"""
+        return {
+            'normalize_width': self.normalize_width,
+            'normalize_numbers': self.normalize_numbers,
+            'remove_punctuation': self.remove_punctuation,
+        }
+
+    def _normalize_piece(self, text: str) -> str:
+        """
+        逐步执行normalize_chinese_text除数字归一和空白移除之外的步骤；
+        数字归一时空白统一保留为一个空格，作为数字串之间的分隔
+        """
+        if self.remove_punctuation:
+            text = _NON_WORD.sub('', text)
+        if self.normalize_width:
+            text = unicodedata.normalize('NFKC', text)
+        return _WHITESPACE.sub(' ' if self.normalize_numbers else '', text)
+
+    def _clean_piece(self, char: str) -> str:
+        """单个字符的clean结果：空白在翻译前已合并，标点删除，其余转小写"""
+        if char.isspace():
+            return char
+        if _is_punctuation(char):
+            return ''
+        return char.lower()
+
+    def _compile(self, kind: str):
+        """
+        构建指定入口的BMP转换表和慢速路径检测正则
+
+        Args:
+            kind (str): "clean"、"normalize"或"fused"
+
+        Returns:
+            tuple: (转换表, 慢速路径检测正则)
+        """
+        composing = _composing_characters() if kind != 'clean' else frozenset()
+        mapping = {}
+        unsafe = set(_CONTEXT_LOWER) if kind != 'normalize' else set()
+
+        for code in range(_BMP_SIZE):
+            if 0xD800 <= code <= 0xDFFF:
+                continue
+            char = chr(code)
+            if char in unsafe:
+                continue
+
+            if kind == 'clean':
+                result = self._clean_piece(char)
+                pieces = result
+            elif kind == 'normalize':
+                result = pieces = self._normalize_piece(char)
+            else:
+                cleaned = self._clean_piece(char)
+                result = self._normalize_piece(cleaned)
+                pieces = cleaned + result
+
+            # 结果包含可组合字符时依赖上下文，交给慢速路径
+            if char in composing or any(c in composing for c in pieces):
+                unsafe.add(char)
+            elif result != char:
+                mapping[code] = result or None
+
+        # BMP以外的字符数量极少，统一走慢速路径
+        slow = re.compile(f"[{_char_class(unsafe)}\U00010000-\U0010ffff]")
+        return _as_table(mapping), slow
+
+    def _tables(self, kind: str):
+        """获取指定入口的转换表，首次使用时编译"""
+        compiled = self._compiled.get(kind)
+        if compiled is None:
+            compiled = self._compiled[kind] = self._compile(kind)
+        return compiled
+
+    def _finish(self, text: str) -> str:
+        """数字归一：合并数字串后再去掉作为分隔保留的空格"""
+        if self.normalize_numbers:
+            text = _DIGIT_RUN.sub('0', text).replace(' ', '')
+        return text
+
+    def clean_slow(self, text: str) -> str:
+        """clean的逐步实现（慢速路径，同时作为对照基准）"""
+        text = _MULTIPLE_SPACES.sub(' ', text).strip()
+        text = ''.join(c for c in text if not _is_punctuation(c))
+        return text.lower()
+
+    def normalize_slow(self, text: str) -> str:
+        """normalize的逐步实现（慢速路径，同时作为对照基准）"""
+        if self.remove_punctuation:
+            text = _NON_WORD.sub('', text)
+        if self.normalize_width:
+            text = unicodedata.normalize('NFKC', text)
+        if self.normalize_numbers:
+            text = _DIGIT_RUN.sub('0', text)
+        return _WHITESPACE.sub('', text)
+
+    def clean(self, text: str) -> str:
+        """
+        基础清洗：合并多余空格、去首尾空白、移除标点、转小写
+
+        Args:
+            text (str): 输入文本
+
+        Returns:
+            str: 清洗后的文本
+        """
+        table, slow = self._tables('clean')
+        if slow.search(text):
+            return self.clean_slow(text)
+        return _MULTIPLE_SPACES.sub(' ', text).strip().translate(table)
+
+    def normalize(self, text: str) -> str:
+        """
+        中文标准化：移除非单词字符、统一全半角、可选数字归一、移除空白
+
+        Args:
+            text (str): 输入文本
+
+        Returns:
+            str: 标准化后的文本
+        """
+        table, slow = self._tables('normalize')
+        if slow.search(text):
+            return self.normalize_slow(text)
+        return self._finish(text.translate(table))
+
+    def __call__(self, text: str) -> str:
+        """
+        一次完成clean和normalize
+
+        Args:
+            text (str): 输入文本
+
+        Returns:
+            str: 标准化后的文本
+        """
+        table, slow = self._tables('fused')
+        if slow.search(text):
+            return self.normalize_slow(self.clean_slow(text))
+        # normalize会移除全部空白，clean阶段的空格合并和去首尾空白无需执行
+        return self._finish(text.translate(table))
+
+    def __repr__(self) -> str:
+        options = ', '.join(f"{k}={v}" for k, v in self.config.items())
+        return f"TextNormalizer({options})"
+
+
+def get_normalizer(normalize_width: bool = True,
+                   normalize_numbers: bool = False,
+                   remove_punctuation: bool = True) -> TextNormalizer:
+    """
+    获取指定配置的标准化器（每种配置只创建一次）
+
+    Args:
+        normalize_width (bool): 是否统一全/半角字符
+        normalize_numbers (bool): 是否将数字串归一为'0'
+        remove_punctuation (bool): 是否移除非单词字符
+
+    Returns:
+        TextNormalizer: 标准化器实例
+    """
+    return _cached_normalizer(bool(normalize_width), bool(normalize_numbers), bool(remove_punctuation))
+
+
+@lru_cache(maxsize=None)
+def _cached_normalizer(normalize_width: bool, normalize_numbers: bool,
+                       remove_punctuation: bool) -> TextNormalizer:
+    """按位置参数缓存标准化器，保证关键字和位置两种调用方式命中同一实例"""
+    return TextNormalizer(normalize_width, normalize_numbers, remove_punctuation)
@@ -13,10 +13,11 @@ from .tokenizers.base import (
     TokenizerProcessError
 )
 
-# 导入具体分词器实现
-from .tokenizers.jieba_tokenizer import JiebaTokenizer
-from .tokenizers.thulac_tokenizer import ThulacTokenizer
-from .tokenizers.hanlp_tokenizer import HanlpTokenizer
+# 导入分词结果缓存
+from .tokenizers.result_cache import TokenizerResultCache, cached_result, cached_batch
+
+# 导入紧凑的分词位置表示
+from .tokenizers.spans import TokenSpans, CharacterPositions
 
 # 导入工厂类
 from .tokenizers.factory import TokenizerFactory
@@ -26,9 +27,43 @@ from .tokenizers.factory import (
     get_available_tokenizers, 
     get_tokenizer, 
     get_tokenizer_info,
-    get_cached_tokenizer_info
+    get_cached_tokenizer_info,
+    probe_tokenizer
 )
 
+# 具体分词器实现按需导入（导入jieba等依赖包本身就需要数百毫秒），
+# 保留 from text_tokenizers import JiebaTokenizer 的写法
+_LAZY_TOKENIZER_CLASSES = {
+    'JiebaTokenizer': 'jieba',
+    'ThulacTokenizer': 'thulac',
+    'HanlpTokenizer': 'hanlp',
+}
+
+# 共享分词服务同样按需导入（multiprocessing.managers的导入开销不小，且只在使用服务时需要）
+_LAZY_SERVICE_ATTRIBUTES = (
+    'RemoteTokenizer',
+    'TokenizerService',
+    'start_tokenizer_service',
+    'use_tokenizer_service',
+)
+
+
+def __getattr__(name):
+    if name in _LAZY_TOKENIZER_CLASSES:
+        tokenizer_class = TokenizerFactory.get_tokenizer_class(_LAZY_TOKENIZER_CLASSES[name])
+        globals()[name] = tokenizer_class
+        return tokenizer_class
+    if name in _LAZY_SERVICE_ATTRIBUTES:
+        from .tokenizers import service
+        value = globals()[name] = getattr(service, name)
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_TOKENIZER_CLASSES) | set(_LAZY_SERVICE_ATTRIBUTES))
+
+
 # 导出模块
 __all__ = [
     'BaseTokenizer',
@@ -38,9 +73,19 @@ __all__ = [
     'JiebaTokenizer',
     'ThulacTokenizer', 
     'HanlpTokenizer',
+    'TokenizerResultCache',
+    'cached_result',
+    'cached_batch',
+    'TokenSpans',
+    'CharacterPositions',
     'TokenizerFactory',
     'get_available_tokenizers',
     'get_tokenizer',
     'get_tokenizer_info',
-    'get_cached_tokenizer_info'
+    'get_cached_tokenizer_info',
+    'probe_tokenizer',
+    'RemoteTokenizer',
+    'TokenizerService',
+    'start_tokenizer_service',
+    'use_tokenizer_service'
 ] 
\ No newline at end of file
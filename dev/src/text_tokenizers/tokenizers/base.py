@@ -4,7 +4,9 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Sequence, Optional
+from .result_cache import TokenizerResultCache, DEFAULT_RESULT_CACHE_SIZE
+from .spans import TokenSpans
 
 
 class TokenizerError(Exception):
@@ -28,10 +30,22 @@ class BaseTokenizer(ABC):
     定义所有分词器必须实现的接口
     """
     
+    # 依赖包的导入名，工厂据此用importlib.util.find_spec判断是否已安装（不导入、不加载模型）
+    package: Optional[str] = None
+    # 依赖包的发行包名，用于从包元数据读取版本号（默认与导入名相同）
+    distribution: Optional[str] = None
+    # 分词器描述
+    description: str = ''
+    # 多线程使用策略："shared"表示实例可被多个线程同时调用，工厂只创建一个共享实例；
+    # "per_thread"表示实例不是线程安全的，工厂为每个线程分别创建实例
+    thread_policy: str = 'shared'
+    
     def __init__(self):
         self.name = self.__class__.__name__.replace('Tokenizer', '').lower()
         self.is_initialized = False
         self.version = "unknown"
+        # 分词结果缓存，默认关闭（由enable_result_cache开启）
+        self.result_cache: Optional[TokenizerResultCache] = None
     
     @abstractmethod
     def initialize(self) -> bool:
@@ -94,6 +108,71 @@ class BaseTokenizer(ABC):
         """
         pass
     
+    def cut_batch(self, texts: Sequence[str]) -> List[List[str]]:
+        """
+        批量分词，结果顺序与输入一致
+        默认逐条调用cut，支持批量推理的分词器应重写此方法
+        
+        Args:
+            texts (Sequence[str]): 待分词的文本列表
+            
+        Returns:
+            List[List[str]]: 每条文本的分词结果列表
+            
+        Raises:
+            TokenizerProcessError: 分词处理失败时抛出
+        """
+        return [self.cut(text) for text in texts]
+    
+    def posseg_batch(self, texts: Sequence[str]) -> List[List[Tuple[str, str]]]:
+        """
+        批量词性标注，结果顺序与输入一致
+        默认逐条调用posseg，支持批量推理的分词器应重写此方法
+        
+        Args:
+            texts (Sequence[str]): 待标注的文本列表
+            
+        Returns:
+            List[List[Tuple[str, str]]]: 每条文本的(词语, 词性)元组列表
+            
+        Raises:
+            TokenizerProcessError: 词性标注失败时抛出
+        """
+        return [self.posseg(text) for text in texts]
+    
+    def tokenize_batch(self, texts: Sequence[str]) -> List[List[Tuple[str, int, int]]]:
+        """
+        批量精确分词，结果顺序与输入一致
+        默认逐条调用tokenize，支持批量推理的分词器应重写此方法
+        
+        Args:
+            texts (Sequence[str]): 待分词的文本列表
+            
+        Returns:
+            List[List[Tuple[str, int, int]]]: 每条文本的(词语, 开始位置, 结束位置)元组列表
+            
+        Raises:
+            TokenizerProcessError: 分词处理失败时抛出
+        """
+        return [self.tokenize(text) for text in texts]
+    
+    def tokenize_spans(self, text: str) -> TokenSpans:
+        """
+        精确分词，返回紧凑的位置表示（开始/结束位置数组和词语起点位图）
+        按序列使用时与tokenize()的结果一致，位置相对于去除首尾空白后的文本
+        默认由tokenize()的结果转换，能逐个产出词语的分词器可重写此方法以省去中间的元组列表
+        
+        Args:
+            text (str): 待分词的文本
+            
+        Returns:
+            TokenSpans: 紧凑的分词结果
+            
+        Raises:
+            TokenizerProcessError: 分词处理失败时抛出
+        """
+        return TokenSpans.from_tokens(self.validate_text(text), self.tokenize(text))
+    
     def validate_text(self, text: str) -> str:
         """
         验证和预处理输入文本
@@ -122,6 +201,34 @@ class BaseTokenizer(ABC):
         
         return cleaned_text
     
+    def cache_config(self) -> tuple:
+        """
+        影响分词结果的配置，作为结果缓存键的一部分
+        子类有其他影响输出的配置项时应重写此方法
+        
+        Returns:
+            tuple: 配置元组
+        """
+        return (self.name, self.version)
+    
+    def enable_result_cache(self, maxsize: int = DEFAULT_RESULT_CACHE_SIZE) -> TokenizerResultCache:
+        """
+        开启分词结果缓存（只对用cached_result/cached_batch装饰的方法生效）
+        
+        Args:
+            maxsize (int): 每个方法最多缓存的结果条数
+            
+        Returns:
+            TokenizerResultCache: 缓存实例
+        """
+        if self.result_cache is None or self.result_cache.maxsize != maxsize:
+            self.result_cache = TokenizerResultCache(maxsize)
+        return self.result_cache
+    
+    def disable_result_cache(self):
+        """关闭并丢弃分词结果缓存"""
+        self.result_cache = None
+    
     def get_info(self) -> Dict[str, Any]:
         """
         获取分词器信息
@@ -129,12 +236,15 @@ class BaseTokenizer(ABC):
         Returns:
             Dict[str, Any]: 包含分词器信息的字典
         """
-        return {
+        info = {
             'name': self.name,
             'initialized': self.is_initialized,
             'version': self.version,
             'class_name': self.__class__.__name__
         }
+        if self.result_cache is not None:
+            info['result_cache'] = self.result_cache.get_stats()
+        return info
     
     def __str__(self) -> str:
         return f"{self.__class__.__name__}(name='{self.name}', initialized={self.is_initialized})"
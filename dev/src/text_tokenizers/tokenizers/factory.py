@@ -3,26 +3,90 @@
 提供分词器的创建、管理和获取功能
 """
 
-from typing import Dict, List, Optional, Any
+import importlib
+import importlib.util
+import os
+import threading
+import weakref
+from typing import Dict, List, Optional, Any, Union
 from .base import BaseTokenizer, TokenizerInitError
-from .jieba_tokenizer import JiebaTokenizer
-from .thulac_tokenizer import ThulacTokenizer
-from .hanlp_tokenizer import HanlpTokenizer
+from .result_cache import DEFAULT_RESULT_CACHE_SIZE
+
+try:
+    from importlib.metadata import version as _package_version, PackageNotFoundError
+except ImportError:
+    # Python < 3.8 使用importlib_metadata
+    from importlib_metadata import version as _package_version, PackageNotFoundError
+
+
+def _probe_installation(tokenizer_class: type) -> Dict[str, Any]:
+    """
+    探测分词器依赖是否已安装：只用importlib.util.find_spec查找模块、从包元数据读取版本，
+    不导入依赖包，也不加载模型
+    
+    Args:
+        tokenizer_class (type): 分词器类
+        
+    Returns:
+        Dict[str, Any]: {'installed': 是否已安装, 'version': 包版本}，未安装时附带error
+    """
+    package = tokenizer_class.package
+    if not package:
+        return {'installed': True, 'version': 'unknown'}
+    
+    try:
+        spec = importlib.util.find_spec(package)
+    except (ImportError, ValueError):
+        spec = None
+    if spec is None:
+        return {'installed': False, 'version': None, 'error': f"{package}库未安装"}
+    
+    try:
+        package_version = _package_version(tokenizer_class.distribution or package)
+    except PackageNotFoundError:
+        package_version = 'unknown'
+    return {'installed': True, 'version': package_version}
 
 
 class TokenizerFactory:
     """
     分词器工厂类
     使用单例模式管理分词器实例，避免重复初始化
+    
+    线程与进程模型：
+    - 每个分词器名称有一把初始化锁，多个线程同时请求同一分词器时只加载一次（single-flight）
+    - 分词器类的thread_policy为"shared"时所有线程共用一个实例，为"per_thread"时每个线程各自创建实例
+    - 检测到进程号变化（fork出的子进程）时丢弃继承来的实例和锁，在子进程中重新初始化
     """
     
     _instance = None
+    # 共享实例（per_thread策略下为第一个创建的实例，用于查询信息）
     _tokenizers: Dict[str, BaseTokenizer] = {}
-    _available_tokenizers: Dict[str, type] = {
-        'jieba': JiebaTokenizer,
-        'thulac': ThulacTokenizer,
-        'hanlp': HanlpTokenizer
+    # 分词器注册表：名称 -> "模块路径:类名"（相对本包的模块路径，首次需要时才导入）或分词器类
+    _available_tokenizers: Dict[str, Union[str, type]] = {
+        'jieba': '.jieba_tokenizer:JiebaTokenizer',
+        'thulac': '.thulac_tokenizer:ThulacTokenizer',
+        'hanlp': '.hanlp_tokenizer:HanlpTokenizer'
     }
+    # 创建分词器实例时传给构造函数的参数（如jieba的持久化缓存目录和自定义词典）
+    _tokenizer_options: Dict[str, Dict[str, Any]] = {}
+    # 开启了分词结果缓存的分词器及其缓存容量
+    _result_cache_sizes: Dict[str, int] = {}
+    # 依赖安装情况的探测结果（进程内缓存）
+    _install_probes: Dict[str, Dict[str, Any]] = {}
+    # 首次使用时加载失败的分词器及错误信息（进程内缓存，不再列为可用）
+    _load_errors: Dict[str, str] = {}
+    
+    # 保护上述类级字典的锁，以及每个分词器名称的初始化锁
+    _lock = threading.Lock()
+    _init_locks: Dict[str, threading.Lock] = {}
+    # per_thread策略的线程本地实例，clear_cache时递增代号使旧实例失效
+    _thread_local = threading.local()
+    _generation = 0
+    # 每个分词器名称创建过的全部实例（弱引用），用于统一开关结果缓存
+    _instances: Dict[str, "weakref.WeakSet[BaseTokenizer]"] = {}
+    # 创建上述状态的进程号
+    _pid = os.getpid()
     
     def __new__(cls):
         """
@@ -36,41 +100,136 @@ class TokenizerFactory:
             cls._instance = super(TokenizerFactory, cls).__new__(cls)
         return cls._instance
     
+    @classmethod
+    def _reset_after_fork(cls):
+        """
+        fork出的子进程中丢弃从父进程继承的实例和锁
+        （锁可能在fork时正被其他线程持有，原生库的线程和句柄在子进程中也不可用）
+        """
+        cls._lock = threading.Lock()
+        cls._init_locks = {}
+        cls._tokenizers = {}
+        cls._instances = {}
+        cls._thread_local = threading.local()
+        cls._generation += 1
+        cls._pid = os.getpid()
+    
+    @classmethod
+    def _check_process(cls):
+        """进程号变化时（没有os.register_at_fork的平台或绕过钩子的fork）重置状态"""
+        if cls._pid != os.getpid():
+            cls._reset_after_fork()
+    
+    @classmethod
+    def _init_lock(cls, name: str) -> threading.Lock:
+        """获取分词器名称对应的初始化锁"""
+        with cls._lock:
+            lock = cls._init_locks.get(name)
+            if lock is None:
+                lock = cls._init_locks[name] = threading.Lock()
+            return lock
+    
+    @classmethod
+    def _thread_instances(cls) -> Dict[str, BaseTokenizer]:
+        """当前线程的per_thread实例，clear_cache之后的旧实例自动作废"""
+        local = cls._thread_local
+        if getattr(local, 'generation', None) != cls._generation:
+            local.generation = cls._generation
+            local.tokenizers = {}
+        return local.tokenizers
+    
+    @classmethod
+    def get_tokenizer_class(cls, name: str) -> type:
+        """
+        获取分词器类，注册表中为模块路径时在此导入并缓存
+        
+        Args:
+            name (str): 分词器名称
+            
+        Returns:
+            type: 分词器类
+            
+        Raises:
+            ValueError: 如果分词器名称不支持
+        """
+        if name not in cls._available_tokenizers:
+            raise ValueError(f"不支持的分词器: {name}，可用的分词器: {list(cls._available_tokenizers.keys())}")
+        
+        entry = cls._available_tokenizers[name]
+        if isinstance(entry, str):
+            module_path, class_name = entry.split(':')
+            entry = getattr(importlib.import_module(module_path, __package__), class_name)
+            cls._available_tokenizers[name] = entry
+        return entry
+    
+    @classmethod
+    def register_tokenizer(cls, name: str, target: Union[str, type]):
+        """
+        注册分词器
+        
+        Args:
+            name (str): 分词器名称
+            target: 分词器类，或"模块路径:类名"形式的字符串（首次使用时才导入）
+        """
+        cls._available_tokenizers[name] = target
+        cls._install_probes.pop(name, None)
+        cls._load_errors.pop(name, None)
+    
+    @classmethod
+    def get_registered_tokenizers(cls) -> List[str]:
+        """
+        获取已注册的全部分词器名称（不论是否已安装）
+        
+        Returns:
+            List[str]: 分词器名称列表
+        """
+        return list(cls._available_tokenizers.keys())
+    
+    @classmethod
+    def probe_tokenizer(cls, name: str, refresh: bool = False) -> Dict[str, Any]:
+        """
+        两级可用性探测，不会创建实例或加载模型
+        - installed: 依赖包已安装（find_spec + 包元数据），结果在进程内缓存
+        - loaded: 实例已在首次使用时创建并初始化成功
+        
+        Args:
+            name (str): 分词器名称
+            refresh (bool): 是否重新探测安装情况
+            
+        Returns:
+            Dict[str, Any]: {'name', 'installed', 'loaded', 'version', 'description'}，
+                未安装或加载失败时附带error
+            
+        Raises:
+            ValueError: 如果分词器名称不支持
+        """
+        if name not in cls._available_tokenizers:
+            raise ValueError(f"不支持的分词器: {name}，可用的分词器: {list(cls._available_tokenizers.keys())}")
+        
+        tokenizer_class = cls.get_tokenizer_class(name)
+        probe = cls._install_probes.get(name)
+        if probe is None or refresh:
+            probe = cls._install_probes[name] = _probe_installation(tokenizer_class)
+        
+        status = dict(probe, name=name, loaded=name in cls._tokenizers,
+                      description=tokenizer_class.description)
+        if name in cls._tokenizers:
+            status['version'] = cls._tokenizers[name].version
+        if name in cls._load_errors:
+            status['error'] = cls._load_errors[name]
+        return status
+    
     @classmethod
     def get_available_tokenizers(cls) -> List[str]:
         """
         获取可用的分词器列表
-        检查每个分词器的依赖是否满足
+        只检查依赖包是否已安装（不加载模型），首次使用时加载失败的分词器不再列出
         
         Returns:
             List[str]: 可用的分词器名称列表
         """
-        available = []
-        
-        for name, tokenizer_class in cls._available_tokenizers.items():
-            try:
-                # 尝试创建分词器实例
-                tokenizer = tokenizer_class()
-                tokenizer.initialize()
-                available.append(name)
-            except TokenizerInitError:
-                # 如果初始化失败，该分词器不可用
-                continue
-            except Exception:
-                # 其他异常也视为不可用
-                continue
-        
-        # 确保jieba总是在列表中（如果可用的话）
-        if 'jieba' not in available:
-            # 再次尝试jieba
-            try:
-                jieba_tokenizer = JiebaTokenizer()
-                jieba_tokenizer.initialize()
-                available.insert(0, 'jieba')
-            except:
-                pass
-        
-        return available
+        return [name for name in cls._available_tokenizers
+                if cls.probe_tokenizer(name)['installed'] and name not in cls._load_errors]
     
     @classmethod
     def get_tokenizer(cls, name: str) -> BaseTokenizer:
@@ -90,26 +249,43 @@ class TokenizerFactory:
         if name not in cls._available_tokenizers:
             raise ValueError(f"不支持的分词器: {name}，可用的分词器: {list(cls._available_tokenizers.keys())}")
         
-        # 如果已经创建过该分词器实例，直接返回
-        if name in cls._tokenizers:
-            return cls._tokenizers[name]
-        
-        # 创建新的分词器实例
-        tokenizer_class = cls._available_tokenizers[name]
-        tokenizer = tokenizer_class()
-        
-        # 初始化分词器
-        try:
-            success = tokenizer.initialize()
-            if not success:
-                raise TokenizerInitError(f"{name}分词器初始化失败")
-        except Exception as e:
-            raise TokenizerInitError(f"{name}分词器初始化失败: {str(e)}")
+        cls._check_process()
+        tokenizer_class = cls.get_tokenizer_class(name)
+        per_thread = tokenizer_class.thread_policy == 'per_thread'
+        instances = cls._thread_instances() if per_thread else cls._tokenizers
         
-        # 缓存分词器实例
-        cls._tokenizers[name] = tokenizer
+        # 如果已经创建过该分词器实例，直接返回
+        tokenizer = instances.get(name)
+        if tokenizer is not None:
+            return tokenizer
         
-        return tokenizer
+        # 同一名称的初始化串行执行，等待期间其他线程创建好的共享实例直接复用
+        with cls._init_lock(name):
+            tokenizer = instances.get(name)
+            if tokenizer is not None:
+                return tokenizer
+            
+            # 创建新的分词器实例
+            tokenizer = tokenizer_class(**cls._tokenizer_options.get(name, {}))
+            
+            # 初始化分词器
+            try:
+                success = tokenizer.initialize()
+                if not success:
+                    raise TokenizerInitError(f"{name}分词器初始化失败")
+            except Exception as e:
+                cls._load_errors[name] = str(e)
+                raise TokenizerInitError(f"{name}分词器初始化失败: {str(e)}")
+            
+            cls._load_errors.pop(name, None)
+            cls._apply_result_cache(name, tokenizer)
+            
+            # 缓存分词器实例
+            with cls._lock:
+                instances[name] = tokenizer
+                cls._tokenizers.setdefault(name, tokenizer)
+            
+            return tokenizer
     
     @classmethod
     def get_tokenizer_info(cls, name: str) -> Dict[str, Any]:
@@ -183,12 +359,13 @@ class TokenizerFactory:
         return None
     
     @classmethod
-    def check_tokenizer_availability(cls, name: str) -> bool:
+    def check_tokenizer_availability(cls, name: str, load: bool = False) -> bool:
         """
         检查指定分词器是否可用
         
         Args:
             name (str): 分词器名称
+            load (bool): 是否实际加载分词器确认可用（默认只检查依赖是否已安装）
             
         Returns:
             bool: 是否可用
@@ -196,11 +373,13 @@ class TokenizerFactory:
         if name not in cls._available_tokenizers:
             return False
         
+        if not load:
+            return name in cls.get_available_tokenizers()
+        
         try:
-            tokenizer_class = cls._available_tokenizers[name]
-            tokenizer = tokenizer_class()
-            return tokenizer.initialize()
-        except:
+            cls.get_tokenizer(name)
+            return True
+        except Exception:
             return False
     
     @classmethod
@@ -221,8 +400,8 @@ class TokenizerFactory:
         if name not in cls._available_tokenizers:
             raise ValueError(f"不支持的分词器: {name}")
         
-        tokenizer_class = cls._available_tokenizers[name]
-        tokenizer = tokenizer_class()
+        tokenizer_class = cls.get_tokenizer_class(name)
+        tokenizer = tokenizer_class(**cls._tokenizer_options.get(name, {}))
         
         # 初始化分词器
         try:
@@ -232,14 +411,86 @@ class TokenizerFactory:
         except Exception as e:
             raise TokenizerInitError(f"{name}分词器初始化失败: {str(e)}")
         
+        cls._apply_result_cache(name, tokenizer)
         return tokenizer
     
+    @classmethod
+    def configure_tokenizer(cls, name: str, **options):
+        """
+        设置创建分词器实例时的构造参数，例如：
+        configure_tokenizer('jieba', cache_dir='~/.cache/cer', user_dicts=['asr_terms.txt'])
+        已缓存的实例随之作废，下次获取时按新参数创建；不传参数表示恢复默认
+        
+        Args:
+            name (str): 分词器名称
+            **options: 分词器构造函数的关键字参数
+            
+        Raises:
+            ValueError: 如果分词器名称不支持
+        """
+        if name not in cls._available_tokenizers:
+            raise ValueError(f"不支持的分词器: {name}，可用的分词器: {list(cls._available_tokenizers.keys())}")
+        
+        with cls._lock:
+            if options:
+                cls._tokenizer_options[name] = dict(options)
+            else:
+                cls._tokenizer_options.pop(name, None)
+            cls._tokenizers.pop(name, None)
+            cls._load_errors.pop(name, None)
+            cls._generation += 1
+    
+    @classmethod
+    def _apply_result_cache(cls, name: str, tokenizer: BaseTokenizer):
+        """记录新创建的实例，并按工厂配置开启结果缓存"""
+        with cls._lock:
+            cls._instances.setdefault(name, weakref.WeakSet()).add(tokenizer)
+        maxsize = cls._result_cache_sizes.get(name)
+        if maxsize is not None:
+            tokenizer.enable_result_cache(maxsize)
+    
+    @classmethod
+    def enable_result_cache(cls, name: str, maxsize: int = DEFAULT_RESULT_CACHE_SIZE):
+        """
+        为指定分词器开启分词结果缓存
+        已创建的实例立即生效，之后创建的实例（包括create_tokenizer）自动开启
+        
+        Args:
+            name (str): 分词器名称
+            maxsize (int): 每个方法（cut/posseg/tokenize）最多缓存的结果条数
+            
+        Raises:
+            ValueError: 如果分词器名称不支持或缓存容量无效
+        """
+        if name not in cls._available_tokenizers:
+            raise ValueError(f"不支持的分词器: {name}，可用的分词器: {list(cls._available_tokenizers.keys())}")
+        if maxsize <= 0:
+            raise ValueError(f"缓存容量必须大于0: {maxsize}")
+        
+        cls._result_cache_sizes[name] = maxsize
+        for tokenizer in list(cls._instances.get(name, ())):
+            tokenizer.enable_result_cache(maxsize)
+    
+    @classmethod
+    def disable_result_cache(cls, name: str):
+        """
+        关闭指定分词器的分词结果缓存
+        
+        Args:
+            name (str): 分词器名称
+        """
+        cls._result_cache_sizes.pop(name, None)
+        for tokenizer in list(cls._instances.get(name, ())):
+            tokenizer.disable_result_cache()
+    
     @classmethod
     def clear_cache(cls):
         """
-        清除缓存的分词器实例
+        清除缓存的分词器实例（包括各线程的per_thread实例）
         """
-        cls._tokenizers.clear()
+        with cls._lock:
+            cls._tokenizers.clear()
+            cls._generation += 1
     
     @classmethod
     def get_all_tokenizer_info(cls) -> Dict[str, Dict[str, Any]]:
@@ -255,6 +506,11 @@ class TokenizerFactory:
         return info
 
 
+# fork出的子进程立即丢弃继承的分词器实例和锁
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=TokenizerFactory._reset_after_fork)
+
+
 # 便捷函数
 def get_tokenizer(name: str) -> BaseTokenizer:
     """
@@ -281,6 +537,20 @@ def get_available_tokenizers() -> List[str]:
     return factory.get_available_tokenizers()
 
 
+def probe_tokenizer(name: str) -> Dict[str, Any]:
+    """
+    探测分词器安装和加载状态的便捷函数（不加载模型）
+    
+    Args:
+        name (str): 分词器名称
+        
+    Returns:
+        Dict[str, Any]: 分词器状态字典
+    """
+    factory = TokenizerFactory()
+    return factory.probe_tokenizer(name)
+
+
 def get_tokenizer_info(name: str) -> Dict[str, Any]:
     """
     获取分词器信息的便捷函数
@@ -3,8 +3,16 @@ HanLP分词器实现
 基于HanLP库的分词器，提供BERT等深度学习模型支持
 """
 
-from typing import List, Tuple
+import re
+from typing import List, Optional, Tuple, Sequence
 from .base import BaseTokenizer, TokenizerInitError, TokenizerProcessError
+from .result_cache import cached_result, cached_batch
+
+
+# 句末边界：句末标点（可连续出现）及其后的右引号/右括号
+_SENTENCE_BOUNDARY = re.compile(r'[。！？!?；;…\n]+[”’"」』）)]*')
+# 次级边界：空白
+_SOFT_BOUNDARY = re.compile(r'\s+')
 
 
 class HanlpTokenizer(BaseTokenizer):
@@ -13,12 +21,25 @@ class HanlpTokenizer(BaseTokenizer):
     基于HanLP 2.x版本，支持BERT等深度学习模型的中文分词
     """
     
+    # 依赖的包（导入名和发行包名）及描述，供工厂在不加载模型的情况下探测和列出分词器
+    package = 'hanlp'
+    distribution = 'hanlp'
+    description = '基于HanLP库的深度学习中文分词器'
+    # 模型推理不修改模型状态，共用一个实例，避免每个线程各加载一份模型
+    thread_policy = 'shared'
+    
     def __init__(self):
         super().__init__()
         self.name = "hanlp"
         self.hanlp = None
         self.tok_model = None
         self.pos_model = None
+        # 批量推理时每批送入模型的片段条数
+        self.batch_size = 32
+        # 单个片段的最大字符数：长文本按句切分后再送入模型，避免被模型截断或注意力计算量平方增长
+        self.max_chunk_length = 256
+        # 无法按句或空白切分时固定窗口之间的重叠字符数
+        self.chunk_overlap = 32
     
     def initialize(self) -> bool:
         """
@@ -92,9 +113,15 @@ class HanlpTokenizer(BaseTokenizer):
         except Exception as e:
             raise TokenizerInitError(f"HanLP分词器初始化失败: {str(e)}")
     
+    def cache_config(self) -> tuple:
+        """分片参数会影响分词结果，一并计入结果缓存键"""
+        return super().cache_config() + (self.max_chunk_length, self.chunk_overlap)
+    
+    @cached_result
     def cut(self, text: str) -> List[str]:
         """
         基础分词功能
+        长文本按句切分为不超过max_chunk_length的片段后分批送入模型
         
         Args:
             text (str): 待分词的文本
@@ -106,20 +133,11 @@ class HanlpTokenizer(BaseTokenizer):
             TokenizerProcessError: 分词处理失败时抛出
         """
         try:
-            if not self.is_initialized:
-                raise TokenizerProcessError("HanLP分词器未初始化")
-            
-            cleaned_text = self.validate_text(text)
-            if not cleaned_text:
-                return []
-            
-            # 使用HanLP进行分词
-            result = self.tok_model(cleaned_text)
-            return result
-            
+            return self.cut_batch([text])[0]
         except Exception as e:
             raise TokenizerProcessError(f"HanLP分词失败: {str(e)}")
     
+    @cached_result
     def posseg(self, text: str) -> List[Tuple[str, str]]:
         """
         词性标注功能
@@ -134,38 +152,15 @@ class HanlpTokenizer(BaseTokenizer):
             TokenizerProcessError: 词性标注失败时抛出
         """
         try:
-            if not self.is_initialized:
-                raise TokenizerProcessError("HanLP分词器未初始化")
-            
-            cleaned_text = self.validate_text(text)
-            if not cleaned_text:
-                return []
-            
-            # 先进行分词
-            words = self.cut(cleaned_text)
-            
-            if self.pos_model:
-                # 如果有词性标注模型，使用HanLP进行词性标注
-                try:
-                    pos_tags = self.pos_model(words)
-                    result = list(zip(words, pos_tags))
-                    return result
-                except Exception as e:
-                    # 如果词性标注失败，使用默认词性
-                    result = [(word, 'unk') for word in words]
-                    return result
-            else:
-                # 如果没有词性标注模型，使用默认词性
-                result = [(word, 'unk') for word in words]
-                return result
-            
+            return self.posseg_batch([text])[0]
         except Exception as e:
             raise TokenizerProcessError(f"HanLP词性标注失败: {str(e)}")
     
+    @cached_result
     def tokenize(self, text: str) -> List[Tuple[str, int, int]]:
         """
         精确分词，返回词语及其在原文中的位置
-        HanLP某些模型支持输出偏移量，如果不支持则手动计算
+        每个片段的分词结果在片段内定位后加上片段起点，得到在原文中的位置
         
         Args:
             text (str): 待分词的文本
@@ -177,74 +172,295 @@ class HanlpTokenizer(BaseTokenizer):
             TokenizerProcessError: 分词处理失败时抛出
         """
         try:
-            if not self.is_initialized:
-                raise TokenizerProcessError("HanLP分词器未初始化")
-            
-            cleaned_text = self.validate_text(text)
-            if not cleaned_text:
-                return []
+            return self.tokenize_batch([text])[0]
+        except Exception as e:
+            raise TokenizerProcessError(f"HanLP精确分词失败: {str(e)}")
+    
+    def _locate_words(self, cleaned_text: str, words: List[str]) -> List[Tuple[str, int, int]]:
+        """
+        在原文中依次查找分词结果，计算每个词语的位置
+        
+        Args:
+            cleaned_text (str): 分词时使用的文本
+            words (List[str]): 分词结果
             
-            # 尝试使用HanLP的偏移量功能
-            try:
-                # 检查模型是否支持输出偏移量
-                if hasattr(self.tok_model, 'config') and hasattr(self.tok_model.config, 'output_offsets'):
-                    # 启用偏移量输出
-                    self.tok_model.config.output_offsets = True
-                    result_with_offsets = self.tok_model(cleaned_text)
-                    
-                    if isinstance(result_with_offsets, tuple) and len(result_with_offsets) == 2:
-                        tokens, offsets = result_with_offsets
-                        result = []
-                        for token, (start, end) in zip(tokens, offsets):
-                            result.append((token, start, end))
-                        return result
-            except:
-                pass  # 如果不支持偏移量，继续使用手动计算
+        Returns:
+            List[Tuple[str, int, int]]: (词语, 开始位置, 结束位置)的元组列表
+        """
+        result = []
+        current_pos = 0
+        text_chars = list(cleaned_text)
+        
+        for word in words:
+            word_chars = list(word)
+            word_len = len(word_chars)
             
-            # 手动计算位置信息
-            words = self.cut(cleaned_text)
-            result = []
-            current_pos = 0
-            text_chars = list(cleaned_text)
+            # 在剩余文本中查找当前词语
+            start_pos = current_pos
+            found = False
             
-            for word in words:
-                word_chars = list(word)
-                word_len = len(word_chars)
-                
-                # 在剩余文本中查找当前词语
-                start_pos = current_pos
-                found = False
-                
-                # 向前搜索匹配位置
-                while start_pos <= len(text_chars) - word_len:
-                    # 检查是否匹配
-                    match = True
-                    for i, char in enumerate(word_chars):
-                        if start_pos + i >= len(text_chars) or text_chars[start_pos + i] != char:
-                            match = False
-                            break
-                    
-                    if match:
-                        end_pos = start_pos + word_len
-                        result.append((word, start_pos, end_pos))
-                        current_pos = end_pos
-                        found = True
+            # 向前搜索匹配位置
+            while start_pos <= len(text_chars) - word_len:
+                # 检查是否匹配
+                match = True
+                for i, char in enumerate(word_chars):
+                    if start_pos + i >= len(text_chars) or text_chars[start_pos + i] != char:
+                        match = False
                         break
-                    
-                    start_pos += 1
                 
-                # 如果没有找到匹配，使用近似位置
-                if not found:
-                    end_pos = current_pos + word_len
-                    if end_pos > len(text_chars):
-                        end_pos = len(text_chars)
-                    result.append((word, current_pos, end_pos))
+                if match:
+                    end_pos = start_pos + word_len
+                    result.append((word, start_pos, end_pos))
                     current_pos = end_pos
+                    found = True
+                    break
+                
+                start_pos += 1
+            
+            # 如果没有找到匹配，使用近似位置
+            if not found:
+                end_pos = current_pos + word_len
+                if end_pos > len(text_chars):
+                    end_pos = len(text_chars)
+                result.append((word, current_pos, end_pos))
+                current_pos = end_pos
+        
+        return result
+    
+    def _length_buckets(self, texts: Sequence[str]) -> List[List[int]]:
+        """
+        按长度把非空文本分桶：先按长度排序，再每batch_size条切成一批，
+        同一批内文本长度相近，减少模型补齐（padding）带来的无效计算
+        
+        Args:
+            texts (Sequence): 已验证的文本列表（或分词后的词语列表）
             
-            return result
+        Returns:
+            List[List[int]]: 每批文本在输入列表中的下标
+        """
+        order = sorted((i for i, text in enumerate(texts) if text), key=lambda i: len(texts[i]))
+        batch_size = max(1, int(self.batch_size))
+        return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+    
+    def _chunk_spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        把文本切分为不超过max_chunk_length的片段
+        优先在句末标点处切分（相邻短句合并到同一片段），其次在空白处切分，
+        仍然过长的部分按固定窗口切分，相邻窗口重叠chunk_overlap个字符
+        
+        Args:
+            text (str): 已验证的文本
             
+        Returns:
+            List[Tuple[int, int]]: 各片段在原文中的(开始位置, 结束位置)，只有固定窗口之间会重叠
+        """
+        limit = max(1, int(self.max_chunk_length))
+        spans = []
+        self._pack_spans(text, 0, len(text), (_SENTENCE_BOUNDARY, _SOFT_BOUNDARY), limit, spans)
+        return spans
+    
+    def _pack_spans(self, text: str, start: int, end: int, boundaries: tuple, limit: int,
+                    spans: List[Tuple[int, int]]):
+        """
+        按第一级边界切分text[start:end]并把相邻小段贪心合并到不超过limit，
+        单独一段仍超过limit时交给下一级边界，没有更多边界时按固定窗口切分
+        """
+        if end - start <= limit:
+            spans.append((start, end))
+            return
+        if not boundaries:
+            spans.extend(self._window_spans(start, end, limit))
+            return
+        
+        pattern, rest = boundaries[0], boundaries[1:]
+        cuts = [m.end() for m in pattern.finditer(text, start, end) if m.end() < end]
+        cuts.append(end)
+        
+        chunk_start = piece_start = start
+        for cut in cuts:
+            # 当前片段加上这一段会超长，先把已合并的部分作为一个片段
+            if cut - chunk_start > limit and piece_start > chunk_start:
+                spans.append((chunk_start, piece_start))
+                chunk_start = piece_start
+            # 这一段本身超长，交给下一级边界
+            if cut - chunk_start > limit:
+                self._pack_spans(text, chunk_start, cut, rest, limit, spans)
+                chunk_start = cut
+            piece_start = cut
+        
+        if chunk_start < end:
+            spans.append((chunk_start, end))
+    
+    def _window_spans(self, start: int, end: int, limit: int) -> List[Tuple[int, int]]:
+        """按固定长度窗口切分，相邻窗口重叠chunk_overlap个字符（最多为窗口长度的一半）"""
+        overlap = min(max(0, int(self.chunk_overlap)), limit // 2)
+        step = limit - overlap
+        spans = []
+        pos = start
+        while True:
+            spans.append((pos, min(pos + limit, end)))
+            if pos + limit >= end:
+                return spans
+            pos += step
+    
+    @staticmethod
+    def _overlap_cut(prev_tokens: list, next_tokens: list, start: int, end: int) -> int:
+        """
+        在两个窗口的重叠区[start, end]内选择拼接位置：
+        优先选两侧都是词边界的位置，其次选前一窗口的词边界，都取最靠近重叠区中点的位置
+        （窗口边缘的上下文最少，中点附近两侧的分词结果最可靠）
+        """
+        prev_ends = {token_end for _, _, token_end in prev_tokens if start <= token_end <= end}
+        next_starts = {token_start for _, token_start, _ in next_tokens if start <= token_start <= end}
+        candidates = (prev_ends & next_starts) or prev_ends or next_starts or {(start + end) // 2}
+        middle = (start + end) / 2
+        return min(candidates, key=lambda pos: (abs(pos - middle), pos))
+    
+    @staticmethod
+    def _clip_tokens(text: str, tokens: list, low: Optional[int], high: Optional[int]) -> list:
+        """只保留位于[low, high)内的词语，跨越边界的词语截断为原文中对应的部分"""
+        result = []
+        for word, token_start, token_end in tokens:
+            clipped_start = token_start if low is None else max(token_start, low)
+            clipped_end = token_end if high is None else min(token_end, high)
+            if clipped_start >= clipped_end:
+                continue
+            if (clipped_start, clipped_end) != (token_start, token_end):
+                word = text[clipped_start:clipped_end]
+            result.append((word, clipped_start, clipped_end))
+        return result
+    
+    def _segment_texts(self, texts: Sequence[str]) -> List[List[List[Tuple[str, int, int]]]]:
+        """
+        分片批量分词的核心流程：
+        1. 每条文本切分为片段，所有文本的片段一起按长度分桶，每批以列表形式调用一次模型
+        2. 每个片段的分词结果在片段内定位，加上片段起点得到原文位置
+        3. 重叠窗口在重叠区内选定拼接位置，两侧分别截断后拼接
+        
+        Args:
+            texts (Sequence[str]): 待分词的文本列表
+            
+        Returns:
+            list: 每条文本的片段列表，每个片段为(词语, 开始位置, 结束位置)的元组列表
+        """
+        if not self.is_initialized:
+            raise TokenizerProcessError("HanLP分词器未初始化")
+        
+        cleaned_texts = [self.validate_text(text) for text in texts]
+        chunks = []  # (文本下标, 开始位置, 结束位置)
+        for index, cleaned_text in enumerate(cleaned_texts):
+            if cleaned_text:
+                chunks.extend((index, start, end) for start, end in self._chunk_spans(cleaned_text))
+        
+        chunk_texts = [cleaned_texts[index][start:end] for index, start, end in chunks]
+        chunk_tokens = [[] for _ in chunks]
+        for bucket in self._length_buckets(chunk_texts):
+            outputs = self.tok_model([chunk_texts[k] for k in bucket])
+            for k, words in zip(bucket, outputs):
+                offset = chunks[k][1]
+                located = self._locate_words(chunk_texts[k], list(words))
+                chunk_tokens[k] = [(word, token_start + offset, token_end + offset)
+                                   for word, token_start, token_end in located]
+        
+        segments = [[] for _ in cleaned_texts]
+        prev_end = 0
+        for (index, start, end), tokens in zip(chunks, chunk_tokens):
+            text_segments = segments[index]
+            if text_segments and start < prev_end:
+                cut = self._overlap_cut(text_segments[-1], tokens, start, prev_end)
+                text_segments[-1] = self._clip_tokens(cleaned_texts[index], text_segments[-1], None, cut)
+                tokens = self._clip_tokens(cleaned_texts[index], tokens, cut, None)
+            text_segments.append(tokens)
+            prev_end = end
+        
+        return segments
+    
+    @cached_batch
+    def cut_batch(self, texts: Sequence[str]) -> List[List[str]]:
+        """
+        批量分词：所有文本的片段按长度分桶后以列表形式送入模型，
+        一次前向计算处理一批片段，结果顺序与输入一致
+        
+        Args:
+            texts (Sequence[str]): 待分词的文本列表
+            
+        Returns:
+            List[List[str]]: 每条文本的分词结果列表
+            
+        Raises:
+            TokenizerProcessError: 分词处理失败时抛出
+        """
+        try:
+            return [[word for segment in text_segments for word, _, _ in segment]
+                    for text_segments in self._segment_texts(texts)]
         except Exception as e:
-            raise TokenizerProcessError(f"HanLP精确分词失败: {str(e)}")
+            raise TokenizerProcessError(f"HanLP批量分词失败: {str(e)}")
+    
+    @cached_batch
+    def posseg_batch(self, texts: Sequence[str]) -> List[List[Tuple[str, str]]]:
+        """
+        批量词性标注：分词和词性标注模型都按片段分批调用
+        
+        Args:
+            texts (Sequence[str]): 待标注的文本列表
+            
+        Returns:
+            List[List[Tuple[str, str]]]: 每条文本的(词语, 词性)元组列表
+            
+        Raises:
+            TokenizerProcessError: 词性标注失败时抛出
+        """
+        try:
+            text_segments = self._segment_texts(texts)
+            owners = []
+            words_list = []
+            for index, segments in enumerate(text_segments):
+                for segment in segments:
+                    owners.append(index)
+                    words_list.append([word for word, _, _ in segment])
+            
+            tagged = [[(word, 'unk') for word in words] for words in words_list]
+            if self.pos_model:
+                for bucket in self._length_buckets(words_list):
+                    try:
+                        outputs = self.pos_model([words_list[k] for k in bucket])
+                        for k, pos_tags in zip(bucket, outputs):
+                            tagged[k] = list(zip(words_list[k], pos_tags))
+                    except Exception:
+                        # 整批标注失败时逐个片段重试，仍失败的片段使用默认词性
+                        for k in bucket:
+                            try:
+                                tagged[k] = list(zip(words_list[k], self.pos_model(words_list[k])))
+                            except Exception:
+                                pass
+            
+            results = [[] for _ in text_segments]
+            for index, pairs in zip(owners, tagged):
+                results[index].extend(pairs)
+            return results
+            
+        except Exception as e:
+            raise TokenizerProcessError(f"HanLP批量词性标注失败: {str(e)}")
+    
+    @cached_batch
+    def tokenize_batch(self, texts: Sequence[str]) -> List[List[Tuple[str, int, int]]]:
+        """
+        批量精确分词
+        
+        Args:
+            texts (Sequence[str]): 待分词的文本列表
+            
+        Returns:
+            List[List[Tuple[str, int, int]]]: 每条文本的(词语, 开始位置, 结束位置)元组列表
+            
+        Raises:
+            TokenizerProcessError: 分词处理失败时抛出
+        """
+        try:
+            return [[token for segment in text_segments for token in segment]
+                    for text_segments in self._segment_texts(texts)]
+        except Exception as e:
+            raise TokenizerProcessError(f"HanLP批量精确分词失败: {str(e)}")
     
     def get_info(self) -> dict:
         """
@@ -272,13 +488,16 @@ class HanlpTokenizer(BaseTokenizer):
                 pos_model_name = self.pos_model.__class__.__name__
         
         info.update({
-            'description': '基于HanLP库的深度学习中文分词器',
+            'description': self.description,
             'features': ['分词', '词性标注', '精确位置分词', 'BERT支持'],
             'dependencies': ['hanlp'],
             'performance': '较慢（深度学习模型）',
             'accuracy': '最高精度',
             'tok_model': tok_model_name,
             'pos_model': pos_model_name,
+            'batch_size': self.batch_size,
+            'max_chunk_length': self.max_chunk_length,
+            'chunk_overlap': self.chunk_overlap,
             'note': '首次使用时需要下载模型文件'
         })
         return info
\ No newline at end of file
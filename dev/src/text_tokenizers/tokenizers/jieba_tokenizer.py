@@ -3,10 +3,97 @@ Jieba分词器实现
 基于jieba库的分词器，完全兼容现有功能
 """
 
-from typing import List, Tuple
-import jieba
-import jieba.posseg
+import hashlib
+import marshal
+import mmap
+import os
+import tempfile
+import threading
+import time
+from typing import List, Tuple, Sequence, Optional, Dict, Any
 from .base import BaseTokenizer, TokenizerInitError, TokenizerProcessError
+from .result_cache import cached_result, cached_batch
+from .spans import TokenSpans
+
+
+# jieba的并行模式通过替换模块级函数实现，开启和关闭必须串行
+_PARALLEL_LOCK = threading.Lock()
+
+# jieba模块，创建第一个分词器实例时才导入（导入jieba.posseg约需数百毫秒）
+jieba = None
+
+# 持久化词典缓存的格式版本，缓存内容结构变化时递增
+_DICTIONARY_CACHE_FORMAT = 1
+
+
+def _import_jieba():
+    """导入jieba和jieba.posseg"""
+    global jieba
+    if jieba is None:
+        import jieba.posseg
+    return jieba
+
+
+def _dictionary_fingerprint(user_dicts: Sequence[str]) -> str:
+    """
+    计算前缀词典缓存的指纹：jieba版本、主词典的大小和修改时间、各自定义词典的内容摘要
+    
+    Args:
+        user_dicts (Sequence[str]): 自定义词典路径列表（按加载顺序）
+        
+    Returns:
+        str: SHA-256十六进制摘要
+    """
+    main_dict = os.path.join(os.path.dirname(jieba.__file__), jieba.DEFAULT_DICT_NAME)
+    stat = os.stat(main_dict)
+    digest = hashlib.sha256(
+        f"{_DICTIONARY_CACHE_FORMAT}\0{jieba.__version__}\0{stat.st_size}\0{stat.st_mtime_ns}".encode('utf-8')
+    )
+    for path in user_dicts:
+        with open(path, 'rb') as f:
+            digest.update(b'\0' + hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def _read_dictionary_cache(path: str) -> Optional[tuple]:
+    """
+    通过mmap读取持久化的前缀词典，文件不存在或已损坏时返回None
+    
+    Args:
+        path (str): 缓存文件路径
+        
+    Returns:
+        Optional[tuple]: (前缀词频表, 总词频, 自定义词性表, 强制拆分词列表)
+    """
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            content = marshal.loads(data)
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+    if not isinstance(content, tuple) or len(content) != 4:
+        return None
+    return content
+
+
+def _write_dictionary_cache(path: str, content: tuple):
+    """
+    原子写入前缀词典缓存（先写同目录临时文件再替换，多个进程同时写入也不会读到半个文件）
+    
+    Args:
+        path (str): 缓存文件路径
+        content (tuple): (前缀词频表, 总词频, 自定义词性表, 强制拆分词列表)
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            marshal.dump(content, f)
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
 
 
 class JiebaTokenizer(BaseTokenizer):
@@ -15,9 +102,86 @@ class JiebaTokenizer(BaseTokenizer):
     基于jieba库，提供中文分词、词性标注和精确位置分词功能
     """
     
-    def __init__(self):
+    # 依赖的包（导入名和发行包名）及描述，供工厂在不加载模型的情况下探测和列出分词器
+    package = 'jieba'
+    distribution = 'jieba'
+    description = '基于jieba库的中文分词器'
+    # jieba分词只读取初始化后的词典，多线程共用一个实例
+    thread_policy = 'shared'
+    
+    def __init__(self, cache_dir: Optional[str] = None, user_dicts: Optional[Sequence[str]] = None):
+        """
+        Args:
+            cache_dir (str): 前缀词典持久化缓存目录，None表示使用jieba默认的临时目录缓存
+            user_dicts (Sequence[str]): 自定义词典路径列表（领域术语、产品名等，jieba用户词典格式）
+        """
         super().__init__()
         self.name = "jieba"
+        _import_jieba()
+        # 批量分词总字符数达到该值时启用jieba并行模式（创建进程池有固定开销，小批量串行更快）
+        self.parallel_min_chars = 200000
+        # 并行模式的进程数，None表示使用CPU核数
+        self.parallel_workers = None
+        
+        self.cache_dir = os.path.abspath(cache_dir) if cache_dir else None
+        self.user_dicts = [os.path.abspath(path) for path in (user_dicts or [])]
+        # 未指定缓存目录和自定义词典时使用jieba的全局词典，否则在initialize中创建独立的词典
+        self._dt = jieba.dt
+        self._pos = jieba.posseg.dt
+        # 词典加载耗时（秒）、持久化缓存文件路径及是否命中
+        self.load_time = None
+        self.dictionary_cache_path = None
+        self.dictionary_cache_hit = None
+    
+    @property
+    def uses_global_dictionary(self) -> bool:
+        """是否使用jieba的全局词典（只有全局词典可以使用jieba并行模式）"""
+        return self._dt is jieba.dt
+    
+    def _load_dictionary(self):
+        """
+        创建独立的jieba词典并加载自定义词典
+        指定了缓存目录时，把加载自定义词典后的前缀词典、词性和强制拆分词整体序列化到缓存文件，
+        之后的进程直接通过mmap反序列化，不再解析主词典和自定义词典
+        """
+        dt = jieba.Tokenizer()
+        path = None
+        content = None
+        if self.cache_dir:
+            path = os.path.join(self.cache_dir, f"jieba.{_dictionary_fingerprint(self.user_dicts)[:32]}.cache")
+            content = _read_dictionary_cache(path)
+        
+        if content is not None:
+            dt.FREQ, dt.total, user_tags, force_split = content
+            dt.user_word_tag_tab = dict(user_tags)
+            dt.initialized = True
+            jieba.finalseg.Force_Split_Words.update(force_split)
+        else:
+            if path:
+                # 需要写入持久化缓存时自行构建，避免jieba再往临时目录写一份
+                dt.FREQ, dt.total = dt.gen_pfdict(dt.get_dict_file())
+                dt.initialized = True
+            else:
+                dt.initialize()
+            force_split_before = set(jieba.finalseg.Force_Split_Words)
+            for user_dict in self.user_dicts:
+                dt.load_userdict(user_dict)
+            if path:
+                force_split = sorted(set(jieba.finalseg.Force_Split_Words) - force_split_before)
+                try:
+                    _write_dictionary_cache(path, (dt.FREQ, dt.total, dt.user_word_tag_tab, force_split))
+                except OSError as e:
+                    print(f"写入Jieba词典缓存失败: {str(e)}")
+        
+        # 词性标注器复用已导入的全局词性表，自定义词性在首次标注时由jieba合并
+        pos = jieba.posseg.POSTokenizer.__new__(jieba.posseg.POSTokenizer)
+        pos.tokenizer = dt
+        pos.word_tag_tab = dict(jieba.posseg.dt.word_tag_tab)
+        
+        self._dt = dt
+        self._pos = pos
+        self.dictionary_cache_path = path
+        self.dictionary_cache_hit = content is not None if path else None
     
     def initialize(self) -> bool:
         """
@@ -30,9 +194,12 @@ class JiebaTokenizer(BaseTokenizer):
             TokenizerInitError: 初始化失败时抛出
         """
         try:
-            # Jieba无需特殊初始化，但可以预加载词典
-            # 这里进行一次简单的分词操作来确保jieba正常工作
-            test_result = list(jieba.cut("测试"))
+            # 预加载词典，并进行一次简单的分词操作来确保jieba正常工作
+            start = time.perf_counter()
+            if self.cache_dir or self.user_dicts:
+                self._load_dictionary()
+            test_result = list(self._dt.cut("测试"))
+            self.load_time = time.perf_counter() - start
             if not test_result:
                 raise TokenizerInitError("Jieba分词器测试失败")
             
@@ -62,6 +229,7 @@ class JiebaTokenizer(BaseTokenizer):
         except Exception as e:
             raise TokenizerInitError(f"Jieba分词器初始化失败: {str(e)}")
     
+    @cached_result
     def cut(self, text: str) -> List[str]:
         """
         基础分词功能
@@ -81,12 +249,13 @@ class JiebaTokenizer(BaseTokenizer):
                 return []
             
             # 使用jieba进行分词
-            result = list(jieba.cut(cleaned_text))
+            result = list(self._dt.cut(cleaned_text))
             return result
             
         except Exception as e:
             raise TokenizerProcessError(f"Jieba分词失败: {str(e)}")
     
+    @cached_result
     def posseg(self, text: str) -> List[Tuple[str, str]]:
         """
         词性标注功能
@@ -107,7 +276,7 @@ class JiebaTokenizer(BaseTokenizer):
             
             # 使用jieba进行词性标注
             result = []
-            for word, flag in jieba.posseg.cut(cleaned_text):
+            for word, flag in self._pos.cut(cleaned_text):
                 result.append((word, flag))
             
             return result
@@ -115,6 +284,7 @@ class JiebaTokenizer(BaseTokenizer):
         except Exception as e:
             raise TokenizerProcessError(f"Jieba词性标注失败: {str(e)}")
     
+    @cached_result
     def tokenize(self, text: str) -> List[Tuple[str, int, int]]:
         """
         精确分词，返回词语及其在原文中的位置
@@ -135,7 +305,7 @@ class JiebaTokenizer(BaseTokenizer):
             
             # 使用jieba的tokenize功能获取精确位置
             result = []
-            for tk in jieba.tokenize(cleaned_text):
+            for tk in self._dt.tokenize(cleaned_text):
                 word, start, end = tk
                 result.append((word, start, end))
             
@@ -144,6 +314,179 @@ class JiebaTokenizer(BaseTokenizer):
         except Exception as e:
             raise TokenizerProcessError(f"Jieba精确分词失败: {str(e)}")
     
+    def tokenize_spans(self, text: str) -> TokenSpans:
+        """
+        精确分词，返回紧凑的位置表示
+        未开启结果缓存时直接消费jieba的tokenize生成器，不生成中间的元组列表
+        
+        Args:
+            text (str): 待分词的文本
+            
+        Returns:
+            TokenSpans: 紧凑的分词结果
+            
+        Raises:
+            TokenizerProcessError: 分词处理失败时抛出
+        """
+        if self.result_cache is not None:
+            return super().tokenize_spans(text)
+        try:
+            cleaned_text = self.validate_text(text)
+            if not cleaned_text:
+                return TokenSpans(cleaned_text)
+            return TokenSpans.from_tokens(cleaned_text, self._dt.tokenize(cleaned_text))
+        except Exception as e:
+            raise TokenizerProcessError(f"Jieba精确分词失败: {str(e)}")
+    
+    def _parallel_workers(self) -> int:
+        """
+        并行模式可用的进程数，不支持并行时为1
+        （非POSIX系统，或使用独立词典：jieba并行模式的工作进程只使用全局词典）
+        """
+        if os.name != 'posix' or not self.uses_global_dictionary:
+            return 1
+        return self.parallel_workers or os.cpu_count() or 1
+    
+    def _run_batch(self, texts: Sequence[str], cut_func, serial_func) -> list:
+        """
+        批量执行分词或词性标注
+        总字符数足够大时把不含换行的文本用换行拼接成一个文本，交给jieba并行模式按行分发到进程池，
+        再按换行词语切回各条文本；jieba逐行独立分词，结果与逐条调用一致
+        
+        Args:
+            texts (Sequence[str]): 待处理的文本列表
+            cut_func: 并行模式下生效的jieba模块级函数（jieba.cut或jieba.posseg.cut）的取值函数
+            serial_func: 逐条处理单个文本的方法
+            
+        Returns:
+            list: 每条文本的处理结果
+        """
+        cleaned_texts = [self.validate_text(text) for text in texts]
+        workers = self._parallel_workers()
+        if workers < 2 or sum(len(text) for text in cleaned_texts) < self.parallel_min_chars:
+            return [serial_func(text) for text in cleaned_texts]
+        
+        results = [None] * len(cleaned_texts)
+        joined = []
+        for i, text in enumerate(cleaned_texts):
+            if not text:
+                results[i] = []
+            elif len(text.splitlines()) == 1:
+                joined.append(i)
+            else:
+                # 文本内部包含换行时无法按行切分，单独处理
+                results[i] = serial_func(text)
+        
+        if not joined:
+            return results
+        
+        with _PARALLEL_LOCK:
+            jieba.enable_parallel(workers)
+            try:
+                outputs = list(cut_func()("\n".join(cleaned_texts[i] for i in joined)))
+            finally:
+                jieba.disable_parallel()
+        
+        position = 0
+        current = []
+        for item in outputs:
+            # 词性标注结果为jieba.posseg.pair对象
+            if getattr(item, 'word', item) == "\n":
+                results[joined[position]] = current
+                position += 1
+                current = []
+            else:
+                current.append(item)
+        results[joined[position]] = current
+        return results
+    
+    @cached_batch
+    def cut_batch(self, texts: Sequence[str]) -> List[List[str]]:
+        """
+        批量分词，大批量时使用jieba并行模式
+        
+        Args:
+            texts (Sequence[str]): 待分词的文本列表
+            
+        Returns:
+            List[List[str]]: 每条文本的分词结果列表
+            
+        Raises:
+            TokenizerProcessError: 分词处理失败时抛出
+        """
+        try:
+            return self._run_batch(texts, lambda: jieba.cut, self.cut)
+        except Exception as e:
+            raise TokenizerProcessError(f"Jieba批量分词失败: {str(e)}")
+    
+    @cached_batch
+    def posseg_batch(self, texts: Sequence[str]) -> List[List[Tuple[str, str]]]:
+        """
+        批量词性标注，大批量时使用jieba并行模式
+        
+        Args:
+            texts (Sequence[str]): 待标注的文本列表
+            
+        Returns:
+            List[List[Tuple[str, str]]]: 每条文本的(词语, 词性)元组列表
+            
+        Raises:
+            TokenizerProcessError: 词性标注失败时抛出
+        """
+        try:
+            results = self._run_batch(texts, lambda: jieba.posseg.cut, self.posseg)
+            return [[pair if isinstance(pair, tuple) else (pair.word, pair.flag) for pair in words]
+                    for words in results]
+        except Exception as e:
+            raise TokenizerProcessError(f"Jieba批量词性标注失败: {str(e)}")
+    
+    @cached_batch
+    def tokenize_batch(self, texts: Sequence[str]) -> List[List[Tuple[str, int, int]]]:
+        """
+        批量精确分词
+        jieba.tokenize的默认模式就是按分词结果依次累加长度，直接由批量分词结果计算位置
+        
+        Args:
+            texts (Sequence[str]): 待分词的文本列表
+            
+        Returns:
+            List[List[Tuple[str, int, int]]]: 每条文本的(词语, 开始位置, 结束位置)元组列表
+            
+        Raises:
+            TokenizerProcessError: 分词处理失败时抛出
+        """
+        try:
+            results = []
+            for words in self.cut_batch(texts):
+                tokens = []
+                start = 0
+                for word in words:
+                    tokens.append((word, start, start + len(word)))
+                    start += len(word)
+                results.append(tokens)
+            return results
+        except Exception as e:
+            raise TokenizerProcessError(f"Jieba批量精确分词失败: {str(e)}")
+    
+    def cache_config(self) -> tuple:
+        """分词结果还取决于加载的自定义词典"""
+        return super().cache_config() + (tuple(self.user_dicts),)
+    
+    def get_dictionary_info(self) -> Dict[str, Any]:
+        """
+        获取词典加载信息
+        
+        Returns:
+            Dict[str, Any]: 加载耗时、持久化缓存路径及是否命中、自定义词典列表
+        """
+        return {
+            'load_seconds': self.load_time,
+            'cache_path': self.dictionary_cache_path,
+            'cache_hit': self.dictionary_cache_hit,
+            'user_dicts': list(self.user_dicts),
+            'global_dictionary': self.uses_global_dictionary,
+        }
+    
     def get_info(self) -> dict:
         """
         获取Jieba分词器信息
@@ -153,10 +496,13 @@ class JiebaTokenizer(BaseTokenizer):
         """
         info = super().get_info()
         info.update({
-            'description': '基于jieba库的中文分词器',
+            'description': self.description,
             'features': ['分词', '词性标注', '精确位置分词'],
             'dependencies': ['jieba'],
             'performance': '高速',
-            'accuracy': '中等'
+            'accuracy': '中等',
+            'parallel_min_chars': self.parallel_min_chars,
+            'parallel_workers': self._parallel_workers(),
+            'dictionary': self.get_dictionary_info()
         })
         return info 
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""
+分词结果缓存
+为BaseTokenizer子类的cut/posseg/tokenize提供按方法独立的LRU缓存，
+通过装饰器挂在具体实现上，默认关闭，调用enable_result_cache()或在工厂中按分词器开启
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Dict, Hashable, Optional
+
+
+# 每个方法默认缓存的文本条数
+DEFAULT_RESULT_CACHE_SIZE = 2048
+
+
+class TokenizerResultCache:
+    """
+    分词结果缓存
+    每个方法（cut/posseg/tokenize）各自维护一个按条数淘汰的LRU，并分别统计命中、未命中和淘汰次数
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_RESULT_CACHE_SIZE):
+        """
+        初始化缓存
+
+        Args:
+            maxsize (int): 每个方法最多缓存的结果条数
+        """
+        if maxsize <= 0:
+            raise ValueError(f"缓存容量必须大于0: {maxsize}")
+
+        self.maxsize = maxsize
+        self._entries: Dict[str, "OrderedDict[Hashable, tuple]"] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _counter(self, method: str) -> Dict[str, int]:
+        """获取方法的计数器（调用方持有锁）"""
+        counter = self._counters.get(method)
+        if counter is None:
+            counter = self._counters[method] = {'hits': 0, 'misses': 0, 'evictions': 0}
+            self._entries[method] = OrderedDict()
+        return counter
+
+    def get(self, method: str, key: Hashable) -> Optional[tuple]:
+        """
+        查询缓存
+
+        Args:
+            method (str): 方法名
+            key (Hashable): 缓存键
+
+        Returns:
+            Optional[tuple]: 缓存的结果，未命中时为None
+        """
+        with self._lock:
+            counter = self._counter(method)
+            entries = self._entries[method]
+            value = entries.get(key)
+            if value is None:
+                counter['misses'] += 1
+                return None
+            entries.move_to_end(key)
+            counter['hits'] += 1
+            return value
+
+    def put(self, method: str, key: Hashable, value: tuple):
+        """
+        写入缓存，超出容量时淘汰最久未使用的结果
+
+        Args:
+            method (str): 方法名
+            key (Hashable): 缓存键
+            value (tuple): 结果
+        """
+        with self._lock:
+            counter = self._counter(method)
+            entries = self._entries[method]
+            entries[key] = value
+            entries.move_to_end(key)
+            while len(entries) > self.maxsize:
+                entries.popitem(last=False)
+                counter['evictions'] += 1
+
+    @property
+    def computing(self) -> bool:
+        """当前线程是否正在计算某个未命中的结果（嵌套调用直接透传，避免重复计数）"""
+        return getattr(self._local, 'depth', 0) > 0
+
+    @contextmanager
+    def compute(self):
+        """标记当前线程正在计算未命中的结果"""
+        self._local.depth = getattr(self._local, 'depth', 0) + 1
+        try:
+            yield
+        finally:
+            self._local.depth -= 1
+
+    def clear(self):
+        """清空缓存内容（保留统计）"""
+        with self._lock:
+            for entries in self._entries.values():
+                entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计信息
+
+        Returns:
+            dict: 总计和各方法的命中/未命中/淘汰次数及当前条数
+        """
+        with self._lock:
+            methods = {}
+            totals = {'hits': 0, 'misses': 0, 'evictions': 0}
+            for method, counter in self._counters.items():
+                methods[method] = dict(counter, entries=len(self._entries[method]))
+                for name in totals:
+                    totals[name] += counter[name]
+            lookups = totals['hits'] + totals['misses']
+            return dict(totals,
+                        hit_rate=totals['hits'] / lookups if lookups else 0.0,
+                        maxsize=self.maxsize,
+                        methods=methods)
+
+    def __repr__(self) -> str:
+        stats = self.get_stats()
+        return (f"TokenizerResultCache(maxsize={self.maxsize}, hits={stats['hits']}, "
+                f"misses={stats['misses']}, evictions={stats['evictions']})")
+
+
+def cached_result(func):
+    """
+    单条文本方法（cut/posseg/tokenize）的结果缓存装饰器
+    分词器未开启结果缓存时直接调用原方法；缓存键为(分词器配置, 文本)，
+    返回结果的副本，调用方修改返回的列表不会影响缓存
+    """
+    method = func.__name__
+
+    @wraps(func)
+    def wrapper(self, text):
+        cache = getattr(self, 'result_cache', None)
+        if cache is None or cache.computing or not isinstance(text, str):
+            return func(self, text)
+
+        key = (self.cache_config(), text)
+        value = cache.get(method, key)
+        if value is not None:
+            return list(value)
+
+        with cache.compute():
+            result = func(self, text)
+        cache.put(method, key, tuple(result))
+        return result
+
+    return wrapper
+
+
+def cached_batch(func):
+    """
+    批量方法（cut_batch/posseg_batch/tokenize_batch）的结果缓存装饰器
+    与对应的单条方法共用同一个LRU，只把未命中的文本交给原方法批量处理
+    """
+    method = func.__name__[:-len('_batch')]
+
+    @wraps(func)
+    def wrapper(self, texts):
+        cache = getattr(self, 'result_cache', None)
+        if cache is None or cache.computing:
+            return func(self, texts)
+
+        texts = list(texts)
+        config = self.cache_config()
+        results = [None] * len(texts)
+        pending = {}
+        for i, text in enumerate(texts):
+            if text in pending:
+                pending[text].append(i)
+                continue
+            value = cache.get(method, (config, text)) if isinstance(text, str) else None
+            if value is not None:
+                results[i] = list(value)
+            else:
+                pending[text] = [i]
+
+        if pending:
+            missing = list(pending)
+            with cache.compute():
+                outputs = func(self, missing)
+            for text, result in zip(missing, outputs):
+                indices = pending[text]
+                results[indices[0]] = result
+                for i in indices[1:]:
+                    results[i] = list(result)
+                if isinstance(text, str):
+                    cache.put(method, (config, text), tuple(result))
+        return results
+
+    return wrapper
@@ -0,0 +1,366 @@
+"""
+共享分词服务
+在单独的服务进程中加载一份分词模型，多个评估进程通过Unix socket（或TCP地址）
+以multiprocessing.managers协议提交批量分词请求，HanLP等大模型在一台机器上只占一份内存。
+
+服务端：start_tokenizer_service()在后台进程中启动服务，
+或 python -m text_tokenizers.tokenizers.service --address /tmp/tokenizers.sock --preload hanlp
+客户端：RemoteTokenizer实现BaseTokenizer接口，use_tokenizer_service()让工厂改为创建远程分词器
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+from multiprocessing.managers import BaseManager
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .base import BaseTokenizer, TokenizerInitError, TokenizerProcessError
+from .factory import TokenizerFactory
+from .result_cache import cached_result, cached_batch
+
+
+# 未指定认证密钥时读取的环境变量（独立启动的服务和客户端需要共用同一密钥）
+AUTHKEY_ENV = 'TEXT_TOKENIZERS_AUTHKEY'
+
+Address = Union[str, Tuple[str, int]]
+
+
+def _resolve_authkey(authkey: Optional[Union[str, bytes]]) -> bytes:
+    """
+    确定连接认证密钥：显式传入 > 环境变量 > 当前进程的authkey
+    （最后一种只对由同一父进程创建的服务和工作进程有效）
+    """
+    if authkey is None:
+        authkey = os.environ.get(AUTHKEY_ENV)
+    if authkey is None:
+        return bytes(multiprocessing.current_process().authkey)
+    if isinstance(authkey, str):
+        authkey = authkey.encode('utf-8')
+    return authkey
+
+
+def parse_address(text: str) -> Address:
+    """
+    解析命令行中的服务地址："主机:端口"为TCP地址，其余视为Unix socket路径
+
+    Args:
+        text (str): 地址字符串
+
+    Returns:
+        Address: Unix socket路径或(主机, 端口)
+    """
+    host, _, port = text.rpartition(':')
+    if host and port.isdigit() and '/' not in text:
+        return (host, int(port))
+    return text
+
+
+class TokenizerService:
+    """
+    服务进程中的分词服务对象
+    所有客户端连接共用一个实例，分词器实例由服务进程内的TokenizerFactory管理
+    （每个连接在服务端各有一个线程，分词器按各自的thread_policy共享或分线程创建）
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests: Dict[str, int] = {}
+        self._texts: Dict[str, int] = {}
+
+    def _tokenizer(self, name: str, texts: Optional[Sequence[str]] = None) -> BaseTokenizer:
+        """获取服务进程内的分词器实例并记录请求数"""
+        tokenizer = TokenizerFactory.get_tokenizer(name)
+        with self._lock:
+            self._requests[name] = self._requests.get(name, 0) + 1
+            self._texts[name] = self._texts.get(name, 0) + len(texts or ())
+        return tokenizer
+
+    def cut_batch(self, name: str, texts: List[str]) -> List[List[str]]:
+        """批量分词"""
+        return self._tokenizer(name, texts).cut_batch(texts)
+
+    def posseg_batch(self, name: str, texts: List[str]) -> List[List[Tuple[str, str]]]:
+        """批量词性标注"""
+        return self._tokenizer(name, texts).posseg_batch(texts)
+
+    def tokenize_batch(self, name: str, texts: List[str]) -> List[List[Tuple[str, int, int]]]:
+        """批量精确分词"""
+        return self._tokenizer(name, texts).tokenize_batch(texts)
+
+    def get_info(self, name: str) -> Dict[str, Any]:
+        """获取服务进程内分词器的信息（必要时加载分词器）"""
+        return self._tokenizer(name).get_info()
+
+    def get_cache_config(self, name: str) -> tuple:
+        """获取服务进程内分词器影响分词结果的配置（含服务端的自定义词典等选项）"""
+        return self._tokenizer(name).cache_config()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取服务统计信息
+
+        Returns:
+            dict: 服务进程号、已加载的分词器、各分词器的请求数和文本条数
+        """
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'loaded': sorted(TokenizerFactory._tokenizers),
+                'requests': dict(self._requests),
+                'texts': dict(self._texts),
+            }
+
+
+# 服务进程中唯一的服务对象
+_service = None
+_service_lock = threading.Lock()
+
+
+def _get_service() -> TokenizerService:
+    """返回服务进程中的服务对象（每个客户端拿到的代理都指向同一个对象）"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = TokenizerService()
+        return _service
+
+
+class TokenizerManager(BaseManager):
+    """分词服务的multiprocessing管理器"""
+    pass
+
+
+TokenizerManager.register('service', callable=_get_service)
+
+
+def _initialize_service(preload: Sequence[str], options: Dict[str, Dict[str, Any]]):
+    """
+    服务进程启动时配置并预加载分词器，使第一个客户端请求不必等待模型加载
+
+    Args:
+        preload (Sequence[str]): 预加载的分词器名称
+        options (dict): 分词器名称 -> 构造参数（见TokenizerFactory.configure_tokenizer）
+    """
+    for name, tokenizer_options in options.items():
+        TokenizerFactory.configure_tokenizer(name, **tokenizer_options)
+    for name in preload:
+        TokenizerFactory.get_tokenizer(name)
+
+
+def start_tokenizer_service(address: Optional[Address] = None,
+                            authkey: Optional[Union[str, bytes]] = None,
+                            preload: Sequence[str] = (),
+                            options: Optional[Dict[str, Dict[str, Any]]] = None) -> TokenizerManager:
+    """
+    在后台进程中启动分词服务
+    服务进程以spawn方式启动，不继承调用方已加载的模型和工厂配置
+
+    Args:
+        address: Unix socket路径或(主机, 端口)，None表示自动分配（通过返回值的address获取）
+        authkey: 连接认证密钥，None时依次使用环境变量TEXT_TOKENIZERS_AUTHKEY和当前进程的authkey
+        preload (Sequence[str]): 启动时预加载的分词器名称
+        options (dict): 分词器名称 -> 构造参数
+
+    Returns:
+        TokenizerManager: 已启动的管理器，调用shutdown()停止服务
+    """
+    manager = TokenizerManager(address=address, authkey=_resolve_authkey(authkey),
+                               ctx=multiprocessing.get_context('spawn'))
+    manager.start(initializer=_initialize_service, initargs=(list(preload), dict(options or {})))
+    return manager
+
+
+def serve_tokenizer_service(address: Address,
+                            authkey: Optional[Union[str, bytes]] = None,
+                            preload: Sequence[str] = (),
+                            options: Optional[Dict[str, Dict[str, Any]]] = None):
+    """
+    在当前进程中运行分词服务（阻塞，直到进程被终止）
+
+    Args:
+        address: Unix socket路径或(主机, 端口)
+        authkey: 连接认证密钥
+        preload (Sequence[str]): 启动时预加载的分词器名称
+        options (dict): 分词器名称 -> 构造参数
+    """
+    _initialize_service(list(preload), dict(options or {}))
+    manager = TokenizerManager(address=address, authkey=_resolve_authkey(authkey))
+    server = manager.get_server()
+    print(f"分词服务已启动: {server.address} (进程 {os.getpid()})")
+    server.serve_forever()
+
+
+class RemoteTokenizer(BaseTokenizer):
+    """
+    分词服务的客户端
+    接口与本地分词器一致，单条请求按只有一条文本的批量请求发送；
+    名称、版本和cache_config()取自服务端的分词器，结果缓存和预处理缓存的键与配置相同的本地分词器相同
+    """
+
+    description = '连接共享分词服务的远程分词器'
+    # 代理对象为每个线程分别建立连接，多线程共用一个实例
+    thread_policy = 'shared'
+
+    def __init__(self, tokenizer_name: str = 'jieba', address: Optional[Address] = None,
+                 authkey: Optional[Union[str, bytes]] = None):
+        """
+        Args:
+            tokenizer_name (str): 服务端使用的分词器名称
+            address: 服务地址（Unix socket路径或(主机, 端口)）
+            authkey: 连接认证密钥
+        """
+        super().__init__()
+        self.name = tokenizer_name
+        self.tokenizer_name = tokenizer_name
+        self.address = address
+        self.authkey = authkey
+        self._service = None
+        self._cache_config = None
+
+    def initialize(self) -> bool:
+        """
+        连接分词服务，并确认服务端的分词器可用
+
+        Returns:
+            bool: 初始化是否成功
+
+        Raises:
+            TokenizerInitError: 连接失败或服务端分词器加载失败时抛出
+        """
+        if self.address is None:
+            raise TokenizerInitError("未指定分词服务地址")
+        try:
+            manager = TokenizerManager(address=self.address, authkey=_resolve_authkey(self.authkey))
+            manager.connect()
+            self._service = manager.service()
+            info = self._service.get_info(self.tokenizer_name)
+            self._cache_config = tuple(self._service.get_cache_config(self.tokenizer_name))
+        except Exception as e:
+            raise TokenizerInitError(f"连接分词服务{self.address}失败: {str(e)}")
+
+        self.version = info.get('version', 'unknown')
+        self.is_initialized = True
+        return True
+
+    def _call(self, method: str, texts: Sequence[str]) -> list:
+        """向服务端发送批量请求"""
+        if not self.is_initialized:
+            raise TokenizerProcessError("远程分词器未连接")
+        texts = [self.validate_text(text) for text in texts]
+        try:
+            return getattr(self._service, method)(self.tokenizer_name, texts)
+        except TokenizerProcessError:
+            raise
+        except Exception as e:
+            raise TokenizerProcessError(f"分词服务请求失败: {str(e)}")
+
+    def cache_config(self) -> tuple:
+        """服务端分词器的配置（服务端以不同的词典等选项启动时缓存键不同）"""
+        if self._cache_config is not None:
+            return self._cache_config
+        return super().cache_config()
+
+    @cached_result
+    def cut(self, text: str) -> List[str]:
+        """基础分词功能"""
+        return self._call('cut_batch', [text])[0]
+
+    @cached_result
+    def posseg(self, text: str) -> List[Tuple[str, str]]:
+        """词性标注功能"""
+        return [tuple(pair) for pair in self._call('posseg_batch', [text])[0]]
+
+    @cached_result
+    def tokenize(self, text: str) -> List[Tuple[str, int, int]]:
+        """精确分词，返回词语及其在原文中的位置"""
+        return [tuple(token) for token in self._call('tokenize_batch', [text])[0]]
+
+    @cached_batch
+    def cut_batch(self, texts: Sequence[str]) -> List[List[str]]:
+        """批量分词，整批一次请求"""
+        return self._call('cut_batch', texts)
+
+    @cached_batch
+    def posseg_batch(self, texts: Sequence[str]) -> List[List[Tuple[str, str]]]:
+        """批量词性标注，整批一次请求"""
+        return [[tuple(pair) for pair in pairs] for pairs in self._call('posseg_batch', texts)]
+
+    @cached_batch
+    def tokenize_batch(self, texts: Sequence[str]) -> List[List[Tuple[str, int, int]]]:
+        """批量精确分词，整批一次请求"""
+        return [[tuple(token) for token in tokens] for tokens in self._call('tokenize_batch', texts)]
+
+    def get_service_stats(self) -> Dict[str, Any]:
+        """
+        获取服务端统计信息
+
+        Returns:
+            dict: 服务进程号、已加载的分词器、请求数和文本条数
+        """
+        if not self.is_initialized:
+            raise TokenizerProcessError("远程分词器未连接")
+        return self._service.get_stats()
+
+    def get_info(self) -> dict:
+        """
+        获取远程分词器信息
+
+        Returns:
+            dict: 服务端分词器的信息，附带服务地址
+        """
+        info = super().get_info()
+        if self.is_initialized:
+            remote = self._service.get_info(self.tokenizer_name)
+            remote.pop('result_cache', None)
+            info.update(remote)
+        info.update({
+            'class_name': self.__class__.__name__,
+            'description': self.description,
+            'service_address': self.address,
+        })
+        return info
+
+
+def use_tokenizer_service(address: Address, authkey: Optional[Union[str, bytes]] = None,
+                          names: Optional[Sequence[str]] = None):
+    """
+    让工厂改为通过分词服务创建分词器（ASRMetrics等调用方无需修改）
+
+    Args:
+        address: 服务地址
+        authkey: 连接认证密钥
+        names (Sequence[str]): 改用服务的分词器名称，None表示全部已注册的分词器
+    """
+    for name in names or TokenizerFactory.get_registered_tokenizers():
+        TokenizerFactory.register_tokenizer(name, RemoteTokenizer)
+        TokenizerFactory.configure_tokenizer(name, tokenizer_name=name, address=address, authkey=authkey)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """命令行入口：在前台运行分词服务"""
+    parser = argparse.ArgumentParser(description='共享分词服务')
+    parser.add_argument('--address', required=True,
+                        help='Unix socket路径，或"主机:端口"形式的TCP地址')
+    parser.add_argument('--preload', nargs='*', default=[],
+                        help='启动时预加载的分词器')
+    parser.add_argument('--user-dict', action='append', metavar='PATH',
+                        help='jieba自定义词典，可多次指定')
+    parser.add_argument('--dict-cache-dir', metavar='DIR',
+                        help='jieba前缀词典持久化缓存目录')
+    args = parser.parse_args(argv)
+
+    if os.environ.get(AUTHKEY_ENV) is None:
+        print(f"请通过环境变量{AUTHKEY_ENV}设置服务和客户端共用的认证密钥", file=sys.stderr)
+        return 1
+
+    options = {}
+    if args.user_dict or args.dict_cache_dir:
+        options['jieba'] = {'cache_dir': args.dict_cache_dir, 'user_dicts': args.user_dict}
+    serve_tokenizer_service(parse_address(args.address), preload=args.preload, options=options)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+紧凑的分词位置表示
+用两个array('i')保存每个词语的开始/结束位置，并用位图标记词语起点，
+词语和(字符, 位置)只在访问时从原文切片生成，不再为每个字符创建一个元组
+"""
+
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+
+class TokenSpans(Sequence):
+    """
+    分词结果的紧凑表示
+    作为序列使用时与tokenize()的返回值一致：每一项为(词语, 开始位置, 结束位置)，
+    但词语只在访问时从原文切片生成。分词器输出的词语与原文片段不一致时
+    （例如THULAC把全角字符转为半角），只为这些词语单独保存原始输出
+    """
+
+    __slots__ = ('text', 'starts', 'ends', 'boundaries', '_words', '_offsets')
+
+    def __init__(self, text: str):
+        """
+        创建空的分词结果，通常通过from_tokens()或single_characters()创建
+
+        Args:
+            text (str): 分词的原文（位置相对于该文本）
+        """
+        self.text = text
+        self.starts = array('i')
+        self.ends = array('i')
+        # 词语起点位图：第pos位为1表示有词语从原文第pos个字符开始
+        self.boundaries = bytearray((len(text) + 8) // 8)
+        # 与原文片段不一致的词语：下标 -> 分词器输出的词语
+        self._words: Dict[int, str] = {}
+        # 各词语在展开后的字符序列中的起始下标（首次按字符访问时计算）
+        self._offsets: Optional[array] = None
+
+    @classmethod
+    def from_tokens(cls, text: str, tokens: Iterable[Tuple[str, int, int]]) -> "TokenSpans":
+        """
+        由(词语, 开始位置, 结束位置)序列创建；tokens可以是生成器，逐项转换，不保留元组
+
+        Args:
+            text (str): 分词的原文
+            tokens (Iterable[Tuple[str, int, int]]): 分词结果
+
+        Returns:
+            TokenSpans: 紧凑的分词结果
+        """
+        spans = cls(text)
+        starts = spans.starts
+        ends = spans.ends
+        boundaries = spans.boundaries
+        for word, start, end in tokens:
+            if end - start != len(word) or not text.startswith(word, start):
+                spans._words[len(starts)] = word
+            starts.append(start)
+            ends.append(end)
+            if 0 <= start < len(text):
+                boundaries[start >> 3] |= 1 << (start & 7)
+        return spans
+
+    @classmethod
+    def single_characters(cls, text: str) -> "TokenSpans":
+        """
+        每个字符单独作为一个词语（分词失败时的回退表示）
+
+        Args:
+            text (str): 原文
+
+        Returns:
+            TokenSpans: 紧凑的分词结果
+        """
+        spans = cls(text)
+        spans.starts = array('i', range(len(text)))
+        spans.ends = array('i', range(1, len(text) + 1))
+        spans.boundaries = bytearray(b'\xff' * ((len(text) + 8) // 8))
+        return spans
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def word(self, index: int) -> str:
+        """第index个词语"""
+        word = self._words.get(index)
+        if word is None:
+            word = self.text[self.starts[index]:self.ends[index]]
+        return word
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("词语下标超出范围")
+        return (self.word(index), self.starts[index], self.ends[index])
+
+    def __iter__(self) -> Iterator[Tuple[str, int, int]]:
+        for index in range(len(self)):
+            yield (self.word(index), self.starts[index], self.ends[index])
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (TokenSpans, list, tuple)):
+            return len(self) == len(other) and all(a == tuple(b) for a, b in zip(self, other))
+        return NotImplemented
+
+    def words(self) -> Iterator[str]:
+        """依次生成词语"""
+        for index in range(len(self)):
+            yield self.word(index)
+
+    def is_boundary(self, pos: int) -> bool:
+        """是否有词语从原文第pos个字符开始"""
+        if not 0 <= pos < len(self.text):
+            return False
+        return bool(self.boundaries[pos >> 3] & (1 << (pos & 7)))
+
+    def characters(self) -> str:
+        """
+        全部词语依次拼接后的字符序列（与"".join(词语)一致）
+
+        Returns:
+            str: 字符序列
+        """
+        if not self._words and self._contiguous():
+            # 词语首尾相接时直接切片，不生成中间的词语字符串
+            return self.text[self.starts[0]:self.ends[-1]] if len(self) else ""
+        return "".join(self.words())
+
+    def _contiguous(self) -> bool:
+        """各词语是否首尾相接"""
+        starts = self.starts
+        ends = self.ends
+        return all(starts[i + 1] == ends[i] for i in range(len(starts) - 1))
+
+    def _character_offsets(self) -> array:
+        """各词语在字符序列中的起始下标，最后一项为字符总数"""
+        if self._offsets is None:
+            offsets = array('i', [0])
+            total = 0
+            for index in range(len(self)):
+                word = self._words.get(index)
+                total += len(word) if word is not None else self.ends[index] - self.starts[index]
+                offsets.append(total)
+            self._offsets = offsets
+        return self._offsets
+
+    def character_positions(self) -> "CharacterPositions":
+        """
+        (字符, 位置)视图，与逐个展开词语得到的元组列表一致
+
+        Returns:
+            CharacterPositions: 字符位置视图
+        """
+        return CharacterPositions(self)
+
+    @property
+    def nbytes(self) -> int:
+        """位置数组和位图占用的字节数（不含原文）"""
+        return (self.starts.itemsize * len(self.starts) + self.ends.itemsize * len(self.ends)
+                + len(self.boundaries))
+
+    def __repr__(self) -> str:
+        return f"TokenSpans(tokens={len(self)}, chars={len(self.text)}, nbytes={self.nbytes})"
+
+
+class CharacterPositions(Sequence):
+    """
+    TokenSpans上的(字符, 位置)只读视图
+    每个字符的元组在访问时才生成，位置为词语开始位置加字符在词语内的偏移
+    """
+
+    __slots__ = ('spans',)
+
+    def __init__(self, spans: TokenSpans):
+        self.spans = spans
+
+    def __len__(self) -> int:
+        return self.spans._character_offsets()[-1]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("字符下标超出范围")
+        offsets = self.spans._character_offsets()
+        token = bisect_right(offsets, index) - 1
+        offset = index - offsets[token]
+        return (self.spans.word(token)[offset], self.spans.starts[token] + offset)
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        spans = self.spans
+        for index in range(len(spans)):
+            start = spans.starts[index]
+            for offset, char in enumerate(spans.word(index)):
+                yield (char, start + offset)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (CharacterPositions, list, tuple)):
+            return len(self) == len(other) and all(a == tuple(b) for a, b in zip(self, other))
+        return NotImplemented
+
+    def characters(self) -> str:
+        """全部字符拼接成的字符串"""
+        return self.spans.characters()
+
+    def __repr__(self) -> str:
+        return f"CharacterPositions(chars={len(self)})"
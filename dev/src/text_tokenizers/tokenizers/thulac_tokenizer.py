@@ -3,8 +3,14 @@ THULAC分词器实现
 基于THULAC库的分词器，提供高精度中文分词
 """
 
+import unicodedata
 from typing import List, Tuple
 from .base import BaseTokenizer, TokenizerInitError, TokenizerProcessError
+from .result_cache import cached_result
+
+
+# THULAC输出与原文不一致时，在游标之后最多多看的字符数
+_RESYNC_WINDOW = 8
 
 
 class ThulacTokenizer(BaseTokenizer):
@@ -13,10 +19,21 @@ class ThulacTokenizer(BaseTokenizer):
     基于THULAC库，提供高精度中文分词和词性标注功能
     """
     
+    # 依赖的包（导入名和发行包名）及描述，供工厂在不加载模型的情况下探测和列出分词器
+    package = 'thulac'
+    distribution = 'thulac'
+    description = '基于THULAC库的中文分词器'
+    # THULAC的解码器在分词时复用实例内部的缓冲区，多线程同时调用会互相覆盖，每个线程各用一个实例
+    thread_policy = 'per_thread'
+    
     def __init__(self):
         super().__init__()
         self.name = "thulac"
         self.thu = None
+        # 最近一次分析的(文本, (词语, 词性)列表)，供cut/posseg/tokenize共享
+        self._last_analysis = None
+        # 计算位置时遇到的输出与原文不一致次数
+        self.offset_mismatches = 0
     
     def initialize(self) -> bool:
         """
@@ -78,6 +95,43 @@ class ThulacTokenizer(BaseTokenizer):
         except Exception as e:
             raise TokenizerInitError(f"THULAC分词器初始化失败: {str(e)}")
     
+    def _analyze(self, text: str) -> Tuple[str, List[Tuple[str, str]]]:
+        """
+        对文本调用一次THULAC，得到结构化的(词语, 词性)列表
+        同一文本连续以cut/posseg/tokenize多种方式请求时复用上一次的结果
+        （per_thread策略下每个线程各有实例，复用结果不会跨线程）
+        
+        Args:
+            text (str): 待分析的文本
+            
+        Returns:
+            Tuple[str, List[Tuple[str, str]]]: (验证后的文本, (词语, 词性)列表)
+            
+        Raises:
+            TokenizerProcessError: 分词器未初始化时抛出
+        """
+        if not self.is_initialized:
+            raise TokenizerProcessError("THULAC分词器未初始化")
+        
+        cleaned_text = self.validate_text(text)
+        if not cleaned_text:
+            return cleaned_text, []
+        
+        last = self._last_analysis
+        if last is not None and last[0] == cleaned_text:
+            return last
+        
+        # text=False时THULAC直接返回[词语, 词性]列表，无需再按空格和下划线解析字符串
+        pairs = []
+        for item in self.thu.cut(cleaned_text, text=False):
+            word = item[0]
+            pos = item[1] if len(item) > 1 and item[1] else 'unk'
+            pairs.append((word, pos))
+        
+        self._last_analysis = (cleaned_text, pairs)
+        return self._last_analysis
+    
+    @cached_result
     def cut(self, text: str) -> List[str]:
         """
         基础分词功能
@@ -92,32 +146,13 @@ class ThulacTokenizer(BaseTokenizer):
             TokenizerProcessError: 分词处理失败时抛出
         """
         try:
-            if not self.is_initialized:
-                raise TokenizerProcessError("THULAC分词器未初始化")
-            
-            cleaned_text = self.validate_text(text)
-            if not cleaned_text:
-                return []
-            
-            # 使用THULAC进行分词，只返回词语
-            result_text = self.thu.cut(cleaned_text, text=True)
-            # 分割成词语列表
-            words = result_text.split()
-            
-            # 提取词语部分（去掉词性标注）
-            result = []
-            for word in words:
-                if '_' in word:
-                    word_part = word.split('_')[0]
-                    result.append(word_part)
-                else:
-                    result.append(word)
-            
-            return result
+            _, pairs = self._analyze(text)
+            return [word for word, _ in pairs]
             
         except Exception as e:
             raise TokenizerProcessError(f"THULAC分词失败: {str(e)}")
     
+    @cached_result
     def posseg(self, text: str) -> List[Tuple[str, str]]:
         """
         词性标注功能
@@ -132,37 +167,17 @@ class ThulacTokenizer(BaseTokenizer):
             TokenizerProcessError: 词性标注失败时抛出
         """
         try:
-            if not self.is_initialized:
-                raise TokenizerProcessError("THULAC分词器未初始化")
-            
-            cleaned_text = self.validate_text(text)
-            if not cleaned_text:
-                return []
-            
-            # 使用THULAC进行词性标注
-            result_text = self.thu.cut(cleaned_text, text=True)
-            # 分割成词语列表
-            words = result_text.split()
-            
-            # 解析词语和词性
-            result = []
-            for word_pos in words:
-                if '_' in word_pos:
-                    word, pos = word_pos.split('_', 1)
-                    result.append((word, pos))
-                else:
-                    # 如果没有词性标注，使用默认值
-                    result.append((word_pos, 'unk'))
-            
-            return result
+            _, pairs = self._analyze(text)
+            return list(pairs)
             
         except Exception as e:
             raise TokenizerProcessError(f"THULAC词性标注失败: {str(e)}")
     
+    @cached_result
     def tokenize(self, text: str) -> List[Tuple[str, int, int]]:
         """
         精确分词，返回词语及其在原文中的位置
-        由于THULAC不直接提供位置信息，需要手动计算
+        由于THULAC不直接提供位置信息，用一次游标遍历计算
         
         Args:
             text (str): 待分词的文本
@@ -174,59 +189,55 @@ class ThulacTokenizer(BaseTokenizer):
             TokenizerProcessError: 分词处理失败时抛出
         """
         try:
-            if not self.is_initialized:
-                raise TokenizerProcessError("THULAC分词器未初始化")
-            
-            cleaned_text = self.validate_text(text)
-            if not cleaned_text:
-                return []
+            cleaned_text, pairs = self._analyze(text)
+            return self._locate_words(cleaned_text, [word for word, _ in pairs])
             
-            # 获取分词结果
-            words = self.cut(cleaned_text)
+        except Exception as e:
+            raise TokenizerProcessError(f"THULAC精确分词失败: {str(e)}")
+    
+    def _locate_words(self, text: str, words: List[str]) -> List[Tuple[str, int, int]]:
+        """
+        单次游标遍历计算词语位置，总耗时与文本长度成线性关系
+        
+        THULAC输出与原文不一致时的处理：
+        - 原文中的空白被THULAC丢弃：游标跳过空白
+        - 词语经过字符标准化（如全角转半角）：按NFKC比较，长度相同即视为对应原文片段
+        - 其他不一致：只在游标后很小的窗口内重新对齐，找不到时按词语长度近似定位，
+          不会像逐字符向前搜索那样跳到远处的同形词
+        
+        Args:
+            text (str): 验证后的文本
+            words (List[str]): 分词结果
             
-            # 手动计算位置信息
-            result = []
-            current_pos = 0
-            text_chars = list(cleaned_text)
+        Returns:
+            List[Tuple[str, int, int]]: (词语, 开始位置, 结束位置)的元组列表
+        """
+        result = []
+        pos = 0
+        length = len(text)
+        
+        for word in words:
+            word_len = len(word)
             
-            for word in words:
-                word_chars = list(word)
-                word_len = len(word_chars)
-                
-                # 在剩余文本中查找当前词语
-                start_pos = current_pos
-                found = False
-                
-                # 向前搜索匹配位置
-                while start_pos <= len(text_chars) - word_len:
-                    # 检查是否匹配
-                    match = True
-                    for i, char in enumerate(word_chars):
-                        if start_pos + i >= len(text_chars) or text_chars[start_pos + i] != char:
-                            match = False
-                            break
-                    
-                    if match:
-                        end_pos = start_pos + word_len
-                        result.append((word, start_pos, end_pos))
-                        current_pos = end_pos
-                        found = True
-                        break
-                    
-                    start_pos += 1
-                
-                # 如果没有找到匹配（可能由于分词结果与原文不一致），使用近似位置
-                if not found:
-                    end_pos = current_pos + word_len
-                    if end_pos > len(text_chars):
-                        end_pos = len(text_chars)
-                    result.append((word, current_pos, end_pos))
-                    current_pos = end_pos
+            # 跳过THULAC丢弃的空白
+            while pos < length and text[pos].isspace() and not word[:1].isspace():
+                pos += 1
             
-            return result
+            if text.startswith(word, pos):
+                start = pos
+            elif unicodedata.normalize('NFKC', text[pos:pos + word_len]) == unicodedata.normalize('NFKC', word):
+                start = pos
+                self.offset_mismatches += 1
+            else:
+                self.offset_mismatches += 1
+                found = text.find(word, pos, pos + word_len + _RESYNC_WINDOW)
+                start = found if found >= 0 else pos
             
-        except Exception as e:
-            raise TokenizerProcessError(f"THULAC精确分词失败: {str(e)}")
+            end = min(start + word_len, length)
+            result.append((word, start, end))
+            pos = end
+        
+        return result
     
     def get_info(self) -> dict:
         """
@@ -237,11 +248,12 @@ class ThulacTokenizer(BaseTokenizer):
         """
         info = super().get_info()
         info.update({
-            'description': '基于THULAC库的中文分词器',
+            'description': self.description,
             'features': ['分词', '词性标注', '精确位置分词'],
             'dependencies': ['thulac'],
             'performance': '中等',
             'accuracy': '高精度',
-            'note': 'tokenize方法使用手动位置计算，可能存在精度差异'
+            'offset_mismatches': self.offset_mismatches,
+            'note': 'tokenize方法根据分词结果在原文中定位，THULAC输出与原文不一致时位置为近似值'
         })
         return info 
\ No newline at end of file
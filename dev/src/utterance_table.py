@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kaldi/ESPnet风格的语句表读取与按语句编号连接
+语句表每行为"utt_id 转写文本"（编号与文本以第一个空白分隔，文本可以为空）。
+两个表都按编号排序（Kaldi的C locale排序，与Python字符串比较一致）时使用归并连接，
+只需常数内存；未排序时使用哈希连接，识别表超过内存上限后把两个表按编号哈希分区写入临时文件再逐区连接
+"""
+
+import os
+import shutil
+import tempfile
+import zlib
+from typing import Iterator, Optional, Tuple
+
+
+# 哈希连接在内存中保存的识别结果条数上限，超过后改为分区落盘
+DEFAULT_MAX_MEMORY_ITEMS = 200000
+
+# 落盘时的分区数
+DEFAULT_PARTITIONS = 64
+
+# 连接结果：(语句编号, 参考文本, 识别文本)，缺失的一侧为None
+JoinedUtterance = Tuple[str, Optional[str], Optional[str]]
+
+
+class UtteranceTableError(ValueError):
+    """语句表格式错误或编号重复"""
+    pass
+
+
+def parse_line(line: str) -> Optional[Tuple[str, str]]:
+    """
+    解析语句表的一行
+
+    Args:
+        line (str): 一行内容
+
+    Returns:
+        Optional[Tuple[str, str]]: (语句编号, 文本)，空行返回None
+    """
+    parts = line.strip().split(None, 1)
+    if not parts:
+        return None
+    return parts[0], parts[1] if len(parts) > 1 else ''
+
+
+def iter_table(path: str) -> Iterator[Tuple[str, str]]:
+    """
+    逐行读取语句表
+
+    Args:
+        path (str): 语句表路径
+
+    Yields:
+        Tuple[str, str]: (语句编号, 文本)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            item = parse_line(line)
+            if item is not None:
+                yield item
+
+
+def is_sorted_table(path: str) -> bool:
+    """
+    检查语句表是否按编号严格递增（只读取编号，不保留内容）
+
+    Args:
+        path (str): 语句表路径
+
+    Returns:
+        bool: 是否已排序且编号不重复
+    """
+    previous = None
+    for utt_id, _ in iter_table(path):
+        if previous is not None and utt_id <= previous:
+            return False
+        previous = utt_id
+    return True
+
+
+def _checked_order(items: Iterator[Tuple[str, str]], path: str) -> Iterator[Tuple[str, str]]:
+    """归并连接的输入检查：编号必须严格递增"""
+    previous = None
+    for utt_id, text in items:
+        if previous is not None and utt_id <= previous:
+            problem = "重复" if utt_id == previous else "未排序"
+            raise UtteranceTableError(f"{path}: 语句编号{problem}: {utt_id}（前一条为{previous}）")
+        previous = utt_id
+        yield utt_id, text
+
+
+def merge_join(ref_path: str, hyp_path: str) -> Iterator[JoinedUtterance]:
+    """
+    归并连接两个已按编号排序的语句表，按编号顺序产出，内存占用为常数
+
+    Args:
+        ref_path (str): 参考语句表路径
+        hyp_path (str): 识别语句表路径
+
+    Yields:
+        JoinedUtterance: (语句编号, 参考文本, 识别文本)
+
+    Raises:
+        UtteranceTableError: 编号未排序或重复时抛出
+    """
+    refs = _checked_order(iter_table(ref_path), ref_path)
+    hyps = _checked_order(iter_table(hyp_path), hyp_path)
+    ref = next(refs, None)
+    hyp = next(hyps, None)
+    while ref is not None or hyp is not None:
+        if hyp is None or ref is not None and ref[0] < hyp[0]:
+            yield ref[0], ref[1], None
+            ref = next(refs, None)
+        elif ref is None or hyp[0] < ref[0]:
+            yield hyp[0], None, hyp[1]
+            hyp = next(hyps, None)
+        else:
+            yield ref[0], ref[1], hyp[1]
+            ref = next(refs, None)
+            hyp = next(hyps, None)
+
+
+def _partition(path: str, directory: str, name: str, partitions: int):
+    """按编号的CRC32把语句表分区写入临时文件，返回各分区文件路径"""
+    paths = [os.path.join(directory, f"{name}.{i}") for i in range(partitions)]
+    files = [open(p, 'w', encoding='utf-8') for p in paths]
+    try:
+        for utt_id, text in iter_table(path):
+            index = zlib.crc32(utt_id.encode('utf-8')) % partitions
+            files[index].write(f"{utt_id} {text}\n")
+    finally:
+        for f in files:
+            f.close()
+    return paths
+
+
+def _load_table(path: str, source: Optional[str] = None) -> dict:
+    """读取语句表到字典，编号重复时抛出异常（source为报错时显示的原始路径）"""
+    table = {}
+    for utt_id, text in iter_table(path):
+        if utt_id in table:
+            raise UtteranceTableError(f"{source or path}: 语句编号重复: {utt_id}")
+        table[utt_id] = text
+    return table
+
+
+def _probe(ref_path: str, hyps: dict, source: Optional[str] = None) -> Iterator[JoinedUtterance]:
+    """
+    按参考表顺序在识别结果字典中查找，最后按编号顺序产出只有识别结果的语句
+    参考表中编号重复时抛出UtteranceTableError（source为报错时显示的原始参考表路径）
+    """
+    seen = set()
+    for utt_id, text in iter_table(ref_path):
+        if utt_id in seen:
+            raise UtteranceTableError(f"{source or ref_path}: 语句编号重复: {utt_id}")
+        seen.add(utt_id)
+        yield utt_id, text, hyps.pop(utt_id, None)
+    for utt_id in sorted(hyps):
+        yield utt_id, None, hyps[utt_id]
+
+
+def hash_join(ref_path: str, hyp_path: str,
+              max_memory_items: int = DEFAULT_MAX_MEMORY_ITEMS,
+              partitions: int = DEFAULT_PARTITIONS,
+              spill_dir: Optional[str] = None) -> Iterator[JoinedUtterance]:
+    """
+    哈希连接两个未排序的语句表
+    识别表不超过max_memory_items条时在内存中建哈希表，按参考表顺序产出；
+    否则把两个表分区写入临时目录，逐个分区连接（同一分区内按参考表顺序）
+
+    Args:
+        ref_path (str): 参考语句表路径
+        hyp_path (str): 识别语句表路径
+        max_memory_items (int): 内存中保存的识别结果条数上限
+        partitions (int): 落盘时的分区数
+        spill_dir (str): 临时文件所在目录，None表示系统临时目录
+
+    Yields:
+        JoinedUtterance: (语句编号, 参考文本, 识别文本)
+
+    Raises:
+        UtteranceTableError: 参考表或识别表中编号重复时抛出（与merge_join一致）
+    """
+    hyps = {}
+    for utt_id, text in iter_table(hyp_path):
+        if utt_id in hyps:
+            raise UtteranceTableError(f"{hyp_path}: 语句编号重复: {utt_id}")
+        hyps[utt_id] = text
+        if len(hyps) > max_memory_items:
+            break
+    else:
+        yield from _probe(ref_path, hyps)
+        return
+
+    # 识别表超过内存上限：丢弃已读入的部分，两个表都分区落盘
+    hyps = None
+    directory = tempfile.mkdtemp(prefix='utterance-join-', dir=spill_dir)
+    try:
+        ref_parts = _partition(ref_path, directory, 'ref', partitions)
+        hyp_parts = _partition(hyp_path, directory, 'hyp', partitions)
+        for ref_part, hyp_part in zip(ref_parts, hyp_parts):
+            # 同一编号总是落在同一分区，逐分区检查重复即可覆盖整个参考表
+            yield from _probe(ref_part, _load_table(hyp_part, hyp_path), ref_path)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def join_tables(ref_path: str, hyp_path: str, assume_sorted: Optional[bool] = None,
+                max_memory_items: int = DEFAULT_MAX_MEMORY_ITEMS,
+                spill_dir: Optional[str] = None) -> Iterator[JoinedUtterance]:
+    """
+    按语句编号连接参考表和识别表
+
+    Args:
+        ref_path (str): 参考语句表路径
+        hyp_path (str): 识别语句表路径
+        assume_sorted (bool): True时直接归并连接（遇到未排序的编号时报错），
+            False时使用哈希连接，None时先检查两个表是否都已排序
+        max_memory_items (int): 哈希连接内存中保存的识别结果条数上限
+        spill_dir (str): 哈希连接落盘的临时目录
+
+    Yields:
+        JoinedUtterance: (语句编号, 参考文本, 识别文本)，缺失的一侧为None
+    """
+    if assume_sorted is None:
+        assume_sorted = is_sorted_table(ref_path) and is_sorted_table(hyp_path)
+    if assume_sorted:
+        return merge_join(ref_path, hyp_path)
+    return hash_join(ref_path, hyp_path, max_memory_items=max_memory_items, spill_dir=spill_dir)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+对齐回退实现内存基准
+对比完整DP矩阵回溯与Hirschberg线性内存对齐的峰值内存（python-Levenshtein不可用时的回退路径）
+每个长度在独立子进程中运行，读取子进程的峰值RSS
+
+运行方式:
+    python tests/benchmark_alignment_memory.py
+"""
+
+import sys
+import os
+# 添加src目录到Python路径
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../dev/src')
+sys.path.insert(0, SRC_DIR)
+
+import resource
+import subprocess
+import time
+
+from benchmark_edit_distance import make_pair
+
+
+# 完整DP矩阵在该长度以上内存占用过大，不再测试
+FULL_DP_MAX_LENGTH = 10000
+
+
+def run_single(backend: str, length: int):
+    """在当前进程中执行一次对齐，输出 距离,耗时,峰值RSS(KB)"""
+    sys.path.insert(0, SRC_DIR)
+    from alignment import align
+
+    ref, hyp = make_pair(length, seed=length)
+    start = time.perf_counter()
+    result = align(ref, hyp, backend=backend, linear_memory_threshold=None)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss在Linux上单位为KB
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{result.distance},{elapsed:.4f},{peak}")
+
+
+def measure(backend: str, length: int):
+    """在子进程中执行对齐，返回(编辑距离, 耗时秒数, 峰值RSS MB)"""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--single', backend, str(length)],
+        capture_output=True, text=True, check=True
+    ).stdout.strip()
+    distance, elapsed, peak = output.split(',')
+    return int(distance), float(elapsed), int(peak) / 1024
+
+
+def run_benchmark(lengths=(1000, 2000, 5000, 10000, 20000, 40000)):
+    """运行基准测试并打印结果表"""
+    from alignment import FALLBACK_BACKEND
+
+    print("=" * 78)
+    print(f"对齐回退实现内存基准（完整矩阵后端: {FALLBACK_BACKEND}）")
+    print("=" * 78)
+    print(f"{'长度':>8} | {'完整矩阵耗时':>10} | {'完整矩阵RSS':>10} | {'Hirschberg耗时':>12} | {'Hirschberg RSS':>14}")
+    print("-" * 78)
+
+    for length in lengths:
+        h_dist, h_time, h_rss = measure('hirschberg', length)
+
+        if length <= FULL_DP_MAX_LENGTH:
+            f_dist, f_time, f_rss = measure(FALLBACK_BACKEND, length)
+            assert f_dist == h_dist, "Hirschberg编辑距离与完整矩阵不一致"
+            full_text = f"{f_time:10.2f}s | {f_rss:8.1f}MB"
+        else:
+            full_text = f"{'(跳过)':>10} | {'-':>10}"
+
+        print(f"{length:>8} | {full_text} | {h_time:12.2f}s | {h_rss:12.1f}MB")
+
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == '--single':
+        run_single(sys.argv[2], int(sys.argv[3]))
+    else:
+        run_benchmark()
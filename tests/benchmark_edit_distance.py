@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+编辑距离回退实现性能基准
+对比原有的嵌套列表动态规划与位并行算法（python-Levenshtein不可用时的回退路径）
+
+运行方式:
+    python tests/benchmark_edit_distance.py
+"""
+
+import sys
+import os
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+import random
+import time
+
+from alignment import bitparallel_distance, build_pattern_masks
+
+try:
+    import Levenshtein
+except ImportError:
+    Levenshtein = None
+
+
+# 嵌套列表DP在该长度以上耗时过长，不再测试
+LEGACY_MAX_LENGTH = 3000
+
+
+def legacy_edit_distance(s1: str, s2: str) -> int:
+    """原有的(m+1)×(n+1)嵌套列表动态规划实现，作为对比基线"""
+    if len(s1) == 0:
+        return len(s2)
+    if len(s2) == 0:
+        return len(s1)
+
+    matrix = [[0] * (len(s2) + 1) for _ in range(len(s1) + 1)]
+    for i in range(len(s1) + 1):
+        matrix[i][0] = i
+    for j in range(len(s2) + 1):
+        matrix[0][j] = j
+
+    for i in range(1, len(s1) + 1):
+        for j in range(1, len(s2) + 1):
+            cost = 0 if s1[i-1] == s2[j-1] else 1
+            matrix[i][j] = min(
+                matrix[i-1][j] + 1,
+                matrix[i][j-1] + 1,
+                matrix[i-1][j-1] + cost
+            )
+
+    return matrix[len(s1)][len(s2)]
+
+
+def make_pair(length: int, error_rate: float = 0.1, seed: int = 0):
+    """生成模拟ASR结果的文本对：参考文本随机，假设文本按错误率随机替换/删除/插入"""
+    rng = random.Random(seed)
+    alphabet = "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经"
+    ref = ''.join(rng.choice(alphabet) for _ in range(length))
+
+    hyp = []
+    for char in ref:
+        roll = rng.random()
+        if roll < error_rate / 3:
+            hyp.append(rng.choice(alphabet))      # 替换
+        elif roll < error_rate * 2 / 3:
+            continue                              # 删除
+        elif roll < error_rate:
+            hyp.append(char)
+            hyp.append(rng.choice(alphabet))      # 插入
+        else:
+            hyp.append(char)
+    return ref, ''.join(hyp)
+
+
+def timed(func, *args):
+    """执行函数并返回(结果, 耗时秒数)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run_benchmark(lengths=(100, 500, 1000, 2000, 3000, 5000, 10000, 20000)):
+    """运行基准测试并打印结果表"""
+    print("=" * 78)
+    print("编辑距离回退实现性能基准")
+    print("=" * 78)
+    print(f"{'长度':>8} | {'嵌套列表DP':>12} | {'位并行':>10} | {'位并行(预计算)':>14} | {'加速比':>8} | {'Levenshtein':>11}")
+    print("-" * 78)
+
+    for length in lengths:
+        ref, hyp = make_pair(length, seed=length)
+
+        bp_result, bp_time = timed(bitparallel_distance, ref, hyp)
+
+        # 预计算参考文本的位掩码后再计算，模拟同一参考文本多次评估
+        masks = build_pattern_masks(ref)
+        _, bp_pre_time = timed(bitparallel_distance, ref, hyp, masks)
+
+        if length <= LEGACY_MAX_LENGTH:
+            legacy_result, legacy_time = timed(legacy_edit_distance, ref, hyp)
+            assert legacy_result == bp_result, "位并行结果与基线不一致"
+            legacy_text = f"{legacy_time:10.4f}s"
+            speedup_text = f"{legacy_time / bp_time:7.1f}x"
+        else:
+            legacy_text = f"{'(跳过)':>11}"
+            speedup_text = f"{'-':>8}"
+
+        if Levenshtein is not None:
+            lev_result, lev_time = timed(Levenshtein.distance, ref, hyp)
+            assert lev_result == bp_result, "位并行结果与Levenshtein不一致"
+            lev_text = f"{lev_time:10.4f}s"
+        else:
+            lev_text = f"{'未安装':>9}"
+
+        print(f"{length:>8} | {legacy_text:>12} | {bp_time:9.4f}s | {bp_pre_time:13.4f}s | {speedup_text:>8} | {lev_text:>11}")
+
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导入耗时基准
+用 python -X importtime 统计 import cli 的累计导入耗时，列出最耗时的模块，
+并与同时导入jieba分词器（旧版在导入text_tokenizers时总会发生）的耗时对比
+
+运行方式:
+    python tests/benchmark_import_time.py [重复次数]
+"""
+
+import sys
+import os
+import subprocess
+import statistics
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../dev/src')
+
+# 旧版 text_tokenizers/__init__.py 会立即导入全部分词器实现，其中jieba_tokenizer在模块级导入jieba
+EAGER_STATEMENT = "import cli; from text_tokenizers import JiebaTokenizer; JiebaTokenizer()"
+
+
+def import_times(statement: str):
+    """在子进程中执行导入语句，返回{模块名（保留表示嵌套层级的缩进）: 累计导入耗时(微秒)}"""
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True
+    ).stderr
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        times[module.rstrip()] = int(cumulative)
+    return times
+
+
+def total_time(statement: str, repeat: int) -> float:
+    """多次运行取中位数，返回全部顶层导入的累计耗时(毫秒)"""
+    samples = []
+    for _ in range(repeat):
+        times = import_times(statement)
+        # 顶层模块（只有一个前导空格）的累计耗时之和
+        samples.append(sum(t for name, t in times.items() if len(name) - len(name.lstrip()) == 1) / 1000)
+    return statistics.median(samples)
+
+
+def run_benchmark(repeat: int = 5):
+    """运行基准测试并打印结果"""
+    times = import_times("import cli")
+    print("=" * 60)
+    print("import cli 最耗时的模块（累计耗时）")
+    print("=" * 60)
+    for module, cumulative in sorted(times.items(), key=lambda item: -item[1])[:10]:
+        print(f"{cumulative / 1000:>10.1f} ms  {module.strip()}")
+    print(f"\njieba已导入: {'是' if any(m.strip().startswith('jieba') for m in times) else '否'}")
+
+    lazy = total_time("import cli", repeat)
+    eager = total_time(EAGER_STATEMENT, repeat)
+    print("=" * 60)
+    print(f"import cli（按需导入分词器）:     {lazy:>8.1f} ms")
+    print(f"import cli + 导入jieba分词器:      {eager:>8.1f} ms")
+    print(f"节省:                             {eager - lazy:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试统一对齐引擎（alignment模块）
+验证各后端结果一致，以及操作块、高亮和差异序列都来自同一条对齐路径
+"""
+
+import sys
+import os
+import random
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+import alignment
+from alignment import align, editops_to_ops, OP_EQUAL
+
+
+def _available_backends():
+    """当前环境中可用的具体后端"""
+    backends = ['python']
+    if alignment.np is not None:
+        backends.append('numpy')
+    if alignment.Levenshtein is not None:
+        backends.append('levenshtein')
+    return backends
+
+
+def _random_pairs(count=60, seed=42):
+    """生成随机字符串对，字符集较小以产生大量平局路径"""
+    rng = random.Random(seed)
+    alphabet = "今天气很好不abc"
+    pairs = []
+    for _ in range(count):
+        ref = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        hyp = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        pairs.append((ref, hyp))
+    return pairs
+
+
+FIXED_PAIRS = [
+    ("abcdef", "axcxef"),
+    ("abcdef", "abef"),
+    ("abef", "abcdef"),
+    ("kitten", "sitting"),
+    ("今天天气很好", "今天天气不好"),
+    ("abc", ""),
+    ("", "abc"),
+    ("", ""),
+]
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("backend", _available_backends())
+def test_fixed_cases(backend):
+    """固定用例的S/D/I统计"""
+    expected = {
+        ("abcdef", "axcxef"): (2, 0, 0),
+        ("abcdef", "abef"): (0, 2, 0),
+        ("abef", "abcdef"): (0, 0, 2),
+        ("今天天气很好", "今天天气不好"): (1, 0, 0),
+        ("abc", ""): (0, 3, 0),
+        ("", "abc"): (0, 0, 3),
+        ("", ""): (0, 0, 0),
+    }
+    for (ref, hyp), counts in expected.items():
+        assert align(ref, hyp, backend=backend).counts() == counts
+    assert align("kitten", "sitting", backend=backend).distance == 3
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_backends_agree():
+    """所有后端的编辑距离一致；numpy与纯Python回溯路径完全相同"""
+    backends = _available_backends()
+    for ref, hyp in _random_pairs():
+        results = {b: align(ref, hyp, backend=b) for b in backends}
+        distances = {r.distance for r in results.values()}
+        assert len(distances) == 1, (ref, hyp, results)
+        if 'numpy' in results:
+            assert results['numpy'].ops == results['python'].ops
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("backend", _available_backends())
+def test_opcodes_reconstruct_both_sides(backend):
+    """操作块覆盖两侧全部字符，equal块内容一致"""
+    for ref, hyp in FIXED_PAIRS + _random_pairs(20, seed=7):
+        result = align(ref, hyp, backend=backend)
+        opcodes = result.get_opcodes()
+        ref_rebuilt = ''.join(ref[i1:i2] for _, i1, i2, _, _ in opcodes)
+        hyp_rebuilt = ''.join(hyp[j1:j2] for _, _, _, j1, j2 in opcodes)
+        assert ref_rebuilt == ref and hyp_rebuilt == hyp
+        for tag, i1, i2, j1, j2 in opcodes:
+            if tag == 'equal':
+                assert ref[i1:i2] == hyp[j1:j2]
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_editops_roundtrip():
+    """逐列操作数组与editops格式可以互相转换"""
+    for ref, hyp in FIXED_PAIRS + _random_pairs(20, seed=3):
+        result = align(ref, hyp, backend='python')
+        editops = result.get_editops()
+        assert editops_to_ops(editops, len(ref), len(hyp)) == result.ops
+        assert result.hits == result.ops.count(OP_EQUAL)
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_highlights_and_diff_follow_alignment():
+    """高亮和差异序列与统计数字一致"""
+    result = align("我来到北京清华大学", "我来到背景清大学")
+    ref_hl, hyp_hl = result.highlights()
+    assert ref_hl == "我来到[北京]清[华]大学"
+    assert hyp_hl == "我来到[背景]清大学"
+
+    diff = result.diff_sequence()
+    assert diff.count('- ') == result.substitutions + result.deletions
+    assert diff.count('+ ') == result.substitutions + result.insertions
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_invalid_backend():
+    """不支持的后端应抛出异常"""
+    with pytest.raises(ValueError):
+        align("a", "b", backend='gpu')
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_bitparallel_distance_parity():
+    """位并行编辑距离与完整DP结果完全一致（含长于64字符、跨机器字的文本）"""
+    rng = random.Random(2024)
+    for _ in range(300):
+        ref = ''.join(rng.choice("今天气很好不abc") for _ in range(rng.randint(0, 200)))
+        hyp = ''.join(rng.choice("今天气很好不abc") for _ in range(rng.randint(0, 200)))
+        expected = align(ref, hyp, backend='python').distance
+        assert alignment.bitparallel_distance(ref, hyp) == expected, (ref, hyp)
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_bitparallel_with_precomputed_masks():
+    """预计算的参考文本位掩码可以重复用于多个假设文本"""
+    ref = "我来到北京清华大学" * 20
+    masks = alignment.build_pattern_masks(ref)
+    for hyp in ["我来到北京清大学" * 20, "", ref, "完全不同"]:
+        assert alignment.bitparallel_distance(ref, hyp, masks) == align(ref, hyp, backend='python').distance
+
+
+def _check_alignment_consistency(result):
+    """对齐结果的S/D/I与两侧长度、编辑距离相互一致，且操作块能还原两侧文本"""
+    ref, hyp = result.ref, result.hyp
+    assert result.hits + result.substitutions + result.deletions == len(ref)
+    assert result.hits + result.substitutions + result.insertions == len(hyp)
+    for tag, i1, i2, j1, j2 in result.get_opcodes():
+        if tag == 'equal':
+            assert ref[i1:i2] == hyp[j1:j2]
+        elif tag == 'replace':
+            assert all(a != b for a, b in zip(ref[i1:i2], hyp[j1:j2]))
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_hirschberg_matches_full_dp(monkeypatch, use_numpy):
+    """Hirschberg分治对齐的编辑距离与完整DP一致（强制很小的基础块以覆盖多层递归）"""
+    if use_numpy and alignment.np is None:
+        pytest.skip("numpy未安装")
+    if not use_numpy:
+        monkeypatch.setattr(alignment, 'np', None)
+
+    rng = random.Random(11)
+    for _ in range(150):
+        ref = ''.join(rng.choice("今天气很好不abc") for _ in range(rng.randint(0, 80)))
+        hyp = ''.join(rng.choice("今天气很好不abc") for _ in range(rng.randint(0, 80)))
+        ops = alignment.hirschberg_ops(ref, hyp, base_cells=16)
+        result = alignment.Alignment(ref, hyp, ops, 'hirschberg')
+        assert result.distance == alignment.bitparallel_distance(ref, hyp), (ref, hyp)
+        _check_alignment_consistency(result)
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_linear_memory_threshold_switches_backend():
+    """回退实现超过阈值时切换到Hirschberg，原生Levenshtein后端不受影响"""
+    ref, hyp = "我来到北京清华大学" * 30, "我来到背景清大学" * 30
+    fallback = alignment.FALLBACK_BACKEND
+
+    full = align(ref, hyp, backend=fallback, linear_memory_threshold=None)
+    linear = align(ref, hyp, backend=fallback, linear_memory_threshold=1000)
+    assert full.backend == fallback
+    assert linear.backend == 'hirschberg'
+    assert linear.distance == full.distance
+    _check_alignment_consistency(linear)
+
+    assert align(ref, hyp, backend='hirschberg').distance == full.distance
+    if alignment.Levenshtein is not None:
+        assert align(ref, hyp, backend='levenshtein', linear_memory_threshold=1000).backend == 'levenshtein'
+
+
+def _long_pair(length, seed):
+    """生成带少量随机错误的长文本对"""
+    rng = random.Random(seed)
+    alphabet = "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工"
+    ref = ''.join(rng.choice(alphabet) for _ in range(length))
+    hyp = ''.join(c if rng.random() > 0.08 else rng.choice(alphabet) for c in ref if rng.random() > 0.02)
+    return ref, hyp
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_find_anchors_are_monotonic_and_match():
+    """锚点两侧内容一致、单调且互不重叠"""
+    ref, hyp = _long_pair(3000, seed=1)
+    anchors = alignment.find_anchors(ref, hyp, k=8)
+    assert anchors
+    assert alignment.anchors_are_monotonic(anchors)
+    for ref_pos, hyp_pos, length in anchors:
+        assert ref[ref_pos:ref_pos + length] == hyp[hyp_pos:hyp_pos + length]
+
+    assert not alignment.anchors_are_monotonic([(10, 5, 4), (12, 20, 4)])
+    assert alignment.find_anchors("短文本", "短文本", k=8) == []
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_segmented_align_is_upper_bound_and_reports_exactness():
+    """分段对齐的编辑距离不小于精确值，exact标记与精确值比较结果一致"""
+    for seed in range(10):
+        ref, hyp = _long_pair(1500, seed=seed)
+        expected = alignment.bitparallel_distance(ref, hyp)
+        result = alignment.segmented_align(ref, hyp, anchor_length=6, verify=True)
+        assert result.backend.startswith('segmented:')
+        assert result.distance >= expected
+        assert result.exact == (result.distance == expected)
+        _check_alignment_consistency(result)
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_segmented_align_without_verify():
+    """不做精确校验时只有达到下界才标记为精确；没有锚点时退化为完整对齐"""
+    ref = "今天天气很好我们一起去公园散步吧" * 3
+    hyp = ref.replace("公园", "公圆")
+    result = alignment.segmented_align(ref, hyp, anchor_length=6)
+    assert result.counts() == (3, 0, 0)
+    assert result.exact is True
+
+    short = alignment.segmented_align("abc", "abd", anchor_length=6)
+    assert short.exact is True
+    assert short.distance == 1
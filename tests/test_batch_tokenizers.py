@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试批量分词接口（cut_batch / posseg_batch / tokenize_batch）
+以及ASRMetrics的批量评估路径
+"""
+
+import sys
+import os
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+from text_tokenizers import get_tokenizer, HanlpTokenizer
+from asr_metrics_refactored import ASRMetrics
+from preprocess_cache import PreprocessCache
+from result_store import ResultStore
+from manifest import PairRecord
+import cli
+
+
+TEXTS = [
+    "我来到北京清华大学",
+    "",
+    "   ",
+    "  今天天气很好，我们去公园散步吧 ",
+    "第一行\n第二行",
+    "Hello World 你好世界",
+    "嗯",
+    "我来到北京清华大学",
+]
+
+PAIRS = [
+    ("我来到北京清华大学", "我来到北京清大学"),
+    ("嗯，这个问题啊，我们需要讨论一下", "这个问题我们需要讨论"),
+    ("ＡＳＲ测试123，Hello World", "asr测试123 hello word"),
+    ("", "多出来的内容"),
+    ("我来到北京清华大学", ""),
+    ("好", "好"),
+]
+
+
+class StubTokModel:
+    """离线HanLP分词模型替身：按字切分，记录每次调用的输入"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, data):
+        self.calls.append(data)
+        if isinstance(data, str):
+            return list(data)
+        return [list(text) for text in data]
+
+
+class StubPosModel:
+    """离线HanLP词性标注模型替身"""
+
+    def __call__(self, data):
+        if data and isinstance(data[0], list):
+            return [['n'] * len(words) for words in data]
+        return ['n'] * len(data)
+
+
+def _stub_hanlp(batch_size=2):
+    """使用离线替身模型的HanLP分词器"""
+    tokenizer = HanlpTokenizer()
+    tokenizer.tok_model = StubTokModel()
+    tokenizer.pos_model = StubPosModel()
+    tokenizer.batch_size = batch_size
+    tokenizer.is_initialized = True
+    return tokenizer
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("parallel", [False, True])
+def test_jieba_batch_matches_single(parallel):
+    """jieba批量接口（含并行模式）与逐条调用结果一致"""
+    tokenizer = get_tokenizer('jieba')
+    texts = TEXTS * 20
+    expected = ([tokenizer.cut(t) for t in texts], [tokenizer.posseg(t) for t in texts],
+                [tokenizer.tokenize(t) for t in texts])
+
+    old = (tokenizer.parallel_min_chars, tokenizer.parallel_workers)
+    if parallel:
+        if os.name != 'posix':
+            pytest.skip("jieba并行模式只支持POSIX系统")
+        tokenizer.parallel_min_chars, tokenizer.parallel_workers = 0, 2
+    try:
+        assert tokenizer.cut_batch(texts) == expected[0]
+        assert tokenizer.posseg_batch(texts) == expected[1]
+        assert tokenizer.tokenize_batch(texts) == expected[2]
+    finally:
+        tokenizer.parallel_min_chars, tokenizer.parallel_workers = old
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_hanlp_batches_are_lists_bucketed_by_length():
+    """HanLP批量分词把按长度分桶的文本列表送入模型，结果顺序与输入一致"""
+    tokenizer = _stub_hanlp(batch_size=2)
+    texts = ["四个字啊", "一", "", "五个字的句", "两字", "三个字"]
+    result = tokenizer.cut_batch(texts)
+
+    assert result == [list(t) for t in texts]
+    assert tokenizer.tok_model.calls == [["一", "两字"], ["三个字", "四个字啊"], ["五个字的句"]]
+
+    assert tokenizer.posseg_batch(texts)[0] == [(c, 'n') for c in "四个字啊"]
+    tokens = tokenizer.tokenize_batch(["  前后空格 ", "今天"])
+    assert tokens == [[('前', 0, 1), ('后', 1, 2), ('空', 2, 3), ('格', 3, 4)],
+                      [('今', 0, 1), ('天', 1, 2)]]
+    assert tokens[0] == tokenizer.tokenize("  前后空格 ")
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("mode", ["token", "char"])
+@pytest.mark.parametrize("filter_fillers", [False, True])
+def test_evaluate_batch_matches_evaluate_pair(mode, filter_fillers):
+    """evaluate_batch与逐对调用evaluate_pair结果一致"""
+    metrics = ASRMetrics('jieba', evaluation_mode=mode)
+    expected = [metrics.evaluate_pair(r, h, filter_fillers) for r, h in PAIRS]
+    assert metrics.evaluate_batch(PAIRS, filter_fillers) == expected
+    assert metrics.preprocess_batch(TEXTS, filter_fillers) == [
+        metrics.preprocess_text(t, filter_fillers) for t in TEXTS
+    ]
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_evaluate_batch_uses_batch_api_and_cache():
+    """批量评估只调用分词器的批量接口，重复文本只处理一次并写入预处理缓存"""
+    cache = PreprocessCache()
+    metrics = ASRMetrics('jieba', evaluation_mode='token', preprocess_cache=cache)
+    metrics.tokenizer = _stub_hanlp(batch_size=4)
+
+    results = metrics.evaluate_batch(PAIRS[:3] * 2, include_diff=False)
+    assert [r['metrics'] for r in results[:3]] == [r['metrics'] for r in results[3:]]
+    # 一次分词预处理 + 一次字符定位，每次按batch_size=4分桶
+    assert all(isinstance(call, list) and len(call) <= 4 for call in metrics.tokenizer.tok_model.calls)
+    assert len(metrics.tokenizer.tok_model.calls) == 4
+
+    metrics.evaluate_batch(PAIRS[:3], include_diff=False)
+    assert len(metrics.tokenizer.tok_model.calls) == 4
+    assert cache.get_stats()['hits'] == 12
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_evaluate_batch_consults_result_store(tmp_path):
+    """批量评估与evaluate_pair共用结果库，只预处理未命中的文本对"""
+    store = ResultStore(str(tmp_path / "results.db"))
+    metrics = ASRMetrics('jieba', evaluation_mode='char', result_store=store)
+    expected = [ASRMetrics('jieba', evaluation_mode='char').evaluate_pair(r, h) for r, h in PAIRS]
+    metrics.evaluate_pair(*PAIRS[0])
+
+    processed = []
+    original = metrics.preprocess_batch
+    metrics.preprocess_batch = lambda texts, *a: processed.extend(texts) or original(texts, *a)
+    assert metrics.evaluate_batch(PAIRS) == expected
+    assert len(processed) == 2 * (len(PAIRS) - 1)
+    assert [r['diff_sequence'] for r in metrics.evaluate_batch(PAIRS, include_diff=False)] == [''] * len(PAIRS)
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_cli_records_use_evaluate_batch(monkeypatch):
+    """清单记录按块调用evaluate_batch；整批失败时逐条评估，出错的记录单独报告"""
+    metrics = ASRMetrics('jieba', evaluation_mode='char')
+    records = [PairRecord(line=i, utt_id=f"u{i}", ref=r, hyp=h) for i, (r, h) in enumerate(PAIRS)]
+    records.append(PairRecord(line=99, utt_id="bad", ref_path="/missing/ref.txt", hyp="x"))
+    calls = []
+    original = metrics.evaluate_batch
+    monkeypatch.setattr(metrics, 'evaluate_batch', lambda texts, *a, **k: calls.append(len(texts))
+                        or original(texts, *a, **k))
+    outputs = cli._evaluate_records(metrics, records, False)
+    assert calls == [len(PAIRS)]
+    assert [key for key, _, _, _ in outputs] == [r.key for r in records]
+    assert outputs[-1][2] is None and outputs[-1][3]
+    expected = [metrics.evaluate_pair(r, h, include_diff=False)['metrics']['cer'] for r, h in PAIRS]
+    assert [result['cer'] for _, _, result, _ in outputs[:-1]] == expected
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("batch failed")
+    monkeypatch.setattr(metrics, 'evaluate_batch', broken)
+    fallback = cli._evaluate_records(metrics, records[:2], False)
+    assert [result['cer'] for _, _, result, _ in fallback] == expected[:2]
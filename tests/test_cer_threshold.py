@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试带CER阈值的提前结束计算（calculate_cer的max_cer参数和cli.py的--max-cer分诊模式）
+"""
+
+import sys
+import os
+import random
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+import alignment
+from asr_metrics_refactored import ASRMetrics, ABOVE_THRESHOLD
+import cli
+
+
+def _available_backends():
+    """当前环境中可用的距离后端"""
+    backends = ['python']
+    if alignment.Levenshtein is not None:
+        backends.append('levenshtein')
+    return backends
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("backend", _available_backends())
+def test_distance_score_cutoff(backend):
+    """超过上限时返回score_cutoff + 1，否则返回精确距离"""
+    rng = random.Random(7)
+    for _ in range(200):
+        ref = ''.join(rng.choice("今天气很好不abc") for _ in range(rng.randint(0, 60)))
+        hyp = ''.join(rng.choice("今天气很好不abc") for _ in range(rng.randint(0, 60)))
+        exact = alignment.bitparallel_distance(ref, hyp)
+        cutoff = rng.randint(0, 40)
+        result = alignment.distance(ref, hyp, backend=backend, score_cutoff=cutoff)
+        assert result == (exact if exact <= cutoff else cutoff + 1), (ref, hyp, cutoff)
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_calculate_cer_with_threshold():
+    """未超过阈值时返回精确CER，超过时返回ABOVE_THRESHOLD"""
+    metrics = ASRMetrics('jieba', evaluation_mode='char')
+    ref, hyp = "今天天气很好我们去玩", "今天天气不好我们去玩"
+
+    exact = metrics.calculate_cer(ref, hyp)
+    assert exact == pytest.approx(0.1)
+    # 阈值恰好等于CER时不算超标
+    assert metrics.calculate_cer(ref, hyp, max_cer=0.1) == exact
+    assert metrics.calculate_cer(ref, hyp, max_cer=0.5) == exact
+    assert metrics.calculate_cer(ref, hyp, max_cer=0.09) == ABOVE_THRESHOLD
+    assert metrics.calculate_cer(ref, "完全不同", max_cer=0.2) == ABOVE_THRESHOLD
+
+    # 空参考文本
+    assert metrics.calculate_cer("", "abc", max_cer=0.5) == ABOVE_THRESHOLD
+    assert metrics.calculate_cer("", "", max_cer=0.0) == 0.0
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_max_distance_matches_float_comparison():
+    """阈值换算的最大距离与浮点比较结果一致"""
+    for ref_length in range(1, 120):
+        for max_cer in (0.0, 0.07, 0.1, 0.29, 0.3, 0.333, 1.0, 1.5):
+            limit = ASRMetrics._max_distance(max_cer, ref_length)
+            assert limit / ref_length <= max_cer
+            assert (limit + 1) / ref_length > max_cer
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_cli_triage_lists_offending_pairs(tmp_path, capsys):
+    """--max-cer分诊只列出超过阈值的文件对，存在超标时退出码为1"""
+    asr_dir, ref_dir = tmp_path / "asr", tmp_path / "ref"
+    asr_dir.mkdir()
+    ref_dir.mkdir()
+    texts = {
+        "good": ("今天天气很好我们去公园", "今天天气很好我们去公园"),
+        "bad": ("今天天气很好我们去公园", "明天下雨"),
+    }
+    for name, (ref, hyp) in texts.items():
+        (ref_dir / f"{name}.txt").write_text(ref, encoding='utf-8')
+        (asr_dir / f"{name}.txt").write_text(hyp, encoding='utf-8')
+
+    offending = cli.triage_pairs(
+        [(str(asr_dir / f"{n}.txt"), str(ref_dir / f"{n}.txt")) for n in texts],
+        'jieba', False, 0.1, evaluation_mode='char'
+    )
+    assert [item['asr_file'] for item in offending] == ["bad.txt"]
+
+    sys_argv = sys.argv
+    try:
+        sys.argv = ['cli.py', '--asr-dir', str(asr_dir), '--ref-dir', str(ref_dir),
+                    '--mode', 'char', '--max-cer', '0.1']
+        assert cli.main() == 1
+        sys.argv[-1] = '1.0'
+        assert cli.main() == 0
+    finally:
+        sys.argv = sys_argv
+    assert "bad.txt" in capsys.readouterr().out
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试纯字符级快速评估模式（evaluation_mode='char'）
+验证其结果与token分词路径一致，且在不过滤语气词时不调用分词器
+"""
+
+import sys
+import os
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+from asr_metrics_refactored import ASRMetrics
+
+
+TEST_PAIRS = [
+    ("我来到北京清华大学", "我来到北京清大学"),
+    ("今天天气很好123", "今天天气很好１２３"),
+    ("Hello World，你好世界！", "hello world 你好 世界"),
+    ("嗯，这个问题啊，我们需要讨论一下", "这个问题我们需要讨论"),
+    ("  前后 有 空格  ", "前后有空格"),
+    ("", "abc"),
+]
+
+
+class ExplodingTokenizer:
+    """任何调用都会报错的分词器，用于证明char模式不触碰分词器"""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"char模式不应调用分词器方法: {name}")
+
+
+class RewritingTokenizer:
+    """会改写文本的分词器，用于验证一致性校验能发现差异"""
+
+    name = "rewriting"
+
+    def cut(self, text):
+        return [text.replace("好", "号")]
+
+    def tokenize(self, text):
+        text = text.replace("好", "号")
+        return [(char, i, i + 1) for i, char in enumerate(text)]
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("ref,hyp", TEST_PAIRS)
+@pytest.mark.parametrize("filter_fillers", [False, True])
+def test_char_mode_matches_token_mode(ref, hyp, filter_fillers):
+    """char模式与token模式的详细指标一致（评估模式字段除外）"""
+    token_result = ASRMetrics('jieba').calculate_detailed_metrics(ref, hyp, filter_fillers)
+    char_result = ASRMetrics('jieba', evaluation_mode='char').calculate_detailed_metrics(ref, hyp, filter_fillers)
+
+    assert char_result.pop('evaluation_mode') == 'char'
+    assert token_result.pop('evaluation_mode') == 'token'
+    assert char_result == token_result
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_char_mode_does_not_touch_tokenizer():
+    """不过滤语气词时char模式完全不调用分词器"""
+    metrics = ASRMetrics('jieba', evaluation_mode='char')
+    metrics.tokenizer = ExplodingTokenizer()
+
+    result = metrics.evaluate_pair("今天天气很好", "今天天气不好")
+    assert result['metrics']['substitutions'] == 1
+    assert metrics.calculate_cer("今天天气很好", "今天天气不好") == pytest.approx(1 / 6)
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_char_mode_loads_tokenizer_lazily():
+    """char模式在构造时不加载分词器，需要词性标注时才加载"""
+    metrics = ASRMetrics('jieba', evaluation_mode='char')
+    assert metrics._tokenizer is None
+    assert metrics.get_tokenizer_info()['initialized'] is False
+
+    metrics.evaluate_pair("嗯今天天气很好", "今天天气很好", filter_fillers=True)
+    assert metrics._tokenizer is not None
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_invalid_evaluation_mode():
+    """不支持的评估模式应抛出异常"""
+    with pytest.raises(ValueError):
+        ASRMetrics('jieba', evaluation_mode='word')
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_verify_char_mode_reports_no_divergence():
+    """jieba分词不改写文本，校验结果无差异"""
+    metrics = ASRMetrics('jieba')
+    texts = [ref for ref, _ in TEST_PAIRS] + [hyp for _, hyp in TEST_PAIRS]
+    report = metrics.verify_char_mode(texts)
+    assert report['checked'] == len(texts)
+    assert report['divergences'] == []
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_verify_char_mode_detects_rewriting_tokenizer():
+    """分词器改写文本时，校验应报告差异及其位置"""
+    metrics = ASRMetrics('jieba')
+    metrics.tokenizer = RewritingTokenizer()
+
+    report = metrics.verify_char_mode(["今天天气很好", "没有差异的文本"], sample_size=2)
+    assert report['checked'] == 2
+    assert len(report['divergences']) == 1
+    item = report['divergences'][0]
+    assert item['text'] == "今天天气很好"
+    assert item['index'] == 5
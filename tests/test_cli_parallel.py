@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试cli.py的并行批处理（--jobs）：结果与逐个处理一致，
+有序收集时保持文件对顺序，无序收集时结果集合相同
+"""
+
+import sys
+import os
+import csv
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+import cli
+
+
+PAIRS = [
+    ("我来到北京清华大学", "我来到北京清大学"),
+    ("今天天气很好", "今天天气不好"),
+    ("人工智能技术发展", "人工智能技术发展很快"),
+    ("完全相同的文本", "完全相同的文本"),
+    ("ＡＳＲ测试123", "asr测试12"),
+    ("abc", "xyz"),
+    ("语音识别", "语音"),
+]
+
+
+@pytest.fixture
+def directories(tmp_path):
+    """按文件名配对的ASR目录和标注目录"""
+    asr_dir = tmp_path / "asr"
+    ref_dir = tmp_path / "ref"
+    asr_dir.mkdir()
+    ref_dir.mkdir()
+    for i, (ref, hyp) in enumerate(PAIRS):
+        (ref_dir / f"{i:03d}.txt").write_text(ref, encoding='utf-8')
+        (asr_dir / f"{i:03d}.txt").write_text(hyp, encoding='utf-8')
+    return str(asr_dir), str(ref_dir)
+
+
+def _key(result):
+    return (result['asr_file'], result['cer'], result['substitutions'],
+            result['deletions'], result['insertions'])
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("ordered", [True, False])
+def test_parallel_matches_sequential(directories, ordered):
+    """并行批处理与逐个处理结果一致"""
+    asr_dir, ref_dir = directories
+    sequential = cli.batch_process_directory(asr_dir, ref_dir, 'jieba', False,
+                                             evaluation_mode='char')
+    parallel = cli.batch_process_directory(asr_dir, ref_dir, 'jieba', False,
+                                           evaluation_mode='char', jobs=2, ordered=ordered)
+
+    assert len(parallel) == len(PAIRS)
+    if ordered:
+        assert [_key(r) for r in parallel] == [_key(r) for r in sequential]
+    else:
+        assert sorted(_key(r) for r in parallel) == sorted(_key(r) for r in sequential)
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_parallel_chunks_cover_all_pairs(directories):
+    """任意块大小下每个文件对只处理一次，处理失败的文件对结果为None"""
+    asr_dir, ref_dir = directories
+    pairs = [(os.path.join(asr_dir, f"{i:03d}.txt"), os.path.join(ref_dir, f"{i:03d}.txt"))
+             for i in range(len(PAIRS))]
+    pairs.append((os.path.join(asr_dir, "missing.txt"), os.path.join(ref_dir, "000.txt")))
+
+    results = cli.parallel_process_pairs(pairs, 3, 'jieba', False, evaluation_mode='char',
+                                         chunksize=2)
+    assert [r['asr_file'] for r in results[:-1]] == [f"{i:03d}.txt" for i in range(len(PAIRS))]
+    assert results[-1] is None
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_cli_jobs_option(directories, tmp_path):
+    """命令行--jobs选项输出的CSV按文件对顺序排列"""
+    asr_dir, ref_dir = directories
+    output = tmp_path / "results.csv"
+    sys_argv = sys.argv
+    try:
+        sys.argv = ['cli.py', '--asr-dir', asr_dir, '--ref-dir', ref_dir,
+                    '--mode', 'char', '--jobs', '2', '--output', str(output)]
+        assert cli.main() == 0
+    finally:
+        sys.argv = sys_argv
+
+    with open(output, encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [r['asr_file'] for r in rows] == [f"{i:03d}.txt" for i in range(len(PAIRS))]
+    assert float(rows[1]['cer']) == pytest.approx(1 / 6)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试单次评估接口 ASRMetrics.evaluate_pair
+验证其结果与分别调用 calculate_detailed_metrics / highlight_errors / show_differences 一致
+"""
+
+import sys
+import os
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+from asr_metrics_refactored import ASRMetrics
+
+
+# 测试用例：(参考文本, 识别文本)
+TEST_PAIRS = [
+    ("我来到北京清华大学", "我来到北京清大学"),
+    ("今天天气很好", "今天天气不好"),
+    ("人工智能技术发展", "人工智能技术发展很快"),
+    ("嗯，这个问题啊，我们需要讨论一下", "这个问题我们需要讨论"),
+    ("完全相同的文本", "完全相同的文本"),
+    ("abc", ""),
+    ("", "abc"),
+    ("", ""),
+]
+
+
+@pytest.fixture(scope="module")
+def metrics():
+    """共享的ASRMetrics实例"""
+    return ASRMetrics(tokenizer_name='jieba')
+
+
+def _strip_brackets(text: str) -> str:
+    """去掉高亮标记，恢复原始字符序列"""
+    return text.replace('[', '').replace(']', '')
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("ref,hyp", TEST_PAIRS)
+@pytest.mark.parametrize("filter_fillers", [False, True])
+def test_metrics_match_detailed_metrics(metrics, ref, hyp, filter_fillers):
+    """evaluate_pair的指标与calculate_detailed_metrics完全一致"""
+    expected = metrics.calculate_detailed_metrics(ref, hyp, filter_fillers)
+    result = metrics.evaluate_pair(ref, hyp, filter_fillers)
+    assert result['metrics'] == expected
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("ref,hyp", TEST_PAIRS)
+def test_highlights_cover_processed_text(metrics, ref, hyp):
+    """高亮文本去掉标记后应与预处理结果一致"""
+    result = metrics.evaluate_pair(ref, hyp)
+    assert _strip_brackets(result['diff_reference']) == metrics.preprocess_text(ref)
+    assert _strip_brackets(result['diff_hypothesis']) == metrics.preprocess_text(hyp)
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("ref,hyp", TEST_PAIRS)
+def test_diff_sequence_consistent_with_metrics(metrics, ref, hyp):
+    """差异序列中的'-'和'+'数量应与S/D/I统计一致"""
+    result = metrics.evaluate_pair(ref, hyp)
+    diff = result['diff_sequence']
+    m = result['metrics']
+
+    # 差异序列每个条目占3个字符：两位标记加一个字符
+    entries = [diff[k:k + 3] for k in range(0, len(diff), 3)]
+    minus = sum(1 for e in entries if e.startswith('- '))
+    plus = sum(1 for e in entries if e.startswith('+ '))
+    assert minus == m['substitutions'] + m['deletions']
+    assert plus == m['substitutions'] + m['insertions']
+
+    # 还原两侧文本
+    ref_chars = ''.join(e[2] for e in entries if not e.startswith('+ '))
+    hyp_chars = ''.join(e[2] for e in entries if not e.startswith('- '))
+    assert ref_chars == metrics.preprocess_text(ref)
+    assert hyp_chars == metrics.preprocess_text(hyp)
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_preprocess_called_once_per_side(metrics, monkeypatch):
+    """每侧文本只预处理一次"""
+    calls = []
+    original = metrics.preprocess_text
+
+    def counting_preprocess(text, filter_fillers=False):
+        calls.append(text)
+        return original(text, filter_fillers)
+
+    monkeypatch.setattr(metrics, 'preprocess_text', counting_preprocess)
+    metrics.evaluate_pair("今天天气很好", "今天天气不好", filter_fillers=True)
+    assert len(calls) == 2
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_include_diff_disabled(metrics):
+    """关闭差异生成时只返回指标"""
+    result = metrics.evaluate_pair("今天天气很好", "今天天气不好", include_diff=False)
+    assert result['metrics']['substitutions'] == 1
+    assert result['diff_reference'] == ''
+    assert result['diff_sequence'] == ''
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_segmented_alignment_mode():
+    """分段对齐模式附带alignment_exact字段，指标与完整对齐一致"""
+    ref = "人工智能技术正在改变我们的生活方式和工作方式" * 5
+    hyp = ref.replace("生活", "生火")
+    full = ASRMetrics('jieba', evaluation_mode='char').evaluate_pair(ref, hyp)
+    segmented = ASRMetrics('jieba', evaluation_mode='char', alignment_mode='segmented',
+                           anchor_length=6).evaluate_pair(ref, hyp)
+
+    assert segmented['metrics'].pop('alignment_exact') is True
+    assert segmented['metrics'] == full['metrics']
+    assert segmented['diff_sequence'] == full['diff_sequence']
+
+    with pytest.raises(ValueError):
+        ASRMetrics('jieba', alignment_mode='fast')
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试HanLP长文本分片：按句/空白/固定窗口切分、按长度分批调用模型、拼接词语和位置
+使用离线替身模型，不需要安装HanLP
+"""
+
+import sys
+import os
+import random
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+from text_tokenizers import HanlpTokenizer
+
+
+class PairModel:
+    """离线替身模型：每两个字符切成一个词（从片段开头计），记录每次调用的输入"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, data):
+        self.calls.append(data)
+        texts = [data] if isinstance(data, str) else data
+        results = [[text[i:i + 2] for i in range(0, len(text), 2)] for text in texts]
+        return results[0] if isinstance(data, str) else results
+
+
+class TagModel:
+    """离线替身词性标注模型：记录每次调用的输入"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, data):
+        self.calls.append(data)
+        return [['n'] * len(words) for words in data]
+
+
+def _tokenizer(max_chunk_length, chunk_overlap=0, batch_size=4):
+    tokenizer = HanlpTokenizer()
+    tokenizer.tok_model = PairModel()
+    tokenizer.pos_model = TagModel()
+    tokenizer.max_chunk_length = max_chunk_length
+    tokenizer.chunk_overlap = chunk_overlap
+    tokenizer.batch_size = batch_size
+    tokenizer.is_initialized = True
+    return tokenizer
+
+
+def _check_tokens(text, tokens):
+    """词语首尾相接覆盖全文，且与原文中对应位置的内容一致"""
+    position = 0
+    for word, start, end in tokens:
+        assert start == position and text[start:end] == word
+        position = end
+    assert position == len(text)
+
+
+def _long_text(sentences, seed=0):
+    rng = random.Random(seed)
+    alphabet = "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工"
+    parts = []
+    for _ in range(sentences):
+        parts.append(''.join(rng.choice(alphabet) for _ in range(rng.randint(5, 40))))
+        parts.append(rng.choice("。！？；"))
+    return ''.join(parts)
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_sentence_chunks_are_bounded_and_batched():
+    """长文本按句切分，每个片段不超过上限，同一批片段按长度排序且不超过batch_size"""
+    tokenizer = _tokenizer(max_chunk_length=60, batch_size=4)
+    text = _long_text(80)
+    tokens = tokenizer.tokenize(text)
+    _check_tokens(text, tokens)
+
+    chunks = [chunk for call in tokenizer.tok_model.calls for chunk in call]
+    assert sorted(''.join(chunks)) == sorted(text)
+    assert all(len(chunk) <= 60 for chunk in chunks)
+    assert all(chunk[-1] in "。！？；" for chunk in chunks)
+    lengths = [len(chunk) for chunk in chunks]
+    assert lengths == sorted(lengths)
+    assert all(len(call) <= 4 for call in tokenizer.tok_model.calls)
+
+    assert tokenizer.cut(text) == [word for word, _, _ in tokens]
+    tags = tokenizer.posseg(text)
+    assert [word for word, _ in tags] == [word for word, _, _ in tokens]
+    assert all(len(words) <= 60 for call in tokenizer.pos_model.calls for words in call)
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_whitespace_and_window_fallback():
+    """没有句末标点时在空白处切分，仍然过长时按重叠窗口切分并在重叠区拼接"""
+    tokenizer = _tokenizer(max_chunk_length=31, chunk_overlap=10)
+    assert tokenizer._chunk_spans("a" * 20 + " " + "b" * 20) == [(0, 21), (21, 41)]
+
+    text = _long_text(1).rstrip("。！？；") * 5
+    spans = tokenizer._chunk_spans(text)
+    assert spans[0] == (0, 31) and spans[1][0] == 21
+    assert all(end - start <= 31 for start, end in spans)
+
+    # 窗口起点为奇数时两个窗口的词边界在重叠区内错开，必须截断跨越拼接位置的词语
+    tokens = tokenizer.tokenize(text)
+    _check_tokens(text, tokens)
+    assert tokenizer.cut(text) == [word for word, _, _ in tokens]
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_short_texts_are_unchanged_and_order_is_kept():
+    """短文本整体送入模型，批量结果顺序与输入一致"""
+    tokenizer = _tokenizer(max_chunk_length=256)
+    texts = ["今天天气很好", "", "长一点的一句话。第二句话！", "好"]
+    assert tokenizer.cut_batch(texts) == [PairModel()([t.strip()])[0] if t.strip() else [] for t in texts]
+    assert tokenizer.tok_model.calls == [["好", "今天天气很好", "长一点的一句话。第二句话！"]]
+
+    with pytest.raises(Exception):
+        HanlpTokenizer().cut("未初始化")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试Jieba持久化前缀词典缓存和自定义词典：
+首次构建后写入缓存，之后的实例直接加载；词典内容变化时缓存失效；加载耗时通过get_info()报告
+"""
+
+import sys
+import os
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+from text_tokenizers import JiebaTokenizer, TokenizerFactory
+
+
+TEXT = "我们在测试星河语音转写引擎的效果"
+
+
+@pytest.fixture
+def user_dict(tmp_path):
+    """包含产品名和领域术语的自定义词典"""
+    path = tmp_path / "asr_terms.txt"
+    path.write_text("星河语音 10 nz\n转写引擎 5 n\n", encoding='utf-8')
+    return path
+
+
+def _create(**options):
+    tokenizer = JiebaTokenizer(**options)
+    tokenizer.initialize()
+    return tokenizer
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_persistent_cache_roundtrip(tmp_path, user_dict):
+    """首次构建写入缓存，第二个实例命中缓存且分词结果一致"""
+    cache_dir = tmp_path / "cache"
+    first = _create(cache_dir=str(cache_dir), user_dicts=[str(user_dict)])
+    info = first.get_info()['dictionary']
+    assert info['cache_hit'] is False
+    assert os.path.isfile(info['cache_path'])
+    assert info['load_seconds'] > 0
+    assert not info['global_dictionary']
+
+    second = _create(cache_dir=str(cache_dir), user_dicts=[str(user_dict)])
+    assert second.get_info()['dictionary']['cache_hit'] is True
+    assert second.get_info()['dictionary']['cache_path'] == info['cache_path']
+
+    for tokenizer in (first, second):
+        words = tokenizer.cut(TEXT)
+        assert "星河语音" in words and "转写引擎" in words
+        assert ("星河语音", 'nz') in tokenizer.posseg(TEXT)
+        assert [w for w, _, _ in tokenizer.tokenize(TEXT)] == words
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_cache_invalidated_when_user_dict_changes(tmp_path, user_dict):
+    """自定义词典内容变化后使用新的缓存文件"""
+    cache_dir = tmp_path / "cache"
+    first = _create(cache_dir=str(cache_dir), user_dicts=[str(user_dict)])
+    user_dict.write_text("星河语音 10 nz\n效果评测 5 n\n", encoding='utf-8')
+    second = _create(cache_dir=str(cache_dir), user_dicts=[str(user_dict)])
+
+    assert second.dictionary_cache_hit is False
+    assert second.dictionary_cache_path != first.dictionary_cache_path
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_corrupt_cache_is_rebuilt(tmp_path, user_dict):
+    """缓存文件损坏时重新构建并覆盖"""
+    cache_dir = tmp_path / "cache"
+    path = _create(cache_dir=str(cache_dir), user_dicts=[str(user_dict)]).dictionary_cache_path
+    with open(path, 'wb') as f:
+        f.write(b"not a dictionary")
+
+    rebuilt = _create(cache_dir=str(cache_dir), user_dicts=[str(user_dict)])
+    assert rebuilt.dictionary_cache_hit is False
+    assert "星河语音" in rebuilt.cut(TEXT)
+    assert _create(cache_dir=str(cache_dir), user_dicts=[str(user_dict)]).dictionary_cache_hit is True
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_default_tokenizer_uses_global_dictionary():
+    """未配置时仍使用jieba全局词典，报告加载耗时但没有持久化缓存"""
+    info = _create().get_info()['dictionary']
+    assert info['global_dictionary'] is True
+    assert info['cache_path'] is None and info['cache_hit'] is None
+    assert info['load_seconds'] is not None
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_factory_configure_tokenizer(tmp_path, user_dict):
+    """工厂按配置的构造参数创建jieba实例，恢复默认后重新使用全局词典"""
+    TokenizerFactory.configure_tokenizer('jieba', cache_dir=str(tmp_path), user_dicts=[str(user_dict)])
+    try:
+        tokenizer = TokenizerFactory.get_tokenizer('jieba')
+        assert tokenizer.user_dicts == [str(user_dict)]
+        assert "星河语音" in tokenizer.cut(TEXT)
+    finally:
+        TokenizerFactory.configure_tokenizer('jieba')
+    assert TokenizerFactory.get_tokenizer('jieba').uses_global_dictionary
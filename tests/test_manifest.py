@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试评估清单（TSV/JSONL）的流式读取，以及cli.py的--manifest模式
+"""
+
+import sys
+import os
+import csv
+import json
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+import manifest as manifest_module
+from manifest import ManifestError, PairRecord, iter_manifest
+import cli
+
+
+@pytest.fixture
+def text_files(tmp_path):
+    """清单中按路径引用的文本文件"""
+    (tmp_path / "ref").mkdir()
+    (tmp_path / "hyp").mkdir()
+    (tmp_path / "ref" / "a.txt").write_text("今天天气很好", encoding='utf-8')
+    (tmp_path / "hyp" / "a.txt").write_text("今天天气不好", encoding='utf-8')
+    return tmp_path
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_tsv_paths_and_inline_text(text_files):
+    """TSV清单：路径相对于清单目录，空的文本列表示使用路径，其余列为元数据"""
+    manifest = text_files / "pairs.tsv"
+    manifest.write_text(
+        "utt_id\tref\tref_path\thyp\thyp_path\tspeaker\n"
+        "u1\t\tref/a.txt\t\thyp/a.txt\tspk1\n"
+        "u2\t我来到北京\t\t我来到\t\tspk2\n"
+        "\n",
+        encoding='utf-8')
+
+    records = list(iter_manifest(str(manifest)))
+    assert [r.utt_id for r in records] == ["u1", "u2"]
+    assert records[0].ref is None
+    assert records[0].ref_path == os.path.join(str(text_files), "ref/a.txt")
+    assert records[0].metadata == {'speaker': 'spk1'}
+    assert (records[1].ref, records[1].hyp, records[1].hyp_path) == ("我来到北京", "我来到", None)
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_jsonl_records_are_lazy(tmp_path):
+    """JSONL清单逐行解析：格式错误只在读到该行时报告，并给出行号"""
+    manifest = tmp_path / "pairs.jsonl"
+    lines = [json.dumps({'id': 7, 'ref': "abc", 'hyp': "", 'extra': {'k': 1}}, ensure_ascii=False),
+             json.dumps({'ref': "abc"}),
+             "not json"]
+    manifest.write_text("\n".join(lines), encoding='utf-8')
+
+    records = iter_manifest(str(manifest))
+    first = next(records)
+    assert first == PairRecord(line=1, utt_id="7", ref="abc", hyp="", metadata={'extra': {'k': 1}})
+    with pytest.raises(ManifestError) as excinfo:
+        next(records)
+    assert excinfo.value.line == 2
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_conflicting_and_ragged_rows(tmp_path):
+    """同时给出文本和路径、列数与表头不一致都报告为清单格式错误"""
+    manifest = tmp_path / "pairs.jsonl"
+    manifest.write_text(json.dumps({'ref': "a", 'ref_path': "a.txt", 'hyp': "b"}), encoding='utf-8')
+    with pytest.raises(ManifestError, match="只能指定一个"):
+        list(iter_manifest(str(manifest)))
+
+    manifest = tmp_path / "pairs.tsv"
+    manifest.write_text("ref\thyp\na\tb\textra\n", encoding='utf-8')
+    with pytest.raises(ManifestError, match="列数"):
+        list(iter_manifest(str(manifest)))
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_evaluate_manifest_streams_results(text_files, jobs):
+    """清单模式逐条写出结果，汇总与逐条计算一致，出错的记录单独计数"""
+    manifest = text_files / "pairs.jsonl"
+    records = [{'utt_id': "u1", 'ref_path': "ref/a.txt", 'hyp_path': "hyp/a.txt", 'speaker': "spk1"},
+               {'utt_id': "u2", 'ref': "我来到北京", 'hyp': "我来到"},
+               {'utt_id': "u3", 'ref_path': "ref/missing.txt", 'hyp': "x"}]
+    manifest.write_text("\n".join(json.dumps(r, ensure_ascii=False) for r in records),
+                        encoding='utf-8')
+    output = text_files / "results.csv"
+
+    summary = cli.evaluate_manifest(str(manifest), 'jieba', False, str(output),
+                                    evaluation_mode='char', jobs=jobs, chunksize=1)
+    assert summary['records'] == 3
+    assert summary['failed'] == 1
+    assert (summary['substitutions'], summary['deletions']) == (1, 2)
+    assert summary['corpus_cer'] == pytest.approx(3 / 11)
+
+    with open(output, encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [r['utt_id'] for r in rows] == ["u1", "u2"]
+    assert rows[0]['asr_file'] == "a.txt"
+    assert json.loads(rows[0]['metadata']) == {'speaker': "spk1"}
+    assert float(rows[1]['cer']) == pytest.approx(0.4)
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_cli_manifest_option(tmp_path, capsys):
+    """命令行--manifest选项：格式错误时退出码为1"""
+    manifest = tmp_path / "pairs.tsv"
+    manifest.write_text("utt_id\tref\thyp\nu1\t今天天气很好\t今天天气不好\nu2\t缺少识别文本\n",
+                        encoding='utf-8')
+    sys_argv = sys.argv
+    try:
+        sys.argv = ['cli.py', '--manifest', str(manifest), '--mode', 'char']
+        assert cli.main() == 1
+    finally:
+        sys.argv = sys_argv
+    assert "pairs.tsv:3" in capsys.readouterr().out
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_tsv_long_fields_and_csv_errors(tmp_path, monkeypatch):
+    """TSV中超过csv默认上限的长文本可以读取；csv解析错误报告为带行号的ManifestError"""
+    long_text = "语" * 200000
+    manifest = tmp_path / "long.tsv"
+    manifest.write_text(f"utt_id\tref\thyp\nu1\t{long_text}\t{long_text}\n", encoding='utf-8')
+    records = list(iter_manifest(str(manifest)))
+    assert len(records[0].ref) == 200000
+
+    limit = csv.field_size_limit()
+    monkeypatch.setattr(manifest_module, '_raise_field_size_limit', lambda: csv.field_size_limit(10))
+    try:
+        with pytest.raises(ManifestError) as excinfo:
+            list(iter_manifest(str(manifest)))
+        assert excinfo.value.line == 2
+    finally:
+        csv.field_size_limit(limit)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试参考文本预处理复用（ASRMetrics.prepare_reference / evaluate / evaluate_cer）
+以及cli.py的多系统对比模式
+"""
+
+import sys
+import os
+import csv
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+from asr_metrics_refactored import ASRMetrics, PreparedReference, ABOVE_THRESHOLD
+import cli
+
+
+REFERENCES = [
+    "我来到北京清华大学",
+    "嗯，这个问题啊，我们需要讨论一下",
+    "ＡＳＲ测试123，Hello World",
+    "",
+]
+
+HYPOTHESES = [
+    "我来到北京清大学",
+    "这个问题我们需要讨论",
+    "asr测试123 hello word",
+    "",
+    "完全不同的内容",
+]
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("mode", ["token", "char"])
+@pytest.mark.parametrize("filter_fillers", [False, True])
+def test_evaluate_matches_evaluate_pair(mode, filter_fillers):
+    """evaluate与evaluate_pair结果完全一致，evaluate_cer与指标中的CER一致"""
+    metrics = ASRMetrics('jieba', evaluation_mode=mode)
+    for reference in REFERENCES:
+        prepared = metrics.prepare_reference(reference, filter_fillers)
+        assert isinstance(prepared, PreparedReference)
+        for hypothesis in HYPOTHESES:
+            expected = metrics.evaluate_pair(reference, hypothesis, filter_fillers)
+            assert metrics.evaluate(prepared, hypothesis) == expected
+            assert metrics.evaluate_cer(prepared, hypothesis) == pytest.approx(expected['metrics']['cer'])
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_reference_is_preprocessed_once(monkeypatch):
+    """多个假设文本对比时参考文本只预处理一次"""
+    metrics = ASRMetrics('jieba', evaluation_mode='char')
+    prepared = metrics.prepare_reference("今天天气很好我们一起去公园")
+
+    calls = []
+    original = metrics.preprocess_text
+
+    def counting_preprocess(text, filter_fillers=False):
+        calls.append(text)
+        return original(text, filter_fillers)
+
+    monkeypatch.setattr(metrics, 'preprocess_text', counting_preprocess)
+    for hypothesis in ["今天天气很好", "今天天气不好我们去公园", "明天下雨"]:
+        metrics.evaluate(prepared, hypothesis, include_diff=False)
+    assert calls == ["今天天气很好", "今天天气不好我们去公园", "明天下雨"]
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_evaluate_cer_threshold_and_mode_check():
+    """evaluate_cer支持CER阈值；评估模式不一致时报错"""
+    metrics = ASRMetrics('jieba', evaluation_mode='char')
+    prepared = metrics.prepare_reference("今天天气很好我们去玩")
+    assert metrics.evaluate_cer(prepared, "今天天气不好我们去玩", max_cer=0.1) == pytest.approx(0.1)
+    assert metrics.evaluate_cer(prepared, "明天下雨", max_cer=0.1) == ABOVE_THRESHOLD
+
+    with pytest.raises(ValueError):
+        ASRMetrics('jieba', evaluation_mode='token').evaluate(prepared, "今天")
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_cli_multiple_systems(tmp_path, capsys):
+    """一个标注目录对应多个ASR目录时按文件名配对并输出带系统名称的结果"""
+    ref_dir = tmp_path / "ref"
+    systems = {"vendor_a": "今天天气很好", "vendor_b": "今天天气不好"}
+    ref_dir.mkdir()
+    (ref_dir / "001.txt").write_text("今天天气很好", encoding='utf-8')
+    (ref_dir / "002.txt").write_text("我们去公园", encoding='utf-8')
+    for name, text in systems.items():
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "001.txt").write_text(text, encoding='utf-8')
+    (tmp_path / "vendor_a" / "002.txt").write_text("我们去公园", encoding='utf-8')
+
+    output = tmp_path / "bakeoff.csv"
+    sys_argv = sys.argv
+    try:
+        sys.argv = ['cli.py', '--ref-dir', str(ref_dir),
+                    '--asr-dir', str(tmp_path / "vendor_a"), str(tmp_path / "vendor_b"),
+                    '--mode', 'char', '--output', str(output)]
+        assert cli.main() == 0
+    finally:
+        sys.argv = sys_argv
+
+    with open(output, encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [(r['system'], r['asr_file']) for r in rows] == [
+        ("vendor_a", "001.txt"), ("vendor_b", "001.txt"), ("vendor_a", "002.txt")
+    ]
+    assert float(rows[1]['cer']) == pytest.approx(1 / 6)
+    assert "vendor_b缺少1个" in capsys.readouterr().out
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_systems_stream_and_resume(tmp_path, capsys):
+    """多系统对比逐条写入JSONL，续跑时按系统跳过已完成的结果；不支持的选项直接报错"""
+    ref_dir = tmp_path / "ref"
+    ref_dir.mkdir()
+    (ref_dir / "001.txt").write_text("今天天气很好", encoding='utf-8')
+    asr_dirs = []
+    for name, text in {"a": "今天天气很好", "b": "今天天气不好"}.items():
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "001.txt").write_text(text, encoding='utf-8')
+        asr_dirs.append(str(tmp_path / name))
+    output = str(tmp_path / "bakeoff.jsonl")
+
+    first = cli.evaluate_systems(asr_dirs, str(ref_dir), 'jieba', False, output, evaluation_mode='char')
+    assert [r['system'] for r in first] == ["a", "b"]
+    capsys.readouterr()
+    resumed = cli.evaluate_systems(asr_dirs, str(ref_dir), 'jieba', False, output,
+                                   evaluation_mode='char', resume=True)
+    assert resumed == []
+    with open(output, encoding='utf-8') as f:
+        assert len(f.readlines()) == 2
+    # 续跑后的汇总仍包含之前的结果
+    assert "0.1667" in capsys.readouterr().out
+
+    sys_argv = sys.argv
+    try:
+        for extra in (['--jobs', '4'], ['--output', str(tmp_path / "out.txt")]):
+            sys.argv = ['cli.py', '--ref-dir', str(ref_dir), '--asr-dir', *asr_dirs, '--mode', 'char'] + extra
+            assert cli.main() == 1
+    finally:
+        sys.argv = sys_argv
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试预处理结果缓存（preprocess_cache模块及ASRMetrics集成）
+"""
+
+import sys
+import os
+import sqlite3
+import time
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+from preprocess_cache import PreprocessCache, make_cache_key
+from asr_metrics_refactored import ASRMetrics
+from text_tokenizers import TokenizerFactory
+import cli
+
+
+class CountingTokenizer:
+    """记录调用次数的分词器包装"""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.name = inner.name
+        self.version = inner.version
+        self.texts = []
+
+    def cache_config(self):
+        return self.inner.cache_config()
+
+    def __getattr__(self, name):
+        method = getattr(self.inner, name)
+
+        def wrapper(text, *args, **kwargs):
+            self.texts.append(text)
+            return method(text, *args, **kwargs)
+        return wrapper
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_lru_eviction_by_bytes():
+    """超过字节预算时淘汰最久未使用的项"""
+    entry = PreprocessCache._entry_size('k0', 'x' * 100)
+    cache = PreprocessCache(max_bytes=entry * 3)
+    for i in range(3):
+        cache.put(f'k{i}', 'x' * 100)
+    assert cache.get('k0') is not None  # k0变为最近使用
+
+    cache.put('k3', 'x' * 100)
+    assert cache.get('k1') is None
+    assert cache.get('k0') is not None
+    stats = cache.get_stats()
+    assert stats['evictions'] == 1
+    assert stats['entries'] == 3
+    assert stats['bytes'] <= stats['max_bytes']
+    assert (stats['hits'], stats['misses']) == (2, 1)
+
+    # 单项超过预算时不缓存
+    cache.put('huge', 'x' * entry * 10)
+    assert cache.get('huge') is None
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_disk_tier_survives_new_instance(tmp_path):
+    """磁盘层在新实例中仍可命中"""
+    path = str(tmp_path / "cache" / "preprocess.db")
+    cache = PreprocessCache(disk_path=path)
+    cache.put('key', '今天天气很好')
+    cache.close()
+
+    reopened = PreprocessCache(disk_path=path)
+    assert reopened.get('key') == '今天天气很好'
+    assert reopened.get_stats()['disk_hits'] == 1
+    reopened.clear(disk=True)
+    assert reopened.get('key') is None
+    reopened.close()
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_cache_key_covers_configuration():
+    """缓存键区分文本、语气词过滤、评估模式、分词器及其版本和标准化配置"""
+    base = ("今天", False, 'token', 'jieba', '0.42', {'normalize_width': True})
+    variants = [
+        ("明天",) + base[1:],
+        base[:1] + (True,) + base[2:],
+        base[:2] + ('char',) + base[3:],
+        base[:3] + ('thulac',) + base[4:],
+        base[:4] + ('0.43',) + base[5:],
+        base[:5] + ({'normalize_width': False},),
+    ]
+    keys = {make_cache_key(*base)} | {make_cache_key(*v) for v in variants}
+    assert len(keys) == len(variants) + 1
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("filter_fillers", [False, True])
+def test_asr_metrics_reuses_preprocessing(filter_fillers):
+    """共享缓存的多个实例对同一参考文本只分词一次，结果与未缓存时一致"""
+    cache = PreprocessCache()
+    reference = "嗯，今天天气很好，我们一起去公园散步吧"
+    expected = ASRMetrics('jieba').preprocess_text(reference, filter_fillers)
+
+    tokenizer = None
+    for hypothesis in ["今天天气很好", "今天天气不好", "我们去公园"]:
+        metrics = ASRMetrics('jieba', preprocess_cache=cache)
+        if tokenizer is None:
+            tokenizer = CountingTokenizer(metrics.tokenizer)
+        metrics.tokenizer = tokenizer
+        assert metrics.evaluate_pair(reference, hypothesis, filter_fillers)['metrics']['ref_length'] == len(expected)
+        assert metrics.preprocess_text(reference, filter_fillers) == expected
+
+    # 参考文本只在第一个实例中真正经过分词器
+    first_pass = ASRMetrics('jieba')
+    first_pass.tokenizer = counter = CountingTokenizer(first_pass.tokenizer)
+    first_pass._character_sequence(first_pass.preprocess_text(reference, filter_fillers))
+    reference_calls = [t for t in tokenizer.texts if "公园散步" in t]
+    assert len(reference_calls) == len(counter.texts)
+
+    stats = metrics.get_cache_stats()
+    # 每轮4次查询（参考/假设各一次预处理和一次字符定位），参考文本的2次只在第一轮未命中
+    assert stats['hits'] + stats['misses'] == 3 * 4 + 3
+    assert stats['misses'] == 2 + 3 * 2
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_cache_disabled_by_default():
+    """默认不启用缓存"""
+    metrics = ASRMetrics('jieba', evaluation_mode='char')
+    assert metrics.preprocess_cache is None
+    assert metrics.get_cache_stats() is None
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_char_mode_key_ignores_tokenizer():
+    """char快速路径的缓存不依赖分词器，也不会触发分词器加载"""
+    cache = PreprocessCache()
+    jieba_metrics = ASRMetrics('jieba', evaluation_mode='char', preprocess_cache=cache)
+    other_metrics = ASRMetrics('thulac', evaluation_mode='char', preprocess_cache=cache)
+    jieba_metrics.preprocess_text("今天天气很好")
+    other_metrics.preprocess_text("今天天气很好")
+    assert cache.get_stats()['hits'] == 1
+    assert other_metrics._tokenizer is None
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_disk_cache_keyed_by_user_dicts(tmp_path):
+    """切换自定义词典后不复用磁盘缓存中按默认词典得到的预处理结果"""
+    user_dict = tmp_path / "fillers.txt"
+    user_dict.write_text("嗯哼 10 n\n", encoding='utf-8')
+    path = str(tmp_path / "preprocess.db")
+    text = "我说嗯哼这个事情很好"
+
+    default = ASRMetrics('jieba', preprocess_cache=PreprocessCache(disk_path=path))
+    expected_default = default.preprocess_text(text, True)
+    TokenizerFactory.configure_tokenizer('jieba', user_dicts=[str(user_dict)])
+    try:
+        cache = PreprocessCache(disk_path=path)
+        custom = ASRMetrics('jieba', preprocess_cache=cache)
+        processed = custom.preprocess_text(text, True)
+        assert processed == ASRMetrics('jieba').preprocess_text(text, True)
+        assert processed != expected_default
+        assert cache.get_stats()['disk_hits'] == 0
+    finally:
+        TokenizerFactory.configure_tokenizer('jieba')
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_disk_tier_prune(tmp_path):
+    """磁盘层按最近使用时间和条数清理；旧版本的缓存文件自动补上last_used列"""
+    path = str(tmp_path / "preprocess.db")
+    old = sqlite3.connect(path)
+    old.execute("CREATE TABLE preprocess_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    old.execute("INSERT INTO preprocess_cache VALUES ('legacy', '旧条目')")
+    old.commit()
+    old.close()
+
+    cache = PreprocessCache(disk_path=path)
+    for i in range(3):
+        cache.put(f"k{i}", f"值{i}")
+    assert cache.disk_entries() == 4
+    assert cache.prune(max_age_days=1) == 1
+    time.sleep(0.01)
+    cache.clear()
+    assert cache.get("k0") == "值0"  # 磁盘命中更新最近使用时间
+    assert cache.prune(max_entries=1) == 2
+    assert cache.disk_entries() == 1 and cache.get("k0") == "值0"
+    cache.close()
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_cli_prunes_preprocess_cache(tmp_path):
+    """--prune-cache-entries配合--preprocess-cache清理预处理缓存后退出"""
+    path = str(tmp_path / "preprocess.db")
+    cache = PreprocessCache(disk_path=path)
+    for i in range(3):
+        cache.put(f"k{i}", "x")
+    cache.close()
+
+    sys_argv = sys.argv
+    try:
+        sys.argv = ['cli.py', '--preprocess-cache', path, '--prune-cache-entries', '1']
+        assert cli.main() == 0
+    finally:
+        sys.argv = sys_argv
+    assert PreprocessCache(disk_path=path).disk_entries() == 1
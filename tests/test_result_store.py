@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试持久化结果库ResultStore：按内容和配置生成的键、跨实例复用、清理，
+以及ASRMetrics和cli.py的--cache-db
+"""
+
+import sys
+import os
+import time
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+from result_store import ResultStore, make_result_key
+from asr_metrics_refactored import ASRMetrics
+from text_tokenizers import TokenizerFactory
+import cli
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_key_depends_on_content_and_config():
+    """文本内容或配置任一变化时键不同，配置顺序不影响键"""
+    key = make_result_key("今天天气很好", "今天天气不好", {'a': 1, 'b': True})
+    assert key == make_result_key("今天天气很好", "今天天气不好", {'b': True, 'a': 1})
+    assert key != make_result_key("今天天气很好", "今天天气好", {'a': 1, 'b': True})
+    assert key != make_result_key("今天天气不好", "今天天气很好", {'a': 1, 'b': True})
+    assert key != make_result_key("今天天气很好", "今天天气不好", {'a': 1, 'b': False})
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_evaluate_pair_reuses_stored_result(tmp_path, monkeypatch):
+    """结果库命中时不再计算对齐，新的ASRMetrics实例也能复用；配置变化时重新计算"""
+    path = str(tmp_path / "results.db")
+    metrics = ASRMetrics(evaluation_mode='char', result_store=ResultStore(path))
+    first = metrics.evaluate_pair("今天天气很好", "今天天气不好")
+
+    store = ResultStore(path)
+    reused = ASRMetrics(evaluation_mode='char', result_store=store)
+    monkeypatch.setattr(reused, '_evaluate_sequences',
+                        lambda *a, **k: pytest.fail("命中结果库时不应重新计算"))
+    assert reused.evaluate_pair("今天天气很好", "今天天气不好") == first
+    assert store.get_stats()['hits'] == 1
+
+    # 不需要差异序列的调用（命令行）复用同一条完整结果，只是不返回差异
+    result = reused.evaluate_pair("今天天气很好", "今天天气不好", include_diff=False)
+    assert result['metrics'] == first['metrics'] and result['diff_sequence'] == ''
+    assert first['diff_sequence'] and len(store) == 1
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_key_depends_on_user_dicts(tmp_path):
+    """切换自定义词典后不复用按默认词典得到的结果"""
+    user_dict = tmp_path / "fillers.txt"
+    user_dict.write_text("嗯哼 10 n\n", encoding='utf-8')
+    store = ResultStore(str(tmp_path / "results.db"))
+    pair = ("我说嗯哼这个事情很好", "我说这个事情很好")
+
+    default = ASRMetrics('jieba', result_store=store).evaluate_pair(*pair, filter_fillers=True)
+    TokenizerFactory.configure_tokenizer('jieba', user_dicts=[str(user_dict)])
+    try:
+        expected = ASRMetrics('jieba').evaluate_pair(*pair, filter_fillers=True)
+        custom = ASRMetrics('jieba', result_store=store).evaluate_pair(*pair, filter_fillers=True)
+    finally:
+        TokenizerFactory.configure_tokenizer('jieba')
+    assert custom['metrics']['cer'] == pytest.approx(expected['metrics']['cer'])
+    assert custom['metrics']['cer'] != pytest.approx(default['metrics']['cer'])
+    assert len(store) == 2
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_prune(tmp_path):
+    """按未使用天数和条数清理，保留最近使用的结果"""
+    store = ResultStore(str(tmp_path / "results.db"))
+    for i in range(5):
+        store.put(f"k{i}", {'i': i})
+    old = time.time() - 10 * 86400
+    store._db.execute("UPDATE results SET last_used = ? WHERE key IN ('k0', 'k1')", (old,))
+
+    assert store.prune(max_age_days=7) == 2
+    store.get("k2")
+    assert store.prune(max_entries=1) == 2
+    assert store.get("k2") == {'i': 2}
+    assert len(store) == 1
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_cli_cache_db_and_prune(tmp_path):
+    """第二次运行复用全部结果，汇总中包含结果库统计；清理命令需要--cache-db"""
+    manifest = tmp_path / "pairs.tsv"
+    manifest.write_text("utt_id\tref\thyp\na\t今天天气很好\t今天天气不好\nb\t我来到北京\t我来到\n",
+                        encoding='utf-8')
+    path = str(tmp_path / "results.db")
+
+    first = cli.evaluate_manifest(str(manifest), 'jieba', False, evaluation_mode='char',
+                                  result_store=ResultStore(path))
+    assert (first['result_store']['reused'], first['result_store']['computed']) == (0, 2)
+    second = cli.evaluate_manifest(str(manifest), 'jieba', False, evaluation_mode='char',
+                                   result_store=ResultStore(path))
+    assert (second['result_store']['reused'], second['result_store']['computed']) == (2, 0)
+    assert second['corpus_cer'] == pytest.approx(first['corpus_cer'])
+
+    sys_argv = sys.argv
+    try:
+        sys.argv = ['cli.py', '--prune-cache-entries', '1']
+        assert cli.main() == 1
+        sys.argv = ['cli.py', '--cache-db', path, '--prune-cache-entries', '1']
+        assert cli.main() == 0
+    finally:
+        sys.argv = sys_argv
+    assert len(ResultStore(path)) == 1
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_systems_reuse_result_store(tmp_path, capsys):
+    """多系统对比使用结果库：第二次运行全部复用，结果与evaluate_pair一致，并打印结果库统计"""
+    ref_dir = tmp_path / "ref"
+    ref_dir.mkdir()
+    (ref_dir / "a.txt").write_text("今天天气很好", encoding='utf-8')
+    asr_dirs = []
+    for name, hyp in [("sys1", "今天天气不好"), ("sys2", "今天天气很好")]:
+        asr_dir = tmp_path / name
+        asr_dir.mkdir()
+        (asr_dir / "a.txt").write_text(hyp, encoding='utf-8')
+        asr_dirs.append(str(asr_dir))
+    path = str(tmp_path / "results.db")
+
+    first = cli.evaluate_systems(asr_dirs, str(ref_dir), 'jieba', False, evaluation_mode='char',
+                                 result_store=ResultStore(path))
+    capsys.readouterr()
+    store = ResultStore(path)
+    second = cli.evaluate_systems(asr_dirs, str(ref_dir), 'jieba', False, evaluation_mode='char',
+                                  result_store=store)
+    assert "结果库: 复用=2, 新计算=0" in capsys.readouterr().out
+    assert [r['cer'] for r in second] == pytest.approx([r['cer'] for r in first])
+    # 与按文本对评估共用同一条结果
+    ASRMetrics(evaluation_mode='char', result_store=store).evaluate_pair("今天天气很好", "今天天气不好")
+    assert len(store) == 2
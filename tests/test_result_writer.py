@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试增量结果写入器ResultWriter的检查点提交与续跑，
+以及cli.py批处理/清单模式的--resume
+"""
+
+import sys
+import os
+import csv
+import json
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+from result_writer import CheckpointError, ResultWriter, checkpoint_path
+import cli
+
+
+FIELDS = ['utt_id', 'cer', 'metadata']
+
+
+def _result(i):
+    return {'utt_id': f"u{i}", 'cer': i / 10, 'metadata': {'i': i}, 'ignored': True}
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("suffix", [".csv", ".jsonl"])
+def test_uncommitted_results_are_discarded_on_resume(tmp_path, suffix):
+    """续跑时输出截断到最后一次提交的位置，只跳过已提交的键"""
+    output = str(tmp_path / f"results{suffix}")
+    writer = ResultWriter(output, FIELDS, flush_every=2, flush_interval=3600, fsync=False)
+    for i in range(5):
+        writer.write(f"u{i}", _result(i))
+    # 模拟崩溃：第5条已写入输出但未提交
+    writer._output.flush()
+    writer._output.close()
+    writer._checkpoint.close()
+
+    with ResultWriter(output, FIELDS, resume=True, fsync=False) as resumed:
+        assert resumed.resumed
+        assert resumed.completed == {"u0", "u1", "u2", "u3"}
+        existing = list(resumed.iter_existing())
+        assert [row['utt_id'] for row in existing] == ["u0", "u1", "u2", "u3"]
+        resumed.write("u4", _result(4))
+
+    with open(output, encoding='utf-8') as f:
+        if suffix == ".jsonl":
+            rows = [json.loads(line) for line in f]
+            assert rows[4] == {'utt_id': "u4", 'cer': 0.4, 'metadata': {'i': 4}}
+        else:
+            rows = list(csv.DictReader(f))
+            assert json.loads(rows[4]['metadata']) == {'i': 4}
+    assert [row['utt_id'] for row in rows] == [f"u{i}" for i in range(5)]
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_resume_without_checkpoint_starts_over(tmp_path):
+    """没有输出文件时resume从头开始；已有输出但缺少可用的检查点时报错，不覆盖输出"""
+    output = tmp_path / "results.csv"
+    with ResultWriter(str(output), FIELDS, resume=True, fsync=False) as writer:
+        assert not writer.resumed
+        writer.write("u1", _result(1))
+        writer.commit()
+        # 本次运行提交的键不驻留内存
+        assert writer.committed == 1 and not writer.completed
+    assert output.read_text(encoding='utf-8').splitlines()[0] == "utt_id,cer,metadata"
+    assert os.path.exists(checkpoint_path(str(output)))
+
+    # 输出文件比检查点记录的短
+    content = output.read_text(encoding='utf-8')
+    output.write_text("stale\n", encoding='utf-8')
+    with pytest.raises(CheckpointError):
+        ResultWriter(str(output), FIELDS, resume=True, fsync=False)
+
+    # 检查点丢失
+    output.write_text(content, encoding='utf-8')
+    os.remove(checkpoint_path(str(output)))
+    with pytest.raises(CheckpointError):
+        ResultWriter(str(output), FIELDS, resume=True, fsync=False)
+    assert output.read_text(encoding='utf-8') == content
+
+
+@pytest.fixture
+def directories(tmp_path):
+    asr_dir = tmp_path / "asr"
+    ref_dir = tmp_path / "ref"
+    asr_dir.mkdir()
+    ref_dir.mkdir()
+    for i, (ref, hyp) in enumerate([("今天天气很好", "今天天气不好"), ("我来到北京", "我来到"),
+                                    ("语音识别", "语音识别")]):
+        (ref_dir / f"{i}.txt").write_text(ref, encoding='utf-8')
+        (asr_dir / f"{i}.txt").write_text(hyp, encoding='utf-8')
+    return str(asr_dir), str(ref_dir)
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_batch_resume_skips_completed_pairs(directories, tmp_path, monkeypatch):
+    """批处理续跑只计算未完成的文件对，输出文件中没有重复的结果"""
+    asr_dir, ref_dir = directories
+    output = str(tmp_path / "results.csv")
+    first = cli.batch_process_directory(asr_dir, ref_dir, 'jieba', False, output,
+                                        evaluation_mode='char')
+    assert len(first) == 3
+
+    # 删除最后一对的检查点记录，模拟在它提交之前中断
+    ckpt = checkpoint_path(output)
+    lines = open(ckpt, encoding='utf-8').read().splitlines()
+    with open(output, 'rb') as f:
+        offset = len(b"".join(f.readlines()[:3]))
+    with open(ckpt, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines[:2] + [f"#{offset}"]) + "\n")
+
+    processed = []
+    original = cli.process_single_pair
+    monkeypatch.setattr(cli, 'process_single_pair',
+                        lambda asr, ref, *a, **k: processed.append(asr) or original(asr, ref, *a, **k))
+    second = cli.batch_process_directory(asr_dir, ref_dir, 'jieba', False, output,
+                                         evaluation_mode='char', resume=True)
+    assert [os.path.basename(p) for p in processed] == ["2.txt"]
+    assert len(second) == 1
+
+    with open(output, encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [r['asr_file'] for r in rows] == ["0.txt", "1.txt", "2.txt"]
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_manifest_resume_keeps_corpus_totals(tmp_path):
+    """清单模式续跑时汇总统计包含之前已完成的记录"""
+    manifest = tmp_path / "pairs.jsonl"
+    records = [{'utt_id': "a", 'ref': "今天天气很好", 'hyp': "今天天气不好"},
+               {'utt_id': "b", 'ref': "我来到北京", 'hyp': "我来到"}]
+    manifest.write_text("\n".join(json.dumps(r, ensure_ascii=False) for r in records),
+                        encoding='utf-8')
+    output = str(tmp_path / "results.jsonl")
+
+    full = cli.evaluate_manifest(str(manifest), 'jieba', False, output, evaluation_mode='char')
+    resumed = cli.evaluate_manifest(str(manifest), 'jieba', False, output,
+                                    evaluation_mode='char', resume=True)
+    assert resumed['skipped'] == 2
+    assert resumed['corpus_cer'] == pytest.approx(full['corpus_cer'])
+    assert resumed['records'] == full['records'] == 2
+    with open(output, encoding='utf-8') as f:
+        assert len(f.readlines()) == 2
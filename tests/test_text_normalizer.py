@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试融合式文本标准化器（text_normalizer模块）
+与原有的jiwer.Compose + 正则标准化实现逐字符对照
+"""
+
+import sys
+import os
+import re
+import random
+import itertools
+import unicodedata
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+import jiwer
+from text_normalizer import get_normalizer, TextNormalizer
+from asr_metrics_refactored import ASRMetrics
+
+
+CONFIGS = list(itertools.product([True, False], repeat=3))
+
+# 覆盖全半角、标点、大小写、数字、空白以及需要慢速路径的字符
+CHAR_POOL = ("今天天气很好我们 \t\n　ΣΑΣσ123１２３①⑩¹ＡＢＣabcİ,.!？。、“”‘’"
+             "é́가ㄱㅏ각가がｶﾞ㌀ﬁ¨´－—…·《》〇_ ")
+
+SAMPLE_TEXTS = [
+    "",
+    "   ",
+    "今天天气很好",
+    "Hello， World！ 你好世界。",
+    "ＡＳＲ测试１２３，ABC abc",
+    "价格是 1,234.56 元，共 ３ 件",
+    "  前后  有 多个   空格  ",
+    "ΟΔΥΣΣΕΥΣ 希腊文大写",
+    "é 组合字符 ㄱㅏ 韩文字母 ｶﾞ 半角浊音",
+    "表情😀和扩展汉字𠀀",
+]
+
+
+def legacy_clean(text):
+    """原有ASRMetrics._preprocess中的jiwer基础转换"""
+    return jiwer.Compose([
+        jiwer.RemoveMultipleSpaces(),
+        jiwer.Strip(),
+        jiwer.RemovePunctuation(),
+        jiwer.ToLowerCase(),
+    ])(text)
+
+
+def legacy_normalize(text, normalize_width=True, normalize_numbers=False, remove_punctuation=True):
+    """原有ASRMetrics.normalize_chinese_text的逐步实现"""
+    if remove_punctuation:
+        text = re.sub(r'[^\w\s]', '', text)
+    if normalize_width:
+        text = unicodedata.normalize('NFKC', text)
+    if normalize_numbers:
+        text = re.sub(r'[0-9０-９]+', '0', text)
+    return re.sub(r'\s+', '', text)
+
+
+def _random_texts(count, seed):
+    """从字符池和整个BMP中随机生成文本"""
+    rng = random.Random(seed)
+    bmp = [chr(c) for c in range(0x20, 0x10000) if not 0xD800 <= c <= 0xDFFF]
+    texts = []
+    for _ in range(count):
+        source = CHAR_POOL if rng.random() < 0.6 else bmp
+        text = ''.join(rng.choice(source) for _ in range(rng.randint(0, 16)))
+        if rng.random() < 0.05:
+            text += chr(rng.randint(0x10000, 0x2FFFF))
+        texts.append(text)
+    return texts
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("config", CONFIGS)
+def test_parity_on_samples(config):
+    """样例文本上与原有实现一致"""
+    normalizer = get_normalizer(*config)
+    for text in SAMPLE_TEXTS:
+        cleaned = legacy_clean(text)
+        assert normalizer.clean(text) == cleaned, text
+        assert normalizer.normalize(text) == legacy_normalize(text, *config), text
+        assert normalizer(text) == legacy_normalize(cleaned, *config), text
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("config", CONFIGS)
+def test_parity_on_random_texts(config):
+    """随机文本上与原有实现一致"""
+    normalizer = get_normalizer(*config)
+    for text in _random_texts(400, seed=sum(config)):
+        cleaned = legacy_clean(text)
+        assert normalizer.clean(text) == cleaned, repr(text)
+        assert normalizer.normalize(text) == legacy_normalize(text, *config), repr(text)
+        assert normalizer(text) == legacy_normalize(cleaned, *config), repr(text)
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_every_bmp_character():
+    """逐个BMP字符（单独出现及与常见字符相邻）与原有标准化实现一致"""
+    normalizer = get_normalizer()
+    numbers = get_normalizer(normalize_numbers=True)
+    for code in range(0x10000):
+        if 0xD800 <= code <= 0xDFFF:
+            continue
+        char = chr(code)
+        for text in (char, "a" + char, char + "1", "1" + char + "2"):
+            assert normalizer.normalize(text) == legacy_normalize(text), repr(text)
+            assert numbers.normalize(text) == legacy_normalize(text, normalize_numbers=True), repr(text)
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_normalizer_is_compiled_once_per_config():
+    """同一配置复用同一个实例，不同配置互不影响"""
+    assert get_normalizer() is get_normalizer(True, False, True)
+    assert get_normalizer(normalize_numbers=True) is not get_normalizer()
+    assert isinstance(get_normalizer(), TextNormalizer)
+    assert get_normalizer(normalize_numbers=True).normalize("第１２３号") == "第0号"
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("mode", ["token", "char"])
+@pytest.mark.parametrize("filter_fillers", [False, True])
+def test_preprocess_text_parity(mode, filter_fillers):
+    """ASRMetrics.preprocess_text与原有jiwer流水线结果一致"""
+    metrics = ASRMetrics('jieba', evaluation_mode=mode)
+    for text in SAMPLE_TEXTS + ["嗯，这个问题啊，我们需要讨论一下"]:
+        if not text.strip():
+            expected = ""
+        else:
+            expected = legacy_clean(text)
+            if expected and filter_fillers:
+                expected = metrics.filter_filler_words(expected)
+            if expected and mode == 'token':
+                expected = metrics.preprocess_chinese_text(expected)
+            expected = legacy_normalize(expected)
+        assert metrics.preprocess_text(text, filter_fillers) == expected, text
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试THULAC分词器：每个文本只调用一次THULAC、结构化解析、线性游标定位
+使用离线替身，不需要安装THULAC
+"""
+
+import sys
+import os
+import time
+import unicodedata
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+from text_tokenizers import ThulacTokenizer
+
+
+class StubThulac:
+    """THULAC替身：按空白断开、全角转半角后每两个字符切成一个词，记录调用次数"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def cut(self, sentence, text=False):
+        self.calls += 1
+        assert text is False
+        words = []
+        for piece in sentence.split():
+            piece = unicodedata.normalize('NFKC', piece)
+            words.extend(piece[i:i + 2] for i in range(0, len(piece), 2))
+        return [[word, 'n' if i % 2 else 'v'] for i, word in enumerate(words)]
+
+
+def _tokenizer():
+    tokenizer = ThulacTokenizer()
+    tokenizer.thu = StubThulac()
+    tokenizer.is_initialized = True
+    return tokenizer
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_single_call_shared_by_all_methods():
+    """同一文本依次cut、posseg、tokenize只调用一次THULAC"""
+    tokenizer = _tokenizer()
+    text = "今天天气很好我们去公园"
+    words = tokenizer.cut(text)
+    tags = tokenizer.posseg(text)
+    tokens = tokenizer.tokenize(text)
+
+    assert tokenizer.thu.calls == 1
+    assert words == ["今天", "天气", "很好", "我们", "去公", "园"]
+    assert tags[:2] == [("今天", 'v'), ("天气", 'n')]
+    assert tokens[-1] == ("园", 10, 11)
+
+    tokenizer.cut("另一段文本")
+    tokenizer.cut(text)
+    assert tokenizer.thu.calls == 3
+    assert tokenizer.cut("   ") == [] and tokenizer.thu.calls == 3
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_offsets_handle_dropped_spaces_and_width_changes():
+    """原文中的空白被丢弃、全角字符被转换时位置仍然对应原文"""
+    tokenizer = _tokenizer()
+    text = "今天 天气ＡＢ很 好"
+    tokens = tokenizer.tokenize(text)
+    assert tokens == [("今天", 0, 2), ("天气", 3, 5), ("AB", 5, 7), ("很", 7, 8), ("好", 9, 10)]
+    assert tokenizer.offset_mismatches == 1
+    assert tokenizer.get_info()['offset_mismatches'] == 1
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_tokenize_is_linear():
+    """长文本（含大量空白）的定位耗时与长度成线性关系"""
+    tokenizer = _tokenizer()
+    text = ("我们 今天 去公园 " * 20000).strip()
+    start = time.perf_counter()
+    tokens = tokenizer.tokenize(text)
+    assert time.perf_counter() - start < 2.0
+    assert all(text[s:e] == w for w, s, e in tokens)
+    assert tokenizer.offset_mismatches == 0
+    assert tokens[-1][2] == len(text)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试紧凑的分词位置表示TokenSpans和(字符, 位置)视图CharacterPositions：
+与元组列表结果一致，且字符定位的内存分配明显少于逐字符元组列表
+使用离线替身分词器，不需要安装jieba等依赖
+"""
+
+import sys
+import os
+import tracemalloc
+import unicodedata
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+from text_tokenizers import BaseTokenizer, TokenSpans, CharacterPositions
+from asr_metrics_refactored import ASRMetrics
+
+
+class PairTokenizer(BaseTokenizer):
+    """每两个字符切成一个词的测试分词器，normalize为True时输出全角转半角后的词语"""
+
+    def __init__(self, normalize=False):
+        super().__init__()
+        self.normalize = normalize
+        self.is_initialized = True
+
+    def initialize(self):
+        return True
+
+    def cut(self, text):
+        return [word for word, _, _ in self.tokenize(text)]
+
+    def posseg(self, text):
+        return [(word, 'x') for word in self.cut(text)]
+
+    def tokenize(self, text):
+        text = self.validate_text(text)
+        tokens = []
+        for start in range(0, len(text), 2):
+            word = text[start:start + 2]
+            if self.normalize:
+                word = unicodedata.normalize('NFKC', word)
+            tokens.append((word, start, start + len(text[start:start + 2])))
+        return tokens
+
+
+def _expected_positions(tokens):
+    """逐个展开词语得到的(字符, 位置)元组列表（原有实现）"""
+    return [(char, start + i) for word, start, _ in tokens for i, char in enumerate(word)]
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("normalize", [False, True])
+def test_spans_match_tokenize(normalize):
+    """按序列使用时与tokenize结果一致，字符视图与展开的元组列表一致"""
+    tokenizer = PairTokenizer(normalize)
+    text = "今天ＡＢ天气很好，ｘ"
+    tokens = tokenizer.tokenize(text)
+    spans = tokenizer.tokenize_spans(text)
+
+    assert isinstance(spans, TokenSpans)
+    assert spans == tokens
+    assert list(spans) == tokens
+    assert spans[-1] == tokens[-1]
+    assert spans[1:3] == tokens[1:3]
+    assert spans.characters() == "".join(word for word, _, _ in tokens)
+
+    positions = spans.character_positions()
+    expected = _expected_positions(tokens)
+    assert isinstance(positions, CharacterPositions)
+    assert len(positions) == len(expected)
+    assert positions == expected
+    assert [positions[i] for i in range(-len(expected), len(expected))] == expected + expected
+    with pytest.raises(IndexError):
+        positions[len(expected)]
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_boundary_bitmap():
+    """词语起点位图只标记每个词语的开始位置"""
+    spans = TokenSpans.from_tokens("我来到北京", [("我", 0, 1), ("来到", 1, 3), ("北京", 3, 5)])
+    assert [spans.is_boundary(pos) for pos in range(6)] == [True, True, False, True, False, False]
+    assert spans.nbytes < 64
+
+    single = TokenSpans.single_characters("北京")
+    assert single == [("北", 0, 1), ("京", 1, 2)]
+    assert all(single.is_boundary(pos) for pos in range(2))
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_get_character_positions_view():
+    """ASRMetrics的字符定位返回视图，结果与原有元组列表一致；分词失败时回退为逐字符"""
+    metrics = ASRMetrics(evaluation_mode='char')
+    metrics.tokenizer = PairTokenizer()
+    text = "人工智能技术发展很快"
+
+    positions = metrics.get_character_positions(text)
+    assert positions == _expected_positions(metrics.tokenizer.tokenize(text))
+    assert positions.characters() == text
+    assert metrics.get_character_positions("   ") == []
+
+    metrics.tokenizer = type('Broken', (), {'tokenize_spans': lambda self, t: 1 / 0})()
+    assert metrics.get_character_positions("北京") == [("北", 0), ("京", 1)]
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_character_positions_allocate_less():
+    """长文本的字符定位：视图加字符序列的峰值分配远小于逐字符元组列表"""
+    tokens = PairTokenizer().tokenize("语音识别字准确率" * 6250)
+
+    tracemalloc.start()
+    positions = _expected_positions(tokens)
+    "".join(pos[0] for pos in positions)
+    _, list_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del positions
+
+    text = "语音识别字准确率" * 6250
+    tracemalloc.start()
+    spans = TokenSpans.from_tokens(text, iter(tokens))
+    spans.character_positions().characters()
+    _, spans_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert spans_peak * 5 < list_peak
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试TokenizerFactory的线程安全与进程感知：
+单次初始化（single-flight）、shared/per_thread实例策略、fork后在子进程中重新初始化
+"""
+
+import sys
+import os
+import time
+import threading
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+from text_tokenizers import TokenizerFactory, BaseTokenizer
+
+
+class SlowTokenizer(BaseTokenizer):
+    """初始化较慢的测试分词器，记录初始化次数和所在进程"""
+
+    package = 'json'
+    initializations = 0
+    counter_lock = threading.Lock()
+
+    def initialize(self):
+        with SlowTokenizer.counter_lock:
+            SlowTokenizer.initializations += 1
+        time.sleep(0.05)
+        self.pid = os.getpid()
+        self.thread = threading.get_ident()
+        self.is_initialized = True
+        return True
+
+    def cut(self, text):
+        return list(text)
+
+    def posseg(self, text):
+        return [(c, 'x') for c in text]
+
+    def tokenize(self, text):
+        return [(c, i, i + 1) for i, c in enumerate(text)]
+
+
+class PerThreadTokenizer(SlowTokenizer):
+    """非线程安全的测试分词器"""
+
+    thread_policy = 'per_thread'
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """只注册测试分词器的独立工厂状态"""
+    monkeypatch.setattr(TokenizerFactory, '_available_tokenizers',
+                        {'slow': SlowTokenizer, 'local': PerThreadTokenizer})
+    monkeypatch.setattr(TokenizerFactory, '_tokenizers', {})
+    monkeypatch.setattr(TokenizerFactory, '_instances', {})
+    monkeypatch.setattr(TokenizerFactory, '_init_locks', {})
+    monkeypatch.setattr(TokenizerFactory, '_result_cache_sizes', {})
+    monkeypatch.setattr(SlowTokenizer, 'initializations', 0)
+
+
+def _get_from_threads(name, count=8):
+    """多个线程同时请求同一分词器，返回各线程拿到的实例"""
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(index):
+        barrier.wait()
+        results[index] = TokenizerFactory.get_tokenizer(name)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_shared_tokenizer_is_initialized_once(registry):
+    """多个线程同时请求共享分词器时只初始化一次"""
+    results = _get_from_threads('slow')
+    assert SlowTokenizer.initializations == 1
+    assert all(tokenizer is results[0] for tokenizer in results)
+    assert TokenizerFactory.get_tokenizer('slow') is results[0]
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_per_thread_policy(registry):
+    """per_thread分词器每个线程一个实例，同一线程内复用；结果缓存开关作用于全部实例"""
+    results = _get_from_threads('local', count=4)
+    assert SlowTokenizer.initializations == 4
+    assert len({id(tokenizer) for tokenizer in results}) == 4
+    assert all(tokenizer.thread != threading.get_ident() for tokenizer in results)
+
+    main = TokenizerFactory.get_tokenizer('local')
+    assert TokenizerFactory.get_tokenizer('local') is main
+    assert main.thread == threading.get_ident()
+    assert TokenizerFactory.probe_tokenizer('local')['loaded']
+
+    TokenizerFactory.enable_result_cache('local', maxsize=8)
+    assert all(tokenizer.result_cache is not None for tokenizer in results + [main])
+
+    TokenizerFactory.clear_cache()
+    assert TokenizerFactory.get_tokenizer('local') is not main
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="需要fork")
+def test_forked_child_reinitializes(registry):
+    """fork出的子进程不复用父进程的实例，重新初始化"""
+    parent = TokenizerFactory.get_tokenizer('slow')
+    assert parent.pid == os.getpid()
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            child = TokenizerFactory.get_tokenizer('slow')
+            ok = child is not parent and child.pid == os.getpid() and child.cut("好") == ["好"]
+            os.write(write_fd, b'1' if ok else b'0')
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    os.waitpid(pid, 0)
+    assert os.read(read_fd, 1) == b'1'
+    os.close(read_fd)
+    assert TokenizerFactory.get_tokenizer('slow') is parent
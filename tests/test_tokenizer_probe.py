@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试分词器两级可用性探测：installed（依赖已安装，不加载模型）与loaded（首次使用时加载）
+"""
+
+import sys
+import os
+import importlib.util
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+from text_tokenizers import TokenizerFactory, BaseTokenizer, TokenizerInitError
+from text_tokenizers.tokenizers import factory as factory_module
+import cli
+
+
+class FakeTokenizer(BaseTokenizer):
+    """依赖已安装（标准库json）的测试分词器，记录实例化次数"""
+
+    package = 'json'
+    description = '测试分词器'
+    instances = 0
+    fail = False
+
+    def __init__(self):
+        super().__init__()
+        FakeTokenizer.instances += 1
+
+    def initialize(self):
+        if FakeTokenizer.fail:
+            raise TokenizerInitError("模型加载失败")
+        self.version = '1.0'
+        self.is_initialized = True
+        return True
+
+    def cut(self, text):
+        return list(text)
+
+    def posseg(self, text):
+        return [(c, 'x') for c in text]
+
+    def tokenize(self, text):
+        return [(c, i, i + 1) for i, c in enumerate(text)]
+
+
+class MissingTokenizer(FakeTokenizer):
+    """依赖未安装的测试分词器"""
+
+    package = 'no_such_tokenizer_package_xyz'
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """只注册测试分词器的独立工厂状态"""
+    monkeypatch.setattr(TokenizerFactory, '_available_tokenizers',
+                        {'fake': FakeTokenizer, 'missing': MissingTokenizer})
+    monkeypatch.setattr(TokenizerFactory, '_tokenizers', {})
+    monkeypatch.setattr(TokenizerFactory, '_install_probes', {})
+    monkeypatch.setattr(TokenizerFactory, '_load_errors', {})
+    monkeypatch.setattr(FakeTokenizer, 'instances', 0)
+    monkeypatch.setattr(FakeTokenizer, 'fail', False)
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_listing_does_not_instantiate(registry, monkeypatch):
+    """列出可用分词器只探测依赖，不创建实例；探测结果在进程内缓存"""
+    calls = []
+    original = importlib.util.find_spec
+    monkeypatch.setattr(factory_module.importlib.util, 'find_spec',
+                        lambda name: calls.append(name) or original(name))
+
+    assert TokenizerFactory.get_available_tokenizers() == ['fake']
+    assert TokenizerFactory.get_available_tokenizers() == ['fake']
+    assert FakeTokenizer.instances == 0
+    assert calls == ['json', 'no_such_tokenizer_package_xyz']
+
+    status = TokenizerFactory.probe_tokenizer('fake')
+    assert status['installed'] and not status['loaded']
+    assert status['description'] == '测试分词器'
+    missing = TokenizerFactory.probe_tokenizer('missing')
+    assert not missing['installed'] and 'error' in missing
+    assert TokenizerFactory.check_tokenizer_availability('fake')
+    assert FakeTokenizer.instances == 0
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_loaded_state_and_load_failures(registry):
+    """首次使用时加载并标记为loaded；加载失败的分词器不再列为可用"""
+    TokenizerFactory.get_tokenizer('fake')
+    status = TokenizerFactory.probe_tokenizer('fake')
+    assert status['loaded'] and status['version'] == '1.0'
+    assert FakeTokenizer.instances == 1
+
+    TokenizerFactory.clear_cache()
+    FakeTokenizer.fail = True
+    with pytest.raises(TokenizerInitError):
+        TokenizerFactory.get_tokenizer('fake')
+    assert TokenizerFactory.get_available_tokenizers() == []
+    assert TokenizerFactory.probe_tokenizer('fake')['error'] == "模型加载失败"
+    assert not TokenizerFactory.check_tokenizer_availability('fake', load=True)
+
+    FakeTokenizer.fail = False
+    assert TokenizerFactory.check_tokenizer_availability('fake', load=True)
+    assert TokenizerFactory.get_available_tokenizers() == ['fake']
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_cli_list_tokenizers(registry, capsys):
+    """cli.py --list-tokenizers 不加载任何分词器"""
+    cli.list_tokenizers()
+    output = capsys.readouterr().out
+    assert "✓ fake" in output and "首次使用时加载" in output
+    assert "✗ missing" in output
+    assert "共 1 个可用分词器" in output
+    assert FakeTokenizer.instances == 0
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_backends_are_imported_lazily():
+    """导入cli和text_tokenizers不会导入jieba，分词器类在首次访问时才导入"""
+    import subprocess
+    src_dir = os.path.join(os.path.dirname(__file__), '../dev/src')
+    code = (
+        "import sys, cli, text_tokenizers\n"
+        "assert 'jieba' not in sys.modules\n"
+        "assert 'text_tokenizers.tokenizers.jieba_tokenizer' not in sys.modules\n"
+        "text_tokenizers.get_available_tokenizers()\n"
+        "assert 'jieba' not in sys.modules\n"
+        "from text_tokenizers import JiebaTokenizer\n"
+        "assert JiebaTokenizer is text_tokenizers.TokenizerFactory.get_tokenizer_class('jieba')\n"
+        "JiebaTokenizer()\n"
+        "assert 'jieba.posseg' in sys.modules\n"
+    )
+    subprocess.run([sys.executable, '-c', code], cwd=src_dir, check=True)
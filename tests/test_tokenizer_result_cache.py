@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试分词结果缓存（TokenizerResultCache / cached_result / cached_batch）
+以及工厂按分词器开启缓存
+"""
+
+import sys
+import os
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+from text_tokenizers import TokenizerFactory, HanlpTokenizer, TokenizerResultCache
+
+
+class CountingModel:
+    """离线HanLP模型替身：按字切分并统计调用次数"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, data):
+        self.calls += 1
+        return [list(text) for text in data]
+
+
+def _stub_hanlp():
+    tokenizer = HanlpTokenizer()
+    tokenizer.tok_model = CountingModel()
+    tokenizer.is_initialized = True
+    return tokenizer
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_cache_is_opt_in_and_counts():
+    """默认不缓存；开启后命中不再调用模型，统计通过get_info()报告"""
+    tokenizer = _stub_hanlp()
+    tokenizer.cut("今天天气很好")
+    tokenizer.cut("今天天气很好")
+    assert tokenizer.tok_model.calls == 2
+    assert 'result_cache' not in tokenizer.get_info()
+
+    tokenizer.enable_result_cache(maxsize=2)
+    first = tokenizer.cut("今天天气很好")
+    first.append("被调用方修改")
+    assert tokenizer.cut("今天天气很好") == list("今天天气很好")
+    assert tokenizer.tokenize("今天") == [("今", 0, 1), ("天", 1, 2)]
+    assert tokenizer.tok_model.calls == 4
+
+    stats = tokenizer.get_info()['result_cache']
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 2, 0)
+    assert stats['methods']['cut'] == {'hits': 1, 'misses': 1, 'evictions': 0, 'entries': 1}
+
+    # 每个方法独立按容量淘汰
+    tokenizer.cut("第二条")
+    tokenizer.cut("第三条")
+    assert tokenizer.get_info()['result_cache']['methods']['cut']['evictions'] == 1
+    tokenizer.cut("今天天气很好")
+    assert tokenizer.tok_model.calls == 7
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_batch_shares_cache_and_config_is_part_of_key():
+    """批量方法与单条方法共用缓存，只把未命中的文本送入模型；分片配置变化时不命中旧结果"""
+    tokenizer = _stub_hanlp()
+    cache = tokenizer.enable_result_cache()
+    assert isinstance(cache, TokenizerResultCache)
+
+    tokenizer.cut("甲乙丙")
+    assert tokenizer.cut_batch(["甲乙丙", "丁戊", "丁戊"]) == [list("甲乙丙"), list("丁戊"), list("丁戊")]
+    assert tokenizer.tok_model.calls == 2
+    stats = cache.get_stats()['methods']['cut']
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 2, 2)
+
+    # posseg内部的分词不会重复计数
+    tokenizer.posseg("甲乙丙")
+    assert set(cache.get_stats()['methods']) == {'cut', 'posseg'}
+    assert cache.get_stats()['methods']['posseg']['misses'] == 1
+
+    tokenizer.max_chunk_length = 2
+    tokenizer.cut("甲乙丙")
+    assert cache.get_stats()['methods']['cut']['misses'] == 3
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_factory_enables_cache_per_tokenizer():
+    """工厂按名称开启缓存，对已创建和新创建的实例都生效"""
+    try:
+        jieba_tokenizer = TokenizerFactory.get_tokenizer('jieba')
+        TokenizerFactory.enable_result_cache('jieba', maxsize=16)
+        assert jieba_tokenizer.result_cache.maxsize == 16
+        assert TokenizerFactory.create_tokenizer('jieba').result_cache is not None
+
+        words = jieba_tokenizer.cut("我来到北京清华大学")
+        assert jieba_tokenizer.cut("我来到北京清华大学") == words
+        assert jieba_tokenizer.get_info()['result_cache']['hits'] == 1
+
+        with pytest.raises(ValueError):
+            TokenizerFactory.enable_result_cache('unknown')
+    finally:
+        TokenizerFactory.disable_result_cache('jieba')
+    assert jieba_tokenizer.result_cache is None
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试共享分词服务：服务进程只加载一份分词器，多个客户端进程通过RemoteTokenizer获得与本地一致的结果
+"""
+
+import sys
+import os
+import multiprocessing
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+from text_tokenizers import (JiebaTokenizer, RemoteTokenizer, TokenizerFactory, TokenizerInitError,
+                             start_tokenizer_service, use_tokenizer_service)
+from text_tokenizers.tokenizers.service import parse_address
+
+
+TEXTS = ["今天天气很好", "我们一起去公园散步", "", "语音识别的字准确率"]
+AUTHKEY = b"test-tokenizer-service"
+
+
+@pytest.fixture(scope="module")
+def service(tmp_path_factory):
+    """在Unix socket上启动预加载jieba的分词服务"""
+    address = str(tmp_path_factory.mktemp("service") / "tokenizers.sock")
+    manager = start_tokenizer_service(address, authkey=AUTHKEY, preload=['jieba'])
+    yield address
+    manager.shutdown()
+
+
+def _client_cut(args):
+    """工作进程中连接服务并分词"""
+    address, texts = args
+    tokenizer = RemoteTokenizer('jieba', address, AUTHKEY)
+    tokenizer.initialize()
+    return tokenizer.cut_batch(texts), tokenizer.get_service_stats()['pid']
+
+
+@pytest.mark.unit
+def test_remote_results_match_local(service):
+    """远程分词器的各方法结果与本地jieba一致"""
+    remote = RemoteTokenizer('jieba', service, AUTHKEY)
+    remote.initialize()
+    local = JiebaTokenizer()
+    local.initialize()
+
+    assert remote.name == 'jieba' and remote.version == local.version
+    assert remote.cut_batch(TEXTS) == local.cut_batch(TEXTS)
+    assert remote.posseg_batch(TEXTS) == local.posseg_batch(TEXTS)
+    assert remote.tokenize_batch(TEXTS) == local.tokenize_batch(TEXTS)
+    assert remote.cut(TEXTS[1]) == local.cut(TEXTS[1])
+    assert remote.posseg(TEXTS[1]) == local.posseg(TEXTS[1])
+    assert remote.tokenize(TEXTS[1]) == local.tokenize(TEXTS[1])
+    assert remote.get_info()['service_address'] == service
+
+
+@pytest.mark.unit
+def test_many_clients_share_one_server(service):
+    """多个客户端进程由同一个服务进程处理"""
+    with multiprocessing.get_context('spawn').Pool(3) as pool:
+        outputs = pool.map(_client_cut, [(service, TEXTS)] * 3)
+
+    assert len({pid for _, pid in outputs}) == 1
+    assert outputs[0][1] != os.getpid()
+    assert all(words == outputs[0][0] for words, _ in outputs)
+
+    remote = RemoteTokenizer('jieba', service, AUTHKEY)
+    remote.initialize()
+    stats = remote.get_service_stats()
+    assert stats['loaded'] == ['jieba']
+    assert stats['texts']['jieba'] >= 3 * len(TEXTS)
+
+
+@pytest.mark.unit
+def test_factory_uses_service(service, monkeypatch):
+    """use_tokenizer_service之后工厂创建的是远程分词器"""
+    monkeypatch.setattr(TokenizerFactory, '_available_tokenizers', dict(TokenizerFactory._available_tokenizers))
+    monkeypatch.setattr(TokenizerFactory, '_tokenizer_options', {})
+    monkeypatch.setattr(TokenizerFactory, '_tokenizers', {})
+
+    use_tokenizer_service(service, AUTHKEY, names=['jieba'])
+    tokenizer = TokenizerFactory.get_tokenizer('jieba')
+    assert isinstance(tokenizer, RemoteTokenizer)
+    assert tokenizer.cut("今天天气很好") == ["今天天气", "很", "好"]
+
+
+@pytest.mark.unit
+def test_cache_config_follows_server_options(service, tmp_path):
+    """远程分词器的缓存配置取自服务端，服务端加载自定义词典时与默认配置不同"""
+    remote = RemoteTokenizer('jieba', service, AUTHKEY)
+    remote.initialize()
+    local = JiebaTokenizer()
+    local.initialize()
+    assert remote.cache_config() == local.cache_config()
+
+    user_dict = tmp_path / "terms.txt"
+    user_dict.write_text("星河语音 10 nz\n", encoding='utf-8')
+    address = str(tmp_path / "custom.sock")
+    manager = start_tokenizer_service(address, authkey=AUTHKEY,
+                                      options={'jieba': {'user_dicts': [str(user_dict)]}})
+    try:
+        custom = RemoteTokenizer('jieba', address, AUTHKEY)
+        custom.initialize()
+        assert custom.cache_config() != remote.cache_config()
+        assert str(user_dict) in custom.cache_config()[-1]
+    finally:
+        manager.shutdown()
+
+
+@pytest.mark.unit
+def test_connection_failure(tmp_path):
+    """服务不存在或密钥错误时初始化失败"""
+    with pytest.raises(TokenizerInitError):
+        RemoteTokenizer('jieba', str(tmp_path / "missing.sock"), AUTHKEY).initialize()
+    with pytest.raises(TokenizerInitError):
+        RemoteTokenizer('jieba').initialize()
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_parse_address():
+    """命令行地址解析"""
+    assert parse_address("/tmp/tokenizers.sock") == "/tmp/tokenizers.sock"
+    assert parse_address("127.0.0.1:5000") == ("127.0.0.1", 5000)
+    assert parse_address("tokenizers.sock") == "tokenizers.sock"
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试Kaldi/ESPnet风格语句表的按编号连接（归并连接、哈希连接及分区落盘），
+以及cli.py的--ref-table/--hyp-table模式
+"""
+
+import sys
+import os
+import csv
+import random
+import pytest
+
+# 添加src目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../dev/src'))
+
+from utterance_table import (UtteranceTableError, parse_line, is_sorted_table,
+                             merge_join, hash_join, join_tables)
+import cli
+
+
+def _write_table(path, items):
+    path.write_text("".join(f"{utt_id} {text}\n" for utt_id, text in items), encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def tables(tmp_path):
+    """参考表缺少u05，识别表缺少u03，文本中带空格"""
+    refs = [(f"u{i:02d}", f"参考 文本{i}") for i in range(10) if i != 5]
+    hyps = [(f"u{i:02d}", f"识别 文本{i}") for i in range(10) if i != 3]
+    return tmp_path, refs, hyps
+
+
+def _expected(refs, hyps):
+    ref_map, hyp_map = dict(refs), dict(hyps)
+    return sorted((k, ref_map.get(k), hyp_map.get(k)) for k in set(ref_map) | set(hyp_map))
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_parse_line():
+    """编号与文本以第一个空白分隔，文本可以为空"""
+    assert parse_line("utt1 你好 世界\n") == ("utt1", "你好 世界")
+    assert parse_line("utt2\n") == ("utt2", "")
+    assert parse_line("  \n") is None
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_merge_join_sorted_tables(tables):
+    """已排序的表归并连接，按编号顺序产出，缺失的一侧为None"""
+    tmp_path, refs, hyps = tables
+    ref_path = _write_table(tmp_path / "ref", refs)
+    hyp_path = _write_table(tmp_path / "hyp", hyps)
+    assert is_sorted_table(ref_path) and is_sorted_table(hyp_path)
+    assert list(merge_join(ref_path, hyp_path)) == _expected(refs, hyps)
+    assert list(join_tables(ref_path, hyp_path)) == _expected(refs, hyps)
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("max_memory_items", [100, 2])
+def test_hash_join_unsorted_tables(tables, max_memory_items):
+    """未排序的表哈希连接（含分区落盘），结果集合与归并连接一致，临时文件被清理"""
+    tmp_path, refs, hyps = tables
+    random.Random(0).shuffle(refs)
+    random.Random(1).shuffle(hyps)
+    ref_path = _write_table(tmp_path / "ref", refs)
+    hyp_path = _write_table(tmp_path / "hyp", hyps)
+    spill_dir = tmp_path / "spill"
+    spill_dir.mkdir()
+
+    assert not is_sorted_table(ref_path)
+    joined = list(hash_join(ref_path, hyp_path, max_memory_items=max_memory_items,
+                            partitions=3, spill_dir=str(spill_dir)))
+    assert sorted(joined) == _expected(refs, hyps)
+    assert os.listdir(spill_dir) == []
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_duplicate_and_unsorted_ids(tmp_path):
+    """归并连接遇到未排序或重复的编号报错，哈希连接遇到识别表编号重复报错"""
+    ref_path = _write_table(tmp_path / "ref", [("b", "x"), ("a", "y")])
+    hyp_path = _write_table(tmp_path / "hyp", [("a", "x"), ("a", "y")])
+    with pytest.raises(UtteranceTableError, match="未排序"):
+        list(merge_join(ref_path, ref_path))
+    with pytest.raises(UtteranceTableError, match="重复"):
+        list(merge_join(hyp_path, hyp_path))
+    with pytest.raises(UtteranceTableError, match="重复"):
+        list(join_tables(ref_path, hyp_path))
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("max_memory_items", [100, 0])
+def test_hash_join_duplicate_ref_ids(tmp_path, max_memory_items):
+    """哈希连接（含分区落盘）与归并连接一致：参考表编号重复时报错，而不是产出缺少识别结果的语句"""
+    ref_path = _write_table(tmp_path / "ref", [("b", "x"), ("a", "y"), ("b", "z")])
+    hyp_path = _write_table(tmp_path / "hyp", [("a", "y"), ("b", "x")])
+    with pytest.raises(UtteranceTableError, match="ref: 语句编号重复: b"):
+        list(hash_join(ref_path, hyp_path, max_memory_items=max_memory_items, partitions=3,
+                       spill_dir=str(tmp_path)))
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+@pytest.mark.parametrize("assume_sorted", [None, False])
+def test_evaluate_tables_totals(tmp_path, assume_sorted):
+    """语句表评估输出逐句结果和总体统计，只有一侧存在的语句单独计数"""
+    ref_path = _write_table(tmp_path / "ref", [("a", "今天天气很好"), ("b", "我来到北京"), ("c", "多余")])
+    hyp_path = _write_table(tmp_path / "hyp", [("a", "今天天气不好"), ("b", "我来到"), ("d", "没有参考")])
+    output = tmp_path / "per_utt.csv"
+
+    summary = cli.evaluate_tables(ref_path, hyp_path, 'jieba', False, str(output),
+                                  assume_sorted=assume_sorted, evaluation_mode='char')
+    assert (summary['records'], summary['missing_hyp'], summary['missing_ref']) == (2, 1, 1)
+    assert summary['corpus_cer'] == pytest.approx(3 / 11)
+
+    with open(output, encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [r['utt_id'] for r in rows] == ["a", "b"]
+    assert float(rows[0]['cer']) == pytest.approx(1 / 6)
+
+
+@pytest.mark.basic
+@pytest.mark.unit
+def test_cli_table_options(tmp_path):
+    """--ref-table和--hyp-table必须同时指定，--tables-sorted遇到未排序的表退出码为1"""
+    ref_path = _write_table(tmp_path / "ref", [("b", "x"), ("a", "y")])
+    hyp_path = _write_table(tmp_path / "hyp", [("a", "y")])
+    sys_argv = sys.argv
+    try:
+        sys.argv = ['cli.py', '--ref-table', ref_path, '--mode', 'char']
+        assert cli.main() == 1
+        sys.argv = ['cli.py', '--ref-table', ref_path, '--hyp-table', hyp_path,
+                    '--mode', 'char', '--tables-sorted']
+        assert cli.main() == 1
+        sys.argv = ['cli.py', '--ref-table', ref_path, '--hyp-table', hyp_path, '--mode', 'char']
+        assert cli.main() == 0
+    finally:
+        sys.argv = sys_argv